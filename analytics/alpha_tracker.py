@@ -5,6 +5,7 @@ import json
 import os
 import datetime
 from pathlib import Path
+from core.utils.jsonl_tail import tail_jsonl
 
 LOG_PATH = Path("logs/alpha_decay_log.jsonl")
 
@@ -32,8 +33,7 @@ def get_decay_score(symbol):
     Replace this with live model or journal-based decay scoring.
     """
     try:
-        with open(LOG_PATH, "r") as f:
-            entries = [json.loads(line) for line in f if symbol in line]
+        entries = tail_jsonl(str(LOG_PATH), 1, predicate=lambda e: e.get("symbol") == symbol)
         if not entries:
             return 0.0
         latest = entries[-1]
@@ -0,0 +1,241 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: analytics/bs_pricing.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Vectorized Black-Scholes pricing, greeks and implied volatility for a whole chain.
+
+Polygon's snapshot greeks are stale between downloads, and many contracts
+have none at all. This module recomputes them from the live bid/ask:
+
+* `implied_vol()`: vectorized Newton-Raphson on vega. Contracts that diverge
+  or stall (deep ITM/OTM, vega ≈ 0) fall back to vectorized bisection. A
+  price outside the no-arbitrage bounds → NaN.
+* `bs_greeks()`: price, delta, gamma, vega (per vol point), theta (per
+  calendar day) and vanna in one pass over the arrays.
+* `time_to_expiry()`: minute-precise year fraction to the 16:00 ET close
+  of the expiry date, floored at one minute. A 0DTE contract at 15:30 has
+  30 minutes left, not zero days.
+* `ChainPricer` holds one `ChainFrame`'s static columns. `solve(spot)`
+  re-solves IVs when quotes change; `at(spot)` re-prices the greeks at a
+  new underlying tick from the last IVs, which is cheap enough to run on
+  every tick.
+* `fill_greeks(frame, spot)` returns the frame with missing IV / delta /
+  gamma / vega / theta filled from the model, so GEX no longer drops those
+  contracts.
+"""
+from __future__ import annotations
+
+import dataclasses
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict
+
+import numpy as np
+import pytz
+from scipy.special import ndtr
+
+from polygon.chain_frame import ChainFrame
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+RISK_FREE      = float(os.getenv("RISK_FREE_RATE", "0.045"))
+DIV_YIELD      = float(os.getenv("SPY_DIV_YIELD", "0.013"))
+SECS_PER_YEAR  = 365.0 * 24 * 3600
+MIN_T          = 60.0 / SECS_PER_YEAR            # one minute
+SIGMA_MIN      = 1e-4
+SIGMA_MAX      = 5.0
+IV_TOL         = 1e-6                            # price units
+MIN_PRICE      = 0.005                           # time value below half a tick → IV is noise
+NEWTON_ITERS   = 8
+BISECT_ITERS   = 60
+
+_eastern = pytz.timezone("US/Eastern")
+_INV_SQRT_2PI = 1.0 / np.sqrt(2.0 * np.pi)
+
+# ---------------------------------------------------------------------------
+# Time
+# ---------------------------------------------------------------------------
+def _close_ts(code: int) -> float:
+    """Epoch seconds of the 16:00 ET close on a YYYYMMDD expiry code."""
+    d = datetime.strptime(f"{int(code):08d}", "%Y%m%d")
+    return _eastern.localize(d.replace(hour=16)).timestamp()
+
+
+def time_to_expiry(expiry: np.ndarray | int, now: float | None = None) -> np.ndarray:
+    """Year fraction from *now* (epoch seconds) to each expiry's close; ≥ one minute, NaN if unknown."""
+    codes = np.atleast_1d(np.asarray(expiry, dtype=np.int64))
+    now = time.time() if now is None else now
+    out = np.full(codes.shape, np.nan)
+    for code in np.unique(codes[codes > 0]):
+        out[codes == code] = (_close_ts(code) - now) / SECS_PER_YEAR
+    return np.maximum(out, MIN_T, where=np.isfinite(out), out=out)
+
+# ---------------------------------------------------------------------------
+# Black-Scholes
+# ---------------------------------------------------------------------------
+def _d1_d2(S, K, T, sigma, r, q):
+    vol_t = sigma * np.sqrt(T)
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma * sigma) * T) / vol_t
+    return d1, d1 - vol_t
+
+
+def bs_price(S, K, T, sigma, is_call, r: float = RISK_FREE, q: float = DIV_YIELD) -> np.ndarray:
+    S, K, T, sigma = (np.asarray(x, dtype=float) for x in (S, K, T, sigma))
+    d1, d2 = _d1_d2(S, K, T, sigma, r, q)
+    df_q, df_r = np.exp(-q * T), np.exp(-r * T)
+    call = S * df_q * ndtr(d1) - K * df_r * ndtr(d2)
+    put = K * df_r * ndtr(-d2) - S * df_q * ndtr(-d1)
+    return np.where(is_call, call, put)
+
+
+def _vega_raw(S, K, T, sigma, r, q) -> np.ndarray:
+    """∂price/∂σ (per 1.00 of vol)."""
+    d1, _ = _d1_d2(S, K, T, sigma, r, q)
+    return S * np.exp(-q * T) * _INV_SQRT_2PI * np.exp(-0.5 * d1 * d1) * np.sqrt(T)
+
+
+def bs_greeks(S, K, T, sigma, is_call, r: float = RISK_FREE, q: float = DIV_YIELD) -> Dict[str, np.ndarray]:
+    """price, delta, gamma, vega (per vol point), theta (per day), vanna; NaN where sigma is NaN."""
+    S, K, T, sigma = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (S, K, T, sigma)))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), S.shape)
+    d1, d2 = _d1_d2(S, K, T, sigma, r, q)
+    sqrt_t = np.sqrt(T)
+    df_q, df_r = np.exp(-q * T), np.exp(-r * T)
+    pdf = _INV_SQRT_2PI * np.exp(-0.5 * d1 * d1)
+    n_d1, n_d2 = ndtr(d1), ndtr(d2)
+
+    price = np.where(is_call, S * df_q * n_d1 - K * df_r * n_d2,
+                     K * df_r * (1 - n_d2) - S * df_q * (1 - n_d1))
+    delta = np.where(is_call, df_q * n_d1, df_q * (n_d1 - 1))
+    gamma = df_q * pdf / (S * sigma * sqrt_t)
+    vega = S * df_q * pdf * sqrt_t / 100
+    decay = -S * df_q * pdf * sigma / (2 * sqrt_t)
+    theta = np.where(is_call, decay - r * K * df_r * n_d2 + q * S * df_q * n_d1,
+                     decay + r * K * df_r * (1 - n_d2) - q * S * df_q * (1 - n_d1)) / 365
+    vanna = -df_q * pdf * d2 / sigma
+    return {"price": price, "delta": delta, "gamma": gamma, "vega": vega, "theta": theta, "vanna": vanna}
+
+# ---------------------------------------------------------------------------
+# Implied volatility
+# ---------------------------------------------------------------------------
+def implied_vol(price, S, K, T, is_call, r: float = RISK_FREE, q: float = DIV_YIELD,
+                tol: float = IV_TOL) -> np.ndarray:
+    """Vectorized IV: Newton on vega, bisection for whatever Newton leaves unconverged."""
+    price, S, K, T = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (price, S, K, T)))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), price.shape)
+    fwd_s, fwd_k = S * np.exp(-q * T), K * np.exp(-r * T)
+    lower = np.where(is_call, np.maximum(fwd_s - fwd_k, 0), np.maximum(fwd_k - fwd_s, 0))
+    upper = np.where(is_call, fwd_s, fwd_k)
+    valid = (np.isfinite(price) & np.isfinite(S) & np.isfinite(K) & np.isfinite(T)
+             & (price - lower >= MIN_PRICE) & (price < upper) & (T > 0) & (S > 0) & (K > 0))
+
+    sigma = np.full(price.shape, np.nan)
+    if not valid.any():
+        return sigma
+    # Brenner-Subrahmanyam start, clipped into the search range
+    sigma[valid] = np.clip(np.sqrt(2 * np.pi / T[valid]) * price[valid] / S[valid], 0.05, 2.0)
+    done = np.zeros(price.shape, dtype=bool)
+    live = valid.copy()
+    with np.errstate(all="ignore"):
+        for _ in range(NEWTON_ITERS):
+            idx = np.nonzero(live)[0]
+            if not len(idx):
+                break
+            s_i = sigma[idx]
+            diff = bs_price(S[idx], K[idx], T[idx], s_i, is_call[idx], r, q) - price[idx]
+            vega = _vega_raw(S[idx], K[idx], T[idx], s_i, r, q)
+            nxt = s_i - diff / vega
+            hit = np.abs(diff) < tol
+            bad = ~hit & ((vega < 1e-8) | ~np.isfinite(nxt) | (nxt <= SIGMA_MIN) | (nxt >= SIGMA_MAX))
+            step = ~hit & ~bad
+            sigma[idx[step]] = nxt[step]
+            done[idx[hit]] = True
+            live[idx[hit | bad]] = False
+
+        rest = np.nonzero(valid & ~done)[0]
+        if len(rest):
+            lo = np.full(len(rest), SIGMA_MIN)
+            hi = np.full(len(rest), SIGMA_MAX)
+            args = (S[rest], K[rest], T[rest])
+            for _ in range(BISECT_ITERS):
+                mid = 0.5 * (lo + hi)
+                over = bs_price(*args, mid, is_call[rest], r, q) > price[rest]
+                hi = np.where(over, mid, hi)
+                lo = np.where(over, lo, mid)
+            sigma[rest] = 0.5 * (lo + hi)
+    return sigma
+
+# ---------------------------------------------------------------------------
+# Chain pricer
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True, slots=True)
+class ChainGreeks:
+    spot:  float
+    ts:    float
+    iv:    np.ndarray
+    price: np.ndarray
+    delta: np.ndarray
+    gamma: np.ndarray
+    vega:  np.ndarray
+    theta: np.ndarray
+    vanna: np.ndarray
+
+    @property
+    def solved(self) -> int:
+        return int(np.isfinite(self.iv).sum())
+
+
+def _mid(bid: np.ndarray, ask: np.ndarray) -> np.ndarray:
+    ok = np.isfinite(bid) & np.isfinite(ask) & (ask > 0) & (ask >= bid)
+    return np.where(ok, (np.nan_to_num(bid) + np.nan_to_num(ask)) / 2, np.nan)
+
+
+class ChainPricer:
+    """Model greeks for one ChainFrame: solve IVs on new quotes, re-price greeks per tick."""
+
+    def __init__(self, frame: ChainFrame, r: float = RISK_FREE, q: float = DIV_YIELD):
+        self.frame = frame
+        self.r, self.q = r, q
+        self._iv = np.full(len(frame), np.nan)
+
+    def solve(self, spot: float, now: float | None = None, bid: np.ndarray | None = None,
+              ask: np.ndarray | None = None) -> ChainGreeks:
+        """IVs from mid quotes (the frame's, or live *bid*/*ask* aligned with its rows), then greeks."""
+        now = time.time() if now is None else now
+        mid = _mid(self.frame.bid if bid is None else bid, self.frame.ask if ask is None else ask)
+        T = time_to_expiry(self.frame.expiry, now)
+        iv = implied_vol(mid, spot, self.frame.strike, T, self.frame.is_call, self.r, self.q)
+        self._iv = np.where(np.isfinite(iv), iv, self._iv)    # keep the last good IV when a quote drops
+        return self.at(spot, now)
+
+    def at(self, spot: float, now: float | None = None) -> ChainGreeks:
+        """Greeks at a new underlying price from the last solved IVs (no root finding)."""
+        now = time.time() if now is None else now
+        T = time_to_expiry(self.frame.expiry, now)
+        with np.errstate(all="ignore"):
+            g = bs_greeks(spot, self.frame.strike, T, self._iv, self.frame.is_call, self.r, self.q)
+        return ChainGreeks(float(spot), now, self._iv.copy(), **g)
+
+
+def fill_greeks(frame: ChainFrame, spot: float, now: float | None = None) -> ChainFrame:
+    """*frame* with NaN iv / delta / gamma / vega / theta replaced by model values from its quotes."""
+    if not len(frame) or not spot:
+        return frame
+    model = ChainPricer(frame).solve(spot, now)
+    fill = {name: np.where(np.isfinite(getattr(frame, name)), getattr(frame, name), getattr(model, name))
+            for name in ("iv", "delta", "gamma", "vega", "theta")}
+    return dataclasses.replace(frame, **fill)
+
+
+__all__ = [
+    "ChainGreeks",
+    "ChainPricer",
+    "bs_greeks",
+    "bs_price",
+    "fill_greeks",
+    "implied_vol",
+    "time_to_expiry",
+]
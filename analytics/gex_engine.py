@@ -0,0 +1,273 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: analytics/gex_engine.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Background gamma-exposure engine.
+
+Every `GEX_INTERVAL` seconds the engine reads the shared chain snapshot
+(`polygon.chain_snapshot`, so no extra REST traffic) and updates an
+in-memory 0DTE gamma profile:
+
+* Per-strike signed GEX = |gamma| × OI × 100, calls +, puts −. Dealers are
+  taken as long calls / short puts, so the profile can flip sign. The
+  flip zone is the first sign change.
+* The call wall is the strike with the largest positive GEX; the put wall
+  is the most negative.
+* Updates are incremental. Each contract's contribution is remembered, and
+  only contracts whose gamma or OI changed since the previous snapshot
+  adjust their strike. The whole profile is rebuilt every `FULL_REBUILD`
+  updates to shed float drift.
+
+`get_gex_engine().current()` is read in-memory by `q_gamma` and by
+`polygon_utils.get_gex_score`. The JSON snapshot is still written for
+offline tools: compact, atomic, and the dated history copy at most every
+`HISTORY_INTERVAL` seconds.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Tuple
+
+import numpy as np
+
+from analytics.bs_pricing import fill_greeks
+from core.logger_setup import get_logger
+from polygon.chain_frame import first_sign_flip
+from polygon.chain_snapshot import ChainSnapshot, get_chain_snapshot
+from polygon.open_interest import get_open_interest
+from polygon.polygon_rest import get_today_expiry
+
+logger = get_logger(__name__)
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+GEX_INTERVAL     = float(os.getenv("GEX_INTERVAL", "30"))        # seconds between recomputes
+FULL_REBUILD     = 20                                            # updates between full rebuilds
+HISTORY_INTERVAL = 300.0
+CONTRACT_SIZE    = 100
+SNAPSHOT_DIR     = "data/gex_ml_snapshots"
+SNAPSHOT_PATH    = f"{SNAPSHOT_DIR}/latest_gex.json"
+
+# ---------------------------------------------------------------------------
+# Profile
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True, slots=True)
+class GexProfile:
+    symbol:      str
+    expiry:      str
+    spot:        float
+    ts:          float
+    strikes:     np.ndarray          # sorted
+    gex:         np.ndarray          # signed, per strike
+    call_gex:    float
+    put_gex:     float               # ≤ 0
+    flip_zone:   float | None
+    call_wall:   float | None
+    put_wall:    float | None
+    contracts:   int
+    changed:     int                 # contracts that moved this update
+
+    @property
+    def net_gex(self) -> float:
+        return self.call_gex + self.put_gex
+
+    @property
+    def dealer_bias(self) -> str:
+        return "long_gamma" if self.net_gex > 0 else "short_gamma" if self.net_gex < 0 else "neutral"
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.ts
+
+    @property
+    def gex_map(self) -> Dict[int, float]:
+        return {int(k): float(v) for k, v in zip(self.strikes, self.gex)}
+
+    def as_snapshot(self) -> dict:
+        """Shape of data/gex_ml_snapshots/latest_gex.json."""
+        return {
+            "timestamp": datetime.utcfromtimestamp(self.ts).isoformat(),
+            "spy_price": self.spot,
+            "expiry": self.expiry,
+            "gex_map": self.gex_map,
+            "gex_score": self.net_gex,
+            "dealer_bias": self.dealer_bias,
+            "gamma_flip_zone": self.flip_zone,
+            "call_wall": self.call_wall,
+            "put_wall": self.put_wall,
+            "max_gex_strike": self.call_wall,
+            "min_gex_strike": self.put_wall,
+        }
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+def _contributions(snapshot: ChainSnapshot, expiry: str) -> Dict[str, Tuple[float, float]]:
+    """ticker → (strike, signed gamma notional) for the expiry's contracts with gamma, delta and OI.
+    Greeks Polygon left blank are filled from the contract's quote (analytics.bs_pricing); OI comes
+    from the day's cached table (polygon.open_interest) when loaded, else from the snapshot."""
+    frame = fill_greeks(snapshot.frame, snapshot.underlying_price)
+    oi = frame.oi
+    table = get_open_interest().current()
+    if table is not None:
+        cached = table.for_frame(frame)
+        oi = np.where(np.isfinite(cached), cached, oi)
+    m = (frame.mask(expiry) & np.isfinite(frame.gamma) & np.isfinite(oi)
+         & np.isfinite(frame.delta) & (oi != 0))
+    notional = np.abs(frame.gamma[m]) * oi[m] * CONTRACT_SIZE * np.where(frame.is_call[m], 1.0, -1.0)
+    return dict(zip(frame.ticker[m].tolist(), zip(np.trunc(frame.strike[m]).tolist(), notional.tolist())))
+
+
+def _atomic_write(path: str, obj: dict) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(path), delete=False) as tmp:
+        json.dump(obj, tmp, separators=(",", ":"))
+    os.replace(tmp.name, path)
+
+
+class GexEngine:
+    def __init__(self, symbol: str = "SPY", interval: float = GEX_INTERVAL, persist: bool = True):
+        self.symbol = symbol
+        self.interval = interval
+        self.persist = persist
+        self._expiry: str | None = None
+        self._contrib: Dict[str, Tuple[float, float]] = {}
+        self._by_strike: Dict[float, float] = {}
+        self._calls = 0.0
+        self._puts = 0.0
+        self._source_ts = 0.0
+        self._updates = 0
+        self._profile: GexProfile | None = None
+        self._history_at = 0.0
+        self._task: asyncio.Task | None = None
+        self._stats = {"updates": 0, "rebuilds": 0, "unchanged": 0, "changed": 0, "errors": 0}
+
+    # ── reads ────────────────────────────────────────────────────────────────
+    def current(self, max_age: float | None = None) -> GexProfile | None:
+        prof = self._profile
+        if prof is None or (max_age is not None and prof.age > max_age):
+            return None
+        return prof
+
+    # ── updates ──────────────────────────────────────────────────────────────
+    def _reset(self, expiry: str) -> None:
+        self._expiry = expiry
+        self._contrib, self._by_strike = {}, {}
+        self._calls = self._puts = 0.0
+
+    def _apply(self, strike: float, notional: float, sign: int) -> None:
+        value = self._by_strike.get(strike, 0.0) + sign * notional
+        if abs(value) < 1e-9:
+            self._by_strike.pop(strike, None)   # no exposure left – keep the flip search clean
+        else:
+            self._by_strike[strike] = value
+        if notional >= 0:
+            self._calls += sign * notional
+        else:
+            self._puts += sign * notional
+
+    def update(self, snapshot: ChainSnapshot, expiry: str | None = None) -> GexProfile | None:
+        """Fold a chain snapshot into the profile, touching only contracts that changed."""
+        expiry = expiry or get_today_expiry()
+        if not snapshot or (snapshot.fetched_at == self._source_ts and expiry == self._expiry):
+            self._stats["unchanged"] += 1
+            return self._profile
+        new = _contributions(snapshot, expiry)
+        if not new:
+            return self._profile
+
+        rebuild = expiry != self._expiry or self._updates % FULL_REBUILD == 0
+        if rebuild:
+            self._reset(expiry)
+            self._stats["rebuilds"] += 1
+        changed = 0
+        for ticker in self._contrib.keys() - new.keys():      # contracts that left the chain
+            self._apply(*self._contrib.pop(ticker), -1)
+            changed += 1
+        for ticker, contrib in new.items():
+            old = self._contrib.get(ticker)
+            if old == contrib:
+                continue
+            if old is not None:
+                self._apply(*old, -1)
+            self._apply(*contrib, +1)
+            self._contrib[ticker] = contrib
+            changed += 1
+
+        self._updates += 1
+        self._source_ts = snapshot.fetched_at
+        self._stats["updates"] += 1
+        self._stats["changed"] += changed
+        self._profile = self._build(snapshot.underlying_price, changed)
+        return self._profile
+
+    def _build(self, spot: float, changed: int) -> GexProfile:
+        strikes = np.array(sorted(self._by_strike), dtype=float)
+        gex = np.array([self._by_strike[k] for k in strikes], dtype=float)
+        call_wall = float(strikes[np.argmax(gex)]) if len(gex) and gex.max() > 0 else None
+        put_wall = float(strikes[np.argmin(gex)]) if len(gex) and gex.min() < 0 else None
+        return GexProfile(self.symbol, self._expiry or "", float(spot or 0.0), time.time(), strikes, gex,
+                          self._calls, self._puts, first_sign_flip(strikes, gex), call_wall, put_wall,
+                          len(self._contrib), changed)
+
+    def refresh(self) -> GexProfile | None:
+        """Blocking: read the shared chain snapshot, update, persist."""
+        try:
+            prof = self.update(get_chain_snapshot(self.symbol))
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error({"event": "gex_update_fail", "symbol": self.symbol, "err": str(e)})
+            return self._profile
+        if prof is not None and self.persist and prof.changed:
+            self._write(prof)
+        return prof
+
+    def _write(self, prof: GexProfile) -> None:
+        snap = prof.as_snapshot()
+        try:
+            _atomic_write(SNAPSHOT_PATH, snap)
+            if prof.ts - self._history_at >= HISTORY_INTERVAL:
+                _atomic_write(f"{SNAPSHOT_DIR}/gex_{datetime.utcnow().date()}.json", snap)
+                self._history_at = prof.ts
+        except OSError as e:
+            logger.warning({"event": "gex_persist_fail", "err": str(e)})
+
+    # ── lifecycle ────────────────────────────────────────────────────────────
+    async def run(self) -> None:
+        while True:
+            prof = await asyncio.to_thread(self.refresh)
+            if prof is not None:
+                logger.debug({"event": "gex_profile", "net": round(prof.net_gex), "flip": prof.flip_zone,
+                              "call_wall": prof.call_wall, "put_wall": prof.put_wall, "changed": prof.changed})
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run(), name="gex-engine")
+        return self._task
+
+    def stats(self) -> dict:
+        prof = self._profile
+        return {**self._stats, "contracts": len(self._contrib),
+                "age": round(prof.age, 1) if prof is not None else None}
+
+
+_ENGINE = GexEngine()
+
+
+def get_gex_engine() -> GexEngine:
+    return _ENGINE
+
+
+__all__ = [
+    "GexEngine",
+    "GexProfile",
+    "get_gex_engine",
+]
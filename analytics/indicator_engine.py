@@ -0,0 +1,297 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: analytics/indicator_engine.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Incremental intraday indicators, updated in O(1) per bar / trade.
+
+Fed by `polygon.bar_store` listeners (minute bars, partial and final) and by
+the stocks websocket trade stream. Readers get an immutable
+`IndicatorSnapshot` – no pandas, no HTTP, microseconds per read.
+
+* Wilder RSI (`INDICATOR_RSI_PERIOD`, default 14)
+* Session VWAP (typical price) with volume-weighted σ bands
+* Return from the session open, fade from session high / low
+* Rolling volume over the last `INDICATOR_VOLUME_WINDOW` minutes
+
+Closed bars are committed into the running state; the in-progress minute is
+overlaid at read time without mutating it.
+"""
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Dict, Tuple
+
+from core.logger_setup import get_logger
+from polygon.bar_store import get_bar_store, session_date
+
+logger = get_logger(__name__)
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+RSI_PERIOD    = int(os.getenv("INDICATOR_RSI_PERIOD", "14"))
+VOLUME_WINDOW = int(os.getenv("INDICATOR_VOLUME_WINDOW", "5"))    # minutes
+
+# ---------------------------------------------------------------------------
+# Snapshot value object
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True)
+class IndicatorSnapshot:
+    symbol:           str
+    updated_at:       float
+    bars:             int              # committed + in-progress
+    last:             float
+    open:             float
+    high:             float
+    low:              float
+    rsi:              float | None     # None until RSI_PERIOD deltas seen
+    vwap:             float
+    vwap_sd:          float
+    return_from_open: float            # %
+    high_fade:        float            # % from session high (≤ 0)
+    low_fade:         float            # % from session low  (≥ 0)
+    rolling_volume:   float
+
+    @property
+    def warm(self) -> bool:
+        return self.bars > 0
+
+    @property
+    def above_vwap(self) -> bool:
+        return bool(self.vwap) and self.last > self.vwap
+
+    def vwap_band(self, k: float = 1.0) -> Tuple[float, float]:
+        """(lower, upper) at ±k standard deviations around VWAP."""
+        return self.vwap - k * self.vwap_sd, self.vwap + k * self.vwap_sd
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _empty(symbol: str) -> IndicatorSnapshot:
+    return IndicatorSnapshot(symbol, 0.0, 0, 0.0, 0.0, 0.0, 0.0, None,
+                             0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+# ---------------------------------------------------------------------------
+# Running state
+# ---------------------------------------------------------------------------
+class _State:
+    """Committed (closed-bar) accumulators for one symbol and session."""
+    __slots__ = ("day", "n", "t", "open", "high", "low", "close",
+                 "cum_pv", "cum_pv2", "cum_v",
+                 "n_deltas", "avg_gain", "avg_loss",
+                 "vols", "vol_sum")
+
+    def __init__(self, day: str):
+        self.day = day
+        self.n = 0
+        self.t = 0
+        self.open = self.high = self.low = self.close = 0.0
+        self.cum_pv = self.cum_pv2 = self.cum_v = 0.0
+        self.n_deltas = 0
+        self.avg_gain = self.avg_loss = 0.0     # running sums until seeded
+        self.vols: deque = deque(maxlen=VOLUME_WINDOW)
+        self.vol_sum = 0.0
+
+    def copy(self) -> "_State":
+        dup = _State.__new__(_State)
+        for k in _State.__slots__:
+            setattr(dup, k, getattr(self, k))
+        dup.vols = deque(self.vols, maxlen=self.vols.maxlen)
+        return dup
+
+    def commit(self, bar: dict) -> None:
+        o, h, l, c, v = bar["o"], bar["h"], bar["l"], bar["c"], bar.get("v", 0.0)
+        if self.n == 0:
+            self.open, self.high, self.low = o, h, l
+        else:
+            self._rsi_step(c - self.close)
+            self.high = max(self.high, h)
+            self.low = min(self.low, l)
+
+        typical = (h + l + c) / 3
+        self.cum_pv += typical * v
+        self.cum_pv2 += typical * typical * v
+        self.cum_v += v
+
+        if len(self.vols) == self.vols.maxlen:
+            self.vol_sum -= self.vols[0]
+        self.vols.append(v)
+        self.vol_sum += v
+
+        self.close = c
+        self.t = bar["t"]
+        self.n += 1
+
+    def _rsi_step(self, delta: float) -> None:
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        self.n_deltas += 1
+        if self.n_deltas <= RSI_PERIOD:
+            self.avg_gain += gain
+            self.avg_loss += loss
+            if self.n_deltas == RSI_PERIOD:
+                self.avg_gain /= RSI_PERIOD
+                self.avg_loss /= RSI_PERIOD
+        else:
+            self.avg_gain = (self.avg_gain * (RSI_PERIOD - 1) + gain) / RSI_PERIOD
+            self.avg_loss = (self.avg_loss * (RSI_PERIOD - 1) + loss) / RSI_PERIOD
+
+    def rsi(self) -> float | None:
+        if self.n_deltas < RSI_PERIOD:
+            return None
+        if self.avg_loss == 0:
+            return 100.0
+        return 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+
+
+def _pct(a: float, b: float) -> float:
+    return (a - b) / b * 100 if b else 0.0
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+class IndicatorEngine:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states: Dict[str, _State] = {}
+        self._undo: Dict[str, _State] = {}          # state before the last commit
+        self._pending: Dict[str, dict] = {}         # in-progress minute
+        self._trades: Dict[str, Tuple[float, float]] = {}   # symbol → (price, recv ts)
+        self._bar_at: Dict[str, float] = {}
+        self._snaps: Dict[str, IndicatorSnapshot] = {}
+        self._dirty: set = set()
+
+    # ── ingestion ────────────────────────────────────────────────────────────
+    def _commit(self, symbol: str, state: _State, bar: dict) -> None:
+        self._undo[symbol] = state.copy()
+        state.commit(bar)
+
+    def on_bar(self, symbol: str, bar: dict, final: bool) -> None:
+        """Bar-store listener. Late bars are ignored; a re-sent final bar replaces the last commit."""
+        with self._lock:
+            state = self._states.get(symbol)
+            if state is None or state.day != session_date():
+                return                              # warmed lazily on first read
+            t = bar["t"]
+            if final:
+                if t == state.t:
+                    if symbol not in self._undo:
+                        return                      # seeded bar, nothing to roll back
+                    state = self._states[symbol] = self._undo.pop(symbol)
+                elif t < state.t:
+                    return
+                pending = self._pending.get(symbol)
+                if pending and state.t < pending["t"] < t:
+                    self._commit(symbol, state, pending)     # missed its final
+                self._commit(symbol, state, bar)
+                if pending and pending["t"] <= t:
+                    self._pending.pop(symbol, None)
+            elif t > state.t:
+                self._pending[symbol] = bar
+            else:
+                return
+            self._bar_at[symbol] = time.time()
+            self._dirty.add(symbol)
+
+    def on_trade(self, symbol: str, price: float) -> None:
+        if price:
+            self._trades[symbol] = (float(price), time.time())
+            self._dirty.add(symbol)
+
+    def warm(self, symbol: str = "SPY") -> None:
+        """Rebuild *symbol*'s state from the bar store (REST-seeded if needed)."""
+        day = session_date()
+        bars = get_bar_store().bars(symbol)
+        state = _State(day)
+        for bar in bars[:-1]:
+            state.commit(bar)
+        with self._lock:
+            self._states[symbol] = state
+            self._undo.pop(symbol, None)
+            self._pending.pop(symbol, None)
+            if bars:
+                self._pending[symbol] = bars[-1]
+            self._bar_at[symbol] = time.time()
+            self._dirty.add(symbol)
+        logger.debug({"event": "indicators_warmed", "symbol": symbol, "bars": len(bars)})
+
+    def reset(self) -> None:
+        with self._lock:
+            for d in (self._states, self._undo, self._pending, self._trades,
+                      self._bar_at, self._snaps):
+                d.clear()
+            self._dirty.clear()
+
+    # ── reads ────────────────────────────────────────────────────────────────
+    def _build(self, symbol: str) -> IndicatorSnapshot:
+        state = self._states[symbol]
+        pending = self._pending.get(symbol)
+        if pending is not None and pending["t"] > state.t:
+            view = state.copy()
+            view.commit(pending)
+        else:
+            view = state
+        if view.n == 0:
+            return _empty(symbol)
+
+        last = view.close
+        trade = self._trades.get(symbol)
+        if trade and trade[1] >= self._bar_at.get(symbol, 0):
+            last = trade[0]
+        high, low = max(view.high, last), min(view.low, last)
+
+        vwap = view.cum_pv / view.cum_v if view.cum_v else 0.0
+        var = view.cum_pv2 / view.cum_v - vwap * vwap if view.cum_v else 0.0
+        rsi = view.rsi()
+        return IndicatorSnapshot(
+            symbol=symbol,
+            updated_at=time.time(),
+            bars=view.n,
+            last=last,
+            open=view.open,
+            high=high,
+            low=low,
+            rsi=round(rsi, 2) if rsi is not None else None,
+            vwap=vwap,
+            vwap_sd=math.sqrt(var) if var > 0 else 0.0,
+            return_from_open=_pct(last, view.open),
+            high_fade=_pct(last, high),
+            low_fade=_pct(last, low),
+            rolling_volume=view.vol_sum,
+        )
+
+    def snapshot(self, symbol: str = "SPY") -> IndicatorSnapshot:
+        """Current indicators; rebuilt only when something changed since the last read."""
+        state = self._states.get(symbol)
+        if state is None or state.day != session_date():
+            self.warm(symbol)
+        if symbol in self._dirty or symbol not in self._snaps:
+            with self._lock:
+                self._dirty.discard(symbol)
+                self._snaps[symbol] = self._build(symbol)
+        return self._snaps[symbol]
+
+
+_ENGINE = IndicatorEngine()
+get_bar_store().add_listener(_ENGINE.on_bar)
+
+
+def get_indicator_engine() -> IndicatorEngine:
+    return _ENGINE
+
+
+def get_indicator_snapshot(symbol: str = "SPY") -> IndicatorSnapshot:
+    return _ENGINE.snapshot(symbol)
+
+
+__all__ = [
+    "IndicatorSnapshot",
+    "IndicatorEngine",
+    "get_indicator_engine",
+    "get_indicator_snapshot",
+]
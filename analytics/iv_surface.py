@@ -0,0 +1,260 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: analytics/iv_surface.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Intraday implied-volatility surface with smooth per-expiry smiles.
+
+The shared chain snapshot is turned into one fitted smile per expiry
+(nearest `MAX_EXPIRIES`):
+
+* Points are out-of-the-money contracts only: puts below the forward, calls
+  above. Each uses Polygon's IV, or, where that is missing, the IV solved
+  from its quote (`analytics.bs_pricing`).
+* Each smile is a raw-SVI fit of implied variance in log-moneyness
+  k = ln(K / F):  v(k) = a + b·(ρ(k − m) + √((k − m)² + σ²)).
+  The fit is robust (soft-L1) and warm-started from the previous
+  parameters. With too few points, or a poor fit, the smile falls back to
+  linear interpolation in k with flat wings.
+* Updates are incremental. An expiry is refit only when its input points
+  change, so unchanged expiries keep their fit and cost nothing.
+
+Lookups never miss while a surface exists: `iv(strike)` evaluates the
+smile at any strike, and `iv_at_delta(0.25)` / `iv_at_delta(-0.25)`
+inverts the smile's delta on a strike grid. The background engine
+refreshes every `IV_INTERVAL` seconds, so readers such as q_quant pay for
+a lookup, not a chain download.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+from scipy.optimize import least_squares
+
+from analytics.bs_pricing import DIV_YIELD, RISK_FREE, ChainPricer, bs_greeks, time_to_expiry
+from core.logger_setup import get_logger
+from polygon.chain_snapshot import ChainSnapshot, get_chain_snapshot
+
+logger = get_logger(__name__)
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+IV_INTERVAL  = float(os.getenv("IV_SURFACE_INTERVAL", "15"))    # seconds between refreshes
+MAX_EXPIRIES = 4
+MIN_POINTS   = 5                                                # fewer → interpolation only
+MAX_RMSE     = 0.03                                             # vol points; worse → interpolation
+DELTA_GRID   = 241
+
+_BOUNDS = ([-1.0, 0.0, -0.999, -1.0, 1e-4], [1.0, 500.0, 0.999, 1.0, 2.0])
+
+# ---------------------------------------------------------------------------
+# Smile
+# ---------------------------------------------------------------------------
+def svi_variance(k: np.ndarray, params) -> np.ndarray:
+    a, b, rho, m, sig = params
+    x = k - m
+    return a + b * (rho * x + np.sqrt(x * x + sig * sig))
+
+
+@dataclass(frozen=True, slots=True)
+class Smile:
+    expiry:  int                      # YYYYMMDD
+    T:       float                    # years to the expiry close at fit time
+    forward: float
+    k:       np.ndarray               # fitted points (log-moneyness, sorted)
+    vols:    np.ndarray
+    params:  Tuple[float, ...] | None # SVI (a, b, rho, m, sigma); None → interpolation
+    rmse:    float = 0.0
+
+    def iv(self, strike) -> np.ndarray | float:
+        k = np.log(np.asarray(strike, dtype=float) / self.forward)
+        if self.params is not None:
+            out = np.sqrt(np.maximum(svi_variance(k, self.params), 1e-8))
+        else:
+            out = np.interp(k, self.k, self.vols)
+        return float(out) if np.ndim(out) == 0 else out
+
+    def iv_at_delta(self, delta: float, spot: float) -> Tuple[float, float]:
+        """(strike, iv) whose smile delta is *delta*: > 0 → call delta, < 0 → put delta."""
+        span = max(abs(self.k[0]), abs(self.k[-1]), 0.01) * 2
+        strikes = self.forward * np.exp(np.linspace(-span, span, DELTA_GRID))
+        vols = np.asarray(self.iv(strikes))
+        with np.errstate(all="ignore"):
+            d = bs_greeks(spot, strikes, self.T, vols, delta > 0)["delta"]
+        # call delta falls with strike, put delta (negative) rises toward 0 … both monotone in K
+        order = np.argsort(d)
+        strike = float(np.interp(delta, d[order], strikes[order]))
+        return strike, float(self.iv(strike))
+
+
+def _fit(k: np.ndarray, vols: np.ndarray, warm: Tuple[float, ...] | None) -> Tuple[Tuple[float, ...] | None, float]:
+    if len(k) < MIN_POINTS:
+        return None, 0.0
+    var = vols * vols
+    span = max(float(k[-1] - k[0]), 1e-3)
+    if warm is None:
+        b0 = max(float(var.max() - var.min()) / span, 1e-3)
+        sig0 = span / 4
+        warm = (float(var.min()) - b0 * sig0, b0, 0.0, float(k[np.argmin(var)]), sig0)
+    x0 = np.clip(warm, _BOUNDS[0], _BOUNDS[1])
+
+    def resid(p):
+        return np.sqrt(np.maximum(svi_variance(k, p), 1e-8)) - vols
+
+    try:
+        res = least_squares(resid, x0, bounds=_BOUNDS, loss="soft_l1", f_scale=0.01, max_nfev=200)
+    except (ValueError, np.linalg.LinAlgError) as e:
+        logger.debug({"event": "svi_fit_fail", "err": str(e)})
+        return None, 0.0
+    rmse = float(np.sqrt(np.mean(resid(res.x) ** 2)))
+    return (tuple(float(v) for v in res.x), rmse) if rmse <= MAX_RMSE else (None, rmse)
+
+# ---------------------------------------------------------------------------
+# Surface
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True, slots=True)
+class IvSurface:
+    symbol: str
+    spot:   float
+    ts:     float
+    smiles: Dict[int, Smile]
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.ts
+
+    @property
+    def expiries(self) -> list:
+        return sorted(self.smiles)
+
+    def smile(self, expiry: str | int | None = None) -> Smile:
+        """Nearest expiry by default; accepts YYYYMMDD or YYYY-MM-DD."""
+        code = self.expiries[0] if expiry is None else int(str(expiry).replace("-", ""))
+        return self.smiles[code]
+
+    def iv(self, strike, expiry: str | int | None = None):
+        return self.smile(expiry).iv(strike)
+
+    def iv_at_delta(self, delta: float, expiry: str | int | None = None) -> float:
+        return self.smile(expiry).iv_at_delta(delta, self.spot)[1]
+
+    def skew(self, width: float = 10.0, expiry: str | int | None = None) -> float:
+        """IV(spot − width) − IV(spot + width)."""
+        sm = self.smile(expiry)
+        return float(sm.iv(self.spot - width) - sm.iv(self.spot + width))
+
+
+def _otm_points(snapshot: ChainSnapshot, spot: float, now: float) -> Dict[int, Tuple[float, float, np.ndarray, np.ndarray]]:
+    """expiry → (T, forward, k, iv) of OTM contracts with a usable IV, nearest MAX_EXPIRIES."""
+    frame = snapshot.frame
+    model_iv = ChainPricer(frame).solve(spot, now).iv
+    iv = np.where(np.isfinite(frame.iv) & (frame.iv > 0), frame.iv, model_iv)
+    T_all = time_to_expiry(frame.expiry, now)
+    out = {}
+    for code in frame.expiries[:MAX_EXPIRIES]:
+        m = (frame.expiry == code) & np.isfinite(iv) & np.isfinite(frame.strike)
+        if not m.any():
+            continue
+        T = float(T_all[m][0])
+        fwd = spot * np.exp((RISK_FREE - DIV_YIELD) * T)
+        m &= np.where(frame.is_call, frame.strike >= fwd, frame.strike < fwd)
+        k = np.log(frame.strike[m] / fwd)
+        order = np.argsort(k)
+        if len(order):
+            out[int(code)] = (T, fwd, k[order], iv[m][order])
+    return out
+
+
+class IvSurfaceEngine:
+    def __init__(self, symbol: str = "SPY", interval: float = IV_INTERVAL):
+        self.symbol = symbol
+        self.interval = interval
+        self._surface: IvSurface | None = None
+        self._inputs: Dict[int, bytes] = {}
+        self._source_ts = 0.0
+        self._task: asyncio.Task | None = None
+        self._stats = {"updates": 0, "fits": 0, "reused": 0, "fallbacks": 0, "errors": 0}
+
+    def current(self, max_age: float | None = None) -> IvSurface | None:
+        surf = self._surface
+        if surf is None or (max_age is not None and surf.age > max_age):
+            return None
+        return surf
+
+    def update(self, snapshot: ChainSnapshot, spot: float | None = None,
+               now: float | None = None) -> IvSurface | None:
+        """Refit the expiries whose OTM points changed; reuse the rest."""
+        if not snapshot or snapshot.fetched_at == self._source_ts:
+            return self._surface
+        now = time.time() if now is None else now
+        spot = spot or snapshot.underlying_price
+        if not spot:
+            return self._surface
+        prev = self._surface.smiles if self._surface is not None else {}
+        smiles: Dict[int, Smile] = {}
+        for code, (T, fwd, k, vols) in _otm_points(snapshot, spot, now).items():
+            sig = np.round(np.concatenate([k, vols]), 5).tobytes()
+            old = prev.get(code)
+            if old is not None and self._inputs.get(code) == sig:
+                smiles[code] = old
+                self._stats["reused"] += 1
+                continue
+            params, rmse = _fit(k, vols, old.params if old is not None else None)
+            self._stats["fits"] += 1
+            if params is None:
+                self._stats["fallbacks"] += 1
+            smiles[code] = Smile(code, T, fwd, k, vols, params, rmse)
+            self._inputs[code] = sig
+        if smiles:
+            self._surface = IvSurface(self.symbol, float(spot), now, smiles)
+            self._source_ts = snapshot.fetched_at
+            self._stats["updates"] += 1
+        return self._surface
+
+    def refresh(self) -> IvSurface | None:
+        try:
+            return self.update(get_chain_snapshot(self.symbol))
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error({"event": "iv_surface_fail", "symbol": self.symbol, "err": str(e)})
+            return self._surface
+
+    def surface(self) -> IvSurface | None:
+        """Current surface; built synchronously once if the background loop hasn't yet."""
+        return self._surface or self.refresh()
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.to_thread(self.refresh)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run(), name="iv-surface")
+        return self._task
+
+    def stats(self) -> dict:
+        surf = self._surface
+        return {**self._stats, "expiries": len(surf.smiles) if surf else 0,
+                "age": round(surf.age, 1) if surf else None}
+
+
+_ENGINE = IvSurfaceEngine()
+
+
+def get_iv_surface_engine() -> IvSurfaceEngine:
+    return _ENGINE
+
+
+__all__ = [
+    "IvSurface",
+    "IvSurfaceEngine",
+    "Smile",
+    "get_iv_surface_engine",
+    "svi_variance",
+]
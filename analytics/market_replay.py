@@ -0,0 +1,490 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: analytics/market_replay.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Deterministic market replay through the real trading loop.
+
+Feeds a recorded tick segment (polygon/tick_recorder.py) into the market
+data hub frame by frame on a simulated clock. Every `cycle_seconds` of
+simulated time it awaits the live `manage_positions_async()` and `_entry_cycle()`
+(and so `evaluate_entry`) against `SimBroker`.
+
+* Clock: `time.time()` / `datetime.utcnow()` inside the market-data, exit and
+  runner modules, plus `market_hours._now_et`, follow the replayed receive
+  timestamps. Runs at 1x, Nx or as fast as possible (speed=0).
+* Market data: Q/T go to hub snapshots and A/AM to the bar store, with REST
+  seeding held off for the replayed day.
+* Broker: buys at the replayed ask and sells at the bid, tracking cash,
+  positions and realised PnL. Nothing reaches Tradier.
+* Journals and learners that write live state are stubbed for the run.
+* `offline=True` also replaces the GPT exit advisor and chain REST metrics.
+  Mesh agents still run as configured.
+* `report()` covers fills, PnL, cycle latency percentiles and end-to-end
+  events/s.
+
+CLI:  python -m analytics.market_replay 2025-06-20 --speed 0 --cycle 2 --offline
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import re
+import time as _time
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+import pytz
+
+import core.market_hours as market_hours
+import polygon.bar_store as bar_store
+from core.logger_setup import get_logger
+from polygon.market_data_hub import MarketDataHub, get_market_data_hub
+from polygon.option_subscriptions import normalize_contract
+from polygon.tick_recorder import TICK_DIR, TickReader
+from analytics.indicator_engine import get_indicator_engine
+
+logger = get_logger(__name__)
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+REPLAY_EQUITY   = float(os.getenv("REPLAY_EQUITY", "25000"))
+COMMISSION      = float(os.getenv("REPLAY_COMMISSION", "0.35"))   # $ per contract
+CYCLE_SECONDS   = 2.0                                             # live `_CYCLE_PAUSE`
+
+# modules whose `time` / `datetime` globals follow the simulated clock
+CLOCK_MODULES = (
+    "polygon.market_data_hub", "polygon.bar_store", "polygon.option_subscriptions",
+    "analytics.indicator_engine", "core.market_context",
+)
+DATETIME_MODULES = ("core.alpha_decay_tracker", "core.position_manager", "run_q_algo_live_async")
+
+# live side effects that must not fire during a replay
+RUNNER_STUBS = ("update_runtime_state", "_log_qthink_summary", "send_telegram_alert", "log_open_trade")
+EXIT_STUBS = (
+    "log_exit", "log_alpha_decay", "log_closed_trade", "process_and_journal",
+    "process_trade_for_learning", "evaluate_agents", "remove_trade",
+    "log_allocation_update", "log_exit_attempt", "update_sync_log_with_outcome",
+)
+
+_OCC = re.compile(r"^O:([A-Z]+)(\d{6})([CP])(\d{8})$")
+_eastern = pytz.timezone("US/Eastern")
+
+
+def _noop(*_a, **_k):
+    return None
+
+# ---------------------------------------------------------------------------
+# Simulated clock
+# ---------------------------------------------------------------------------
+class SimClock:
+    """Replay time in epoch seconds. speed 0 = as fast as possible, N = N× real time."""
+
+    def __init__(self, start: float = 0.0, speed: float = 0.0):
+        self._now = start
+        self.speed = speed
+        self._anchor: Tuple[float, float] | None = None     # (sim ts, wall monotonic)
+
+    def time(self) -> float:
+        return self._now
+
+    def now_et(self) -> datetime:
+        return datetime.fromtimestamp(self._now, pytz.utc).astimezone(_eastern)
+
+    async def advance_to(self, ts: float) -> None:
+        if ts <= self._now:
+            return
+        if self.speed > 0:
+            if self._anchor is None:
+                self._anchor = (self._now, _time.monotonic())
+            wait = self._anchor[1] + (ts - self._anchor[0]) / self.speed - _time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+        self._now = ts
+
+
+class _TimeShim:
+    """Stands in for the `time` module inside patched modules; only time() is simulated."""
+
+    def __init__(self, clock: SimClock):
+        self._clock = clock
+
+    def time(self) -> float:
+        return self._clock.time()
+
+    def __getattr__(self, name):
+        return getattr(_time, name)
+
+
+def _datetime_shim(clock: SimClock) -> type:
+    class _SimDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return cls.fromtimestamp(clock.time(), timezone.utc).replace(tzinfo=None)
+
+        @classmethod
+        def now(cls, tz=None):
+            return cls.fromtimestamp(clock.time(), tz)
+
+    return _SimDatetime
+
+
+class _Patches:
+    """setattr with guaranteed restore, in reverse order."""
+
+    def __init__(self):
+        self._saved: List[tuple] = []
+
+    def set(self, module, name: str, value) -> None:
+        self._saved.append((module, name, getattr(module, name)))
+        setattr(module, name, value)
+
+    def restore(self) -> None:
+        while self._saved:
+            module, name, value = self._saved.pop()
+            setattr(module, name, value)
+
+# ---------------------------------------------------------------------------
+# Simulated broker
+# ---------------------------------------------------------------------------
+class SimBroker:
+    """Fills against the hub's replayed NBBO; speaks the Tradier response shapes the loop expects."""
+
+    def __init__(self, hub: MarketDataHub, clock: SimClock,
+                 equity: float = REPLAY_EQUITY, commission: float = COMMISSION):
+        self.hub = hub
+        self.clock = clock
+        self.start_equity = equity
+        self.cash = equity
+        self.commission = commission
+        self.positions: Dict[str, dict] = {}
+        self.fills: List[dict] = []
+        self.realized = 0.0
+        self._orders: Dict[str, str] = {}
+        self._ids = itertools.count(1)
+
+    def _book(self, symbol: str) -> Tuple[float, float, float]:
+        q, t = self.hub.quote(symbol), self.hub.trade(symbol)
+        return (q.bid if q else 0.0), (q.ask if q else 0.0), (t.price if t else 0.0)
+
+    def _fill(self, symbol: str, side: str, qty: int, price: float, trade_id: str) -> str:
+        oid = f"sim-{next(self._ids)}"
+        self._orders[oid] = "filled"
+        self.fills.append({"order_id": oid, "trade_id": trade_id, "time": self.clock.time(),
+                           "symbol": symbol, "side": side, "qty": qty, "price": price})
+        return oid
+
+    # ── order entry ──────────────────────────────────────────────────────────
+    def open_position(self, symbol: str, contracts: int, option_type: str = "C",
+                      score: float = 0.0, rationale: str = "", **_) -> dict:
+        key = normalize_contract(symbol)
+        _bid, ask, last = self._book(key)
+        price = ask or last
+        cost = price * 100 * contracts
+        if not price or cost + self.commission * contracts > self.cash:
+            return {"status": "rejected", "reason": "no_quote" if not price else "buying_power"}
+        self.cash -= cost + self.commission * contracts
+        trade_id = f"replay-{len(self.fills) + 1}"
+        oid = self._fill(key, "buy_to_open", contracts, price, trade_id)
+        self.positions[key] = {
+            "symbol": symbol, "quantity": contracts, "cost_basis": round(cost, 2),
+            "trade_id": trade_id, "option_type": option_type, "score": score,
+            "rationale": rationale, "opened_at": self.clock.time(),
+            "entry_time": datetime.fromtimestamp(self.clock.time(), timezone.utc).strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        return {"status": "ok", "order_id": oid, "trade_id": trade_id, "fill_price": price}
+
+    def submit_order(self, option_symbol: str, qty: int, side: str) -> dict:
+        key = normalize_contract(option_symbol)
+        pos = self.positions.get(key)
+        bid, _ask, last = self._book(key)
+        price = bid or last
+        if side != "sell_to_close" or pos is None or not price:
+            return {"status": "rejected", "reason": "unsupported" if pos else "no_position"}
+        qty = min(int(qty), int(pos["quantity"]))
+        basis = pos["cost_basis"] * qty / pos["quantity"]
+        proceeds = price * 100 * qty - self.commission * qty
+        self.cash += proceeds
+        self.realized += proceeds - basis - self.commission * qty     # entry leg's commission too
+        oid = self._fill(key, side, qty, price, pos["trade_id"])
+        pos["quantity"] -= qty
+        pos["cost_basis"] = round(pos["cost_basis"] - basis, 2)
+        if pos["quantity"] <= 0:
+            del self.positions[key]
+        return {"status": "ok", "order": {"id": oid, "status": "ok"}}
+
+    # ── account reads ────────────────────────────────────────────────────────
+    def get_positions(self) -> dict:
+        now = self.clock.time()
+        return {"positions": [{**p, "minutes_alive": (now - p["opened_at"]) / 60}
+                              for p in self.positions.values()]}
+
+    def get_order_status(self, order_id: str) -> dict:
+        return {"order": {"id": order_id, "status": self._orders.get(order_id, "unknown")}}
+
+    def open_trades(self) -> List[dict]:
+        return list(self.positions.values())
+
+    def equity(self, *_a, **_k) -> float:
+        marks = 0.0
+        for key, p in self.positions.items():
+            bid, ask, last = self._book(key)
+            marks += ((bid + ask) / 2 if bid and ask else last) * 100 * p["quantity"]
+        return round(self.cash + marks, 2)
+
+    def buying_power(self, *_a, **_k) -> float:
+        return round(self.cash, 2)
+
+    # ── async Tradier surface (core.tradier_async / trade_engine.aopen_position) ─
+    async def aopen_position(self, symbol: str, contracts: int, option_type: str = "C", **kw) -> dict:
+        return self.open_position(symbol, contracts, option_type, **kw)
+
+    async def aget_positions(self) -> dict:
+        return self.get_positions()
+
+    async def place_option_order(self, option_symbol: str, quantity: int, side: str, **_):
+        from core.tradier_async import TradierError, TradierOrder
+        resp = self.submit_order(option_symbol, quantity, side)
+        if resp["status"] != "ok":
+            raise TradierError(f"sim reject: {resp['reason']}", body=resp)
+        return TradierOrder(resp["order"]["id"], "ok", option_symbol=option_symbol, side=side,
+                            quantity=float(quantity))
+
+    async def order(self, order_id: str):
+        from core.tradier_async import TradierOrder
+        fill = next((f for f in self.fills if f["order_id"] == order_id), None)
+        if fill is None:
+            return None
+        return TradierOrder(order_id, self._orders[order_id], option_symbol=fill["symbol"][2:],
+                            side=fill["side"], quantity=float(fill["qty"]),
+                            exec_quantity=float(fill["qty"]), avg_fill_price=fill["price"])
+
+    def summary(self) -> dict:
+        return {"start_equity": self.start_equity, "equity": self.equity(), "cash": round(self.cash, 2),
+                "realized_pnl": round(self.realized, 2), "fills": len(self.fills),
+                "open_positions": len(self.positions)}
+
+# ---------------------------------------------------------------------------
+# Replay driver
+# ---------------------------------------------------------------------------
+class MarketReplay:
+    def __init__(self, reader: TickReader, *, speed: float = 0.0,
+                 cycle_seconds: float = CYCLE_SECONDS, equity: float = REPLAY_EQUITY,
+                 underlying: str = "SPY", offline: bool = False,
+                 start_ns: int | None = None, end_ns: int | None = None):
+        self.reader = reader
+        self.underlying = underlying
+        self.cycle_seconds = cycle_seconds
+        self.offline = offline
+        self.records = reader.between(start_ns, end_ns)
+        start = int(self.records[0]["recv_ns"]) / 1e9 if len(self.records) else 0.0
+        self.clock = SimClock(start, speed)
+        self.hub = get_market_data_hub()
+        self.broker = SimBroker(self.hub, self.clock, equity)
+        self.day = self.clock.now_et().strftime("%Y-%m-%d")
+        self._ladder = self._build_ladder()
+        self._latency: List[float] = []
+        self._stats = {"events": 0, "frames": 0, "cycles": 0, "closed_cycles": 0, "errors": 0}
+        self._wall = 0.0
+
+    # ── replayed market helpers ──────────────────────────────────────────────
+    def _build_ladder(self) -> Dict[str, Tuple[np.ndarray, List[str]]]:
+        """side → (strikes, tickers) for the recorded contracts expiring on the replayed day."""
+        expiry = self.day.replace("-", "")[2:]
+        rows: Dict[str, List[Tuple[float, str]]] = {"C": [], "P": []}
+        for sym in self.reader.symbols.values():
+            m = _OCC.match(sym)
+            if m and m.group(1) == self.underlying and m.group(2) == expiry:
+                rows[m.group(3)].append((int(m.group(4)) / 1000, sym))
+        return {side: (np.array([k for k, _ in sorted(r)]), [s for _, s in sorted(r)])
+                for side, r in rows.items()}
+
+    def atm_option_symbol(self, symbol: str = "SPY", call_put: str = "C") -> str | None:
+        """Replacement for the live ATM resolvers (OCC, no `O:` prefix)."""
+        strikes, tickers = self._ladder.get(call_put.upper()[0], (np.empty(0), []))
+        spot = self.hub.price(symbol)
+        if not spot or not len(strikes):
+            return None
+        return tickers[int(np.argmin(np.abs(strikes - spot)))][2:]
+
+    def option_metrics(self, symbol: str = "SPY") -> dict:
+        """Offline stand-in for the chain REST metrics: the ATM call's streamed book.
+        Delta is the ATM approximation (±0.5); greeks are not recorded."""
+        contract = symbol if symbol.startswith("O:") else self.atm_option_symbol(symbol, "C")
+        if not contract:
+            return {}
+        key = normalize_contract(contract)
+        bid, ask, last = self.broker._book(key)
+        trade = self.hub.trade(key)
+        return {"symbol": key, "bid": bid, "ask": ask, "mark": (bid + ask) / 2 if bid and ask else last,
+                "volume": trade.size if trade else 0, "iv": 0.0, "skew": 0.0, "gamma": 0.0,
+                "delta": -0.5 if _OCC.match(key) and _OCC.match(key).group(3) == "P" else 0.5}
+
+    # ── patching ─────────────────────────────────────────────────────────────
+    def _patch(self, live) -> _Patches:
+        import importlib
+        import core.position_manager as pm
+        import analytics.iv_surface as ivs
+        import core.feature_graph as fg
+        import core.market_context as mc
+        import core.order_tracker as ot
+        import polygon.open_interest as oi_mod
+        import polygon.market_data_hub as hub_mod
+
+        p = _Patches()
+        shim, dt_shim = _TimeShim(self.clock), _datetime_shim(self.clock)
+        for name in CLOCK_MODULES:
+            p.set(importlib.import_module(name), "time", shim)
+        for name in DATETIME_MODULES:
+            p.set(importlib.import_module(name), "datetime", dt_shim)
+        p.set(market_hours, "_now_et", self.clock.now_et)
+        p.set(bar_store, "_now_et", self.clock.now_et)
+        p.set(hub_mod, "record_events", _noop)
+
+        b = self.broker
+        for name, fn in (("fetch_tradier_equity", b.equity), ("get_tradier_buying_power", b.buying_power),
+                         ("load_open_trades", b.open_trades), ("aopen_position", b.aopen_position),
+                         ("get_atm_option_symbol", self.atm_option_symbol),
+                         ("resolve_atm_symbol", self.atm_option_symbol)):
+            p.set(live, name, fn)
+        for name, fn in (("get_positions", b.get_positions), ("get_order_status", b.get_order_status),
+                         ("submit_order", b.submit_order), ("aget_open_positions", b.aget_positions),
+                         ("get_tradier", lambda: b)):
+            p.set(pm, name, fn)
+        p.set(ot, "get_tradier", lambda: b)
+        for name in RUNNER_STUBS:
+            p.set(live, name, _noop)
+        for name in EXIT_STUBS:
+            p.set(pm, name, _noop)
+
+        if self.offline:
+            async def _hold(*_a, **_k):
+                return {"signal": "hold", "confidence": 0.0, "rationale": "replay"}
+            p.set(pm, "analyze_exit_with_gpt", _hold)
+            for mod in (pm, mc):
+                p.set(mod, "get_option_metrics", self.option_metrics)
+                p.set(mod, "get_dealer_flow_metrics", lambda *_a, **_k: {})
+            for mod in (fg, ivs, oi_mod):
+                p.set(mod, "get_chain_snapshot", lambda *_a, **_k: None)
+            p.set(fg, "get_gex_score", lambda *_a, **_k: 0.0)
+        return p
+
+    def _prepare(self) -> None:
+        self.hub.reset()
+        store = bar_store.get_bar_store()
+        store.reset()
+        bar_store._DAY_CACHE[0] = 0.0                  # session_date() re-reads the sim clock
+        for sym in self.reader.symbols.values():
+            if not sym.startswith("O:"):
+                store.hold(sym, self.day)
+        get_indicator_engine().reset()
+
+    # ── main loop ────────────────────────────────────────────────────────────
+    def _frames(self) -> Iterator[Tuple[float, List[dict]]]:
+        recv = self.records["recv_ns"]
+        bounds = np.flatnonzero(np.diff(recv)) + 1
+        for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(recv)]):
+            events = list(self.reader.iter_events(self.records[lo:hi]))
+            for ev in events:
+                ev.pop("_recv", None)
+            yield int(recv[lo]) / 1e9, events
+
+    async def _cycle(self, live) -> None:
+        if not live.is_market_open_now():
+            self._stats["closed_cycles"] += 1
+            return
+        t0 = _time.perf_counter()
+        try:
+            market = await live.abuild_market_context("SPY")
+            await live.manage_positions_async(market=market)
+            await live._entry_cycle(market)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error({"event": "replay_cycle_fail", "sim_ts": self.clock.time(), "err": str(e)})
+        self._latency.append(_time.perf_counter() - t0)
+        self._stats["cycles"] += 1
+
+    async def run(self) -> dict:
+        import run_q_algo_live_async as live           # heavy imports; only needed here
+
+        if not len(self.records):
+            return self.report()
+        patches = self._patch(live)
+        wall0 = _time.perf_counter()
+        try:
+            self._prepare()
+            next_cycle = self.clock.time() + self.cycle_seconds
+            for recv, events in self._frames():
+                while recv >= next_cycle:
+                    await self.clock.advance_to(next_cycle)
+                    await self._cycle(live)
+                    next_cycle += self.cycle_seconds
+                await self.clock.advance_to(recv)
+                self.hub.dispatch(events, recv_ts=recv)
+                self._stats["frames"] += 1
+                self._stats["events"] += len(events)
+        finally:
+            self._wall = _time.perf_counter() - wall0
+            patches.restore()
+            bar_store._DAY_CACHE[0] = 0.0
+        return self.report()
+
+    def report(self) -> dict:
+        lat = np.array(self._latency) * 1000 if self._latency else np.zeros(1)
+        sim = (int(self.records[-1]["recv_ns"]) - int(self.records[0]["recv_ns"])) / 1e9 if len(self.records) else 0.0
+        return {
+            "day": self.day,
+            **self._stats,
+            "sim_seconds": round(sim, 1),
+            "wall_seconds": round(self._wall, 3),
+            "speedup": round(sim / self._wall, 1) if self._wall else None,
+            "events_per_s": round(self._stats["events"] / self._wall) if self._wall else None,
+            "cycle_ms": {"p50": round(float(np.percentile(lat, 50)), 2),
+                         "p99": round(float(np.percentile(lat, 99)), 2),
+                         "max": round(float(lat.max()), 2)},
+            "broker": self.broker.summary(),
+            "fills": self.broker.fills,
+        }
+
+
+def _et_ns(day: str, hhmm: str | None) -> int | None:
+    if not hhmm:
+        return None
+    dt = _eastern.localize(datetime.strptime(f"{day} {hhmm}", "%Y-%m-%d %H:%M"))
+    return int(dt.timestamp() * 1e9)
+
+
+def replay_session(day: str, *, directory: str = TICK_DIR, start: str | None = None,
+                   end: str | None = None, **kwargs) -> dict:
+    """Replay one recorded session (YYYY-MM-DD); start/end are HH:MM ET."""
+    reader = TickReader.for_date(day, directory)
+    replay = MarketReplay(reader, start_ns=_et_ns(day, start), end_ns=_et_ns(day, end), **kwargs)
+    return asyncio.run(replay.run())
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Replay a recorded session through the live trading loop")
+    ap.add_argument("day", help="session date, YYYY-MM-DD")
+    ap.add_argument("--dir", default=TICK_DIR)
+    ap.add_argument("--speed", type=float, default=0.0, help="0 = as fast as possible, N = N× real time")
+    ap.add_argument("--cycle", type=float, default=CYCLE_SECONDS, help="simulated seconds between loop cycles")
+    ap.add_argument("--equity", type=float, default=REPLAY_EQUITY)
+    ap.add_argument("--start", help="HH:MM ET")
+    ap.add_argument("--end", help="HH:MM ET")
+    ap.add_argument("--offline", action="store_true", help="stub GPT exit advisor and chain REST metrics")
+    args = ap.parse_args()
+    report = replay_session(args.day, directory=args.dir, start=args.start, end=args.end,
+                            speed=args.speed, cycle_seconds=args.cycle, equity=args.equity,
+                            offline=args.offline)
+    print(json.dumps(report, indent=2, default=str))
+
+
+__all__ = ["SimClock", "SimBroker", "MarketReplay", "replay_session"]
+
+
+if __name__ == "__main__":
+    main()
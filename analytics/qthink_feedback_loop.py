@@ -2,7 +2,7 @@
 
 import os
 import json
-import requests
+from core.http_clients import get_client
 from datetime import datetime
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -66,7 +66,7 @@ def label_trade_with_gpt(trade):
     }
 
     try:
-        response = requests.post(OPENAI_API_URL, headers=HEADERS, json=payload)
+        response = get_client(OPENAI_API_URL).post(OPENAI_API_URL, headers=HEADERS, json=payload)
         response.raise_for_status()
         gpt_output = response.json()
         label = gpt_output["choices"][0]["message"]["content"].strip()
@@ -0,0 +1,323 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: analytics/state_index.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Nearest-neighbour index over every stored q_0dte_brain state vector.
+
+Each snapshot in `logs/q_0dte_memory.jsonl` becomes one row of a float
+matrix over `FEATURES`: vwap_diff, gex, skew, intraday return, VIX and the
+30-minute time-of-day bin. The bin is derived from the snapshot timestamp
+when an old row lacks it. The row's pattern tag and its recorded result
+(win / loss, if one was written back) are kept alongside.
+
+* Columns are z-scored with the mean / std frozen at the last rebuild.
+  Missing values become the column mean, i.e. 0.
+* Rows live in a `cKDTree` plus a small unindexed tail that is scanned
+  brute-force. Appends are O(1): once the tail reaches `TAIL_MAX` rows a
+  background thread recomputes the normalisation, builds a new tree over a
+  view of the rows and swaps it in, so `MemoryStore.append` never waits on
+  a rebuild. Rows appended meanwhile stay in the tail.
+* `query(state, k)` merges the tree's k nearest with the tail's. With the
+  tail capped, a query takes a few hundred microseconds at a million rows.
+* The index subscribes to `MemoryStore` appends and checkpoints its arrays
+  together with the log byte offset they cover (`INDEX_PATH`, written by
+  the rebuild thread after the swap). A restart loads the checkpoint and
+  parses only newer lines.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import warnings
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Tuple
+
+import numpy as np
+import pytz
+from scipy.spatial import cKDTree
+
+from core.logger_setup import get_logger
+from core.utils.jsonl_tail import iter_jsonl_from
+from mesh.q_0dte_memory import MEMORY_LOG_PATH, get_memory_store
+
+logger = get_logger(__name__)
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+FEATURES     = ("vwap_diff", "gex", "skew", "return", "vix", "time_of_day_bin")
+INDEX_PATH   = "logs/q_0dte_state_index.npz"
+TAIL_MAX     = 256          # unindexed rows that trigger a background rebuild
+OUTCOMES     = {"win": 1, "loss": -1}
+
+_ALIASES = {"return": "intraday_return"}         # mesh_router passes feature-graph names
+
+_eastern = pytz.timezone("US/Eastern")
+
+# ---------------------------------------------------------------------------
+# Rows
+# ---------------------------------------------------------------------------
+def _num(v) -> float:
+    try:
+        return float(v) if v is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _time_bin(ts: str | None) -> float:
+    """30-minute ET bucket since the open (0 … 12) of a naive-UTC ISO timestamp."""
+    try:
+        et = pytz.utc.localize(datetime.fromisoformat(ts)).astimezone(_eastern)
+    except (TypeError, ValueError):
+        return np.nan
+    return float(min(max((et.hour * 60 + et.minute - 570) // 30, 0), 12))
+
+
+def _zscore(X: np.ndarray, mu: np.ndarray, sigma: np.ndarray) -> np.ndarray:
+    Z = (X - mu) / sigma
+    return np.where(np.isfinite(Z), Z, 0.0)
+
+
+def state_row(state: dict, ts: str | None = None) -> np.ndarray:
+    row = np.array([_num(state.get(name, state.get(_ALIASES.get(name)))) for name in FEATURES])
+    if np.isnan(row[-1]):
+        row[-1] = _time_bin(ts)
+    return row
+
+
+@dataclass(frozen=True, slots=True)
+class Neighbor:
+    distance: float
+    tag:      str
+    outcome:  str | None
+    state:    dict
+
+
+@dataclass(frozen=True, slots=True)
+class NeighborSet:
+    neighbors: Tuple[Neighbor, ...]
+
+    @property
+    def wins(self) -> int:
+        return sum(n.outcome == "win" for n in self.neighbors)
+
+    @property
+    def losses(self) -> int:
+        return sum(n.outcome == "loss" for n in self.neighbors)
+
+    @property
+    def win_rate(self) -> float | None:
+        decided = self.wins + self.losses
+        return self.wins / decided if decided else None
+
+    @property
+    def dominant_tag(self) -> str | None:
+        tags = Counter(n.tag for n in self.neighbors)
+        return tags.most_common(1)[0][0] if tags else None
+
+    def as_dict(self) -> dict:
+        return {"k": len(self.neighbors), "wins": self.wins, "losses": self.losses,
+                "win_rate": None if self.win_rate is None else round(self.win_rate, 3),
+                "dominant_tag": self.dominant_tag,
+                "nearest": round(self.neighbors[0].distance, 4) if self.neighbors else None}
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+class StateIndex:
+    def __init__(self, log_path: str = MEMORY_LOG_PATH, index_path: str = INDEX_PATH):
+        self.log_path = log_path
+        self.index_path = index_path
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._builder: threading.Thread | None = None
+        self._stats = {"rebuilds": 0, "queries": 0, "appends": 0}
+        self._reset()
+
+    # ── rows ─────────────────────────────────────────────────────────────────
+    def _reset(self) -> None:
+        self._X = np.empty((1024, len(FEATURES)))
+        self._tag = np.empty(1024, dtype=np.int32)
+        self._outcome = np.empty(1024, dtype=np.int8)
+        self._tags: List[str] = []
+        self._tag_ids: dict = {}
+        self._n = 0
+        self._offset = 0                     # log bytes reflected in the rows
+        self._tree: cKDTree | None = None
+        self._tree_n = 0
+        self._mu = np.zeros(len(FEATURES))
+        self._sigma = np.ones(len(FEATURES))
+
+    def _append(self, row: np.ndarray, tag: str, result) -> None:
+        if self._n == len(self._X):
+            grow = len(self._X) * 2
+            self._X = np.resize(self._X, (grow, len(FEATURES)))
+            self._tag = np.resize(self._tag, grow)
+            self._outcome = np.resize(self._outcome, grow)
+        if tag not in self._tag_ids:
+            self._tag_ids[tag] = len(self._tags)
+            self._tags.append(tag)
+        self._X[self._n] = row
+        self._tag[self._n] = self._tag_ids[tag]
+        self._outcome[self._n] = OUTCOMES.get(result, 0)
+        self._n += 1
+
+    def _add_entry(self, entry: dict) -> None:
+        self._append(state_row(entry.get("state_vector") or {}, entry.get("timestamp")),
+                     entry.get("pattern_tag", "unknown"), entry.get("result"))
+
+    def _normalized(self, X: np.ndarray) -> np.ndarray:
+        return _zscore(X, self._mu, self._sigma)
+
+    def _rebuild(self, persist: bool = True) -> None:
+        """Build a tree over the rows present now and swap it in; only the swap holds the lock."""
+        with self._lock:                    # rows below _n are never rewritten → views are stable
+            n, offset, tags = self._n, self._offset, list(self._tags)
+            X, tag, outcome = self._X[:n], self._tag[:n], self._outcome[:n]
+        mu, sigma = self._mu, self._sigma
+        if n:
+            with warnings.catch_warnings():                 # all-NaN column (e.g. no VIX yet)
+                warnings.simplefilter("ignore", RuntimeWarning)
+                mu, sigma = np.nanmean(X, axis=0), np.nanstd(X, axis=0)
+            mu = np.nan_to_num(mu)
+            sigma = np.where(np.isfinite(sigma) & (sigma > 0), sigma, 1.0)
+        tree = cKDTree(_zscore(X, mu, sigma)) if n else None
+        with self._lock:
+            self._mu, self._sigma, self._tree, self._tree_n = mu, sigma, tree, n
+            self._stats["rebuilds"] += 1
+        if persist:
+            self._save(X, tag, outcome, tags, offset)
+
+    def _rebuild_loop(self) -> None:
+        while True:
+            with self._lock:
+                if self._n - self._tree_n < TAIL_MAX:
+                    self._builder = None
+                    return
+            try:
+                self._rebuild()
+            except Exception as e:
+                logger.error({"event": "state_index_rebuild_fail", "err": str(e)})
+                with self._lock:
+                    self._builder = None
+                return
+
+    def _maybe_rebuild(self) -> None:
+        if self._n - self._tree_n >= TAIL_MAX and self._builder is None:
+            self._builder = threading.Thread(target=self._rebuild_loop, daemon=True, name="state-index-rebuild")
+            self._builder.start()
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Wait for an in-flight background rebuild (and its checkpoint) to finish."""
+        builder = self._builder
+        if builder is not None:
+            builder.join(timeout)
+
+    # ── persistence ──────────────────────────────────────────────────────────
+    def _save(self, X: np.ndarray, tag: np.ndarray, outcome: np.ndarray,
+              tags: List[str], offset: int) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=os.path.dirname(self.index_path) or ".",
+                                             suffix=".npz", delete=False) as tmp:
+                np.savez(tmp, X=X, tag=tag, outcome=outcome, tags=np.array(tags, dtype=str),
+                         offset=np.array(offset))
+            os.replace(tmp.name, self.index_path)
+        except OSError as e:
+            logger.warning({"event": "state_index_persist_fail", "err": str(e)})
+
+    def _restore(self) -> None:
+        try:
+            with np.load(self.index_path) as ckpt:
+                X, tag, outcome = ckpt["X"], ckpt["tag"], ckpt["outcome"]
+                tags, offset = ckpt["tags"].tolist(), int(ckpt["offset"])
+        except (OSError, ValueError, KeyError):
+            return
+        if X.ndim != 2 or X.shape[1] != len(FEATURES):
+            return                                   # feature set changed → rebuild from the log
+        cap = max(1024, 2 * len(X))
+        self._X = np.resize(X, (cap, len(FEATURES)))
+        self._tag, self._outcome = np.resize(tag, cap), np.resize(outcome, cap)
+        self._tags, self._tag_ids = tags, {t: i for i, t in enumerate(tags)}
+        self._n, self._offset = len(X), offset
+
+    def load(self) -> "StateIndex":
+        """Checkpoint + log lines after it. Blocking; run once before the first query."""
+        with self._lock:
+            if self._loaded:
+                return self
+            self._restore()
+            start = self._n
+            if os.path.exists(self.log_path):
+                if os.path.getsize(self.log_path) < self._offset:    # rotated → start over
+                    self._reset()
+                    start = 0
+                for self._offset, entry in iter_jsonl_from(self.log_path, self._offset):
+                    if entry is not None:
+                        self._add_entry(entry)
+            self._rebuild(persist=self._n > start)
+            self._loaded = True
+            logger.info({"event": "state_index_loaded", "rows": self._n, "parsed": self._n - start})
+            return self
+
+    # ── live ─────────────────────────────────────────────────────────────────
+    def on_append(self, entry: dict, end_offset: int) -> None:
+        """MemoryStore listener: index a snapshot just written to the log."""
+        with self._lock:
+            if not self._loaded or end_offset <= self._offset:
+                return                               # load() will pick it up from the log
+            self._add_entry(entry)
+            self._offset = end_offset
+            self._stats["appends"] += 1
+            self._maybe_rebuild()
+
+    def query(self, state: dict, k: int = 20) -> NeighborSet:
+        """k most similar stored states, nearest first."""
+        self.load()
+        with self._lock:
+            self._stats["queries"] += 1
+            if not self._n or k <= 0:
+                return NeighborSet(())
+            q = self._normalized(state_row(state))
+            idx, dist = np.empty(0, dtype=np.int64), np.empty(0)
+            if self._tree is not None:
+                d, i = self._tree.query(q, k=min(k, self._tree_n))
+                idx, dist = np.atleast_1d(i), np.atleast_1d(d)
+            if self._n > self._tree_n:
+                tail = self._normalized(self._X[self._tree_n:self._n])
+                d = np.sqrt(((tail - q) ** 2).sum(axis=1))
+                idx = np.concatenate([idx, np.arange(self._tree_n, self._n)])
+                dist = np.concatenate([dist, d])
+            order = np.argsort(dist, kind="stable")[:k]
+            inv = {v: name for name, v in OUTCOMES.items()}
+            return NeighborSet(tuple(
+                Neighbor(float(dist[j]), self._tags[self._tag[idx[j]]], inv.get(int(self._outcome[idx[j]])),
+                         {name: float(v) for name, v in zip(FEATURES, self._X[idx[j]]) if np.isfinite(v)})
+                for j in order))
+
+    def __len__(self) -> int:
+        return self._n
+
+    def stats(self) -> dict:
+        return {**self._stats, "rows": self._n, "indexed": self._tree_n}
+
+
+_INDEX = StateIndex()
+get_memory_store().subscribe(_INDEX.on_append)
+
+
+def get_state_index() -> StateIndex:
+    return _INDEX
+
+
+__all__ = [
+    "FEATURES",
+    "Neighbor",
+    "NeighborSet",
+    "StateIndex",
+    "get_state_index",
+    "state_row",
+]
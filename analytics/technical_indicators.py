@@ -5,9 +5,16 @@ import pandas as pd
 import numpy as np
 import requests
 from polygon.polygon_rest import get_historic_bars
+from analytics.indicator_engine import RSI_PERIOD, get_indicator_snapshot
 
 def get_rsi(symbol: str = "SPY", period: int = 14) -> float | None:
+    """Wilder RSI from the incremental engine; pandas fallback while cold."""
     try:
+        if period == RSI_PERIOD:
+            rsi = get_indicator_snapshot(symbol).rsi
+            if rsi is not None:
+                return rsi
+
         bars = get_historic_bars(symbol, timespan="minute", limit=period+1)
         if not bars or len(bars) < period + 1:
             return None
@@ -32,7 +39,12 @@ def get_rsi(symbol: str = "SPY", period: int = 14) -> float | None:
         return None
 
 def is_vwap_reclaim(symbol: str = "SPY") -> bool:
+    """Last price above session VWAP; recomputes from bars while cold."""
     try:
+        snap = get_indicator_snapshot(symbol)
+        if snap.warm and snap.vwap:
+            return snap.above_vwap
+
         bars = get_historic_bars(symbol, timespan="minute", limit=20)
         if not bars or len(bars) < 2:
             return False
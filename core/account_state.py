@@ -0,0 +1,275 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: core/account_state.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Event-driven Tradier account state – positions, orders and balances.
+
+* One coalesced poll per `ACCOUNT_POLL_SECS`: all three endpoints go out
+  concurrently on the pooled async Tradier client and land in a single
+  immutable `AccountSnapshot`, so readers never see positions from one
+  poll with balances from another.
+* `notify_order()` (called after our own order placements / exits) wakes the
+  poller immediately and schedules one follow-up poll for late fills.
+* Concurrent `refresh()` callers share one in-flight poll.
+* Subscribers get `(snapshot, changes)` whenever positions, orders or
+  balances differ from the previous snapshot. `wait_for_change()` is the
+  awaitable form.
+* Failed endpoints keep their previous value and the poll backs off
+  (capped at `ACCOUNT_POLL_MAX`). Each endpoint keeps its own fetch time and
+  the snapshot's `fetched_at` is the oldest of them, so a carried-over
+  positions or orders list never looks fresh.
+
+Readers such as capital_manager, open_trade_tracker and position_manager
+take `get_account_state().current()`. It returns None when the snapshot is
+missing or stale, and the caller then uses its legacy REST path.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, FrozenSet, List, Optional, Tuple
+
+from core.logger_setup import get_logger
+from core.tradier_async import (
+    TradierAsync,
+    TradierBalances,
+    TradierOrder,
+    TradierPosition,
+    get_tradier,
+)
+
+logger = get_logger(__name__)
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+POLL_SECS       = float(os.getenv("ACCOUNT_POLL_SECS", "2"))
+POLL_MAX        = 60.0                  # back-off ceiling
+MAX_STALENESS   = float(os.getenv("ACCOUNT_MAX_STALENESS", "10"))
+ORDER_FOLLOWUP  = 1.0                   # seconds; second poll after our own order event
+ENDPOINTS       = ("positions", "orders", "balances")
+OPEN_STATUSES   = frozenset({"open", "pending", "partially_filled"})
+
+Listener = Callable[["AccountSnapshot", FrozenSet[str]], None]
+
+# ---------------------------------------------------------------------------
+# Snapshot
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True, slots=True)
+class AccountSnapshot:
+    version:    int
+    fetched_at: float
+    positions:  Tuple[TradierPosition, ...] = ()
+    orders:     Tuple[TradierOrder, ...] = ()
+    balances:   Optional[TradierBalances] = None
+    errors:     Tuple[str, ...] = field(default=(), compare=False)
+    endpoint_at: Tuple[float, float, float] = field(default=(0.0, 0.0, 0.0), compare=False)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    @property
+    def position_count(self) -> int:
+        return len(self.positions)
+
+    @property
+    def equity(self) -> float:
+        return self.balances.total_equity if self.balances else 0.0
+
+    @property
+    def buying_power(self) -> float:
+        return self.balances.total_cash if self.balances else 0.0
+
+    def position(self, symbol: str) -> TradierPosition | None:
+        symbol = symbol.removeprefix("O:")
+        return next((p for p in self.positions if p.symbol == symbol), None)
+
+    def working_orders(self) -> List[TradierOrder]:
+        return [o for o in self.orders if o.status in OPEN_STATUSES]
+
+    def positions_as_dicts(self) -> List[dict]:
+        return [p.as_dict() for p in self.positions]
+
+
+def _diff(old: AccountSnapshot | None, new: AccountSnapshot) -> FrozenSet[str]:
+    if old is None:
+        return frozenset(ENDPOINTS)
+    return frozenset(name for name in ENDPOINTS
+                     if getattr(old, name) != getattr(new, name))
+
+# ---------------------------------------------------------------------------
+# Service
+# ---------------------------------------------------------------------------
+class AccountStateService:
+    def __init__(self, tradier: TradierAsync | None = None, interval: float = POLL_SECS):
+        self._tradier = tradier
+        self.interval = interval
+        self._delay = interval
+        self._snap: AccountSnapshot | None = None
+        self._listeners: List[Listener] = []
+        self._inflight: asyncio.Future | None = None
+        self._wake: asyncio.Event | None = None
+        self._changed: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        self._stats = {"polls": 0, "coalesced": 0, "forced": 0, "changes": 0, "errors": 0}
+
+    @property
+    def tradier(self) -> TradierAsync:
+        return self._tradier or get_tradier()
+
+    # ── reads ────────────────────────────────────────────────────────────────
+    @property
+    def snapshot(self) -> AccountSnapshot | None:
+        return self._snap
+
+    def current(self, max_age: float = MAX_STALENESS) -> AccountSnapshot | None:
+        """Latest snapshot if it is fresher than *max_age* seconds, else None."""
+        snap = self._snap
+        return snap if snap is not None and snap.age <= max_age else None
+
+    # ── notifications ────────────────────────────────────────────────────────
+    def subscribe(self, listener: Listener) -> Callable[[], None]:
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener) if listener in self._listeners else None
+
+    async def wait_for_change(self, after_version: int = -1, timeout: float | None = None) -> AccountSnapshot | None:
+        """Resolve with the first snapshot newer than *after_version* (None on timeout)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._snap is None or self._snap.version <= after_version:
+            self._changed = self._changed or asyncio.Event()
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+        return self._snap
+
+    def _publish(self, snap: AccountSnapshot, changes: FrozenSet[str]) -> None:
+        self._stats["changes"] += 1
+        logger.debug({"event": "account_state_changed", "version": snap.version,
+                      "changes": sorted(changes), "positions": snap.position_count})
+        for listener in list(self._listeners):
+            try:
+                listener(snap, changes)
+            except Exception as e:
+                logger.error({"event": "account_listener_fail", "err": str(e)})
+        if self._changed is not None:
+            self._changed.set()
+            self._changed = asyncio.Event()
+
+    # ── polling ──────────────────────────────────────────────────────────────
+    async def _poll(self) -> AccountSnapshot:
+        prev = self._snap
+        results = await asyncio.gather(self.tradier.positions(), self.tradier.orders(),
+                                       self.tradier.balances(), return_exceptions=True)
+        now = time.time()
+        errors = tuple(f"{name}: {r}" for name, r in zip(ENDPOINTS, results)
+                       if isinstance(r, BaseException))
+        positions, orders, balances = (
+            prev_val if isinstance(r, BaseException) else r
+            for r, prev_val in zip(results, (prev.positions if prev else (),
+                                             prev.orders if prev else (),
+                                             prev.balances if prev else None))
+        )
+        endpoint_at = tuple(
+            prev_at if isinstance(r, BaseException) else now
+            for r, prev_at in zip(results, prev.endpoint_at if prev else (0.0, 0.0, 0.0))
+        )
+        snap = AccountSnapshot(
+            version=(prev.version + 1) if prev else 1,
+            fetched_at=min(endpoint_at),
+            positions=tuple(positions), orders=tuple(orders), balances=balances, errors=errors,
+            endpoint_at=endpoint_at,
+        )
+        self._stats["polls"] += 1
+        if errors:
+            self._stats["errors"] += 1
+            self._delay = min(self._delay * 2, POLL_MAX)
+            logger.warning({"event": "account_poll_partial", "errors": list(errors), "next": self._delay})
+        elif self._delay > self.interval:
+            logger.info({"event": "account_poll_recovered"})
+            self._delay = self.interval
+
+        changes = _diff(prev, snap)
+        if changes or prev is None:
+            self._snap = snap
+            self._publish(snap, changes)
+        else:                                   # same content – keep version, bump freshness
+            self._snap = AccountSnapshot(prev.version, snap.fetched_at, prev.positions,
+                                         prev.orders, prev.balances, errors, snap.endpoint_at)
+        return self._snap
+
+    async def refresh(self) -> AccountSnapshot:
+        """Poll now; callers that arrive while a poll is in flight share its result."""
+        if self._inflight is not None and not self._inflight.done():
+            self._stats["coalesced"] += 1
+            return await asyncio.shield(self._inflight)
+        self._inflight = asyncio.ensure_future(self._poll())
+        return await asyncio.shield(self._inflight)
+
+    def notify_order(self, order_id: str | None = None) -> None:
+        """Our own order event: poll immediately, then once more after ORDER_FOLLOWUP."""
+        if self._loop is None or self._loop.is_closed():
+            return
+        self._stats["forced"] += 1
+        logger.debug({"event": "account_refresh_forced", "order_id": order_id})
+
+        def _kick():
+            if self._wake is not None:
+                self._wake.set()
+            self._loop.call_later(ORDER_FOLLOWUP, lambda: self._wake and self._wake.set())
+        try:
+            if asyncio.get_running_loop() is self._loop:
+                _kick()
+                return
+        except RuntimeError:
+            pass
+        self._loop.call_soon_threadsafe(_kick)
+
+    # ── lifecycle ────────────────────────────────────────────────────────────
+    async def run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error({"event": "account_poll_fail", "err": str(e)})
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self._delay * random.uniform(0.9, 1.1))
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run(), name="account-state")
+        return self._task
+
+    def stats(self) -> dict:
+        snap = self._snap
+        return {**self._stats, "version": snap.version if snap else 0,
+                "age": round(snap.age, 2) if snap else None, "delay": self._delay}
+
+
+_ACCOUNT = AccountStateService()
+
+
+def get_account_state() -> AccountStateService:
+    return _ACCOUNT
+
+
+__all__ = [
+    "AccountSnapshot",
+    "AccountStateService",
+    "get_account_state",
+]
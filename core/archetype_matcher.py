@@ -1,5 +1,5 @@
 # File: core/archetype_loader.py  (refactored)
-"""Loads and validates setup archetypes used by mesh/brain agents.
+"""Loads, validates and evaluates setup archetypes used by mesh/brain agents.
 
 Upgrades
 --------
@@ -7,12 +7,25 @@ Upgrades
 * Structured JSON logging (core.logger_setup).
 * LRU‑cached loader to avoid disk hits on every call.
 * Graceful degradation if *jsonschema* is missing (warn, still load).
+* Accepts both the top‑level list used by data/setup_archetypes.json and the
+  legacy ``{"archetypes": [...]}`` wrapper.
+* `compile_archetypes()` turns every archetype into rows of NumPy arrays once:
+  required agents, preferred time blocks (``"12:30–2:30 PM"``) and failure
+  conditions (``"IV > 60%"``, ``"Q Trap active"``, …). `match()` then scores
+  all archetypes against one per‑tick feature vector in a single vectorized
+  pass. Failure phrases the compiler does not understand are logged once and
+  ignored.
 """
 from __future__ import annotations
 
-import os, json
+import os, json, re, time
+from dataclasses import dataclass
+from datetime import datetime
 from functools import lru_cache
-from typing import List, Dict
+from typing import Dict, List, Mapping, Tuple
+
+import numpy as np
+import pytz
 
 from core.logger_setup import get_logger
 
@@ -24,22 +37,19 @@ logger = get_logger(__name__)
 ARCHETYPES_FILE = os.getenv("ARCHETYPES_FILE", "data/setup_archetypes.json")
 
 _ARCHETYPE_SCHEMA = {
-    "type": "object",
-    "properties": {
-        "archetypes": {
-            "type": "array",
-            "items": {
-                "type": "object",
-                "required": ["archetype_id", "pattern", "match_threshold"],
-                "properties": {
-                    "archetype_id": {"type": "string"},
-                    "pattern": {"type": "object"},
-                    "match_threshold": {"type": "number"},
-                },
-            },
-        }
+    "type": "array",
+    "items": {
+        "type": "object",
+        "required": ["name", "agents_required"],
+        "properties": {
+            "name": {"type": "string"},
+            "agents_required": {"type": "array", "items": {"type": "string"}},
+            "preferred_time_blocks": {"type": "array", "items": {"type": "string"}},
+            "failure_conditions": {"type": "array", "items": {"type": "string"}},
+            "confidence_score_boost": {"type": "number"},
+            "match_threshold": {"type": "number"},
+        },
     },
-    "required": ["archetypes"],
 }
 
 try:
@@ -61,14 +71,15 @@ def load_archetypes() -> List[Dict]:
         return []
 
     try:
-        data = json.load(open(ARCHETYPES_FILE))
+        with open(ARCHETYPES_FILE) as f:
+            data = json.load(f)
+        archs = data.get("archetypes", []) if isinstance(data, dict) else data
 
         if validate:
-            validate(instance=data, schema=_ARCHETYPE_SCHEMA)  # type: ignore[arg-type]
+            validate(instance=archs, schema=_ARCHETYPE_SCHEMA)  # type: ignore[arg-type]
         else:
             logger.debug({"event": "archetypes_no_validation"})
 
-        archs = data.get("archetypes", [])
         logger.info({"event": "archetypes_loaded", "count": len(archs)})
         return archs
 
@@ -79,6 +90,197 @@ def load_archetypes() -> List[Dict]:
         logger.error({"event": "archetypes_load_fail", "err": str(e)})
         return []
 
+# ---------------------------------------------------------------------------
+# Compiler
+# ---------------------------------------------------------------------------
+# market columns of the per‑tick vector; feature names from core.feature_graph
+ARCHETYPE_FEATURES = ("iv", "gex", "dex", "vix", "volume_ratio", "oi_above", "flow_divergence")
+MATCH_THRESHOLD = 0.67      # default when an archetype sets no match_threshold
+OFF_HOURS_WEIGHT = 0.5      # score multiplier outside every preferred time block
+LOW_IV = 0.15
+VOLUME_SPIKE = 1.5          # rolling volume vs session average
+OI_CLUSTER = 10_000         # same bar as q_block's OI_THRESHOLD
+
+_eastern = pytz.timezone("US/Eastern")
+_TIME_BLOCK = re.compile(r"(\d{1,2}):(\d{2})\s*[–—-]\s*(\d{1,2}):(\d{2})\s*(AM|PM)", re.I)
+
+
+def agent_key(label: str) -> str:
+    """'Q Gamma' → 'q_gamma' (mesh agent name)."""
+    return re.sub(r"\s+", "_", label.strip().lower())
+
+
+# phrase (lower case) → (column, ">" | "<", threshold)
+_CONDITIONS = (
+    (re.compile(r"^iv\s*([<>])\s*(\d+(?:\.\d+)?)%$"), lambda m: ("iv", m[1], float(m[2]) / 100)),
+    (re.compile(r"^low iv$"), lambda m: ("iv", "<", LOW_IV)),
+    (re.compile(r"^(q \w+) active$"), lambda m: (f"{agent_key(m[1])}.score", ">", 0.0)),
+    (re.compile(r"^(q \w+) bullish$"), lambda m: (f"{agent_key(m[1])}.dir", ">", 0.0)),
+    (re.compile(r"^(q \w+) bearish$"), lambda m: (f"{agent_key(m[1])}.dir", "<", 0.0)),
+    (re.compile(r"^gex (?:still )?negative$"), lambda m: ("gex", "<", 0.0)),
+    (re.compile(r"^(?:no volume spike|low bounce volume)$"), lambda m: ("volume_ratio", "<", VOLUME_SPIKE)),
+    (re.compile(r"^dealer delta stays short$"), lambda m: ("dex", "<", 0.0)),
+    (re.compile(r"^oi cluster above$"), lambda m: ("oi_above", ">", OI_CLUSTER)),
+    (re.compile(r"^flow divergence$"), lambda m: ("flow_divergence", ">", 0.5)),
+)
+
+
+def parse_time_block(text: str) -> Tuple[int, int] | None:
+    """'10:30–1:00 PM' → (630, 780) minutes after midnight ET. The AM/PM suffix
+    belongs to the end; the start takes it too unless that would put it after the end."""
+    m = _TIME_BLOCK.search(text)
+    if not m:
+        return None
+    h1, m1, h2, m2, half = int(m[1]), int(m[2]), int(m[3]), int(m[4]), m[5].upper()
+
+    def minutes(h: int, mins: int, suffix: str) -> int:
+        return ((h % 12) + (12 if suffix == "PM" else 0)) * 60 + mins
+
+    end = minutes(h2, m2, half)
+    start = minutes(h1, m1, half)
+    if start > end:
+        start = minutes(h1, m1, "AM")
+    return start, end
+
+
+def _condition(text: str) -> Tuple[str, str, float] | None:
+    phrase = text.strip().lower()
+    for pattern, build in _CONDITIONS:
+        m = pattern.match(phrase)
+        if m:
+            return build(m)
+    return None
+
+
+@dataclass(frozen=True, slots=True)
+class ArchetypeMatch:
+    name:      str
+    score:     float              # required-agent coverage × time weight; 0 when a failure fires
+    matched:   bool
+    in_time:   bool
+    coverage:  float              # fraction of required agents signalling
+    failures:  Tuple[str, ...]    # failure phrases that fired
+    direction: str | None
+    boost:     float
+
+    def as_dict(self) -> dict:
+        return {"name": self.name, "score": round(self.score, 3), "matched": self.matched,
+                "in_time": self.in_time, "coverage": round(self.coverage, 3),
+                "failures": list(self.failures), "direction": self.direction, "boost": self.boost}
+
+
+class CompiledArchetypes:
+    """All archetypes as arrays over one feature vector (`columns`)."""
+
+    def __init__(self, archetypes: List[Dict]):
+        self.names = [a["name"] for a in archetypes]
+        agents = sorted({agent_key(x) for a in archetypes for x in a.get("agents_required", [])})
+        conds = []
+        for i, a in enumerate(archetypes):
+            for text in a.get("failure_conditions", []):
+                parsed = _condition(text)
+                if parsed is None:
+                    logger.warning({"event": "archetype_condition_unparsed", "archetype": a["name"], "condition": text})
+                    continue
+                conds.append((i, text, *parsed))
+                col = parsed[0]
+                if "." in col and col.split(".")[0] not in agents:
+                    agents.append(col.split(".")[0])
+
+        self.columns = ("minute", *ARCHETYPE_FEATURES,
+                        *(f"{a}.{k}" for a in agents for k in ("score", "dir")))
+        self.index = {c: j for j, c in enumerate(self.columns)}
+        self.agents = agents
+        n, f = len(archetypes), len(self.columns)
+
+        self.required = np.zeros((n, f))
+        self.required_dir = np.zeros((n, f))
+        for i, a in enumerate(archetypes):
+            for x in a.get("agents_required", []):
+                self.required[i, self.index[f"{agent_key(x)}.score"]] = 1.0
+                self.required_dir[i, self.index[f"{agent_key(x)}.dir"]] = 1.0
+        self.n_required = np.maximum(self.required.sum(axis=1), 1.0)
+
+        blocks = [[b for b in map(parse_time_block, a.get("preferred_time_blocks", [])) if b]
+                  for a in archetypes]
+        width = max((len(b) for b in blocks), default=0) or 1
+        self.win_start = np.full((n, width), np.inf)
+        self.win_end = np.full((n, width), -np.inf)
+        self.any_window = np.array([bool(b) for b in blocks])
+        for i, rows in enumerate(blocks):
+            for j, (s, e) in enumerate(rows):
+                self.win_start[i, j], self.win_end[i, j] = s, e
+
+        self.cond_arch = np.array([c[0] for c in conds], dtype=np.int64)
+        self.cond_text = [c[1] for c in conds]
+        self.cond_col = np.array([self.index[c[2]] for c in conds], dtype=np.int64)
+        self.cond_gt = np.array([c[3] == ">" for c in conds], dtype=bool)
+        self.cond_thr = np.array([c[4] for c in conds], dtype=float)
+
+        self.threshold = np.array([a.get("match_threshold", MATCH_THRESHOLD) for a in archetypes], dtype=float)
+        self.boost = np.array([a.get("confidence_score_boost", 0.0) for a in archetypes], dtype=float)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    # ── per tick ─────────────────────────────────────────────────────────────
+    def vector(self, features: Mapping[str, float], votes: Mapping[str, Mapping] | None = None,
+               ts: float | None = None) -> np.ndarray:
+        """Feature vector in `columns` order. *votes*: agent → {"score", "direction"} (mesh_votes);
+        an agent that did not vote scores 0. Missing market features are NaN (their conditions never fire)."""
+        x = np.full(len(self.columns), np.nan)
+        et = datetime.fromtimestamp(time.time() if ts is None else ts, pytz.utc).astimezone(_eastern)
+        x[0] = et.hour * 60 + et.minute
+        for j, name in enumerate(ARCHETYPE_FEATURES, start=1):
+            v = features.get(name)
+            if isinstance(v, (int, float)):
+                x[j] = v
+        votes = votes or {}
+        for agent in self.agents:
+            vote = votes.get(agent) or {}
+            direction = str(vote.get("direction") or "").lower()
+            x[self.index[f"{agent}.score"]] = float(vote.get("score") or 0.0)
+            x[self.index[f"{agent}.dir"]] = 1.0 if direction == "call" else -1.0 if direction == "put" else 0.0
+        return x
+
+    def scores(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(score, coverage, in_time, fired-per-condition) for every archetype, one pass."""
+        active = np.where(np.isfinite(x) & (x > 0), 1.0, 0.0)
+        coverage = (self.required @ active) / self.n_required
+        t = x[0]
+        in_time = ((self.win_start <= t) & (t <= self.win_end)).any(axis=1) | ~self.any_window
+        vals = x[self.cond_col]
+        with np.errstate(invalid="ignore"):
+            fired = np.where(self.cond_gt, vals > self.cond_thr, vals < self.cond_thr) & np.isfinite(vals)
+        vetoed = np.bincount(self.cond_arch, weights=fired, minlength=len(self)) > 0
+        score = np.where(vetoed, 0.0, coverage * np.where(in_time, 1.0, OFF_HOURS_WEIGHT))
+        return score, coverage, in_time, fired
+
+    def match(self, features: Mapping[str, float], votes: Mapping[str, Mapping] | None = None,
+              ts: float | None = None) -> List[ArchetypeMatch]:
+        """Every archetype scored against this tick, best first."""
+        x = self.vector(features, votes, ts)
+        score, coverage, in_time, fired = self.scores(x)
+        lean = self.required_dir @ np.nan_to_num(x)
+        out = []
+        for i in np.argsort(-score, kind="stable"):
+            failures = tuple(self.cond_text[c] for c in np.nonzero(fired & (self.cond_arch == i))[0])
+            out.append(ArchetypeMatch(
+                self.names[i], float(score[i]), bool(score[i] >= self.threshold[i]), bool(in_time[i]),
+                float(coverage[i]), failures,
+                "call" if lean[i] > 0 else "put" if lean[i] < 0 else None, float(self.boost[i])))
+        return out
+
+
+def compile_archetypes(archetypes: List[Dict] | None = None) -> CompiledArchetypes:
+    return CompiledArchetypes(load_archetypes() if archetypes is None else archetypes)
+
+
+@lru_cache(maxsize=1)
+def get_archetype_matcher() -> CompiledArchetypes:
+    """Compiled once per process from ARCHETYPES_FILE."""
+    return compile_archetypes()
+
 # ---------------------------------------------------------------------------
 # CLI self‑test
 # ---------------------------------------------------------------------------
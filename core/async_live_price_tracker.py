@@ -1,7 +1,7 @@
 # File: core/async_live_price_tracker.py  (refactored)
 """Async‑friendly price helper.
 
-Primary source: `polygon.async_polygon_websocket.SPY_LIVE_PRICE` (mid preferred)
+Primary source: `polygon.market_data_hub` (quote mid preferred, else last trade)
 Fallback: synchronous Tradier REST quote via `core.tradier_client.get_quote`.
 Adds a 15‑second staleness guard so stale ws values trigger REST fetch.
 """
@@ -10,7 +10,7 @@ from __future__ import annotations
 import time, asyncio
 from typing import Optional
 
-from polygon.async_polygon_websocket import SPY_LIVE_PRICE  # populated by ws listener
+from polygon.market_data_hub import get_market_data_hub
 from core.tradier_client import get_quote
 from core.logger_setup import get_logger
 
@@ -28,9 +28,9 @@ _last_tradier_price: float = 0.0
 # -------------------------------------------------------------
 
 def _ws_price() -> Optional[float]:
-    price = SPY_LIVE_PRICE.get("mid") or SPY_LIVE_PRICE.get("price")
-    ts = SPY_LIVE_PRICE.get("timestamp")
-    if price and ts and time.time() - ts < _STALE_AFTER:
+    hub = get_market_data_hub()
+    price = hub.price("SPY")
+    if price and hub.age("SPY") < _STALE_AFTER:
         return price
     return None
 
@@ -6,17 +6,16 @@ Capital / risk utilities for Q-ALGO hedge-fund stack.
 
 Key points
 ══════════
-• Async httpx polling of Tradier balances (fast cadence for 0-DTE scalps).
-• Stale-while-revalidate cache accessed by cheap synchronous getters.
-• Graceful fallback to HTTP/1.1 when `h2` isn’t installed.
+• Balances / position count come from the shared account-state snapshot
+  (core.account_state), which owns the Tradier balances poll; cheap
+  synchronous getters read it.
+• A stale snapshot beats 0.0 (e.g. while the account poll backs off).
 • Back-compat helpers preserved (_RISK_TABLE, log_allocation_update).
 """
 from __future__ import annotations
-import time
-import asyncio, os, random, time
-from typing import Dict
+import os, time
 
-import httpx
+from core.account_state import get_account_state
 from core.logger_setup import get_logger
 from core.tradier_client import get_positions
 
@@ -24,33 +23,11 @@ from core.tradier_client import get_positions
 
 # ─────────────────────────────── configuration
 logger              = get_logger(__name__)
-TRADIER_ACCOUNT_ID  = os.getenv("TRADIER_ACCOUNT_ID", "")
-TRADIER_TOKEN       = os.getenv("TRADIER_ACCESS_TOKEN", "")
-TRADIER_API_BASE    = os.getenv("TRADIER_API_BASE", "https://sandbox.tradier.com/v1").rstrip("/")
-BAL_ENDPOINT        = f"{TRADIER_API_BASE}/accounts/{TRADIER_ACCOUNT_ID}/balances"
-POLL_BASE_SECS      = 5          # fast cadence for 0-DTE
-POLL_MAX_SECS       = 60         # back-off ceiling
-
-_timeout            = httpx.Timeout(8.0)        # finite, generous
-HEADERS             = {
-    "Authorization": f"Bearer {TRADIER_TOKEN}",
-    "Accept":        "application/json",
-}
-
-# ─────────────────────────────── HTTP/2 graceful toggle
-try:
-    import h2                              # noqa: F401  (only presence matters)
-    _HTTP2 = True
-except ImportError:
-    _HTTP2 = False
-    logger.warning("h2 package missing – using HTTP/1.1 for Tradier polling")
-
-# ─────────────────────────────── SWR balance cache
-_balance: Dict[str, float] | None = None
-_last_fetch: float = 0.0
-_backoff:    float = POLL_BASE_SECS
 
 def get_open_position_count() -> int:
+    snap = get_account_state().current()
+    if snap is not None:
+        return snap.position_count
     try:
         positions = get_positions().get("positions", [])
         return len([p for p in positions if isinstance(p, dict)])
@@ -76,40 +53,19 @@ def safe_get_tradier_buying_power(retries: int = 2, delay: float = 0.5) -> float
             time.sleep(delay)
     return bp  # may still be 0
 
-async def _refresh_balance(client: httpx.AsyncClient):
-    """Fetch balances once, updating the shared SWR cache."""
-    global _balance, _last_fetch, _backoff
-    try:
-        r = await client.get(BAL_ENDPOINT, headers=HEADERS, timeout=_timeout)
-        r.raise_for_status()
-        _balance    = r.json().get("balances", {}) or {}
-        _last_fetch = time.time()
-
-        if _backoff > POLL_BASE_SECS:
-            logger.info("✅ Tradier recovered – polling cadence reset")
-        _backoff = POLL_BASE_SECS
-        logger.debug({"event": "balance_update",
-                      "cash": _balance.get("total_cash"),
-                      "equity": _balance.get("total_equity")})
-    except Exception as e:
-        logger.warning(f"🛑 Tradier balance fetch failed: {e}")
-        _backoff = min(_backoff * 2, POLL_MAX_SECS)
-
-
-async def poll_balance_loop():
-    """Fire-and-forget task launched once at startup."""
-    async with httpx.AsyncClient(http2=_HTTP2) as client:
-        await _refresh_balance(client)          # initial fetch
-        while True:
-            await asyncio.sleep(_backoff * random.uniform(0.8, 1.2))
-            await _refresh_balance(client)
-
 # ─────────────────────────────── cached look-ups
 def _val(field: str, default: float = 0.0) -> float:
-    if _balance is None:
+    state = get_account_state()
+    snap = state.current()
+    if snap is not None and snap.balances:
+        balance = snap.balances.raw
+    else:                                   # stale beats 0.0 for sizing / drawdown throttle
+        last = state.snapshot
+        balance = last.balances.raw if last is not None and last.balances else None
+    if balance is None:
         return default
     try:
-        return float(_balance.get(field, default))
+        return float(balance.get(field, default))
     except (TypeError, ValueError):
         return default
 
@@ -9,9 +9,10 @@ from typing import Dict, Tuple, Any
 import pandas as pd, numpy as np, joblib
 
 from analytics.regime_forecaster import forecast_market_regime
-from core.mesh_router import get_mesh_signal
-from polygon.polygon_rest import get_option_metrics, get_dealer_flow_metrics
-from polygon.polygon_websocket import SPY_LIVE_PRICE
+from core.archetype_matcher import ARCHETYPE_FEATURES, get_archetype_matcher
+from core.feature_graph import get_features
+from core.market_context import MarketContext, abuild_market_context
+from core.mesh_router import get_mesh_signal, aget_mesh_signal
 from core.logger_setup import get_logger
 from analytics.qthink_log_labeler import log_score_breakdown_async
 
@@ -22,6 +23,17 @@ REINFORCEMENT_PROFILE_PATH = os.getenv("REINFORCEMENT_PROFILE_PATH", "assistants
 MODEL_VERSION = "entry-model-v2.1"
 ENTRY_THRESHOLD = float(os.getenv("ENTRY_THRESHOLD", "0.55"))
 
+# entry-model ctx key → feature name in core.feature_graph
+ENTRY_FEATURES = {
+    "price": "price",
+    "volume": "option_volume",
+    "iv": "iv",
+    "delta": "delta",
+    "gamma": "gamma",
+    "skew": "skew",
+    "dealer_flow": "dealer_flow",
+}
+
 REGIME_THRESHOLDS = {
     "panic": 0.80,
     "bearish": 0.75,
@@ -41,9 +53,6 @@ def _load_model():
 
 model = _load_model()
 
-def _price() -> float:
-    return SPY_LIVE_PRICE.get("mid") or SPY_LIVE_PRICE.get("last_trade") or 0.0
-
 def _feature_frame(ctx: dict) -> pd.DataFrame:
     base = {
         "price": ctx.get("price", 0),
@@ -64,40 +73,28 @@ def _feature_frame(ctx: dict) -> pd.DataFrame:
         df = df.reindex(columns=model.feature_names_in_, fill_value=0)
     return df
 
-async def evaluate_entry(symbol: str = "SPY", default_threshold: float | None = None, want_meta: bool = False, force_trade: bool = False) -> bool | dict:
+async def evaluate_entry(symbol: str = "SPY", default_threshold: float | None = None, want_meta: bool = False,
+                         force_trade: bool = False, market: MarketContext | None = None) -> bool | dict:
+    """`market` is the cycle's MarketContext; without one a context is built here."""
     threshold_base = default_threshold if default_threshold is not None else ENTRY_THRESHOLD
 
     try:
-        ctx = {
-            "symbol": symbol,
-            "price": _price(),
-            "volume": 0,
-            "iv": 0,
-            "delta": 0,
-            "gamma": 0,
-            "skew": 0,
-            "dealer_flow": 0,
-        }
-
-        opt = await asyncio.to_thread(get_option_metrics, symbol)
-        if isinstance(opt, list):
-            opt = next((o for o in opt if isinstance(o, dict) and "delta" in o), {})
-
-        if not isinstance(opt, dict) or not opt.get("delta"):
-            raise ValueError(f"Malformed or missing option data for {symbol}: {repr(opt)}")
-
-        dealer = await asyncio.to_thread(get_dealer_flow_metrics, symbol) or {}
-
-        ctx.update({
-            "volume": opt.get("volume", 0),
-            "iv": opt.get("iv", 0),
-            "delta": opt.get("delta", 0),
-            "gamma": opt.get("gamma", 0),
-            "skew": opt.get("skew", 0),
-            "dealer_flow": dealer.get("score", 0),
-        })
-
-        score, rationale, regime, mesh = await asyncio.to_thread(score_entry, ctx)
+        market = market if market is not None else await abuild_market_context(symbol)
+        features = get_features(market)
+        await features.resolve((*ENTRY_FEATURES.values(), *ARCHETYPE_FEATURES))
+        ctx = {"symbol": symbol, **{key: features.get(name) for key, name in ENTRY_FEATURES.items()}}
+
+        if not ctx.get("delta"):
+            raise ValueError(f"Malformed or missing option data for {symbol}: {repr(ctx)}")
+
+        mesh = await aget_mesh_signal(ctx, market=market)
+        archetypes = get_archetype_matcher().match(features.many(ARCHETYPE_FEATURES),
+                                                   mesh.get("mesh_votes", {}), market.ts)
+        score, rationale, regime, mesh = await asyncio.to_thread(score_entry, ctx, mesh)
+        best = archetypes[0] if archetypes else None
+        if best is not None and best.matched:
+            score = round(min(1.0, score + best.boost), 4)
+            rationale = f"{rationale} + archetype {best.name} (+{best.boost})"
 
         threshold = REGIME_THRESHOLDS.get(regime, threshold_base)
         decision = force_trade or score >= threshold
@@ -106,7 +103,8 @@ async def evaluate_entry(symbol: str = "SPY", default_threshold: float | None =
             "event": "entry_accepted" if decision else "entry_rejected",
             "score": round(score, 3),
             "threshold": threshold,
-            "regime": regime
+            "regime": regime,
+            "archetype": best.name if best is not None and best.matched else None
         })
 
         result = {
@@ -119,6 +117,7 @@ async def evaluate_entry(symbol: str = "SPY", default_threshold: float | None =
             "gpt_confidence": round(score, 3),
             "gpt_reasoning": rationale,
             "greeks": ctx,
+            "archetype": best.as_dict() if best is not None else None,
         }
 
         return result if want_meta else decision
@@ -128,8 +127,8 @@ async def evaluate_entry(symbol: str = "SPY", default_threshold: float | None =
         print(f"[evaluate_entry] error → {e}")
         return False if not want_meta else {"error": str(e), "passes": False}
 
-def score_entry(ctx: dict) -> Tuple[float, str, str, dict]:
-    mesh = get_mesh_signal(ctx)
+def score_entry(ctx: dict, mesh: dict | None = None) -> Tuple[float, str, str, dict]:
+    mesh = mesh if mesh is not None else get_mesh_signal(ctx)
     if mesh.get("score", 0) >= 99:
         return 0.90, "mesh_override", forecast_market_regime(ctx), mesh
 
@@ -0,0 +1,363 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: core/feature_graph.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Declarative feature registry and a memoized per-tick evaluator.
+
+Each feature declares its inputs (`deps`), whether it does blocking I/O and
+how long a value stays fresh (`ttl`). The per-cycle `MarketContext` is the
+root input, called "market". Agents and models ask for features by name:
+
+    f = get_features(ctx)                    # same graph for the whole cycle
+    f.get("vwap_diff"), f.many(("gex", "skew", "time_of_day_bin"))
+
+* Every feature is computed at most once per tick. Concurrent requests from
+  mesh threads for the same node wait on the first computation instead of
+  repeating it.
+* `await f.resolve(names)` walks the dependency graph level by level. I/O
+  nodes on the same level run concurrently in worker threads.
+* A feature with `ttl > 0` carries its value across ticks until it ages out
+  (e.g. the GEX snapshot file). A failed computation yields the feature's
+  `default` for that tick and is never carried.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+import pytz
+
+from analytics.indicator_engine import VOLUME_WINDOW
+from core.logger_setup import get_logger
+from core.market_context import MarketContext, build_market_context
+from polygon.bar_store import FIELDS as BAR_FIELDS, get_bar_store
+from polygon.chain_snapshot import get_chain_snapshot
+from polygon.open_interest import get_open_interest
+from polygon.polygon_utils import get_gex_score
+
+logger = get_logger(__name__)
+
+ROOT = "market"
+OI_CLUSTER_RANGE = 5.0          # dollars above spot searched by `oi_above`
+_eastern = pytz.timezone("US/Eastern")
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True, slots=True)
+class Feature:
+    name:    str
+    fn:      Callable[..., Any]        # called with the dep values, in `deps` order
+    deps:    Tuple[str, ...] = (ROOT,)
+    io:      bool = False              # blocking I/O → worker thread, concurrent with other I/O
+    ttl:     float = 0.0               # seconds a value may be reused across ticks
+    default: Any = 0.0
+
+
+class FeatureRegistry:
+    def __init__(self):
+        self._features: Dict[str, Feature] = {}
+
+    def register(self, feature: Feature) -> Feature:
+        for dep in feature.deps:
+            if dep != ROOT and dep not in self._features:
+                raise ValueError(f"feature {feature.name!r} depends on unknown {dep!r}")
+        self._features[feature.name] = feature
+        return feature
+
+    def feature(self, name: str, *deps: str, io: bool = False, ttl: float = 0.0,
+                default: Any = 0.0) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Decorator form: `@REGISTRY.feature("vwap_diff", "price", "vwap")`."""
+        def _wrap(fn):
+            self.register(Feature(name, fn, tuple(deps) or (ROOT,), io, ttl, default))
+            return fn
+        return _wrap
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._features
+
+    def __getitem__(self, name: str) -> Feature:
+        try:
+            return self._features[name]
+        except KeyError:
+            raise KeyError(f"unknown feature {name!r}") from None
+
+    def names(self) -> List[str]:
+        return list(self._features)
+
+    def levels(self, names: Iterable[str]) -> List[List[str]]:
+        """Dependency closure of *names*, grouped so each level only needs earlier ones."""
+        depth: Dict[str, int] = {}
+
+        def _depth(name: str) -> int:
+            if name not in depth:
+                feat = self[name]
+                depth[name] = 1 + max((_depth(d) for d in feat.deps if d != ROOT), default=-1)
+            return depth[name]
+
+        for name in names:
+            _depth(name)
+        out: List[List[str]] = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+        for name, d in depth.items():
+            out[d].append(name)
+        return out
+
+
+REGISTRY = FeatureRegistry()
+
+# ---------------------------------------------------------------------------
+# Per-tick evaluator
+# ---------------------------------------------------------------------------
+class FeatureGraph:
+    """Feature values for one MarketContext; thread-safe, every node computed once."""
+
+    def __init__(self, market: MarketContext, registry: FeatureRegistry = REGISTRY,
+                 carry: Dict[str, Tuple[float, Any]] | None = None):
+        self.market = market
+        self.registry = registry
+        self._carry = carry if carry is not None else {}
+        self._nodes: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"computed": 0, "hits": 0, "carried": 0, "failed": 0}
+
+    def get(self, name: str) -> Any:
+        if name == ROOT:
+            return self.market
+        feat = self.registry[name]
+        with self._lock:
+            node = self._nodes.get(name)
+            owner = node is None
+            if owner:
+                node = self._nodes[name] = Future()
+            else:
+                self._stats["hits"] += 1
+        if owner:
+            node.set_result(self._compute(feat))
+        return node.result()
+
+    def many(self, names: Iterable[str]) -> Dict[str, Any]:
+        return {name: self.get(name) for name in names}
+
+    async def resolve(self, names: Iterable[str]) -> Dict[str, Any]:
+        """Evaluate *names* and their dependencies; independent I/O nodes run concurrently."""
+        names = list(names)
+        for level in self.registry.levels(names):
+            io = [n for n in level if self.registry[n].io and n not in self._nodes]
+            await asyncio.gather(*(asyncio.to_thread(self.get, n) for n in io))
+            for name in level:
+                self.get(name)
+        return self.many(names)
+
+    def _compute(self, feat: Feature) -> Any:
+        now = time.time()
+        if feat.ttl > 0:
+            cached = self._carry.get(feat.name)
+            if cached is not None and now - cached[0] < feat.ttl:
+                self._stats["carried"] += 1
+                return cached[1]
+        try:
+            value = feat.fn(*(self.get(d) for d in feat.deps))
+        except Exception as e:
+            self._stats["failed"] += 1
+            logger.warning({"event": "feature_fail", "feature": feat.name, "cycle": self.market.cycle,
+                            "err": str(e)})
+            return feat.default
+        self._stats["computed"] += 1
+        if feat.ttl > 0:
+            self._carry[feat.name] = (now, value)
+        return value
+
+    def stats(self) -> dict:
+        return {"cycle": self.market.cycle, **self._stats}
+
+
+class FeatureEngine:
+    """Hands out one FeatureGraph per MarketContext cycle and keeps the ttl carry between them."""
+
+    def __init__(self, registry: FeatureRegistry = REGISTRY):
+        self.registry = registry
+        self._carry: Dict[str, Tuple[float, Any]] = {}
+        self._graph: FeatureGraph | None = None
+        self._lock = threading.Lock()
+
+    def for_market(self, market: MarketContext) -> FeatureGraph:
+        with self._lock:
+            graph = self._graph
+            if graph is None or graph.market is not market:
+                if graph is not None:
+                    logger.debug({"event": "feature_tick", **graph.stats()})
+                graph = self._graph = FeatureGraph(market, self.registry, self._carry)
+            return graph
+
+
+_ENGINE = FeatureEngine()
+
+
+def get_features(market: MarketContext | None = None) -> FeatureGraph:
+    """The current tick's graph; without a context one is built (legacy callers, scripts)."""
+    return _ENGINE.for_market(market if market is not None else build_market_context("SPY"))
+
+# ---------------------------------------------------------------------------
+# Features
+# ---------------------------------------------------------------------------
+feature = REGISTRY.feature
+
+
+@feature("price")
+def _price(m: MarketContext) -> float:
+    return m.price
+
+
+@feature("spy_price", "price")
+def _spy_price(price: float) -> float:
+    return price
+
+
+@feature("vwap")
+def _vwap(m: MarketContext) -> float:
+    return m.vwap
+
+
+@feature("vwap_diff", "price", "vwap")
+def _vwap_diff(price: float, vwap: float) -> float:
+    """Dollars above (+) / below (−) session VWAP."""
+    return round(price - vwap, 4) if price and vwap else 0.0
+
+
+@feature("vwap_spread", "price", "vwap")
+def _vwap_spread(price: float, vwap: float) -> float:
+    """VWAP distance as a fraction of VWAP."""
+    return (price - vwap) / vwap if price and vwap else 0.0
+
+
+@feature("intraday_return")
+def _intraday_return(m: MarketContext) -> float:
+    """Return vs the previous session close (fraction)."""
+    return float(m.returns) if isinstance(m.returns, (int, float)) else 0.0
+
+
+@feature("volume")
+def _volume(m: MarketContext) -> int:
+    return m.volume
+
+
+@feature("vix", default=18.0)
+def _vix(m: MarketContext) -> float:
+    return m.vix
+
+
+@feature("rsi", default=None)
+def _rsi(m: MarketContext) -> float | None:
+    return m.rsi
+
+
+@feature("dealer_flow")
+def _dealer_flow(m: MarketContext) -> float:
+    return m.dealer_flow.get("score", 0)
+
+
+@feature("iv")
+def _iv(m: MarketContext) -> float:
+    return m.option_metrics.get("iv", 0)
+
+
+@feature("delta")
+def _delta(m: MarketContext) -> float:
+    return m.option_metrics.get("delta", 0)
+
+
+@feature("gamma")
+def _gamma(m: MarketContext) -> float:
+    return m.option_metrics.get("gamma", 0)
+
+
+@feature("option_volume")
+def _option_volume(m: MarketContext) -> float:
+    return m.option_metrics.get("volume", 0)
+
+
+@feature("time_of_day_bin", default=0)
+def _time_of_day_bin(m: MarketContext) -> int:
+    """30-minute bucket since the 09:30 ET open (0 … 12)."""
+    et = datetime.fromtimestamp(m.ts, pytz.utc).astimezone(_eastern)
+    return int(min(max((et.hour * 60 + et.minute - 570) // 30, 0), 12))
+
+
+@feature("chain", io=True, default=None)
+def _chain(m: MarketContext):
+    return get_chain_snapshot(m.symbol)
+
+
+@feature("skew", "chain", "price", default=1.05)
+def _skew(chain, price: float) -> float:
+    """OTM put / call IV ratio, three strikes either side of spot."""
+    skew = chain.frame.skew(spot=chain.underlying_price or price, n=3) if chain else None
+    return round(skew, 4) if skew else 1.05
+
+
+@feature("dex", "chain", "price")
+def _dex(chain, price: float) -> float:
+    """Dealer delta exposure: Σ delta × OI × 100 × spot over contracts with both."""
+    if not chain:
+        return 0.0
+    frame = chain.frame
+    oi = frame.oi
+    table = get_open_interest().current()
+    if table is not None:
+        cached = table.for_frame(frame)
+        oi = np.where(np.isfinite(cached), cached, oi)
+    ok = np.isfinite(frame.delta) & np.isfinite(oi)
+    return float(np.sum(frame.delta[ok] * oi[ok]) * 100 * (chain.underlying_price or price))
+
+
+@feature("max_pain", default=None)
+def _max_pain(m: MarketContext) -> float | None:
+    """Max-pain strike of the nearest cached expiry."""
+    table = get_open_interest().current()
+    return table.max_pain() if table is not None else None
+
+
+@feature("volume_ratio", "market", "volume", default=1.0)
+def _volume_ratio(m: MarketContext, volume: float) -> float:
+    """Rolling volume vs the session's average for the same window length."""
+    bars = get_bar_store().array(m.symbol)
+    avg = float(bars[:, BAR_FIELDS.index("v")].mean()) * VOLUME_WINDOW if len(bars) else 0.0
+    return volume / avg if volume and avg else 1.0
+
+
+@feature("oi_above", "price", default=0.0)
+def _oi_above(price: float) -> float:
+    """Largest call + put OI listed within OI_CLUSTER_RANGE dollars above spot."""
+    table = get_open_interest().current()
+    if table is None or not price:
+        return 0.0
+    rows = table.total
+    m = (rows.strikes > price) & (rows.strikes <= price + OI_CLUSTER_RANGE)
+    return float((rows.call_oi[m] + rows.put_oi[m]).max()) if m.any() else 0.0
+
+
+@feature("flow_divergence", "vwap_diff", "intraday_return", default=0.0)
+def _flow_divergence(vwap_diff: float, intraday_return: float) -> float:
+    """1.0 when price vs VWAP and the day's return point opposite ways."""
+    return 1.0 if vwap_diff * intraday_return < 0 else 0.0
+
+
+@feature("gex", io=True, ttl=30.0)
+def _gex(m: MarketContext) -> float:
+    return get_gex_score(m.symbol)
+
+
+__all__ = [
+    "REGISTRY",
+    "Feature",
+    "FeatureEngine",
+    "FeatureGraph",
+    "FeatureRegistry",
+    "get_features",
+]
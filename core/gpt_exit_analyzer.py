@@ -2,13 +2,14 @@
 
 import os
 import asyncio
-import aiohttp
+from core.http_clients import get_client
 from datetime import datetime
 import json
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 GPT_MODEL = os.getenv("GPT_MODEL", "gpt-4")
 GPT_MODEL_VERSION = "gpt-exit-v1.0"
+OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
 DIALOG_LOG_PATH = "logs/qthink_dialogs.jsonl"
 
 HEADERS = {
@@ -46,22 +47,22 @@ Trade Context:
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post("https://api.openai.com/v1/chat/completions", headers=HEADERS, json=body) as resp:
-                data = await resp.json()
-                message = data["choices"][0]["message"]["content"]
+        # pooled client shared across calls (each call runs under its own asyncio.run loop)
+        resp = await asyncio.to_thread(get_client(OPENAI_CHAT_URL).post, OPENAI_CHAT_URL, headers=HEADERS, json=body)
+        data = resp.json()
+        message = data["choices"][0]["message"]["content"]
 
-                try:
-                    suggestion = json.loads(message)
-                except json.JSONDecodeError:
-                    suggestion = {
-                        "signal": "hold",
-                        "confidence": 0.5,
-                        "rationale": f"⚠️ Failed to parse GPT response: {message[:80]}..."
-                    }
+        try:
+            suggestion = json.loads(message)
+        except json.JSONDecodeError:
+            suggestion = {
+                "signal": "hold",
+                "confidence": 0.5,
+                "rationale": f"⚠️ Failed to parse GPT response: {message[:80]}..."
+            }
 
-                await log_exit_dialog(trade_id, prompt, message, suggestion)
-                return suggestion
+        await log_exit_dialog(trade_id, prompt, message, suggestion)
+        return suggestion
 
     except Exception as e:
         print(f"⚠️ GPT exit analyzer error: {e}")
@@ -0,0 +1,243 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: core/http_clients.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Process-wide registry of pooled, keep-alive HTTP clients – one per host.
+
+* `get_client(url)` returns a shared, thread-safe `httpx.Client` for the URL's
+  host. It suits sync callers, and coroutines that run under a throw-away
+  `asyncio.run()` loop (wrap the call in `asyncio.to_thread`).
+* `get_async_client(url)` returns an `httpx.AsyncClient` for the *running*
+  loop (one per host per loop, e.g. the main trading loop)
+* Per-host limits / timeouts in `HOST_PROFILES`; HTTP/2 when `h2` is
+  installed, HTTP/1.1 keep-alive otherwise
+* `warm_connections()` / `awarm_connections()` open TCP+TLS ahead of the
+  trading window, and `pool_stats()` reports requests, latency and open
+  connections per client.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Iterable, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from core.logger_setup import get_logger
+
+logger = get_logger(__name__)
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+try:
+    import h2                              # noqa: F401  (only presence matters)
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+    logger.warning("h2 package missing – pooled clients use HTTP/1.1 keep-alive")
+
+KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_SECS", "120"))
+
+# host → (timeout, limits)
+HOST_PROFILES: Dict[str, Tuple[httpx.Timeout, httpx.Limits]] = {
+    "api.polygon.io":      (httpx.Timeout(10.0, connect=3.0),
+                            httpx.Limits(max_connections=20, max_keepalive_connections=10,
+                                         keepalive_expiry=KEEPALIVE_EXPIRY)),
+    "api.tradier.com":     (httpx.Timeout(8.0, connect=3.0),
+                            httpx.Limits(max_connections=10, max_keepalive_connections=5,
+                                         keepalive_expiry=KEEPALIVE_EXPIRY)),
+    "sandbox.tradier.com": (httpx.Timeout(8.0, connect=3.0),
+                            httpx.Limits(max_connections=10, max_keepalive_connections=5,
+                                         keepalive_expiry=KEEPALIVE_EXPIRY)),
+    "api.openai.com":      (httpx.Timeout(30.0, connect=5.0),
+                            httpx.Limits(max_connections=8, max_keepalive_connections=4,
+                                         keepalive_expiry=KEEPALIVE_EXPIRY)),
+}
+DEFAULT_PROFILE = (httpx.Timeout(10.0, connect=5.0),
+                   httpx.Limits(max_connections=10, max_keepalive_connections=5,
+                                keepalive_expiry=KEEPALIVE_EXPIRY))
+
+# hosts warmed before the trading window
+WARM_URLS = (
+    "https://api.polygon.io/",
+    os.getenv("TRADIER_API_BASE", "https://sandbox.tradier.com/v1"),
+    "https://api.openai.com/",
+)
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+def _origin(url: str) -> Tuple[str, str]:
+    """('https://api.polygon.io/v2/…') → ('https://api.polygon.io', 'api.polygon.io')."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}", parts.hostname or parts.netloc
+
+
+class _Meter:
+    """Per-client counters fed by httpx event hooks."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def on_request(self, request: httpx.Request) -> None:
+        request.extensions["q_t0"] = time.perf_counter()
+        self.requests += 1
+
+    def on_response(self, response: httpx.Response) -> None:
+        t0 = response.request.extensions.get("q_t0")
+        if t0 is not None:
+            ms = (time.perf_counter() - t0) * 1000     # time to response headers
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+        if response.status_code >= 500:
+            self.errors += 1
+
+    async def aon_request(self, request: httpx.Request) -> None:
+        self.on_request(request)
+
+    async def aon_response(self, response: httpx.Response) -> None:
+        self.on_response(response)
+
+    def as_dict(self) -> dict:
+        return {"requests": self.requests, "server_errors": self.errors,
+                "avg_ms": round(self.total_ms / self.requests, 1) if self.requests else None,
+                "max_ms": round(self.max_ms, 1)}
+
+
+def _connections(client) -> dict:
+    """Open / idle connection counts from the httpcore pool (best effort)."""
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    conns = list(getattr(pool, "connections", []) or [])
+    return {"open": len(conns), "idle": sum(1 for c in conns if c.is_idle())}
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+_lock = threading.Lock()
+_clients: Dict[str, httpx.Client] = {}
+_async_clients: Dict[Tuple[str, int], Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+_meters: Dict[str, _Meter] = {}
+
+
+def _meter(origin: str) -> _Meter:
+    return _meters.setdefault(origin, _Meter())
+
+
+def get_client(url: str) -> httpx.Client:
+    """Shared sync client for *url*'s host (thread-safe, keep-alive pooled)."""
+    origin, host = _origin(url)
+    client = _clients.get(origin)
+    if client is not None:
+        return client
+    with _lock:
+        client = _clients.get(origin)
+        if client is None:
+            timeout, limits = HOST_PROFILES.get(host, DEFAULT_PROFILE)
+            meter = _meter(origin)
+            client = _clients[origin] = httpx.Client(
+                http2=HTTP2, timeout=timeout, limits=limits,
+                event_hooks={"request": [meter.on_request], "response": [meter.on_response]},
+            )
+            logger.debug({"event": "http_client_created", "origin": origin, "http2": HTTP2})
+    return client
+
+
+def get_async_client(url: str) -> httpx.AsyncClient:
+    """Shared async client for *url*'s host on the running loop."""
+    loop = asyncio.get_running_loop()
+    origin, host = _origin(url)
+    key = (origin, id(loop))
+    entry = _async_clients.get(key)
+    if entry is not None and entry[0] is loop:
+        return entry[1]
+    with _lock:
+        for k, (lp, _) in list(_async_clients.items()):
+            if lp.is_closed():                  # loop gone – its client is unusable
+                _async_clients.pop(k, None)
+        timeout, limits = HOST_PROFILES.get(host, DEFAULT_PROFILE)
+        meter = _meter(origin)
+        client = httpx.AsyncClient(
+            http2=HTTP2, timeout=timeout, limits=limits,
+            event_hooks={"request": [meter.aon_request], "response": [meter.aon_response]},
+        )
+        _async_clients[key] = (loop, client)
+    return client
+
+# ---------------------------------------------------------------------------
+# Warm-up / introspection / shutdown
+# ---------------------------------------------------------------------------
+def warm_connections(urls: Iterable[str] = WARM_URLS) -> Dict[str, float | None]:
+    """Open a pooled connection to each host (HEAD /). Returns ms per origin, None on failure."""
+    out: Dict[str, float | None] = {}
+    for url in filter(None, urls):
+        origin, _ = _origin(url)
+        t0 = time.perf_counter()
+        try:
+            get_client(url).head(origin + "/")
+            out[origin] = round((time.perf_counter() - t0) * 1000, 1)
+        except Exception as e:
+            out[origin] = None
+            logger.warning({"event": "http_warm_fail", "origin": origin, "err": str(e)})
+    logger.info({"event": "http_warmed", "ms": out})
+    return out
+
+
+async def awarm_connections(urls: Iterable[str] = WARM_URLS) -> Dict[str, float | None]:
+    """Async twin of `warm_connections` for the running loop's clients."""
+    async def _one(url: str):
+        origin, _ = _origin(url)
+        t0 = time.perf_counter()
+        try:
+            await get_async_client(url).head(origin + "/")
+            return origin, round((time.perf_counter() - t0) * 1000, 1)
+        except Exception as e:
+            logger.warning({"event": "http_warm_fail", "origin": origin, "err": str(e)})
+            return origin, None
+    return dict(await asyncio.gather(*(_one(u) for u in filter(None, urls))))
+
+
+def pool_stats() -> Dict[str, dict]:
+    stats: Dict[str, dict] = {}
+    for origin, client in list(_clients.items()):
+        stats[origin] = {"sync": _connections(client)}
+    for (origin, _), (loop, client) in list(_async_clients.items()):
+        if not loop.is_closed():
+            stats.setdefault(origin, {})["async"] = _connections(client)
+    for origin, meter in list(_meters.items()):
+        stats.setdefault(origin, {}).update(meter.as_dict())
+    return stats
+
+
+def close_all() -> None:
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+async def aclose_all() -> None:
+    """Close the running loop's async clients."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        mine = [(k, c) for k, (lp, c) in _async_clients.items() if lp is loop]
+        for k, _ in mine:
+            _async_clients.pop(k, None)
+    await asyncio.gather(*(c.aclose() for _, c in mine), return_exceptions=True)
+
+
+__all__ = [
+    "get_client",
+    "get_async_client",
+    "warm_connections",
+    "awarm_connections",
+    "pool_stats",
+    "close_all",
+    "aclose_all",
+]
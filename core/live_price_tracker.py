@@ -5,134 +5,82 @@
 Real-time option snapshot & price utilities for Q-ALGO hedge-fund stack.
 
 * Resilient JSON parsing (handles Polygon’s occasional numeric top-level)
-* Async-first API with single-flight cache (one HTTP hit per symbol/15 s)
+* Async-first API backed by the shared single-flight chain snapshot service
+* Streaming first: underlying price from the market data hub, ATM contract
+  from the 0-DTE subscription window, bid/ask/mark from its NBBO book –
+  the chain snapshot only supplies slow-moving greeks / IV / volume
 * Sync wrappers keep legacy code working
 * Always returns a dict with keys:
-      price, iv, volume, skew, delta, gamma
+      price, iv, volume, skew, delta, gamma   (+ bid, ask, mark when streamed)
 """
 from __future__ import annotations
 
 import asyncio
 import math
 import os
-import time
-from pathlib import Path
-from typing import Dict, Tuple, Any, List
-
-import httpx
+import re
+from typing import Dict
 
 from core.logger_setup import get_logger
+from polygon.chain_snapshot import aget_chain_snapshot
+from polygon.market_data_hub import get_market_data_hub
+from polygon.option_subscriptions import get_option_subscriptions, today_expiry
 
 logger = get_logger(__name__)
 
-# ---------------------------------------------------------------------------
-# Config
-# ---------------------------------------------------------------------------
-POLYGON_API_KEY  = os.getenv("POLYGON_API_KEY", "")
-POLYGON_BASE_URL = "https://api.polygon.io/v3/snapshot/options"
-CACHE_TTL        = 15  # seconds
-
-# ---------------------------------------------------------------------------
-# In-memory cache with in-flight single-flight control
-# ---------------------------------------------------------------------------
-class _SnapshotCache:
-    def __init__(self):
-        self._data : Dict[str, Tuple[float, dict]] = {}
-        self._locks: Dict[str, asyncio.Lock]        = {}
-
-    def fresh(self, sym: str) -> bool:
-        ts, _ = self._data.get(sym, (0, {}))
-        return (time.time() - ts) < CACHE_TTL
-
-    def get(self, sym: str) -> dict | None:
-        if self.fresh(sym):
-            return self._data[sym][1]
-        return None
-
-    def set(self, sym: str, payload: dict):
-        self._data[sym] = (time.time(), payload)
-
-    def lock(self, sym: str) -> asyncio.Lock:
-        self._locks.setdefault(sym, asyncio.Lock())
-        return self._locks[sym]
-
-_CACHE = _SnapshotCache()
-
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
-def _safe_get(d: Any, *keys, default=0.0):
-    """Navigate nested dicts defensively; return *default* on any error."""
-    try:
-        for k in keys:
-            d = d[k]
-        return float(d) if d is not None else default
-    except Exception:
-        return default
+_OCC_RE = re.compile(r"^(?:O:)?([A-Z]{1,6})\d{6}[CP]\d{8}$")
 
-async def _fetch_snapshot(symbol: str) -> dict:
-    url = f"{POLYGON_BASE_URL}/{symbol}?apiKey={POLYGON_API_KEY}"
-    async with httpx.AsyncClient(timeout=8.0) as cli:
-        r = await cli.get(url)
-        r.raise_for_status()
-        return r.json()
+# Greeks/IV move slowly; while the stream is live a snapshot this old is fine
+GREEKS_MAX_AGE = float(os.getenv("OPTION_GREEKS_MAX_AGE", "60"))   # seconds
 
-async def _retrieve(symbol: str) -> dict:
-    # single-flight per symbol
-    async with _CACHE.lock(symbol):
-        cached = _CACHE.get(symbol)
-        if cached is not None:
-            return cached
-        try:
-            payload = await _fetch_snapshot(symbol)
-            _CACHE.set(symbol, payload)
-            logger.debug({"event": "polygon_snapshot", "symbol": symbol})
-            return payload
-        except Exception as e:
-            logger.error({"event": "polygon_snapshot_fail", "err": str(e)})
-            return {}
+def _f(v) -> float:
+    v = float(v)
+    return v if math.isfinite(v) else 0.0
 
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
 async def get_option_metrics(symbol: str = "SPY") -> Dict[str, float]:
     """
-    Return ATM 0-DTE option metrics.
+    Return ATM 0-DTE option metrics (or the metrics of *symbol* itself when it
+    is an OCC contract of the chain).
     Keys: price, iv, volume, skew, delta, gamma
     """
-    snap = await _retrieve(symbol)
-
-    underlying_price = _safe_get(snap, "results", "underlying_asset", "last", "price")
-
-    options_list: List[dict] = (
-        snap.get("results", {}).get("options", [])
-        if isinstance(snap.get("results", {}).get("options", []), list)
-        else []
-    )
-
-    if not options_list:
+    occ = _OCC_RE.match(symbol)
+    underlying = occ.group(1) if occ else symbol
+    hub, subs = get_market_data_hub(), get_option_subscriptions()
+    spot = hub.price(underlying) if hub.age(underlying) < GREEKS_MAX_AGE else 0.0
+
+    contract = symbol if occ else (subs.atm_contract("C", spot) if spot else None)
+    snap = await aget_chain_snapshot(underlying, max_age=GREEKS_MAX_AGE if spot else None)
+    frame = snap.frame
+    underlying_price = spot or snap.underlying_price
+
+    idx = frame.index_of(contract) if contract else None
+    if idx is None and not occ:
+        idx = frame.atm_index(today_expiry())
+        if idx is None:
+            idx = frame.atm_index()
+
+    if idx is None:
         return dict(price=underlying_price, iv=0, volume=0, skew=0, delta=0, gamma=0)
 
-    today = time.strftime("%Y-%m-%d")
-
-    def _score(opt: dict) -> float:
-        try:
-            delta_score = abs(abs(opt["delta"]) - 0.5)
-            exp_penalty = 0 if opt["details"]["expiration_date"] == today else 10
-            return delta_score + exp_penalty
-        except Exception:
-            return math.inf
-
-    best = min(options_list, key=_score)
-
-    return {
+    metrics = {
         "price":  underlying_price,
-        "iv":     _safe_get(best, "iv"),
-        "volume": _safe_get(best, "volume"),
-        "skew":   _safe_get(best, "skew"),
-        "delta":  _safe_get(best, "delta"),
-        "gamma":  _safe_get(best, "gamma"),
+        "iv":     _f(frame.iv[idx]),
+        "volume": _f(frame.volume[idx]),
+        "skew":   frame.skew(spot=underlying_price, expiry=int(frame.expiry[idx])) or 0.0,
+        "delta":  _f(frame.delta[idx]),
+        "gamma":  _f(frame.gamma[idx]),
     }
+    book = subs.book(contract or frame.ticker[idx])
+    mark = subs.mark(contract or frame.ticker[idx])
+    if book is not None and mark:
+        metrics.update(bid=book.bid, ask=book.ask, mark=mark)
+    return metrics
 
 # Legacy sync shim (will be removed once callers migrate)
 def get_option_metrics_sync(symbol: str = "SPY") -> Dict[str, float]:
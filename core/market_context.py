@@ -0,0 +1,169 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: core/market_context.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Per-cycle immutable market snapshot shared by entry, exit and the mesh agents.
+
+`abuild_market_context()` runs once per loop iteration:
+
+* In-memory reads are taken together: hub price/NBBO, the incremental
+  indicator snapshot (RSI, VWAP, returns, volume) and the VIX watchlist.
+* The two REST reads (`get_option_metrics`, `get_dealer_flow_metrics`) run
+  concurrently with them in worker threads.
+
+The resulting frozen `MarketContext` is handed explicitly to
+`_entry_cycle` → `evaluate_entry` → the mesh executor (every agent takes
+`ctx=`) and to `manage_positions_async`. One decision then sees one
+consistent set of inputs, fetched once. Mapping fields are read-only
+proxies. Callers without a context (scripts, legacy sync paths) fetch for
+themselves as before.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from analytics.indicator_engine import IndicatorSnapshot, get_indicator_snapshot
+from analytics.technical_indicators import get_rsi, is_vwap_reclaim
+from core.logger_setup import get_logger
+from polygon.market_data_hub import get_market_data_hub
+from polygon.polygon_rest import get_dealer_flow_metrics, get_last_price, get_option_metrics
+from polygon.polygon_utils import get_intraday_returns, get_recent_volume, get_vwap
+
+logger = get_logger(__name__)
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+VIX_DATA_PATH = "data/vix_watchlist.json"
+DEFAULT_VIX   = 18.0
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+_CYCLES = itertools.count(1)
+
+# ---------------------------------------------------------------------------
+# Snapshot
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True, slots=True)
+class MarketContext:
+    cycle:          int
+    ts:             float
+    symbol:         str
+    price:          float
+    bid:            float = 0.0
+    ask:            float = 0.0
+    vwap:           float = 0.0
+    rsi:            float | None = None
+    vwap_reclaim:   bool = False
+    returns:        Any = None                # polygon_utils.get_intraday_returns(symbol)
+    volume:         int = 0                   # rolling underlying volume
+    vix:            float = DEFAULT_VIX
+    indicators:     IndicatorSnapshot | None = None
+    option_metrics: Mapping[str, Any] = field(default_factory=lambda: _EMPTY)
+    dealer_flow:    Mapping[str, Any] = field(default_factory=lambda: _EMPTY)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.ts
+
+    @property
+    def vwap_diff(self) -> float:
+        return round(self.price - self.vwap, 4) if self.price and self.vwap else 0.0
+
+    def entry_fields(self) -> dict:
+        """The ctx dict evaluate_entry / the entry model consume."""
+        opt = self.option_metrics
+        return {
+            "symbol": self.symbol,
+            "price": self.price,
+            "volume": opt.get("volume", 0),
+            "iv": opt.get("iv", 0),
+            "delta": opt.get("delta", 0),
+            "gamma": opt.get("gamma", 0),
+            "skew": opt.get("skew", 0),
+            "dealer_flow": self.dealer_flow.get("score", 0),
+        }
+
+    def as_dict(self) -> dict:
+        return {"cycle": self.cycle, "ts": self.ts, "symbol": self.symbol, "price": self.price,
+                "bid": self.bid, "ask": self.ask, "vwap": self.vwap, "rsi": self.rsi,
+                "vwap_reclaim": self.vwap_reclaim, "returns": self.returns, "volume": self.volume,
+                "vix": self.vix, "option_metrics": dict(self.option_metrics),
+                "dealer_flow": dict(self.dealer_flow)}
+
+# ---------------------------------------------------------------------------
+# Builders
+# ---------------------------------------------------------------------------
+def _vix() -> float:
+    try:
+        with open(VIX_DATA_PATH) as fh:
+            return float(json.load(fh).get("latest_vix", DEFAULT_VIX))
+    except (OSError, ValueError, TypeError):
+        return DEFAULT_VIX
+
+
+def _option_metrics(symbol: str) -> dict:
+    opt = get_option_metrics(symbol)
+    if isinstance(opt, list):                  # some feeds return one row per contract
+        opt = next((o for o in opt if isinstance(o, dict) and "delta" in o), {})
+    return opt if isinstance(opt, dict) else {}
+
+
+def _live_fields(symbol: str) -> dict:
+    hub = get_market_data_hub()
+    quote = hub.quote(symbol)
+    price = hub.price(symbol) or get_last_price(symbol)
+    return {
+        "price": float(price or 0.0),
+        "bid": quote.bid if quote else 0.0,
+        "ask": quote.ask if quote else 0.0,
+        "vwap": get_vwap(symbol),
+        "rsi": get_rsi(symbol),
+        "vwap_reclaim": bool(is_vwap_reclaim(symbol)),
+        "returns": get_intraday_returns(symbol),
+        "volume": get_recent_volume(symbol),
+        "vix": _vix(),
+        "indicators": get_indicator_snapshot(symbol),
+    }
+
+
+def _safe(fn, *args) -> dict:
+    try:
+        return fn(*args) or {}
+    except Exception as e:
+        logger.warning({"event": "market_context_input_fail", "input": fn.__name__, "err": str(e)})
+        return {}
+
+
+def _assemble(symbol: str, live: dict, opt: dict, dealer: dict) -> MarketContext:
+    ctx = MarketContext(cycle=next(_CYCLES), ts=time.time(), symbol=symbol, **live,
+                        option_metrics=MappingProxyType(dict(opt or {})),
+                        dealer_flow=MappingProxyType(dict(dealer or {})))
+    logger.debug({"event": "market_context", "cycle": ctx.cycle, "price": ctx.price,
+                  "vwap": ctx.vwap, "rsi": ctx.rsi, "vix": ctx.vix})
+    return ctx
+
+
+def build_market_context(symbol: str = "SPY") -> MarketContext:
+    return _assemble(symbol, _live_fields(symbol), _safe(_option_metrics, symbol),
+                     _safe(get_dealer_flow_metrics, symbol))
+
+
+async def abuild_market_context(symbol: str = "SPY") -> MarketContext:
+    """Live fields and the two REST inputs gathered concurrently off-loop (cold indicators hit REST)."""
+    live, opt, dealer = await asyncio.gather(asyncio.to_thread(_live_fields, symbol),
+                                             asyncio.to_thread(_safe, _option_metrics, symbol),
+                                             asyncio.to_thread(_safe, get_dealer_flow_metrics, symbol))
+    return _assemble(symbol, live, opt, dealer)
+
+
+__all__ = [
+    "MarketContext",
+    "abuild_market_context",
+    "build_market_context",
+]
@@ -0,0 +1,277 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: core/mesh_executor.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Concurrent mesh-agent executor with per-agent deadlines.
+
+The agents are blocking callables that each make 1-4 HTTP round trips. They
+all start at once on a dedicated thread pool, so mesh latency is the slowest
+agent (capped by its deadline) instead of the sum of every round trip.
+
+* Each agent has its own timeout (`MESH_AGENT_TIMEOUT`, overridable per
+  agent). A late agent comes back as `status="stale"` and nobody waits for
+  it; its thread finishes in the background.
+* An agent still running from a previous cycle is not resubmitted. It is
+  reported stale ("in_flight"), so one hung endpoint can't pile up threads.
+* Each `AgentResult` carries the agent's wall time and the age of its last
+  good signal. `MeshRun.timings` / `stats()` expose them.
+* `run()` is the asyncio form. `run_sync()` serves the legacy sync callers
+  that run inside `asyncio.to_thread`. Keyword arguments (e.g. the cycle's
+  `ctx=MarketContext`) are forwarded to every agent.
+* Per-agent cadence comes from `data/mesh_config.json` (`cadence_seconds`,
+  `max_staleness`). The executor caches each agent's last result and only
+  re-runs the agent once it is due. While a cached result is younger than
+  `max_staleness`, a due agent refreshes in the background and the cycle
+  reads the cached value (`status="cached"`) without waiting.
+* An agent that misses its deadline still lands in the cache when it
+  finishes. Later cycles in which it is late again serve that result
+  (`status="cached"`) while it is younger than `MESH_LATE_MAX_AGE` (or the
+  agent's `max_staleness`, if longer), so a consistently slow agent keeps
+  its vote instead of dropping out of every mesh run.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Literal, Tuple
+
+from core.logger_setup import get_logger
+
+logger = get_logger(__name__)
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+AGENT_TIMEOUT       = float(os.getenv("MESH_AGENT_TIMEOUT", "1.5"))   # seconds per agent
+MAX_WORKERS         = int(os.getenv("MESH_MAX_WORKERS", "16"))
+MESH_RUNTIME_CONFIG = os.getenv("MESH_RUNTIME_CONFIG", "data/mesh_config.json")
+LATE_MAX_AGE        = float(os.getenv("MESH_LATE_MAX_AGE", "30"))     # oldest late result served
+
+AgentStatus = Literal["ok", "cached", "stale", "error"]
+
+
+@dataclass(frozen=True, slots=True)
+class AgentPolicy:
+    cadence:       float = 0.0     # seconds between runs; 0 → every cycle
+    max_staleness: float = 0.0     # a cached result this young is served while the agent refreshes
+
+
+def load_agent_policies(path: str = MESH_RUNTIME_CONFIG) -> Dict[str, AgentPolicy]:
+    """`cadence_seconds` / `max_staleness` per agent from the mesh config (missing → every cycle)."""
+    try:
+        with open(path) as fh:
+            agents = json.load(fh).get("agents", {})
+    except (OSError, ValueError) as e:
+        logger.warning({"event": "mesh_policy_load_fail", "path": path, "err": str(e)})
+        return {}
+    return {name: AgentPolicy(float(cfg.get("cadence_seconds", 0) or 0),
+                              float(cfg.get("max_staleness", 0) or 0))
+            for name, cfg in agents.items() if isinstance(cfg, dict)}
+
+# ---------------------------------------------------------------------------
+# Results
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True, slots=True)
+class AgentResult:
+    agent:   str
+    status:  AgentStatus
+    signal:  dict | None          # None unless status == "ok"
+    elapsed: float                # seconds this cycle (the deadline for stale agents)
+    error:   str = ""
+    last_ok: float | None = None  # wall time of the agent's last good signal
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ("ok", "cached") and isinstance(self.signal, dict)
+
+
+@dataclass(frozen=True, slots=True)
+class MeshRun:
+    results:  Tuple[AgentResult, ...]
+    wall:     float                                   # seconds for the whole mesh
+    started:  float = field(default_factory=time.time)
+
+    @property
+    def signals(self) -> List[dict]:
+        return [r.signal for r in self.results if r.ok]
+
+    @property
+    def stale(self) -> List[str]:
+        return [r.agent for r in self.results if r.status == "stale"]
+
+    @property
+    def cached(self) -> List[str]:
+        return [r.agent for r in self.results if r.status == "cached"]
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        return {r.agent: round(r.elapsed, 4) for r in self.results}
+
+# ---------------------------------------------------------------------------
+# Executor
+# ---------------------------------------------------------------------------
+def _timed(fn: Callable[[], Any]) -> Tuple[Any, float]:
+    t0 = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - t0
+
+
+Job = Tuple[str, Future | None, float, Tuple[float, Any] | None]   # (agent, future, started, served)
+
+
+class MeshExecutor:
+    def __init__(self, agents: Iterable[Tuple[str, Callable[[], Any]]],
+                 timeout: float = AGENT_TIMEOUT, timeouts: Dict[str, float] | None = None,
+                 max_workers: int = MAX_WORKERS, policies: Dict[str, AgentPolicy] | None = None,
+                 late_max_age: float = LATE_MAX_AGE):
+        self.agents: List[Tuple[str, Callable[[], Any]]] = list(agents)
+        self.timeout = timeout
+        self.late_max_age = late_max_age
+        self.timeouts = dict(timeouts or {})
+        self.policies = dict(policies or {})
+        self._pool = ThreadPoolExecutor(max_workers=max(max_workers, len(self.agents)),
+                                        thread_name_prefix="mesh")
+        self._inflight: Dict[str, Tuple[Future, float]] = {}
+        self._last_ok: Dict[str, float] = {}
+        self._cache: Dict[str, Tuple[float, Any]] = {}    # agent → (wall time, last result)
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def timeout_for(self, agent: str) -> float:
+        return self.timeouts.get(agent, self.timeout)
+
+    def policy(self, agent: str) -> AgentPolicy:
+        return self.policies.get(agent) or AgentPolicy()
+
+    # ── submission ───────────────────────────────────────────────────────────
+    def _submit(self, kwargs: Dict[str, Any]) -> List[Job]:
+        """future is None when the agent isn't due or its previous call is still running;
+        served is the cached (ts, value) the cycle reads instead of waiting."""
+        jobs = []
+        now = time.time()
+        for name, fn in self.agents:
+            pol = self.policy(name)
+            hit = self._cache.get(name)
+            age = now - hit[0] if hit is not None else float("inf")
+            fresh = hit if age <= pol.max_staleness else None
+            started = time.perf_counter()
+            if hit is not None and age < pol.cadence:
+                jobs.append((name, None, started, hit))              # not due yet
+                continue
+            prev = self._inflight.get(name)
+            if prev is not None and not prev[0].done():
+                jobs.append((name, None, prev[1], fresh))
+                continue
+            fut = self._pool.submit(_timed, functools.partial(fn, **kwargs) if kwargs else fn)
+            fut.add_done_callback(lambda f, n=name: self._on_done(n, f))
+            self._inflight[name] = (fut, started)
+            jobs.append((name, fut, started, fresh))                 # fresh → refresh in background
+        return jobs
+
+    def _on_done(self, name: str, fut: Future) -> None:
+        if not fut.cancelled() and fut.exception() is None:
+            now = time.time()
+            self._last_ok[name] = now
+            self._cache[name] = (now, fut.result()[0])
+
+    def _result(self, name: str, fut: Future | None, started: float,
+                served: Tuple[float, Any] | None = None) -> AgentResult:
+        deadline = self.timeout_for(name)
+        if fut is not None and fut.done() and fut.exception() is None:
+            served = None                       # finished in time – report the live value
+        elif served is None and (fut is None or not fut.done()):
+            served = self._late(name)           # missed the deadline – last completed result, if recent
+        if served is not None:
+            value = served[1]
+            res = AgentResult(name, "cached", value if isinstance(value, dict) else None,
+                              time.perf_counter() - started, "", served[0])
+        elif fut is None:
+            res = AgentResult(name, "stale", None, time.perf_counter() - started, "in_flight",
+                              self._last_ok.get(name))
+        elif not fut.done():
+            res = AgentResult(name, "stale", None, deadline, "timeout", self._last_ok.get(name))
+        elif fut.exception() is not None:
+            err = fut.exception()
+            res = AgentResult(name, "error", None, time.perf_counter() - started,
+                              f"{type(err).__name__}: {err}", self._last_ok.get(name))
+        else:
+            value, elapsed = fut.result()
+            res = AgentResult(name, "ok", value if isinstance(value, dict) else None, elapsed,
+                              "" if isinstance(value, dict) else f"non-dict result {type(value).__name__}",
+                              self._last_ok.get(name))
+        self._record(res)
+        return res
+
+    def _late(self, name: str) -> Tuple[float, Any] | None:
+        hit = self._cache.get(name)
+        limit = max(self.policy(name).max_staleness, self.late_max_age)
+        return hit if hit is not None and time.time() - hit[0] <= limit else None
+
+    def _record(self, res: AgentResult) -> None:
+        s = self._stats.setdefault(res.agent, {"runs": 0, "ok": 0, "cached": 0, "stale": 0, "error": 0,
+                                               "ewma_ms": 0.0})
+        s["runs"] += 1
+        s[res.status] += 1
+        if res.status == "cached":
+            return
+        ms = res.elapsed * 1e3
+        s["ewma_ms"] = round(ms if s["runs"] == 1 else 0.8 * s["ewma_ms"] + 0.2 * ms, 2)
+        if res.status != "ok":
+            logger.warning({"event": "mesh_agent_" + res.status, "agent": res.agent,
+                            "elapsed": round(res.elapsed, 3), "err": res.error})
+
+    def _finish(self, results: List[AgentResult], t0: float) -> MeshRun:
+        run = MeshRun(tuple(results), time.perf_counter() - t0)
+        logger.debug({"event": "mesh_run", "wall": round(run.wall, 3), "stale": run.stale,
+                      "cached": run.cached, "timings": run.timings})
+        return run
+
+    # ── execution ────────────────────────────────────────────────────────────
+    async def run(self, **kwargs) -> MeshRun:
+        t0 = time.perf_counter()
+        jobs = self._submit(kwargs)
+
+        async def _settle(name: str, fut: Future | None, started: float, served) -> AgentResult:
+            if fut is not None and served is None:
+                remaining = self.timeout_for(name) - (time.perf_counter() - started)
+                try:
+                    await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(fut)), max(remaining, 0))
+                except (asyncio.TimeoutError, Exception):
+                    pass                        # classified from the future's state below
+            return self._result(name, fut, started, served)
+
+        results = await asyncio.gather(*(_settle(*job) for job in jobs))
+        return self._finish(list(results), t0)
+
+    def run_sync(self, **kwargs) -> MeshRun:
+        t0 = time.perf_counter()
+        jobs = self._submit(kwargs)
+        results = []
+        for name, fut, started, served in jobs:
+            if fut is not None and served is None:
+                remaining = self.timeout_for(name) - (time.perf_counter() - started)
+                try:
+                    fut.result(timeout=max(remaining, 0))
+                except (FutureTimeout, Exception):
+                    pass
+            results.append(self._result(name, fut, started, served))
+        return self._finish(results, t0)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {name: dict(s) for name, s in self._stats.items()}
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+__all__ = [
+    "AgentPolicy",
+    "AgentResult",
+    "MeshExecutor",
+    "MeshRun",
+    "load_agent_policies",
+]
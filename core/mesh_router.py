@@ -3,12 +3,17 @@
 
 import os
 import uuid
+import asyncio
 import json
 import random
+import time
 from datetime import datetime
 from typing import Dict, List
 
 from core.logger_setup import get_logger
+from core.market_context import MarketContext
+from core.mesh_executor import MeshExecutor, MeshRun, load_agent_policies
+from core.feature_graph import get_features
 
 from mesh.q_block import get_block_signal
 from mesh.q_quant import get_quant_signal
@@ -39,25 +44,28 @@ AGENTS = [
 
 SIGNAL_PATH = "logs/mesh_signals.jsonl"
 
+BRAIN_FEATURES = ("spy_price", "vix", "gex", "dex", "vwap_diff", "skew", "intraday_return", "time_of_day_bin")
+
+# every agent accepts the cycle's MarketContext as `ctx=` (None → fetch its own inputs)
 AGENT_CALLS = [
     get_block_signal,
     get_quant_signal,
     get_trap_signal,
-    lambda: {"agent": "q_shield", **get_shield_signal()},
+    lambda ctx=None: {"agent": "q_shield", **get_shield_signal(ctx=ctx)},
     get_shadow_signal,
     get_gamma_signal,
     sniper_entry_signal,
     get_scout_signal,
-    lambda: {"agent": "q_0dte_brain", **score_q_brain({
-        "spy_price": 443.12,
-        "vix": 15.2,
-        "gex": -800_000_000,
-        "dex": 900_000_000,
-        "vwap_diff": -0.08,
-        "skew": 1.11
-    })}
+    lambda ctx=None: {"agent": "q_0dte_brain", **score_q_brain(get_features(ctx).many(BRAIN_FEATURES))},
 ]
 
+# q_think synthesizes the others, so it has no entry in AGENT_CALLS.
+# cadence_seconds / max_staleness per agent come from data/mesh_config.json
+_EXECUTOR = MeshExecutor(zip(AGENTS, AGENT_CALLS), policies=load_agent_policies())
+
+def get_mesh_executor() -> MeshExecutor:
+    return _EXECUTOR
+
 def write_mesh_log(entry: dict):
     """
     Writes a mesh-related event or signal to persistent log.
@@ -86,23 +94,35 @@ def _log_signal(entry):
     with open(SIGNAL_PATH, "a") as f:
         f.write(json.dumps(entry) + "\n")
 
-def get_all_agent_signals() -> List[dict]:
-    """Calls each mesh agent to retrieve a directional signal."""
+def _accepted_signals(run: MeshRun) -> List[dict]:
     signals = []
-    for fn in AGENT_CALLS:
+    for res in run.results:
+        if not res.ok or res.signal.get("score", 0) < 0.4:
+            continue
+        result = dict(res.signal)               # cached results are reused across cycles
         try:
-            result = fn()
-            if result and isinstance(result, dict) and result.get("score", 0) >= 0.4:
-                sig_id = str(uuid.uuid4())
-                result["signal_id"] = sig_id
-                result["timestamp"] = result.get("timestamp") or datetime.utcnow().isoformat()
-                signals.append(result)
-                _log_signal(result)
-                logger.info({"event": "mesh_agent_signal", "agent": result["agent"], "score": result["score"], "direction": result["direction"]})
+            result["signal_id"] = str(uuid.uuid4())
+            result["timestamp"] = result.get("timestamp") or datetime.utcnow().isoformat()
+            result["latency_ms"] = round(res.elapsed * 1e3, 1)
+            if res.status == "cached":
+                result["cached_age"] = round(time.time() - res.last_ok, 1)
+            signals.append(result)
+            _log_signal(result)
+            logger.info({"event": "mesh_agent_signal", "agent": result.get("agent", res.agent), "score": result["score"], "direction": result.get("direction")})
         except Exception as e:
-            logger.warning({"event": "mesh_agent_fail", "agent": getattr(fn, "__name__", str(fn)), "err": str(e)})
+            logger.warning({"event": "mesh_agent_fail", "agent": res.agent, "err": str(e)})
     return signals
 
+def _agent_kwargs(market: MarketContext | None) -> dict:
+    return {"ctx": market} if market is not None else {}
+
+def get_all_agent_signals(market: MarketContext | None = None) -> List[dict]:
+    """Runs every mesh agent concurrently (per-agent deadline) and keeps the directional signals."""
+    return _accepted_signals(_EXECUTOR.run_sync(**_agent_kwargs(market)))
+
+async def aget_all_agent_signals(market: MarketContext | None = None) -> List[dict]:
+    return _accepted_signals(await _EXECUTOR.run(**_agent_kwargs(market)))
+
 def summarize_votes(signals: List[dict]) -> str:
     votes = []
     for s in signals:
@@ -118,12 +138,28 @@ def summarize_votes(signals: List[dict]) -> str:
     print(f"→ Final mesh_score: {final_score}\n")
     return final_score
 
-def get_mesh_signal(context: dict = None) -> dict:
+def _with_timings(mesh_result: dict, run: MeshRun) -> dict:
+    mesh_result["agent_timings"] = run.timings
+    mesh_result["stale_agents"] = run.stale
+    mesh_result["cached_agents"] = run.cached
+    mesh_result["mesh_latency"] = round(run.wall, 4)
+    return mesh_result
+
+def get_mesh_signal(context: dict = None, market: MarketContext | None = None) -> dict:
     """Wrapper to get signals and return GPT-synthesized mesh score."""
-    agent_signals = get_all_agent_signals()
+    run = _EXECUTOR.run_sync(**_agent_kwargs(market))
+    agent_signals = _accepted_signals(run)
     mesh_result = synthesize_mesh_signals(agent_signals)
     summarize_votes(agent_signals)
-    return mesh_result
+    return _with_timings(mesh_result, run)
+
+async def aget_mesh_signal(context: dict = None, market: MarketContext | None = None) -> dict:
+    """Async form: agents run concurrently on the mesh pool, the GPT synthesis in a worker thread."""
+    run = await _EXECUTOR.run(**_agent_kwargs(market))
+    agent_signals = _accepted_signals(run)
+    mesh_result = await asyncio.to_thread(synthesize_mesh_signals, agent_signals)
+    summarize_votes(agent_signals)
+    return _with_timings(mesh_result, run)
 
 if __name__ == "__main__":
     all_signals = get_all_agent_signals()
@@ -13,6 +13,7 @@ import requests
 from polygon.polygon_websocket import SPY_LIVE_PRICE
 from core.logger_setup import logger
 from core.resilient_request import resilient_get
+from core.account_state import get_account_state
 
 FILE = "logs/open_trades.jsonl"
 RECONCILIATION_LOG_PATH = Path("logs/reconciliation_log.jsonl")
@@ -54,6 +55,10 @@ def _convert_floats(obj):
     return obj
 
 def fetch_open_tradier_orders() -> list[dict]:
+    snap = get_account_state().current()
+    if snap is not None:
+        # Tradier's own rows: int ids and create_date, same as the REST path below
+        return [o.raw or o.as_dict() for o in snap.orders if o.status in ("filled", "open")]
     url = f"{TRADIER_API_BASE}/accounts/{TRADIER_ACCOUNT_ID}/orders"
     try:
         resp = _tradier_get(url)
@@ -150,12 +155,20 @@ def log_open_trade(option_symbol: str, agent: str, direction: str, strike: float
     except Exception as e:
         print(f"❌ Failed to log open trade: {e}")
 
+_OPEN_TRADES_CACHE: dict = {"key": None, "trades": []}
+
 def load_open_trades() -> list[dict]:
+    """Parsed open-trades journal, re-read only when the file's mtime/size change."""
     try:
         if not OPEN_TRADES_PATH.exists():
             return []
-        with OPEN_TRADES_PATH.open("r") as f:
-            return [json.loads(line.strip()) for line in f if line.strip()]
+        st = OPEN_TRADES_PATH.stat()
+        key = (st.st_mtime_ns, st.st_size)
+        if _OPEN_TRADES_CACHE["key"] != key:
+            with OPEN_TRADES_PATH.open("r") as f:
+                trades = [json.loads(line.strip()) for line in f if line.strip()]
+            _OPEN_TRADES_CACHE.update(key=key, trades=trades)
+        return [dict(t) for t in _OPEN_TRADES_CACHE["trades"]]
     except Exception as e:
         logger.warning({"event": "load_open_trades_failed", "err": str(e)})
         return []
@@ -0,0 +1,271 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: core/option_symbol_resolver.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Pre-resolved ATM option symbols backed by a per-expiry strike-ladder cache.
+
+* `StrikeLadderCache` loads each (underlying, expiry) strike list once, from
+  Tradier `/markets/options/strikes`, falling back to the shared Polygon
+  chain snapshot. Strikes don't change intraday, so nothing is refetched
+  until the expiry rolls.
+* `AtmResolver` follows the hub's live price. It holds the current ATM call
+  and put OCC symbols plus the price band over which they stay ATM (the
+  midpoints to the neighbouring strikes).
+* `resolve_atm_symbol()` is a memory lookup. A spot inside the band returns
+  the held symbol. A spot outside it re-centres with one `searchsorted` on
+  the cached ladder. It returns None only before the first ladder load.
+
+Expiry choice matches `tradier_execution.get_atm_option_symbol`: today's
+expiry, else the next listed one.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from core.logger_setup import get_logger
+from core.tradier_async import TradierError, get_tradier
+from polygon.bar_store import session_date
+from polygon.chain_snapshot import aget_chain_snapshot
+from polygon.market_data_hub import MarketDataHub, get_market_data_hub
+from polygon.option_subscriptions import occ_symbol
+
+logger = get_logger(__name__)
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+RESOLVE_INTERVAL = float(os.getenv("ATM_RESOLVE_SECS", "0.5"))   # background re-centre cadence
+MAX_EXPIRY_DAYS  = int(os.getenv("ATM_MAX_EXPIRY_DAYS", "4"))    # how far to look for the next expiry
+LADDER_RETRY     = 30.0                                          # seconds between failed ladder loads
+
+# ---------------------------------------------------------------------------
+# Strike ladders
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True, slots=True)
+class StrikeLadder:
+    underlying: str
+    expiry:     str            # YYYY-MM-DD
+    strikes:    np.ndarray     # sorted, unique float64
+    source:     str            # "tradier" | "polygon"
+    loaded_at:  float
+
+    def __len__(self) -> int:
+        return len(self.strikes)
+
+    def nearest(self, spot: float) -> int:
+        """Index of the strike closest to *spot* (ties go to the lower strike)."""
+        i = int(np.searchsorted(self.strikes, spot))
+        if i <= 0:
+            return 0
+        if i >= len(self.strikes):
+            return len(self.strikes) - 1
+        return i - 1 if spot - self.strikes[i - 1] <= self.strikes[i] - spot else i
+
+    def band(self, i: int) -> Tuple[float, float]:
+        """[lo, hi] spot range over which strike *i* stays the nearest."""
+        k = self.strikes
+        lo = (k[i - 1] + k[i]) / 2 if i > 0 else -np.inf
+        hi = (k[i] + k[i + 1]) / 2 if i + 1 < len(k) else np.inf
+        return float(lo), float(hi)
+
+    def symbol(self, i: int, side: str) -> str:
+        """OCC ticker without the Polygon `O:` prefix (the form Tradier orders take)."""
+        return occ_symbol(self.underlying, self.expiry.replace("-", ""), side,
+                          float(self.strikes[i]))[2:]
+
+
+class StrikeLadderCache:
+    """(underlying, expiry) → StrikeLadder, loaded once per expiry."""
+
+    def __init__(self):
+        self._ladders: Dict[Tuple[str, str], StrikeLadder] = {}
+        self._lock = threading.Lock()
+        self._stats = {"loads": 0, "hits": 0, "fallbacks": 0}
+
+    def get(self, underlying: str, expiry: str) -> StrikeLadder | None:
+        with self._lock:
+            ladder = self._ladders.get((underlying, expiry))
+        if ladder is not None:
+            self._stats["hits"] += 1
+        return ladder
+
+    def put(self, underlying: str, expiry: str, strikes, source: str = "manual") -> StrikeLadder:
+        arr = np.unique(np.asarray(strikes, dtype=float))
+        ladder = StrikeLadder(underlying, expiry, arr[np.isfinite(arr)], source, time.time())
+        with self._lock:
+            self._ladders[(underlying, expiry)] = ladder
+        return ladder
+
+    async def aload(self, underlying: str, expiry: str) -> StrikeLadder | None:
+        """Cached ladder, else one Tradier strikes call (Polygon chain snapshot on failure)."""
+        ladder = self.get(underlying, expiry)
+        if ladder is not None:
+            return ladder
+        strikes, source = [], "tradier"
+        try:
+            strikes = await get_tradier().strikes(underlying, expiry)
+        except TradierError as e:
+            logger.warning({"event": "strike_ladder_tradier_fail", "expiry": expiry, "err": str(e)})
+        if not strikes:
+            self._stats["fallbacks"] += 1
+            source = "polygon"
+            try:
+                frame = (await aget_chain_snapshot(underlying)).frame
+                strikes = frame.strike[frame.mask(expiry)]
+            except Exception as e:
+                logger.warning({"event": "strike_ladder_polygon_fail", "expiry": expiry, "err": str(e)})
+                strikes = []
+        if not len(strikes):
+            return None
+        ladder = self.put(underlying, expiry, strikes, source)
+        self._stats["loads"] += 1
+        logger.info({"event": "strike_ladder_loaded", "underlying": underlying, "expiry": expiry,
+                     "strikes": len(ladder), "source": source})
+        return ladder
+
+    def prune(self, before: str) -> None:
+        """Drop ladders for expiries earlier than *before* (YYYY-MM-DD)."""
+        with self._lock:
+            for key in [k for k in self._ladders if k[1] < before]:
+                del self._ladders[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "cached": len(self._ladders)}
+
+# ---------------------------------------------------------------------------
+# Resolver
+# ---------------------------------------------------------------------------
+def _add_days(day: str, n: int) -> str:
+    return (date.fromisoformat(day) + timedelta(days=n)).isoformat()
+
+
+class AtmResolver:
+    def __init__(self, hub: MarketDataHub | None = None, underlying: str = "SPY",
+                 ladders: StrikeLadderCache | None = None):
+        self.hub = hub or get_market_data_hub()
+        self.underlying = underlying
+        self.ladders = ladders or StrikeLadderCache()
+        self._ladder: StrikeLadder | None = None
+        self._session = ""
+        self._idx = -1
+        self._band = (np.inf, -np.inf)        # empty until the first centre
+        self._atm: Dict[str, str] = {}
+        self._retry_at = 0.0
+        self._task: asyncio.Task | None = None
+        self._stats = {"recentres": 0, "lookups": 0, "misses": 0}
+
+    # ── ladder selection ─────────────────────────────────────────────────────
+    async def prepare(self, day: str | None = None) -> StrikeLadder | None:
+        """Load the ladder for *day*'s expiry (or the next listed one) and centre on the live price."""
+        day = day or session_date()
+        ladder = None
+        for offset in range(MAX_EXPIRY_DAYS + 1):
+            ladder = await self.ladders.aload(self.underlying, _add_days(day, offset))
+            if ladder is not None:
+                break
+        self._session = day
+        self.ladders.prune(day)
+        if ladder is None:
+            self._retry_at = time.time() + LADDER_RETRY
+            self._ladder, self._idx, self._atm = None, -1, {}      # never serve an expired contract
+            logger.error({"event": "atm_ladder_unavailable", "underlying": self.underlying, "day": day})
+            return None
+        self.set_ladder(ladder, day)
+        return ladder
+
+    def set_ladder(self, ladder: StrikeLadder, day: str | None = None) -> None:
+        self._ladder, self._idx, self._band, self._atm = ladder, -1, (np.inf, -np.inf), {}
+        self._session = day or session_date()
+        self.refresh()
+
+    # ── resolution ───────────────────────────────────────────────────────────
+    def refresh(self, spot: float | None = None) -> bool:
+        """Re-centre if *spot* left the current band; True when the ATM strike changed."""
+        spot = spot or self.hub.price(self.underlying)
+        ladder = self._ladder
+        if not spot or ladder is None or not len(ladder):
+            return False
+        lo, hi = self._band
+        if lo <= spot <= hi:
+            return False
+        i = ladder.nearest(spot)
+        self._band = ladder.band(i)
+        if i == self._idx:
+            return False
+        self._idx = i
+        self._atm = {"C": ladder.symbol(i, "C"), "P": ladder.symbol(i, "P")}
+        self._stats["recentres"] += 1
+        logger.debug({"event": "atm_recentred", "spot": spot, "strike": float(ladder.strikes[i]),
+                      "band": self._band})
+        return True
+
+    def resolve(self, side: str = "C", spot: float | None = None) -> str | None:
+        self._stats["lookups"] += 1
+        self.refresh(spot)
+        sym = self._atm.get(side.upper()[0])
+        if sym is None:
+            self._stats["misses"] += 1
+        return sym
+
+    @property
+    def strike(self) -> float | None:
+        return float(self._ladder.strikes[self._idx]) if self._ladder is not None and self._idx >= 0 else None
+
+    @property
+    def expiry(self) -> str | None:
+        return self._ladder.expiry if self._ladder is not None else None
+
+    # ── lifecycle ────────────────────────────────────────────────────────────
+    async def run(self) -> None:
+        while True:
+            try:
+                stale = self._session != session_date() or self._ladder is None
+                if stale and time.time() >= self._retry_at:
+                    await self.prepare()
+                self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error({"event": "atm_resolver_fail", "err": str(e)})
+            await asyncio.sleep(RESOLVE_INTERVAL)
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run(), name="atm-resolver")
+        return self._task
+
+    def stats(self) -> dict:
+        return {**self._stats, "expiry": self.expiry, "strike": self.strike, "band": self._band,
+                "atm": dict(self._atm), "ladders": self.ladders.stats()}
+
+
+_RESOLVER = AtmResolver()
+
+
+def get_atm_resolver() -> AtmResolver:
+    return _RESOLVER
+
+
+def resolve_atm_symbol(symbol: str = "SPY", call_put: str = "C") -> Optional[str]:
+    """Drop-in for `get_atm_option_symbol` on the hot path; None until the ladder is loaded."""
+    if symbol != _RESOLVER.underlying:
+        return None
+    return _RESOLVER.resolve(call_put)
+
+
+__all__ = [
+    "AtmResolver",
+    "StrikeLadder",
+    "StrikeLadderCache",
+    "get_atm_resolver",
+    "resolve_atm_symbol",
+]
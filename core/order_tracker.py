@@ -0,0 +1,272 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: core/order_tracker.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Async order-fill tracker – follows each order to a terminal state.
+
+States: pending → open → partially_filled → filled | rejected | cancelled | expired
+
+* `track(order)` registers a placement ack and starts a per-order poll of
+  `GET /orders/{id}` with tight backoff (`POLL_SCHEDULE`, then every
+  `POLL_CEILING` seconds until `MAX_TRACK_SECS`)
+* `on_update(order)` is the event-stream entry point. The account-state
+  service feeds it every order it sees, so a fill picked up by the
+  coalesced poll resolves waiters without waiting for the order's own
+  poll.
+* `wait(order_id, timeout=…)` awaits the terminal state with a deadline and
+  can cancel the broker order when the deadline passes
+  (`cancel_on_timeout`), then re-reads it so a partial fill is reported
+* Time-to-fill is recorded per order; `stats()` reports counts and p50/p95
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Literal, Tuple
+
+import numpy as np
+
+from core.logger_setup import get_logger
+from core.tradier_async import TradierAsync, TradierError, TradierOrder, get_tradier
+
+logger = get_logger(__name__)
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+POLL_SCHEDULE  = (0.05, 0.1, 0.2, 0.3, 0.5)     # seconds between the first status polls
+POLL_CEILING   = 1.0
+MAX_TRACK_SECS = float(os.getenv("ORDER_TRACK_MAX_SECS", "300"))
+FILL_DEADLINE  = float(os.getenv("ORDER_FILL_DEADLINE", "8"))   # default wait() budget
+
+OrderState = Literal["pending", "open", "partially_filled", "filled",
+                     "rejected", "cancelled", "expired", "skipped"]
+TERMINAL = frozenset({"filled", "rejected", "cancelled", "expired", "skipped"})
+_STATUS_MAP: Dict[str, OrderState] = {
+    "ok": "pending", "pending": "pending", "submitted": "pending", "calculated": "pending",
+    "accepted_for_bidding": "pending", "open": "open", "partially_filled": "partially_filled",
+    "filled": "filled", "rejected": "rejected", "error": "rejected",
+    "canceled": "cancelled", "cancelled": "cancelled", "pending_cancel": "open",
+    "expired": "expired", "skipped": "skipped",
+}
+
+
+def classify(status: str) -> OrderState | None:
+    """Tradier order status → tracker state (None for statuses we don't know)."""
+    return _STATUS_MAP.get((status or "").lower())
+
+
+def _current_task() -> asyncio.Task | None:
+    try:
+        return asyncio.current_task()
+    except RuntimeError:                         # called off-loop (e.g. from a worker thread)
+        return None
+
+# ---------------------------------------------------------------------------
+# Tracked order
+# ---------------------------------------------------------------------------
+@dataclass(slots=True)
+class TrackedOrder:
+    id:             str
+    symbol:         str = ""
+    side:           str = ""
+    quantity:       float = 0.0
+    state:          OrderState = "pending"
+    filled_qty:     float = 0.0
+    avg_fill_price: float = 0.0
+    reason:         str = ""
+    submitted_at:   float = field(default_factory=time.time)
+    filled_at:      float | None = None
+    history:        List[Tuple[float, str]] = field(default_factory=list)
+    future:         asyncio.Future | None = field(default=None, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.state in TERMINAL
+
+    @property
+    def filled(self) -> bool:
+        return self.state == "filled"
+
+    @property
+    def time_to_fill(self) -> float | None:
+        return None if self.filled_at is None else self.filled_at - self.submitted_at
+
+    def as_dict(self) -> dict:
+        return {"id": self.id, "symbol": self.symbol, "side": self.side, "quantity": self.quantity,
+                "state": self.state, "filled_qty": self.filled_qty, "avg_fill_price": self.avg_fill_price,
+                "reason": self.reason, "time_to_fill": self.time_to_fill}
+
+# ---------------------------------------------------------------------------
+# Tracker
+# ---------------------------------------------------------------------------
+class OrderTracker:
+    def __init__(self, tradier: TradierAsync | None = None):
+        self._tradier = tradier
+        self._orders: Dict[str, TrackedOrder] = {}
+        self._pollers: Dict[str, asyncio.Task] = {}
+        self._fill_times: List[float] = []
+        self._stats = {"tracked": 0, "filled": 0, "rejected": 0, "cancelled": 0,
+                       "expired": 0, "timeouts": 0, "polls": 0}
+
+    @property
+    def tradier(self) -> TradierAsync:
+        return self._tradier or get_tradier()
+
+    def get(self, order_id: str) -> TrackedOrder | None:
+        return self._orders.get(str(order_id))
+
+    # ── registration ─────────────────────────────────────────────────────────
+    def track(self, order: TradierOrder, *, poll: bool = True) -> TrackedOrder:
+        """Register a placement ack; must be called on the loop that will await it."""
+        oid = str(order.id)
+        tracked = self._orders.get(oid)
+        if tracked is None:
+            tracked = TrackedOrder(oid, order.option_symbol or order.symbol, order.side, order.quantity,
+                                   future=asyncio.get_running_loop().create_future())
+            tracked.history.append((tracked.submitted_at, "pending"))
+            self._orders[oid] = tracked
+            self._stats["tracked"] += 1
+        self.on_update(order)
+        if poll and oid and not tracked.done and oid not in self._pollers:
+            self._pollers[oid] = asyncio.get_running_loop().create_task(self._poll(oid), name=f"order-{oid}")
+        return tracked
+
+    # ── transitions ──────────────────────────────────────────────────────────
+    def on_update(self, order: TradierOrder) -> TrackedOrder | None:
+        """Apply a broker status update (poll result or event stream)."""
+        tracked = self._orders.get(str(order.id))
+        state = classify(order.status)
+        if tracked is None or tracked.done or state is None:
+            return tracked
+        if order.exec_quantity:
+            tracked.filled_qty = order.exec_quantity
+        if order.avg_fill_price:
+            tracked.avg_fill_price = order.avg_fill_price
+        if order.reason:
+            tracked.reason = order.reason
+        if state == tracked.state:
+            return tracked
+        if state == "pending" and tracked.state != "pending":
+            return tracked                      # never step back from open/partial
+        now = time.time()
+        tracked.state = state
+        tracked.history.append((now, state))
+        if state == "filled":
+            tracked.filled_at = now
+            tracked.filled_qty = tracked.filled_qty or tracked.quantity
+            self._fill_times.append(tracked.time_to_fill)
+        if state in TERMINAL:
+            self._finish(tracked)
+        return tracked
+
+    def _finish(self, tracked: TrackedOrder) -> None:
+        if tracked.state in self._stats:
+            self._stats[tracked.state] += 1
+        logger.info({"event": "order_terminal", **tracked.as_dict()})
+        if tracked.future is not None and not tracked.future.done():
+            tracked.future.get_loop().call_soon_threadsafe(
+                lambda f=tracked.future: f.done() or f.set_result(tracked))
+        poller = self._pollers.pop(tracked.id, None)
+        if poller is not None and not poller.done() and poller is not _current_task():
+            poller.cancel()
+
+    async def _poll(self, oid: str) -> None:
+        start = time.monotonic()
+        step = 0
+        try:
+            while True:
+                tracked = self._orders.get(oid)
+                if tracked is None or tracked.done:
+                    return
+                if time.monotonic() - start > MAX_TRACK_SECS:
+                    logger.warning({"event": "order_track_gave_up", "order_id": oid, "state": tracked.state})
+                    return
+                await asyncio.sleep(POLL_SCHEDULE[step] if step < len(POLL_SCHEDULE) else POLL_CEILING)
+                step += 1
+                try:
+                    order = await self.tradier.order(oid)
+                    self._stats["polls"] += 1
+                except TradierError as e:
+                    logger.warning({"event": "order_poll_fail", "order_id": oid, "err": str(e)})
+                    continue
+                if order is not None:
+                    self.on_update(order)
+        finally:
+            if self._pollers.get(oid) is asyncio.current_task():
+                self._pollers.pop(oid, None)
+
+    # ── waiting ──────────────────────────────────────────────────────────────
+    async def wait(self, order_id: str, timeout: float | None = FILL_DEADLINE, *,
+                   cancel_on_timeout: bool = False) -> TrackedOrder:
+        """Terminal TrackedOrder, or the still-working one once *timeout* elapses."""
+        tracked = self._orders.get(str(order_id))
+        if tracked is None:
+            raise KeyError(f"order {order_id} is not tracked")
+        if tracked.done or tracked.future is None:
+            return tracked
+        try:
+            return await asyncio.wait_for(asyncio.shield(tracked.future), timeout)
+        except asyncio.TimeoutError:
+            self._stats["timeouts"] += 1
+            logger.warning({"event": "order_fill_timeout", "timeout": timeout, **tracked.as_dict()})
+        if cancel_on_timeout:
+            try:
+                order = await self.tradier.cancel_order(tracked.id)
+                if order is not None:
+                    self.on_update(order)
+            except TradierError as e:
+                logger.error({"event": "order_cancel_fail", "order_id": tracked.id, "err": str(e)})
+            try:                                # re-read: the cancel ack carries no fill quantity
+                order = await self.tradier.order(tracked.id)
+                if order is not None:
+                    self.on_update(order)
+            except TradierError as e:
+                logger.warning({"event": "order_poll_fail", "order_id": tracked.id, "err": str(e)})
+        return tracked
+
+    async def submit_and_wait(self, order: TradierOrder, timeout: float | None = FILL_DEADLINE, *,
+                              cancel_on_timeout: bool = False) -> TrackedOrder:
+        if not order.id:                         # test-mode skips never reach the broker
+            return TrackedOrder("", order.option_symbol, order.side, order.quantity,
+                                state=classify(order.status) or "rejected", reason=order.reason)
+        self.track(order)
+        return await self.wait(order.id, timeout, cancel_on_timeout=cancel_on_timeout)
+
+    # ── event stream ─────────────────────────────────────────────────────────
+    def attach(self, account_state) -> None:
+        """Consume order updates from core.account_state's coalesced poll."""
+        def _on_change(snap, changes):
+            if "orders" in changes:
+                for order in snap.orders:
+                    self.on_update(order)
+        account_state.subscribe(_on_change)
+
+    # ── maintenance ──────────────────────────────────────────────────────────
+    def forget(self, older_than: float = MAX_TRACK_SECS) -> None:
+        cutoff = time.time() - older_than
+        for oid in [o for o, t in self._orders.items() if t.done and t.submitted_at < cutoff]:
+            del self._orders[oid]
+
+    def stats(self) -> dict:
+        ttf = np.array(self._fill_times[-500:], dtype=float)
+        return {**self._stats, "working": sum(not t.done for t in self._orders.values()),
+                "ttf_p50": round(float(np.percentile(ttf, 50)), 3) if len(ttf) else None,
+                "ttf_p95": round(float(np.percentile(ttf, 95)), 3) if len(ttf) else None}
+
+
+_TRACKER = OrderTracker()
+
+
+def get_order_tracker() -> OrderTracker:
+    return _TRACKER
+
+
+__all__ = [
+    "OrderTracker",
+    "TrackedOrder",
+    "classify",
+    "get_order_tracker",
+]
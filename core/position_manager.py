@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
-import os, json, asyncio
+import os, json, asyncio, time
 from datetime import datetime
 from typing import Dict, List
 
 from core.tradier_execution import submit_order
 from core.tradier_client import get_positions, get_order_status
+from core.tradier_async import TradierError, get_tradier
+from core.account_state import get_account_state
+from core.order_tracker import FILL_DEADLINE, POLL_CEILING, POLL_SCHEDULE, TERMINAL, classify, get_order_tracker
 from analytics.qthink_log_labeler import label_exit_reason, process_and_journal
 from core.trade_logger import log_exit, log_alpha_decay
 from core.mesh_router import score_exit_signals
@@ -23,7 +26,9 @@ from analytics.qthink_feedback_loop import (
 )
 from core.gpt_exit_analyzer import analyze_exit_with_gpt
 from polygon.polygon_rest import get_option_metrics, get_dealer_flow_metrics
-from polygon.polygon_websocket import SPY_LIVE_PRICE
+from polygon.market_data_hub import get_market_data_hub
+from core.market_context import MarketContext
+from polygon.option_subscriptions import get_option_subscriptions
 from core.mesh_optimizer import evaluate_agents
 from core.open_trade_tracker import remove_trade
 
@@ -39,7 +44,21 @@ def _atomic_log(path: str, obj: dict):
         fh.write(json.dumps(obj) + "\n")
 
 def get_price() -> float:
-    return SPY_LIVE_PRICE.get("mid") or SPY_LIVE_PRICE.get("last_trade") or 0.0
+    return get_market_data_hub().price("SPY")
+
+def get_option_mark(option_symbol: str) -> float | None:
+    """Streaming NBBO mid / last for a held contract (pins it on the options feed)."""
+    subs = get_option_subscriptions()
+    subs.pin(option_symbol)
+    return subs.mark(option_symbol)
+
+def _mark_pnl(position: dict, mark: float | None) -> float | None:
+    """Fractional PnL vs Tradier cost basis (cost_basis is total $ for the position)."""
+    cost = position.get("cost_basis")
+    qty = position.get("quantity")
+    if not mark or not cost or not qty:
+        return None
+    return round((mark * 100 * float(qty) - float(cost)) / abs(float(cost)), 4)
 
 def log_exit_attempt(symbol: str, qty: int, response: Dict):
     _atomic_log(EXIT_ATTEMPTS_LOG, {
@@ -57,6 +76,9 @@ def update_sync_log_with_outcome(option_symbol: str, outcome: str):
     })
 
 def get_open_positions() -> Dict[str, List[dict]]:
+    snap = get_account_state().current()
+    if snap is not None:
+        return {"positions": snap.positions_as_dicts()}
     try:
         raw = get_positions().get("positions", [])
         return {"positions": [p for p in raw if isinstance(p, dict)]}
@@ -64,15 +86,36 @@ def get_open_positions() -> Dict[str, List[dict]]:
         logger.error({"event": "get_positions_fail", "error": str(e)})
         return {"positions": []}
 
-def confirm_order_success(order_id: str) -> bool:
+async def aget_open_positions() -> Dict[str, List[dict]]:
+    snap = get_account_state().current()
+    if snap is not None:
+        return {"positions": snap.positions_as_dicts()}
     try:
-        status = get_order_status(order_id).get("order", {}).get("status", "unknown")
-        return status == "ok"
-    except Exception as e:
-        logger.error({"event": "confirm_order_failed", "error": str(e)})
-        return False
+        return {"positions": [p.as_dict() for p in await get_tradier().positions()]}
+    except TradierError as e:
+        logger.error({"event": "get_positions_fail", "error": str(e)})
+        return {"positions": []}
 
-def evaluate_exit(context: dict, position: dict):
+def confirm_order_success(order_id: str, timeout: float = FILL_DEADLINE) -> bool:
+    """Poll the order with tight backoff until it fills, dies or *timeout* passes."""
+    deadline = time.time() + timeout
+    delays = iter(POLL_SCHEDULE)
+    while True:
+        try:
+            status = get_order_status(order_id).get("order", {}).get("status", "unknown")
+        except Exception as e:
+            logger.error({"event": "confirm_order_failed", "error": str(e)})
+            status = "unknown"
+        state = classify(status)
+        if state == "filled":
+            return True
+        if state in TERMINAL or time.time() >= deadline:
+            logger.warning({"event": "order_not_filled", "order_id": order_id, "status": status})
+            return False
+        time.sleep(next(delays, POLL_CEILING))
+
+def _exit_inputs(context: dict, position: dict) -> tuple:
+    """Blocking half of the exit decision (profile, mesh exit votes, scenario regime)."""
     profile = load_reinforcement_profile()
     exit_cutoff = profile.get("suggested_exit_decay", 0.6)
 
@@ -92,36 +135,40 @@ def evaluate_exit(context: dict, position: dict):
         "exit_confidence": exit_confidence,
         "trade_id": position.get("trade_id"),
     })
+    return exit_cutoff, exit_signal, exit_confidence, pnl, decay, regime
+
+async def aevaluate_exit(context: dict, position: dict):
+    exit_cutoff, exit_signal, exit_confidence, pnl, decay, regime = await asyncio.to_thread(
+        _exit_inputs, context, position)
+
+    gpt_decision = await analyze_exit_with_gpt(context, context["trade_id"])
+    gpt_signal = gpt_decision.get("signal", "hold")
+    gpt_conf = gpt_decision.get("confidence", 0.5)
+    context.update({
+        "gpt_exit_signal": gpt_signal,
+        "gpt_confidence": gpt_conf,
+        "gpt_rationale": gpt_decision.get("rationale", "n/a"),
+        "reinforcement_label": f"gpt_exit:{gpt_signal}",
+    })
+
+    exit_thresh = get_exit_threshold()
+    should_exit = (
+        (exit_signal == "exit" and exit_confidence >= exit_thresh)
+        or pnl < -0.3
+        or decay > exit_cutoff
+        or regime in ["panic", "compressing"]
+        or (gpt_signal == "exit" and gpt_conf >= 0.65)
+    )
+
+    rationale = label_exit_reason(pnl=pnl, decay=decay, mesh_signal=exit_signal)
+    return should_exit, rationale, regime
 
-    async def decide():
-        gpt_decision = await analyze_exit_with_gpt(context, context["trade_id"])
-        gpt_signal = gpt_decision.get("signal", "hold")
-        gpt_conf = gpt_decision.get("confidence", 0.5)
-        context.update({
-            "gpt_exit_signal": gpt_signal,
-            "gpt_confidence": gpt_conf,
-            "gpt_rationale": gpt_decision.get("rationale", "n/a"),
-            "reinforcement_label": f"gpt_exit:{gpt_signal}",
-        })
-
-        exit_thresh = get_exit_threshold()
-        should_exit = (
-            (exit_signal == "exit" and exit_confidence >= exit_thresh)
-            or pnl < -0.3
-            or decay > exit_cutoff
-            or regime in ["panic", "compressing"]
-            or (gpt_signal == "exit" and gpt_conf >= 0.65)
-        )
-
-        rationale = label_exit_reason(pnl=pnl, decay=decay, mesh_signal=exit_signal)
-        return should_exit, rationale, regime
-
-    return asyncio.run(decide())
+def evaluate_exit(context: dict, position: dict):
+    return asyncio.run(aevaluate_exit(context, position))
 
 def exit_trade(position: Dict, regime: str) -> bool:
     symbol = position.get("symbol")
     qty = int(position.get("quantity", 1))
-    trade_id = position.get("trade_id", symbol)
 
     print(f"[EXIT] Closing position {symbol} ×{qty}")
     response = submit_order(option_symbol=symbol, qty=qty, side="sell_to_close")
@@ -131,11 +178,44 @@ def exit_trade(position: Dict, regime: str) -> bool:
         print(f"🛑 Tradier rejected exit order: {response}")
         return False
 
-    order_id = response.get("order", {}).get("id") or response.get("order_id")
+    order_id = response.get("order", {}).get("id") or response.get("order_id") or response.get("id")
     if not order_id or not confirm_order_success(order_id):
         logger.error({"event": "exit_order_unconfirmed", "resp": response})
         return False
 
+    get_option_subscriptions().unpin(symbol)      # flat → let the ATM window own its channels
+    _journal_exit(position, regime)
+    return True
+
+async def aexit_trade(position: Dict, regime: str) -> bool:
+    """Async exit: the sell order is awaited on the pooled Tradier session, journaling runs after."""
+    symbol = position.get("symbol")
+    qty = int(position.get("quantity", 1))
+
+    print(f"[EXIT] Closing position {symbol} ×{qty}")
+    try:
+        order = await get_tradier().place_option_order(symbol, qty, "sell_to_close")
+    except TradierError as e:
+        log_exit_attempt(symbol, qty, {"status": "rejected", "error": str(e), "body": e.body})
+        print(f"🛑 Tradier rejected exit order: {e}")
+        return False
+    log_exit_attempt(symbol, qty, order.as_dict())
+    get_account_state().notify_order(order.id)
+
+    tracked = await get_order_tracker().submit_and_wait(order, FILL_DEADLINE, cancel_on_timeout=True)
+    if not tracked.filled:
+        logger.error({"event": "exit_order_unfilled", **tracked.as_dict()})
+        return False
+
+    get_option_subscriptions().unpin(symbol)
+    await asyncio.to_thread(_journal_exit, position, regime)
+    return True
+
+def _journal_exit(position: Dict, regime: str) -> None:
+    symbol = position.get("symbol")
+    qty = int(position.get("quantity", 1))
+    trade_id = position.get("trade_id", symbol)
+
     rationale = label_exit_reason(pnl=position.get("pnl", 0), decay=position.get("alpha_decay", 0), mesh_signal="exit")
     log_exit(position, reason=rationale)
     update_sync_log_with_outcome(symbol, outcome="closed")
@@ -161,69 +241,96 @@ def exit_trade(position: Dict, regime: str) -> bool:
         risk_profile="reduction",
         meta={"alpha_decay": position.get("alpha_decay", 0.0), "pnl": position.get("pnl", 0.0)},
     )
-    return True
 
-def manage_positions(vix_value: float = 18.0):
-    positions = get_open_positions().get("positions", [])
+def _position_context(position: dict, vix_value: float, market: MarketContext | None = None) -> dict:
+    """Exit-evaluation context for one open position (blocking: chain metrics + decay log).
+
+    With the cycle's MarketContext the underlying price, dealer flow and VIX come
+    from the snapshot; only the per-contract mark and metrics are fetched here.
+    """
+    option_symbol = position.get("symbol")
+    price = market.price if market is not None else get_price()
+    mark = get_option_mark(option_symbol)
+    option_data = get_option_metrics(option_symbol) or {}
+    dealer_data = market.dealer_flow if market is not None else (get_dealer_flow_metrics("SPY") or {})
+    if market is not None:
+        vix_value = market.vix
+
+    entry_time = position.get("entry_time")
+    mesh_score = position.get("mesh_score", 50)
+    minutes_alive = position.get("minutes_alive", 30)
+
+    decay_time = calculate_time_decay(entry_time) if entry_time else 0.0
+    decay_mesh = calculate_mesh_decay(mesh_score, minutes_alive)
+    alpha_decay = round(0.6 * decay_time + 0.4 * decay_mesh, 4)
+
+    pnl = position.get("pnl")
+    if pnl is None:
+        pnl = _mark_pnl(position, mark) or 0.0
+        position["pnl"] = pnl
+    context = {
+        "symbol": option_symbol,
+        "price": price,
+        "mark": mark or 0.0,
+        "iv": option_data.get("iv", 0),
+        "volume": option_data.get("volume", 0),
+        "skew": option_data.get("skew", 0),
+        "delta": option_data.get("delta", 0),
+        "gamma": option_data.get("gamma", 0),
+        "dealer_flow": dealer_data.get("score", 0),
+        "vix": vix_value,
+        "alpha_decay": alpha_decay,
+        "mesh_score": mesh_score,
+        "pnl": pnl,
+    }
+
+    log_alpha_decay(
+        trade_id=position.get("trade_id", option_symbol),
+        symbol=option_symbol,
+        time_decay=decay_time,
+        mesh_decay=decay_mesh,
+        alpha_decay=alpha_decay,
+        pnl=pnl,
+        rationale="decay_update",
+    )
+    return context
+
+def _valid_positions(positions: list) -> list:
+    out = []
     for position in positions:
         if not isinstance(position, dict):
             logger.warning({"event": "invalid_position_object", "raw": str(position)})
-            continue
-
-        option_symbol = position.get("symbol")
-        if not option_symbol:
+        elif not position.get("symbol"):
             logger.warning({"event": "manage_pos_missing_symbol", "pos": position})
-            continue
-
-        price = get_price()
-        option_data = get_option_metrics(option_symbol) or {}
-        dealer_data = get_dealer_flow_metrics("SPY") or {}
-
-        entry_time = position.get("entry_time")
-        mesh_score = position.get("mesh_score", 50)
-        minutes_alive = position.get("minutes_alive", 30)
-
-        decay_time = calculate_time_decay(entry_time) if entry_time else 0.0
-        decay_mesh = calculate_mesh_decay(mesh_score, minutes_alive)
-        alpha_decay = round(0.6 * decay_time + 0.4 * decay_mesh, 4)
-
-        pnl = position.get("pnl", 0.0)
-        context = {
-            "symbol": option_symbol,
-            "price": price,
-            "iv": option_data.get("iv", 0),
-            "volume": option_data.get("volume", 0),
-            "skew": option_data.get("skew", 0),
-            "delta": option_data.get("delta", 0),
-            "gamma": option_data.get("gamma", 0),
-            "dealer_flow": dealer_data.get("score", 0),
-            "vix": vix_value,
-            "alpha_decay": alpha_decay,
-            "mesh_score": mesh_score,
-            "pnl": pnl,
-        }
-
-        log_alpha_decay(
-            trade_id=position.get("trade_id", option_symbol),
-            symbol=option_symbol,
-            time_decay=decay_time,
-            mesh_decay=decay_mesh,
-            alpha_decay=alpha_decay,
-            pnl=pnl,
-            rationale="decay_update",
-        )
+        else:
+            out.append(position)
+    return out
 
+def _log_exit_allocation(context: dict, regime: str) -> None:
+    log_allocation_update(
+        recommended=0.15,
+        rationale="exit_triggered",
+        qthink_label="exit:decay_or_drawdown",
+        regime=regime,
+        risk_profile="reduction",
+        meta={"alpha_decay": context["alpha_decay"], "pnl": context["pnl"]},
+    )
+
+def manage_positions(vix_value: float = 18.0):
+    for position in _valid_positions(get_open_positions().get("positions", [])):
+        context = _position_context(position, vix_value)
         should_exit, rationale, regime = evaluate_exit(context, position)
-        print(f"[EVAL] {option_symbol} | PnL {pnl:+.2f} | Decision: {rationale}")
-
-        if should_exit:
-            exit_success = exit_trade(position, regime)
-            if exit_success:
-                log_allocation_update(
-                    recommended=0.15,
-                    rationale="exit_triggered",
-                    qthink_label="exit:decay_or_drawdown",
-                    regime=regime,
-                    risk_profile="reduction",
-                    meta={"alpha_decay": alpha_decay, "pnl": pnl},
-                )
+        print(f"[EVAL] {context['symbol']} | PnL {context['pnl']:+.2f} | Decision: {rationale}")
+
+        if should_exit and exit_trade(position, regime):
+            _log_exit_allocation(context, regime)
+
+async def manage_positions_async(vix_value: float = 18.0, market: MarketContext | None = None):
+    """Same cycle as manage_positions, awaited on the live loop (no nested loops per position)."""
+    for position in _valid_positions((await aget_open_positions()).get("positions", [])):
+        context = await asyncio.to_thread(_position_context, position, vix_value, market)
+        should_exit, rationale, regime = await aevaluate_exit(context, position)
+        print(f"[EVAL] {context['symbol']} | PnL {context['pnl']:+.2f} | Decision: {rationale}")
+
+        if should_exit and await aexit_trade(position, regime):
+            await asyncio.to_thread(_log_exit_allocation, context, regime)
@@ -21,7 +21,9 @@ import joblib
 import numpy as np
 from dotenv import load_dotenv
 
+from core.feature_graph import REGISTRY, get_features
 from core.logger_setup import get_logger
+from core.market_context import MarketContext
 from core.forecast_logger import log_forecast
 from core.openai_safe import chat  # version-safe GPT helper
 
@@ -61,6 +63,11 @@ def _load_scaler():
         return None
     return joblib.load(SCALER_PATH)
 
+
+def feature_state(market: MarketContext | None = None) -> Dict[str, float]:
+    """FEATURE_KEYS by name from the tick's feature graph; unregistered keys (macro_flag) → 0.0 at predict time."""
+    return get_features(market).many(k for k in FEATURE_KEYS if k in REGISTRY)
+
 # ---------------------------------------------------------------------------#
 # XGBoost probability                                                         #
 # ---------------------------------------------------------------------------#
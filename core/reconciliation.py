@@ -10,7 +10,7 @@ from core.open_trade_tracker import (
 )
 from core.logger_setup import logger
 from core.entry_learner import score_entry
-from polygon.polygon_websocket import SPY_LIVE_PRICE
+from polygon.market_data_hub import get_market_data_hub
 from pathlib import Path
 
 UI_STATUS_PATH = Path("logs/ui_sync_status.json")
@@ -38,7 +38,7 @@ def enrich_trade(order: dict) -> dict:
         "order_id": order["id"],
         "reconciled": True,
         "reconciled_reason": "missing_in_local",
-        "entry_price": SPY_LIVE_PRICE.get("mid") or SPY_LIVE_PRICE.get("last_trade") or 0.0,
+        "entry_price": get_market_data_hub().price("SPY"),
     }
     try:
         score, rationale, regime, mesh = score_entry({"symbol": opt_sym, "price": base["entry_price"]})
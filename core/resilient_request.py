@@ -13,8 +13,9 @@ import time
 from typing import Any, Dict, Mapping, Sequence
 
 import backoff
-import requests
+import httpx
 
+from core.http_clients import get_client
 from core.logger_setup import get_logger
 
 logger = get_logger(__name__)
@@ -77,10 +78,10 @@ def resilient_get(
     params: Mapping[str, Any] | None = None,
     headers: Mapping[str, str] | None = None,
     timeout: int = _DEFAULT_TIMEOUT,
-) -> requests.Response:
-    """GET with retries, logging and sane defaults."""
+) -> httpx.Response:
+    """GET with retries, logging and sane defaults (pooled per-host client)."""
     _log("http_get", url=url, params=params)
-    resp = requests.get(url, params=params, headers=headers, timeout=timeout)
+    resp = get_client(url).get(url, params=params, headers=headers, timeout=timeout)
 
     if resp.status_code >= 500:
         # trigger back-off retry
@@ -99,10 +100,10 @@ def resilient_post(
     json_body: Any | None = None,
     headers: Mapping[str, str] | None = None,
     timeout: int = _DEFAULT_TIMEOUT,
-) -> requests.Response:
-    """POST with retries, logging and sane defaults."""
+) -> httpx.Response:
+    """POST with retries, logging and sane defaults (pooled per-host client)."""
     _log("http_post", url=url, json=bool(json_body), data_keys=list(data or {}))
-    resp = requests.post(
+    resp = get_client(url).post(
         url,
         data=data,
         json=json_body,
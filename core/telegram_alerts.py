@@ -1,6 +1,6 @@
 # File: core/telegram_alerts.py
 import os
-import httpx
+from core.http_clients import get_client
 from datetime import datetime
 
 BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
@@ -18,8 +18,7 @@ def send_telegram_alert(message: str):
     }
 
     try:
-        with httpx.Client() as client:
-            r = client.post(url, json=payload, timeout=5)
-            r.raise_for_status()
+        r = get_client(url).post(url, json=payload, timeout=5)
+        r.raise_for_status()
     except Exception as e:
         print(f"⚠️ Telegram alert failed: {e}")
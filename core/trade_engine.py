@@ -7,16 +7,14 @@ and structured logging. Designed to be called from run_q_algo_live_async.py.
 import os, json, asyncio, time
 from datetime import datetime, timezone
 from typing import Dict, Any, Literal
-import httpx
-
 from core.logger_setup import get_logger
 from core.open_trade_tracker import track_open_trade
-from core.tradier_execution import _headers  # token-refresh safe
+from core.order_tracker import FILL_DEADLINE, get_order_tracker
+from core.account_state import get_account_state
+from core.tradier_async import TradierError, get_tradier
 
 logger = get_logger(__name__)
 
-TRADIER_BASE_URL   = os.getenv("TRADIER_API_BASE", "https://sandbox.tradier.com/v1").rstrip("/")
-TRADIER_ACCOUNT_ID = os.getenv("TRADIER_ACCOUNT_ID", "")
 DEFAULT_TIF        = os.getenv("TRADIER_ORDER_TIF", "day")
 ENTRY_THRESHOLD    = float(os.getenv("ENTRY_SCORE_THRESHOLD", "0.60"))
 
@@ -29,29 +27,27 @@ async def _place_order_async(
     option_type: Literal["C", "P"],
     limit_price: float | None = None,
 ) -> dict:
-    payload = {
-        "class": "option",
-        "symbol": symbol,
-        "side": "buy_to_open",
-        "quantity": contracts,
-        "type": "market" if limit_price is None else "limit",
-        "price": limit_price,
-        "duration": DEFAULT_TIF,
-    }
-    url = f"{TRADIER_BASE_URL}/accounts/{TRADIER_ACCOUNT_ID}/orders"
-    async with httpx.AsyncClient(timeout=10) as cli:
-        r = await cli.post(url, headers=_headers(), data=payload)
-        try:
-            r.raise_for_status()
-        except httpx.HTTPStatusError as e:
-            raise TradeEngineError(f"HTTP {e.response.status_code}: {e.response.text}") from e
-        data = r.json()
-        order = data.get("order") or data.get("orders")
-        if not order or order.get("status") not in {"ok", "filled", "open"}:
-            raise TradeEngineError(f"Bad response: {json.dumps(data)[:400]}")
-        return order
+    try:
+        order = await get_tradier().place_option_order(
+            symbol, contracts, "buy_to_open",
+            order_type="market" if limit_price is None else "limit",
+            price=limit_price,
+            duration=DEFAULT_TIF,
+        )
+    except TradierError as e:
+        raise TradeEngineError(f"{e} {json.dumps(e.body)[:400] if e.body else ''}".strip()) from e
+    get_account_state().notify_order(order.id)
+    if not order.accepted:
+        raise TradeEngineError(f"Bad response: {json.dumps(order.as_dict())[:400]}")
+    tracked = await get_order_tracker().submit_and_wait(order, FILL_DEADLINE, cancel_on_timeout=True)
+    if not tracked.filled:
+        if tracked.filled_qty <= 0:
+            raise TradeEngineError(f"Entry order {tracked.id} not filled: {tracked.state} {tracked.reason}".strip())
+        logger.warning({"event": "entry_partial_fill", **tracked.as_dict()})    # keep what we hold
+    return {**order.as_dict(), "status": tracked.state, "exec_quantity": tracked.filled_qty,
+            "avg_fill_price": tracked.avg_fill_price, "time_to_fill": tracked.time_to_fill}
 
-def open_position(
+async def aopen_position(
     symbol: str,
     contracts: int,
     option_type: Literal["C", "P"],
@@ -60,15 +56,18 @@ def open_position(
     rationale: str,
     limit_price: float | None = None,
 ) -> Dict[str, Any]:
+    """Entry order awaited directly on the caller's loop (signal → order with no thread hop)."""
     if score < ENTRY_THRESHOLD:
         raise TradeEngineError(
             f"Attempted to place order with score {score:.2f} < threshold {ENTRY_THRESHOLD:.2f}")
-    order = asyncio.run(_place_order_async(symbol, contracts, option_type, limit_price))
+    order = await _place_order_async(symbol, contracts, option_type, limit_price)
     trade_id = f"{symbol}_{order.get('id') or int(time.time())}"
+    filled = int(order.get("exec_quantity") or contracts)
     ctx = {
         "trade_id": trade_id,
         "option_symbol": symbol,
-        "contracts": contracts,
+        "contracts": filled,
+        "entry_price": order.get("avg_fill_price") or 0.0,
         "order_id": order.get("id"),
         "score": score,
         "trigger_agents": [],
@@ -79,9 +78,23 @@ def open_position(
     logger.info({
         "event": "order_submitted",
         "symbol": symbol,
-        "contracts": contracts,
+        "contracts": filled,
+        "requested": contracts,
         "score": score,
         "order_id": order.get("id"),
     })
-    order.update({"trade_id": trade_id, "timestamp": ctx["timestamp"]})
+    order.update({"order_id": order.get("id"), "trade_id": trade_id, "timestamp": ctx["timestamp"]})
     return order
+
+def open_position(
+    symbol: str,
+    contracts: int,
+    option_type: Literal["C", "P"],
+    *,
+    score: float,
+    rationale: str,
+    limit_price: float | None = None,
+) -> Dict[str, Any]:
+    """Blocking wrapper for scripts outside the live loop – the loop awaits `aopen_position`."""
+    return asyncio.run(aopen_position(symbol, contracts, option_type,
+                                      score=score, rationale=rationale, limit_price=limit_price))
@@ -0,0 +1,337 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: core/tradier_async.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Native asyncio Tradier client – quotes, chains, positions, orders, balances.
+
+* Every call goes through the pooled per-host `httpx.AsyncClient` from
+  core.http_clients (one keep-alive session per event loop)
+* Tradier's `"null"` / single-dict / list payload variants are normalised by
+  `_as_list`, and responses are parsed into frozen dataclasses with
+  `as_dict()` for callers that still want the legacy dict shape
+* HTTP errors and `{"errors": …}` bodies raise `TradierError`
+* Order placement honours `ALLOW_ORDER_SUBMISSION=0` (test mode)
+
+Await it straight from the trading loop, with no `asyncio.run` and no thread hop:
+
+    tradier = get_tradier()
+    order = await tradier.place_option_order("SPY250620C00545000", 1, "buy_to_open")
+"""
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Literal, Optional
+
+import httpx
+
+from core.http_clients import get_async_client
+from core.logger_setup import get_logger
+from core.tradier_execution import _headers  # token-refresh safe
+
+logger = get_logger(__name__)
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+TRADIER_API_BASE   = os.getenv("TRADIER_API_BASE", "https://sandbox.tradier.com/v1").rstrip("/")
+TRADIER_ACCOUNT_ID = os.getenv("TRADIER_ACCOUNT_ID", "")
+ORDER_TIMEOUT      = 10.0      # seconds; order entry gets a tighter budget than reads
+
+OrderSide = Literal["buy_to_open", "sell_to_close", "buy_to_close", "sell_to_open"]
+_OCC_ROOT = re.compile(r"^([A-Z]{1,6})\d{6}[CP]\d{8}$")
+
+
+class TradierError(RuntimeError):
+    def __init__(self, message: str, status: int | None = None, body: Any = None):
+        super().__init__(message)
+        self.status = status
+        self.body = body
+
+# ---------------------------------------------------------------------------
+# Normalisation helpers
+# ---------------------------------------------------------------------------
+def _as_list(node: Any, key: str | None = None) -> List[dict]:
+    """Tradier wraps collections as `"null"`, `{key: {...}}` or `{key: [...]}` – always return a list of dicts."""
+    if key is not None:
+        node = node.get(key) if isinstance(node, dict) else None
+    if isinstance(node, dict):
+        return [node]
+    if isinstance(node, list):
+        return [n for n in node if isinstance(n, dict)]
+    return []                                   # None / "null" / ""
+
+
+def _scalars(node: Any, key: str) -> List[Any]:
+    """Same normalisation for scalar collections (`{"date": "…"}` vs `{"date": [...]}`)."""
+    inner = node.get(key) if isinstance(node, dict) else None
+    if isinstance(inner, list):
+        return inner
+    return [] if inner in (None, "null", "") else [inner]
+
+
+def _f(v, default: float = 0.0) -> float:
+    try:
+        return float(v) if v not in (None, "", "null") else default
+    except (TypeError, ValueError):
+        return default
+
+
+def underlying_of(option_symbol: str) -> str:
+    """'SPY250620C00545000' → 'SPY' (OCC root)."""
+    m = _OCC_ROOT.match(option_symbol.removeprefix("O:"))
+    return m.group(1) if m else option_symbol
+
+# ---------------------------------------------------------------------------
+# Typed responses
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True, slots=True)
+class TradierQuote:
+    symbol:  str
+    bid:     float
+    ask:     float
+    last:    float
+    volume:  float
+    raw:     dict
+
+    @property
+    def mid(self) -> float:
+        return round((self.bid + self.ask) / 2, 4) if self.bid and self.ask else self.last
+
+    @classmethod
+    def from_api(cls, d: dict) -> "TradierQuote":
+        return cls(str(d.get("symbol", "")), _f(d.get("bid")), _f(d.get("ask")),
+                   _f(d.get("last")), _f(d.get("volume")), d)
+
+
+@dataclass(frozen=True, slots=True)
+class OptionContract:
+    symbol:      str
+    underlying:  str
+    strike:      float
+    option_type: str        # "call" | "put"
+    expiration:  str        # YYYY-MM-DD
+    bid:         float
+    ask:         float
+    last:        float
+    open_interest: float
+    delta:       float
+    gamma:       float
+    iv:          float
+
+    @classmethod
+    def from_api(cls, d: dict) -> "OptionContract":
+        g = d.get("greeks") if isinstance(d.get("greeks"), dict) else {}
+        return cls(str(d.get("symbol", "")), str(d.get("underlying", "")), _f(d.get("strike")),
+                   str(d.get("option_type", "")), str(d.get("expiration_date", "")),
+                   _f(d.get("bid")), _f(d.get("ask")), _f(d.get("last")), _f(d.get("open_interest")),
+                   _f(g.get("delta")), _f(g.get("gamma")), _f(g.get("mid_iv") or g.get("smv_vol")))
+
+
+@dataclass(frozen=True, slots=True)
+class TradierPosition:
+    id:            str
+    symbol:        str
+    quantity:      float
+    cost_basis:    float
+    date_acquired: str
+
+    @classmethod
+    def from_api(cls, d: dict) -> "TradierPosition":
+        return cls(str(d.get("id", "")), str(d.get("symbol", "")), _f(d.get("quantity")),
+                   _f(d.get("cost_basis")), str(d.get("date_acquired", "")))
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass(frozen=True, slots=True)
+class TradierOrder:
+    id:             str
+    status:         str     # "ok" on placement; open / filled / canceled / rejected … afterwards
+    symbol:         str = ""
+    option_symbol:  str = ""
+    side:           str = ""
+    quantity:       float = 0.0
+    exec_quantity:  float = 0.0
+    avg_fill_price: float = 0.0
+    reason:         str = ""
+    raw:            dict = field(default_factory=dict, repr=False, compare=False)   # Tradier's order row
+
+    @property
+    def accepted(self) -> bool:
+        return self.status in {"ok", "open", "pending", "partially_filled", "filled"}
+
+    @property
+    def filled(self) -> bool:
+        return self.status == "filled"
+
+    @classmethod
+    def from_api(cls, d: dict) -> "TradierOrder":
+        return cls(str(d.get("id", "")), str(d.get("status", "unknown")), str(d.get("symbol", "")),
+                   str(d.get("option_symbol", "")), str(d.get("side", "")), _f(d.get("quantity")),
+                   _f(d.get("exec_quantity")), _f(d.get("avg_fill_price")),
+                   str(d.get("reason_description", "")), d)
+
+    def as_dict(self) -> dict:
+        out = asdict(self)
+        out.pop("raw")
+        return out
+
+
+@dataclass(frozen=True, slots=True)
+class TradierBalances:
+    total_equity:        float
+    total_cash:          float
+    option_buying_power: float
+    raw:                 dict
+
+    @classmethod
+    def from_api(cls, d: dict) -> "TradierBalances":
+        margin = d.get("margin") if isinstance(d.get("margin"), dict) else {}
+        cash = d.get("cash") if isinstance(d.get("cash"), dict) else {}
+        bp = margin.get("option_buying_power", cash.get("cash_available", d.get("total_cash")))
+        return cls(_f(d.get("total_equity")), _f(d.get("total_cash")), _f(bp), d)
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+class TradierAsync:
+    def __init__(self, base_url: str = TRADIER_API_BASE, account_id: str = TRADIER_ACCOUNT_ID):
+        self.base_url = base_url.rstrip("/")
+        self.account_id = account_id
+
+    async def _request(self, method: str, path: str, *, params: dict | None = None,
+                       data: dict | None = None, timeout: float | None = None) -> dict:
+        url = f"{self.base_url}{path}"
+        kwargs: Dict[str, Any] = {"params": params, "data": data, "headers": _headers()}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        try:
+            r = await get_async_client(url).request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            raise TradierError(f"{method} {path}: {type(e).__name__} {e}") from e
+        try:
+            body = r.json() if r.content else {}
+        except ValueError:
+            body = {"raw": r.text}
+        if r.status_code >= 400:
+            raise TradierError(f"{method} {path}: HTTP {r.status_code}", r.status_code, body)
+        if isinstance(body, dict) and body.get("errors"):
+            raise TradierError(f"{method} {path}: {_as_list(body['errors'], 'error') or body['errors']}",
+                               r.status_code, body)
+        return body if isinstance(body, dict) else {}
+
+    def _account(self, suffix: str) -> str:
+        return f"/accounts/{self.account_id}/{suffix}"
+
+    # ── market data ──────────────────────────────────────────────────────────
+    async def quotes(self, *symbols: str, greeks: bool = False) -> List[TradierQuote]:
+        body = await self._request("GET", "/markets/quotes",
+                                   params={"symbols": ",".join(symbols), "greeks": str(greeks).lower()})
+        return [TradierQuote.from_api(q) for q in _as_list(body.get("quotes"), "quote")]
+
+    async def quote(self, symbol: str) -> Optional[TradierQuote]:
+        rows = await self.quotes(symbol)
+        return rows[0] if rows else None
+
+    async def expirations(self, symbol: str = "SPY") -> List[str]:
+        body = await self._request("GET", "/markets/options/expirations", params={"symbol": symbol})
+        return [str(d) for d in _scalars(body.get("expirations"), "date")]
+
+    async def strikes(self, symbol: str, expiration: str) -> List[float]:
+        body = await self._request("GET", "/markets/options/strikes",
+                                   params={"symbol": symbol, "expiration": expiration})
+        return sorted(_f(k) for k in _scalars(body.get("strikes"), "strike"))
+
+    async def chain(self, symbol: str, expiration: str, greeks: bool = True) -> List[OptionContract]:
+        body = await self._request("GET", "/markets/options/chains",
+                                   params={"symbol": symbol, "expiration": expiration,
+                                           "greeks": str(greeks).lower()})
+        return [OptionContract.from_api(o) for o in _as_list(body.get("options"), "option")]
+
+    # ── account ──────────────────────────────────────────────────────────────
+    async def balances(self) -> TradierBalances:
+        body = await self._request("GET", self._account("balances"))
+        return TradierBalances.from_api(body.get("balances") if isinstance(body.get("balances"), dict) else {})
+
+    async def positions(self) -> List[TradierPosition]:
+        body = await self._request("GET", self._account("positions"))
+        return [TradierPosition.from_api(p) for p in _as_list(body.get("positions"), "position")]
+
+    async def orders(self) -> List[TradierOrder]:
+        body = await self._request("GET", self._account("orders"))
+        return [TradierOrder.from_api(o) for o in _as_list(body.get("orders"), "order")]
+
+    async def order(self, order_id: str) -> Optional[TradierOrder]:
+        body = await self._request("GET", self._account(f"orders/{order_id}"))
+        rows = _as_list(body, "order")
+        return TradierOrder.from_api(rows[0]) if rows else None
+
+    # ── orders ───────────────────────────────────────────────────────────────
+    async def place_option_order(
+        self,
+        option_symbol: str,
+        quantity: int,
+        side: OrderSide,
+        *,
+        order_type: Literal["market", "limit"] = "market",
+        price: float | None = None,
+        duration: str = "day",
+        tag: str | None = None,
+    ) -> TradierOrder:
+        """Submit a single-leg option order; returns the placement ack (status "ok")."""
+        option_symbol = option_symbol.removeprefix("O:")
+        if os.getenv("ALLOW_ORDER_SUBMISSION", "1") == "0":
+            logger.info({"event": "order_skipped_test_mode", "option_symbol": option_symbol})
+            return TradierOrder(id="", status="skipped", option_symbol=option_symbol, side=side,
+                                quantity=float(quantity), reason="test_mode")
+        if quantity < 1:
+            raise TradierError(f"invalid quantity {quantity}")
+        payload = {
+            "class": "option",
+            "symbol": underlying_of(option_symbol),
+            "option_symbol": option_symbol,
+            "side": side,
+            "quantity": str(int(quantity)),
+            "type": order_type,
+            "duration": duration,
+            "price": price if order_type == "limit" else None,
+            "tag": tag,
+        }
+        payload = {k: v for k, v in payload.items() if v is not None}
+        body = await self._request("POST", self._account("orders"), data=payload, timeout=ORDER_TIMEOUT)
+        rows = _as_list(body, "order")
+        if not rows:
+            raise TradierError(f"order ack missing: {str(body)[:300]}", body=body)
+        order = TradierOrder.from_api({**rows[0], "option_symbol": option_symbol, "side": side,
+                                       "quantity": quantity})
+        logger.info({"event": "tradier_order_placed", "id": order.id, "status": order.status,
+                     "option_symbol": option_symbol, "side": side, "qty": quantity})
+        return order
+
+    async def cancel_order(self, order_id: str) -> Optional[TradierOrder]:
+        body = await self._request("DELETE", self._account(f"orders/{order_id}"))
+        rows = _as_list(body, "order")
+        return TradierOrder.from_api(rows[0]) if rows else None
+
+
+_TRADIER = TradierAsync()
+
+
+def get_tradier() -> TradierAsync:
+    return _TRADIER
+
+
+__all__ = [
+    "TradierAsync",
+    "TradierError",
+    "TradierQuote",
+    "OptionContract",
+    "TradierPosition",
+    "TradierOrder",
+    "TradierBalances",
+    "get_tradier",
+    "underlying_of",
+]
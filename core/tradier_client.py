@@ -2,8 +2,8 @@
 
 import os
 import json
-import requests
 from dotenv import load_dotenv
+from core.http_clients import get_client
 from core.resilient_request import resilient_post
 
 load_dotenv()
@@ -18,16 +18,18 @@ HEADERS = {
     "Content-Type": "application/x-www-form-urlencoded"
 }
 
+_http = get_client(TRADIER_API_URL)     # pooled keep-alive connection to Tradier
+
 # 📊 Account + Market Data Functions
 def get_account_profile():
     url = f"{TRADIER_API_URL}/user/profile"
-    response = requests.get(url, headers=HEADERS)
+    response = _http.get(url, headers=HEADERS)
     return response.json()
 
 def get_account_balances(verbose=False):
     url = f"{TRADIER_API_URL}/accounts/{TRADIER_ACCOUNT_ID}/balances"
     try:
-        response = requests.get(url, headers=HEADERS)
+        response = _http.get(url, headers=HEADERS)
         response.raise_for_status()
         data = response.json()
         if verbose:
@@ -40,7 +42,7 @@ def get_account_balances(verbose=False):
 def get_positions():
     url = f"{TRADIER_API_URL}/accounts/{TRADIER_ACCOUNT_ID}/positions"
     try:
-        response = requests.get(url, headers=HEADERS)
+        response = _http.get(url, headers=HEADERS)
         response.raise_for_status()
         data = response.json()
 
@@ -65,13 +67,13 @@ def get_option_chain(symbol, expiration=None):
     params = {"symbol": symbol}
     if expiration:
         params["expiration"] = expiration
-    response = requests.get(url, headers=HEADERS, params=params)
+    response = _http.get(url, headers=HEADERS, params=params)
     return response.json()
 
 def get_quote(symbol):
     url = f"{TRADIER_API_URL}/markets/quotes"
     params = {"symbols": symbol}
-    response = requests.get(url, headers=HEADERS, params=params)
+    response = _http.get(url, headers=HEADERS, params=params)
     return response.json()
 
 # 🚫 Not for production algo use — generic low-level wrapper for Tradier API
@@ -103,12 +105,12 @@ def submit_order(option_symbol, quantity, action="buy_to_open", order_type="mark
 
 def cancel_order(order_id):
     url = f"{TRADIER_API_URL}/accounts/{TRADIER_ACCOUNT_ID}/orders/{order_id}/cancel"
-    response = requests.delete(url, headers=HEADERS)
+    response = _http.delete(url, headers=HEADERS)
     return response.json()
 
 def get_order_status(order_id):
     url = f"{TRADIER_API_URL}/accounts/{TRADIER_ACCOUNT_ID}/orders/{order_id}"
-    response = requests.get(url, headers=HEADERS)
+    response = _http.get(url, headers=HEADERS)
     return response.json()
 
 def parse_account_balances(data):
@@ -3,18 +3,18 @@
 from __future__ import annotations
 
 import os
-import requests
 from datetime import datetime, timedelta, date
 from typing import Dict, Any, Optional, List
 
 from core.logger_setup import logger
+from core.http_clients import get_client
 from core.resilient_request import resilient_get
 
 TRADIER_API_KEY    = os.getenv("TRADIER_ACCESS_TOKEN", "")
 TRADIER_ACCOUNT_ID = os.getenv("TRADIER_ACCOUNT_ID", "")
 TRADIER_API_BASE   = os.getenv("TRADIER_API_BASE", "https://sandbox.tradier.com/v1").rstrip("/")
 
-_session = requests.Session()
+_session = get_client(TRADIER_API_BASE)
 
 def _log(event: str, **kv):
     logger.info({"src": "tradier_exec", "event": event, **kv})
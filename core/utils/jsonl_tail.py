@@ -0,0 +1,69 @@
+# File: core/utils/jsonl_tail.py
+# Reverse-seek readers for append-only JSONL logs
+
+import json
+import os
+
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_lines_reversed(path, chunk_size=CHUNK_SIZE):
+    """
+    Yield the raw lines of *path* last-first, reading fixed-size blocks
+    backwards from EOF. Cost is proportional to what is consumed, not to the
+    file size. A partially written final line is yielded like any other.
+    """
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        rest = b""
+        while pos > 0:
+            step = min(chunk_size, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + rest).split(b"\n")
+            rest = lines.pop(0)          # may continue in the previous block
+            for line in reversed(lines):
+                if line.strip():
+                    yield line
+        if rest.strip():
+            yield rest
+
+
+def tail_jsonl(path, limit, predicate=None, chunk_size=CHUNK_SIZE):
+    """
+    Last *limit* parseable records of a JSONL file, oldest first.
+    Lines that fail to parse (torn writes) are skipped; *predicate* filters
+    records. Missing file → [].
+    """
+    if limit <= 0 or not os.path.exists(path):
+        return []
+    out = []
+    for raw in iter_lines_reversed(path, chunk_size):
+        try:
+            rec = json.loads(raw)
+        except ValueError:
+            continue
+        if predicate is None or predicate(rec):
+            out.append(rec)
+            if len(out) >= limit:
+                break
+    out.reverse()
+    return out
+
+
+def iter_jsonl_from(path, offset=0):
+    """
+    Yield (end_offset, record) for each complete line after byte *offset*.
+    Unparseable lines yield record None; a torn final line is left for the
+    next call (its bytes are not consumed).
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            offset += len(raw)
+            try:
+                yield offset, json.loads(raw)
+            except ValueError:
+                yield offset, None
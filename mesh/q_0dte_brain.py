@@ -5,12 +5,11 @@ import json
 from datetime import datetime
 from mesh.q_0dte_memory import store_snapshot, fetch_recent_snapshots
 from qthink.qthink_pattern_matcher import gpt_reflect_on_patterns
-from polygon.polygon_utils import (
-    get_vwap_diff,
-    get_gex_score,
-    get_skew,
-    get_intraday_returns
-)
+from core.feature_graph import get_features
+from analytics.state_index import get_state_index
+
+NEIGHBORS = 25
+MIN_DECIDED = 5            # neighbours with a recorded win/loss before memory moves the score
 
 def score_current_state(state_vector: dict) -> dict:
     spy_price = state_vector.get("spy_price", 0)
@@ -43,12 +42,22 @@ def score_current_state(state_vector: dict) -> dict:
     }
 
 def score_and_log(state_vector: dict):
+    """Rule score blended with the outcomes of the most similar stored states, then logged."""
     scored = score_current_state(state_vector)
+    memory = get_state_index().query(state_vector, k=NEIGHBORS)   # before logging: not its own neighbour
+    if memory.wins + memory.losses >= MIN_DECIDED:
+        scored["confidence"] = round(0.5 * scored["confidence"] + 0.5 * memory.win_rate, 3)
+    scored["memory"] = memory.as_dict()
     store_snapshot(state_vector, pattern_tag=scored["pattern_tag"])
     return scored
 
-def compare_to_memory():
-    recent = fetch_recent_snapshots(limit=20)
+def compare_to_memory(state_vector: dict = None):
+    """GPT reflection on the 20 most similar past states (the 20 most recent without a state)."""
+    if state_vector is not None:
+        recent = [{"pattern_tag": n.tag, "result": n.outcome}
+                  for n in get_state_index().query(state_vector, k=20).neighbors]
+    else:
+        recent = fetch_recent_snapshots(limit=20)
     summary = {
         "tags": [snap.get("pattern_tag", "") for snap in recent if snap.get("pattern_tag")],
         "result_outcomes": [snap.get("result", "") for snap in recent if snap.get("result")]
@@ -63,20 +72,11 @@ def compare_to_memory():
         return {"error": str(e), "status": "GPT reflection failed"}
 
 # Live signal builder for mesh_router
-def get_0dte_brain_signal() -> dict:
+def get_0dte_brain_signal(ctx=None) -> dict:
     try:
-        vwap_diff = get_vwap_diff("SPY")
-        gex = get_gex_score("SPY")
-        skew = get_skew("SPY")
-        spy_return = get_intraday_returns("SPY")
-
-        state = {
-            "spy_price": spy_return.get("price", 0),
-            "vwap_diff": vwap_diff,
-            "gex": gex,
-            "skew": skew,
-            "return": spy_return.get("return", 0)
-        }
+        f = get_features(ctx)
+        state = f.many(("spy_price", "vwap_diff", "gex", "skew", "vix", "time_of_day_bin"))
+        state["return"] = f.get("intraday_return")
 
         result = score_and_log(state)
         return {
@@ -86,6 +86,7 @@ def get_0dte_brain_signal() -> dict:
             "pattern": result["pattern_tag"],
             "confidence": round(result["confidence"] * 100),
             "features": state,
+            "memory": result["memory"],
             "timestamp": datetime.utcnow().isoformat()
         }
     except Exception as e:
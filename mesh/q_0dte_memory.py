@@ -1,64 +1,159 @@
 # File: mesh/q_0dte_memory.py
 # Purpose: Persistent memory for Q-0DTE pattern recognition snapshots
+#
+# logs/q_0dte_memory.jsonl is append-only and grows with every mesh cycle, so
+# nothing here re-reads it whole:
+#   • the last RING_SIZE snapshots live in memory; a cold start fills the
+#     ring with a reverse-seek tail read (core.utils.jsonl_tail)
+#   • pattern/outcome counters are updated on each append and checkpointed
+#     with the byte offset they cover; a restart loads the checkpoint and
+#     counts only the lines appended after it
 
-import os
 import json
+import os
+import threading
+from collections import deque
 from datetime import datetime
 
+from core.logger_setup import logger
+from core.utils.atomic_write import atomic_write_json
+from core.utils.jsonl_tail import iter_jsonl_from, tail_jsonl
+
 MEMORY_LOG_PATH = "logs/q_0dte_memory.jsonl"
+SUMMARY_PATH = "logs/q_0dte_memory_summary.json"
+RING_SIZE = 500
+CHECKPOINT_EVERY = 50      # appends between counter checkpoints
+
+
+def _bump(counters: dict, snap: dict) -> None:
+    tag = snap.get("pattern_tag", "unknown")
+    result = snap.get("result", None)  # Expects "win", "loss", or score
+    row = counters.setdefault(tag, {"count": 0, "wins": 0, "losses": 0, "others": 0})
+    row["count"] += 1
+    if result == "win":
+        row["wins"] += 1
+    elif result == "loss":
+        row["losses"] += 1
+    else:
+        row["others"] += 1
+
+
+class MemoryStore:
+    def __init__(self, path: str = MEMORY_LOG_PATH, summary_path: str = SUMMARY_PATH,
+                 ring_size: int = RING_SIZE):
+        self.path = path
+        self.summary_path = summary_path
+        self._lock = threading.Lock()
+        self._ring = deque(maxlen=ring_size)
+        self._counters = {}
+        self._offset = 0            # bytes of the log reflected in _counters
+        self._since_checkpoint = 0
+        self._loaded = False
+        self._listeners = []
+
+    # ── cold start ───────────────────────────────────────────────────────────
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._ring.extend(tail_jsonl(self.path, self._ring.maxlen))
+        try:
+            with open(self.summary_path) as f:
+                ckpt = json.load(f)
+            self._counters, self._offset = ckpt["patterns"], int(ckpt["offset"])
+        except (OSError, ValueError, KeyError, TypeError):
+            self._counters, self._offset = {}, 0
+        self._catch_up()
+        self._loaded = True
+
+    def _catch_up(self) -> None:
+        """Count lines appended after the checkpoint (everything, if the log was rotated)."""
+        if not os.path.exists(self.path):
+            self._counters, self._offset = {}, 0
+            return
+        if os.path.getsize(self.path) < self._offset:
+            self._counters, self._offset = {}, 0
+        for self._offset, snap in iter_jsonl_from(self.path, self._offset):
+            if snap is not None:
+                _bump(self._counters, snap)
+        self._checkpoint()
+
+    def _checkpoint(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.summary_path) or ".", exist_ok=True)
+            atomic_write_json(self.summary_path, {"offset": self._offset, "patterns": self._counters})
+            self._since_checkpoint = 0
+        except OSError as e:
+            logger.warning({"event": "q0dte_memory_checkpoint_fail", "error": str(e)})
+
+    # ── public API ───────────────────────────────────────────────────────────
+    def append(self, entry: dict) -> None:
+        line = (json.dumps(entry) + "\n").encode()
+        with self._lock:
+            self._load()
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(line)
+            self._ring.append(entry)
+            _bump(self._counters, entry)
+            self._offset += len(line)
+            self._since_checkpoint += 1
+            if self._since_checkpoint >= CHECKPOINT_EVERY:
+                self._checkpoint()
+            for fn in self._listeners:
+                fn(entry, self._offset)
+
+    def subscribe(self, fn) -> None:
+        """Call fn(entry, end_offset) after every append (e.g. analytics.state_index)."""
+        self._listeners.append(fn)
+
+    def recent(self, limit: int = 20) -> list:
+        with self._lock:
+            self._load()
+            if limit > self._ring.maxlen:
+                return tail_jsonl(self.path, limit)
+            return list(self._ring)[-limit:] if limit > 0 else []
+
+    def summary(self) -> dict:
+        with self._lock:
+            self._load()
+            return {tag: dict(row) for tag, row in self._counters.items()}
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._loaded and self._since_checkpoint:
+                self._checkpoint()
+
+
+_STORE = MemoryStore()
+
+
+def get_memory_store() -> MemoryStore:
+    return _STORE
+
 
 def store_snapshot(state_vector: dict, pattern_tag: str = "unknown"):
     """
     Stores a snapshot of the current 0DTE market state with an optional pattern tag.
     """
-    os.makedirs(os.path.dirname(MEMORY_LOG_PATH), exist_ok=True)
-
     entry = {
         "timestamp": datetime.utcnow().isoformat(),
         "pattern_tag": pattern_tag,
         "state_vector": state_vector
     }
+    _STORE.append(entry)
 
-    with open(MEMORY_LOG_PATH, "a") as f:
-        f.write(json.dumps(entry) + "\n")
 
 def fetch_recent_snapshots(limit: int = 20):
     """
-    Retrieves the most recent N memory snapshots from the memory log.
+    Retrieves the most recent N memory snapshots (from the in-memory ring).
     """
-    if not os.path.exists(MEMORY_LOG_PATH):
-        return []
+    return _STORE.recent(limit)
 
-    with open(MEMORY_LOG_PATH, "r") as f:
-        lines = [json.loads(line) for line in f if line.strip()]
-
-    return lines[-limit:] if len(lines) >= limit else lines
 
 def summarize_patterns_with_outcomes():
     """
-    Builds a summary of all known pattern tags and their recorded outcomes (PnL, results, regret, etc.).
+    Summary of all known pattern tags and their recorded outcomes (wins / losses / others),
+    maintained incrementally as snapshots are stored.
     Assumes `result` field is written back into snapshots post-trade.
     """
-    if not os.path.exists(MEMORY_LOG_PATH):
-        return {}
-
-    with open(MEMORY_LOG_PATH, "r") as f:
-        lines = [json.loads(line) for line in f if line.strip()]
-
-    summary = {}
-    for snap in lines:
-        tag = snap.get("pattern_tag", "unknown")
-        result = snap.get("result", None)  # Expects "win", "loss", or score
-
-        if tag not in summary:
-            summary[tag] = {"count": 0, "wins": 0, "losses": 0, "others": 0}
-
-        summary[tag]["count"] += 1
-        if result == "win":
-            summary[tag]["wins"] += 1
-        elif result == "loss":
-            summary[tag]["losses"] += 1
-        else:
-            summary[tag]["others"] += 1
-
-    return summary
+    return _STORE.summary()
@@ -3,27 +3,25 @@
 
 import datetime
 from typing import Optional
-from polygon.polygon_utils import round_to_nearest_strike, get_open_interest_by_strike
+from polygon.polygon_utils import round_to_nearest_strike
+from polygon.open_interest import get_open_interest
 from polygon.polygon_rest import get_last_price
 from core.logger_setup import logger
 
 OI_THRESHOLD = 10000
 
-def detect_order_block_signal() -> Optional[dict]:
+def detect_order_block_signal(ctx=None) -> Optional[dict]:
     try:
-        price = get_last_price("SPY")
+        price = ctx.price if ctx else get_last_price("SPY")
         if not price:
             return None
 
         strike = round_to_nearest_strike(price)
-        oi_map = get_open_interest_by_strike("SPY")
-
-        if str(strike) not in oi_map:
+        oi_table = get_open_interest().get()      # loaded once pre-market, array lookup after
+        if oi_table is None:
             return None
 
-        zone = oi_map[str(strike)]
-        call_oi = zone.get("call_oi", 0)
-        put_oi = zone.get("put_oi", 0)
+        call_oi, put_oi = oi_table.at(strike)
 
         if max(call_oi, put_oi) < OI_THRESHOLD:
             return None
@@ -43,7 +41,8 @@ def detect_order_block_signal() -> Optional[dict]:
                 "price": price,
                 "call_oi": call_oi,
                 "put_oi": put_oi,
-                "oi_ratio": round(oi_ratio, 4)
+                "oi_ratio": round(oi_ratio, 4),
+                "max_pain": oi_table.max_pain()
             },
             "timestamp": datetime.datetime.utcnow().isoformat()
         }
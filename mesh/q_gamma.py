@@ -1,54 +1,27 @@
 # File: mesh/q_gamma.py — Updated for full real-time GEX/DEX logic
 
-import os
 import json
 from datetime import datetime
-from polygon.polygon_utils import (
-    get_realtime_price, round_to_nearest_strike
-)
-from polygon.polygon_options import get_option_chain_gex
+from polygon.polygon_utils import get_realtime_price
+from analytics.gex_engine import SNAPSHOT_PATH, GEX_INTERVAL, get_gex_engine
 from core.logger_setup import logger
 
-SNAPSHOT_PATH = "data/gex_ml_snapshots/latest_gex.json"
-HISTORICAL_PATH = f"data/gex_ml_snapshots/gex_{datetime.utcnow().date()}.json"
-
 def write_gex_snapshot():
+    """Forces a GEX engine update from the shared chain snapshot (persisted by the engine)."""
     try:
-        price = get_realtime_price("SPY")
-        if not price:
-            raise ValueError("Missing SPY price")
-
-        data = get_option_chain_gex("SPY", price)
-        if not data or "gex_map" not in data:
-            raise ValueError("Malformed GEX data")
-
-        gex_map = data["gex_map"]
-        dealer_bias = data.get("dealer_bias", "neutral")
-        flip_zone = data.get("gamma_flip_zone")
-
-        snapshot = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "spy_price": price,
-            "gex_map": gex_map,
-            "dealer_bias": dealer_bias,
-            "gamma_flip_zone": flip_zone,
-            "max_gex_strike": max(gex_map, key=gex_map.get, default=None),
-            "min_gex_strike": min(gex_map, key=gex_map.get, default=None),
-        }
-
-        os.makedirs(os.path.dirname(SNAPSHOT_PATH), exist_ok=True)
-        with open(SNAPSHOT_PATH, "w") as f:
-            json.dump(snapshot, f, indent=2)
-        with open(HISTORICAL_PATH, "w") as f:
-            json.dump(snapshot, f, indent=2)
-
-        print(f"✅ GEX snapshot saved to {SNAPSHOT_PATH}")
-        return snapshot
+        prof = get_gex_engine().refresh()
+        if prof is None:
+            raise ValueError("No GEX profile (empty 0DTE chain)")
+        return prof.as_snapshot()
     except Exception as e:
         logger.error({"agent": "q_gamma", "event": "snapshot_fail", "error": str(e)})
         return None
 
 def load_latest_gex_snapshot():
+    """In-memory profile from the GEX engine; the on-disk snapshot only when the engine has none."""
+    prof = get_gex_engine().current(max_age=GEX_INTERVAL * 4)
+    if prof is not None:
+        return prof.as_snapshot()
     try:
         with open(SNAPSHOT_PATH, "r") as f:
             return json.load(f)
@@ -56,13 +29,13 @@ def load_latest_gex_snapshot():
         logger.warning({"agent": "q_gamma", "event": "load_fail", "error": str(e)})
         return None
 
-def get_gamma_signal(force_refresh=False) -> dict | None:
+def get_gamma_signal(force_refresh=False, ctx=None) -> dict | None:
     try:
         snapshot = write_gex_snapshot() if force_refresh else load_latest_gex_snapshot()
         if not snapshot:
             return None
 
-        price = get_realtime_price("SPY")
+        price = ctx.price if ctx else get_realtime_price("SPY")
         flip_zone = snapshot.get("gamma_flip_zone")
         dealer_bias = snapshot.get("dealer_bias", "neutral")
         gex_map = snapshot.get("gex_map", {})
@@ -5,7 +5,7 @@ from polygon.polygon_rest import get_last_price
 from polygon.polygon_utils import get_intraday_returns, get_vwap
 from core.logger_setup import logger
 
-def sniper_entry_signal(symbol="SPY"):
+def sniper_entry_signal(symbol="SPY", ctx=None):
     """
     High-precision SPY signal based on:
     - VWAP vs. price
@@ -13,9 +13,12 @@ def sniper_entry_signal(symbol="SPY"):
     - Latency placeholder (can be enhanced)
     """
     try:
-        price = get_last_price(symbol)
-        vwap = get_vwap(symbol)
-        returns = get_intraday_returns(symbol, minutes=5)
+        if ctx is not None:
+            price, vwap, returns = ctx.price, ctx.vwap, ctx.returns
+        else:
+            price = get_last_price(symbol)
+            vwap = get_vwap(symbol)
+            returns = get_intraday_returns(symbol, minutes=5)
 
         if not price or not vwap or not returns:
             return None
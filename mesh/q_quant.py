@@ -3,37 +3,31 @@
 
 import datetime
 from typing import Optional
-from polygon.polygon_iv_surface import build_iv_surface
+from analytics.iv_surface import get_iv_surface_engine
 from polygon.polygon_utils import round_to_nearest_strike
 from polygon.polygon_rest import get_last_price
 from core.logger_setup import logger
 
-def get_quant_signal(symbol: str = "SPY") -> Optional[dict]:
+def get_quant_signal(symbol: str = "SPY", ctx=None) -> Optional[dict]:
     """
     Identifies statistical edge based on implied volatility skew and compression.
+    IVs are read from the fitted 0DTE smile, so listed strikes with no IV never blank the signal.
     """
     try:
-        surface = build_iv_surface(symbol)
-        if not surface:
+        surface = get_iv_surface_engine().surface()
+        if surface is None or not surface.smiles:
             return None
 
-        today = max(surface.keys())
-        strikes = list(surface[today].keys())
-        if not strikes:
-            return None
-
-        price = get_last_price()
+        price = ctx.price if ctx else get_last_price()
         if not price or price < 100:
             return None
 
         atm_strike = round_to_nearest_strike(price)
 
-        iv_atm = surface[today].get(atm_strike)
-        iv_up  = surface[today].get(atm_strike + 10)
-        iv_down = surface[today].get(atm_strike - 10)
-
-        if any(v is None for v in [iv_atm, iv_up, iv_down]):
-            return None
+        smile = surface.smile()
+        iv_atm  = round(smile.iv(atm_strike), 4)
+        iv_up   = round(smile.iv(atm_strike + 10), 4)
+        iv_down = round(smile.iv(atm_strike - 10), 4)
 
         skew = round(iv_down - iv_up, 4)
         crush_score = round(1.0 - iv_atm, 3) if iv_atm < 0.3 else 0.2
@@ -53,7 +47,8 @@ def get_quant_signal(symbol: str = "SPY") -> Optional[dict]:
                 "iv_down": iv_down,
                 "crush_score": crush_score,
                 "price": price,
-                "atm_strike": atm_strike
+                "atm_strike": atm_strike,
+                "smile_fit": "svi" if smile.params is not None else "interp"
             },
             "timestamp": datetime.datetime.utcnow().isoformat()
         }
@@ -8,14 +8,14 @@ from qthink.qthink_pattern_matcher import gpt_reflect_on_patterns
 from core.logger_setup import logger
 
 
-def get_scout_signal(symbol="SPY"):
+def get_scout_signal(symbol="SPY", ctx=None):
     """
     Produces a pattern-based GPT signal for SPY 0DTE scalping.
     Uses intraday return, VWAP diff, and GPT scoring.
     """
     try:
-        intraday_return = get_intraday_returns(symbol)
-        vwap = get_vwap(symbol)
+        intraday_return = ctx.returns if ctx else get_intraday_returns(symbol)
+        vwap = ctx.vwap if ctx else get_vwap(symbol)
         features = {
             "intraday_return": intraday_return,
             "vwap": vwap,
@@ -4,6 +4,7 @@ import datetime
 from polygon.polygon_utils import get_intraday_returns, get_vwap
 from polygon.polygon_rest import get_last_price
 from core.logger_setup import logger
+from core.feature_graph import get_features
 
 
 def detect_dark_flow_anomaly(price: float, vwap: float, returns: list[float]) -> dict:
@@ -47,11 +48,15 @@ def detect_dark_flow_anomaly(price: float, vwap: float, returns: list[float]) ->
     }
 
 
-def get_shadow_signal() -> dict | None:
+def get_shadow_signal(ctx=None) -> dict | None:
     try:
-        price = get_last_price("SPY")
-        vwap = get_vwap("SPY")
-        returns = get_intraday_returns("SPY")
+        if ctx is not None:
+            f = get_features(ctx)
+            price, vwap, returns = f.get("price"), f.get("vwap"), ctx.returns
+        else:
+            price = get_last_price("SPY")
+            vwap = get_vwap("SPY")
+            returns = get_intraday_returns("SPY")
 
         if not price or not vwap or not returns:
             logger.warning("q_shadow missing data inputs")
@@ -9,7 +9,7 @@ from core.logger_setup import logger
 VIX_DATA_PATH = "data/vix_watchlist.json"
 
 
-def get_shield_signal():
+def get_shield_signal(ctx=None):
     """
     Detects macro volatility shocks using VIX, VVIX, and SPY divergence.
     Emits directional defense signal with confidence and rationale.
@@ -40,7 +40,7 @@ def get_shield_signal():
     delta_vix_1d = ((vix_now - vix_1d) / max(1, vix_1d)) * 100
     delta_vvix_1h = ((vvix_now - vvix_1h) / max(1, vvix_1h)) * 100
     spy_change = ((spy_now - spy_prev) / max(1, spy_prev)) * 100
-    intraday_rets = get_intraday_returns("SPY")
+    intraday_rets = ctx.returns if ctx else get_intraday_returns("SPY")
 
     reasons = []
     score = 85
@@ -8,18 +8,24 @@ from polygon.polygon_utils import (
     get_recent_volume
 )
 from core.logger_setup import logger
+from core.feature_graph import get_features
 
-def get_trap_signal() -> dict | None:
+def get_trap_signal(ctx=None) -> dict | None:
     try:
-        price = get_realtime_price("SPY")
-        vwap = get_vwap("SPY")
-        volume = get_recent_volume("SPY")
-        intraday = get_intraday_returns("SPY")
+        if ctx is not None:
+            f = get_features(ctx)
+            price, vwap, volume, intraday = f.get("price"), f.get("vwap"), f.get("volume"), ctx.returns
+            vwap_diff = f.get("vwap_diff")
+        else:
+            price = get_realtime_price("SPY")
+            vwap = get_vwap("SPY")
+            volume = get_recent_volume("SPY")
+            intraday = get_intraday_returns("SPY")
+            vwap_diff = price - vwap if price and vwap else 0.0
 
         if not price or not vwap:
             return None
 
-        vwap_diff = price - vwap
         early_gain = intraday.get("first_hour_return", 0)
         fade_from_high = intraday.get("high_to_current_return", 0)
         fade_from_low = intraday.get("low_to_current_return", 0)
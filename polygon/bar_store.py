@@ -0,0 +1,341 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: polygon/bar_store.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+In-process intraday 1-minute bar store.
+
+Every intraday helper (VWAP, recent volume, intraday returns, RSI / VWAP
+reclaim via `get_historic_bars`) reads bars from here instead of issuing its
+own `/v2/aggs` request.
+
+* Seeded once per session day from REST (lazy, on first read)
+* Kept current by the stocks websocket `AM.*` (minute) and `A.*` (second)
+  aggregate channels – second aggregates merge into the in-progress minute,
+  the minute aggregate then replaces it authoritatively
+* Fixed-size ring buffer per symbol (`POLYGON_BAR_CAPACITY` minutes)
+* If the feed goes quiet for `POLYGON_BAR_RESYNC` seconds, readers top the
+  ring up from REST (incrementally, from the last stored minute)
+* Listeners receive `(symbol, bar, final)` for every update
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+from dotenv import load_dotenv
+
+from core.http_clients import get_client
+from core.logger_setup import get_logger
+from core.market_hours import _now_et
+
+load_dotenv()
+logger = get_logger(__name__)
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+POLYGON_API_KEY = os.getenv("POLYGON_API_KEY", "")
+AGGS_URL        = "https://api.polygon.io/v2/aggs/ticker"
+BAR_CAPACITY    = int(os.getenv("POLYGON_BAR_CAPACITY", "960"))     # 04:00–20:00 ET
+RESYNC_AFTER    = float(os.getenv("POLYGON_BAR_RESYNC", "90"))      # seconds
+FETCH_TIMEOUT   = 10                                                # seconds
+
+FIELDS = ("t", "o", "h", "l", "c", "v", "vw")
+_T, _O, _H, _L, _C, _V, _VW = range(len(FIELDS))
+_MINUTE_MS = 60_000
+
+BarListener = Callable[[str, dict, bool], None]
+
+
+_DAY_CACHE = [0.0, ""]   # [computed_at, date] – refreshed at most once a second
+
+
+def session_date() -> str:
+    """Today's trading date in US/Eastern (Polygon's aggs date boundary)."""
+    now = time.time()
+    if now - _DAY_CACHE[0] >= 1.0:
+        _DAY_CACHE[1] = _now_et().strftime("%Y-%m-%d")
+        _DAY_CACHE[0] = now
+    return _DAY_CACHE[1]
+
+# ---------------------------------------------------------------------------
+# Ring buffer
+# ---------------------------------------------------------------------------
+class BarRing:
+    """Fixed-capacity, time-ordered ring of 1-minute bars for one symbol."""
+    __slots__ = ("capacity", "_buf", "_head", "_size")
+
+    def __init__(self, capacity: int = BAR_CAPACITY):
+        self.capacity = capacity
+        self._buf = np.zeros((capacity, len(FIELDS)))
+        self._head = 0          # next write slot
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _slot(self, i: int) -> int:
+        """Physical slot of the i-th bar, oldest first (negative = from newest)."""
+        if i < 0:
+            i += self._size
+        return (self._head - self._size + i) % self.capacity
+
+    @property
+    def last_t(self) -> int:
+        return int(self._buf[self._slot(-1), _T]) if self._size else 0
+
+    def clear(self) -> None:
+        self._head = self._size = 0
+
+    def upsert(self, row: np.ndarray, merge: bool = False) -> np.ndarray | None:
+        """
+        Insert or update the bar starting at row[t]. With *merge* the row is a
+        partial (second) aggregate folded into the existing minute. Returns the
+        stored row, or None for a late bar that already fell off the ring.
+        """
+        t = row[_T]
+        if self._size and t <= self._buf[self._slot(-1), _T]:
+            for i in range(self._size - 1, -1, -1):
+                slot = self._slot(i)
+                cur_t = self._buf[slot, _T]
+                if cur_t == t:
+                    if merge:
+                        _merge_into(self._buf[slot], row)
+                    else:
+                        self._buf[slot] = row
+                    return self._buf[slot]
+                if cur_t < t:
+                    return None         # gap inside history – keep ordering strict
+            return None
+
+        slot = self._head
+        self._buf[slot] = row
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        return self._buf[slot]
+
+    def array(self, limit: int | None = None, first: bool = False) -> np.ndarray:
+        """Chronological copy of the newest (or, with *first*, oldest) *limit* bars."""
+        n = self._size if limit is None else max(0, min(limit, self._size))
+        start = 0 if first else self._size - n
+        idx = [(self._head - self._size + start + i) % self.capacity for i in range(n)]
+        return self._buf[idx].copy()
+
+
+def _merge_into(cur: np.ndarray, add: np.ndarray) -> None:
+    vol = cur[_V] + add[_V]
+    if vol > 0:
+        cur[_VW] = (cur[_VW] * cur[_V] + add[_VW] * add[_V]) / vol
+    cur[_H] = max(cur[_H], add[_H])
+    cur[_L] = min(cur[_L], add[_L])
+    cur[_C] = add[_C]
+    cur[_V] = vol
+
+
+def _row(bar: dict) -> np.ndarray:
+    close = float(bar.get("c") or 0.0)
+    return np.array([
+        float(bar.get("t") or 0),
+        float(bar.get("o") or close),
+        float(bar.get("h") or close),
+        float(bar.get("l") or close),
+        close,
+        float(bar.get("v") or 0.0),
+        float(bar.get("vw") or close),
+    ])
+
+
+def _as_dict(row: np.ndarray) -> dict:
+    d = dict(zip(FIELDS, row.tolist()))
+    d["t"] = int(d["t"])
+    return d
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+class MinuteBarStore:
+    def __init__(self, capacity: int = BAR_CAPACITY):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._rings: Dict[str, BarRing] = {}
+        self._day: Dict[str, str] = {}              # symbol → ET date of ring contents
+        self._seeded: Dict[str, str] = {}           # symbol → ET date seeded for
+        self._live_at: Dict[str, float] = {}        # last websocket update
+        self._synced_at: Dict[str, float] = {}      # last REST seed / top-up
+        self._listeners: List[BarListener] = []
+        self._stats = {"seeds": 0, "resyncs": 0, "ws_bars": 0, "late_drops": 0}
+
+    # ── internals ────────────────────────────────────────────────────────────
+    def _ring(self, symbol: str, today: str | None = None) -> BarRing:
+        ring = self._rings.get(symbol)
+        if ring is None:
+            ring = self._rings[symbol] = BarRing(self.capacity)
+        if today is not None and self._day.get(symbol) != today:
+            ring.clear()                        # session rollover
+            self._day[symbol] = today
+        return ring
+
+    def _fetch(self, symbol: str, start: str | int, end: str) -> List[dict]:
+        url = f"{AGGS_URL}/{symbol}/range/1/minute/{start}/{end}"
+        params = {"adjusted": "true", "sort": "asc", "limit": 50000, "apiKey": POLYGON_API_KEY}
+        try:
+            r = get_client(url).get(url, params=params, timeout=FETCH_TIMEOUT)
+            r.raise_for_status()
+            return r.json().get("results", []) or []
+        except Exception as e:
+            logger.error({"event": "bar_store_fetch_fail", "symbol": symbol, "err": str(e)})
+            return []
+
+    def _notify(self, symbol: str, bar: dict, final: bool) -> None:
+        for fn in list(self._listeners):
+            try:
+                fn(symbol, bar, final)
+            except Exception as e:
+                logger.error({"event": "bar_listener_fail", "symbol": symbol, "err": str(e)})
+
+    def _ensure_fresh(self, symbol: str) -> None:
+        today = session_date()
+        now = time.time()
+        if self._seeded.get(symbol) == today and (
+            now - self._live_at.get(symbol, 0) < RESYNC_AFTER
+            or now - self._synced_at.get(symbol, 0) < RESYNC_AFTER
+        ):
+            return
+        with self._sync_lock:
+            # re-check: another reader may have synced while we waited
+            if self._seeded.get(symbol) == today and (
+                time.time() - self._synced_at.get(symbol, 0) < RESYNC_AFTER
+            ):
+                return
+            if self._seeded.get(symbol) != today:
+                self.seed(symbol)
+            else:
+                self._resync(symbol, today)
+
+    def _resync(self, symbol: str, today: str) -> None:
+        with self._lock:
+            last_t = self._ring(symbol, today).last_t
+        bars = self._fetch(symbol, last_t or today, today)
+        with self._lock:
+            ring = self._ring(symbol, today)
+            for bar in bars:
+                ring.upsert(_row(bar))
+            self._synced_at[symbol] = time.time()
+        self._stats["resyncs"] += 1
+
+    # ── ingestion ────────────────────────────────────────────────────────────
+    def seed(self, symbol: str = "SPY") -> int:
+        """(Re)load today's minute bars from REST. Returns the number stored."""
+        today = session_date()
+        bars = self._fetch(symbol, today, today)
+        with self._lock:
+            ring = self._ring(symbol, today)
+            streamed = ring.array()             # websocket bars that beat the seed
+            ring.clear()
+            for bar in bars:
+                ring.upsert(_row(bar))
+            rest_last = ring.last_t
+            for row in streamed:
+                if row[_T] >= rest_last:
+                    ring.upsert(row)
+            self._seeded[symbol] = today
+            self._synced_at[symbol] = time.time()
+        self._stats["seeds"] += 1
+        logger.info({"event": "bar_store_seeded", "symbol": symbol, "bars": len(bars)})
+        return len(bars)
+
+    def ingest(self, event: dict) -> None:
+        """Apply one websocket aggregate (`ev` = "AM" minute or "A" second)."""
+        ev = event.get("ev")
+        symbol = event.get("sym")
+        if ev not in ("AM", "A") or not symbol:
+            return
+        start = int(event.get("s") or 0)
+        if not start:
+            return
+        row = _row({**event, "t": start - start % _MINUTE_MS})
+        final = ev == "AM"
+        with self._lock:
+            stored = self._ring(symbol, session_date()).upsert(row, merge=not final)
+            self._live_at[symbol] = time.time()
+            if stored is None:
+                self._stats["late_drops"] += 1
+                return
+            self._stats["ws_bars"] += final
+            bar = _as_dict(stored)
+        self._notify(symbol, bar, final)
+
+    def add_listener(self, fn: BarListener) -> None:
+        if fn not in self._listeners:
+            self._listeners.append(fn)
+
+    def remove_listener(self, fn: BarListener) -> None:
+        if fn in self._listeners:
+            self._listeners.remove(fn)
+
+    def reset(self) -> None:
+        """Forget all bars and sync state (replay / tests)."""
+        with self._lock:
+            self._rings.clear()
+            self._day.clear()
+            self._seeded.clear()
+            self._live_at.clear()
+            self._synced_at.clear()
+
+    def hold(self, symbol: str, day: str) -> None:
+        """Treat *symbol* as seeded for *day* and never REST-sync it (offline replay)."""
+        with self._lock:
+            self._seeded[symbol] = day
+            self._synced_at[symbol] = float("inf")
+
+    # ── reads ────────────────────────────────────────────────────────────────
+    def array(self, symbol: str = "SPY", limit: int | None = None, first: bool = False) -> np.ndarray:
+        """(n, 7) float array of FIELDS, chronological."""
+        self._ensure_fresh(symbol)
+        with self._lock:
+            return self._ring(symbol, session_date()).array(limit, first)
+
+    def bars(self, symbol: str = "SPY", limit: int | None = None, first: bool = False) -> List[dict]:
+        """Polygon-shaped bar dicts (t, o, h, l, c, v, vw), chronological."""
+        return [_as_dict(r) for r in self.array(symbol, limit, first)]
+
+    def last_close(self, symbol: str = "SPY") -> float:
+        arr = self.array(symbol, 1)
+        return float(arr[0, _C]) if len(arr) else 0.0
+
+    def session_vwap(self, symbol: str = "SPY") -> float:
+        """Volume-weighted typical price ((h+l+c)/3) across today's bars."""
+        arr = self.array(symbol)
+        vol = arr[:, _V].sum() if len(arr) else 0.0
+        if not vol:
+            return 0.0
+        typical = (arr[:, _H] + arr[:, _L] + arr[:, _C]) / 3
+        return float((typical * arr[:, _V]).sum() / vol)
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "symbols": len(self._rings),
+                "bars": sum(len(r) for r in self._rings.values())}
+
+
+_STORE = MinuteBarStore()
+
+
+def get_bar_store() -> MinuteBarStore:
+    return _STORE
+
+
+def get_minute_bars(symbol: str = "SPY", limit: int | None = None, first: bool = False) -> List[dict]:
+    return _STORE.bars(symbol, limit, first)
+
+
+__all__ = [
+    "BarRing",
+    "MinuteBarStore",
+    "get_bar_store",
+    "get_minute_bars",
+    "session_date",
+]
@@ -0,0 +1,242 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: polygon/chain_frame.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Columnar (struct-of-arrays) view of a Polygon option-chain snapshot.
+
+Built once per `ChainSnapshot` (see `ChainSnapshot.frame`) so that GEX,
+OI-by-strike, ATM selection, skew and IV-surface lookups are NumPy
+reductions instead of per-call walks over nested dicts.
+
+Missing numeric fields are NaN; expiries are stored as int YYYYMMDD.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+def _num(v) -> float:
+    try:
+        return float(v) if v is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _expiry_code(s: str | None) -> int:
+    try:
+        return int((s or "").replace("-", ""))
+    except ValueError:
+        return 0
+
+
+def expiry_label(code: int) -> str:
+    """20250620 → '2025-06-20' (Polygon's native format)."""
+    s = f"{int(code):08d}"
+    return f"{s[:4]}-{s[4:6]}-{s[6:]}"
+
+
+def group_sum(keys: np.ndarray, *values: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Sum each *values* array per unique key. Returns (unique_keys, *sums)."""
+    uniq, inv = np.unique(keys, return_inverse=True)
+    sums = tuple(np.bincount(inv, weights=v, minlength=len(uniq)) for v in values)
+    return (uniq, *sums)
+
+
+def first_sign_flip(strikes: np.ndarray, values: np.ndarray) -> float | None:
+    """Midpoint of the first adjacent strike pair whose values change sign."""
+    if len(values) < 2:
+        return None
+    flips = np.nonzero(values[:-1] * values[1:] < 0)[0]
+    if not len(flips):
+        return None
+    i = flips[0]
+    return float((strikes[i] + strikes[i + 1]) / 2)
+
+# ---------------------------------------------------------------------------
+# Frame
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True, eq=False)
+class ChainFrame:
+    ticker:  np.ndarray   # object  – "O:SPY250620C00545000"
+    strike:  np.ndarray   # float64
+    expiry:  np.ndarray   # int64   – YYYYMMDD
+    is_call: np.ndarray   # bool
+    bid:     np.ndarray
+    ask:     np.ndarray
+    iv:      np.ndarray
+    delta:   np.ndarray
+    gamma:   np.ndarray
+    vega:    np.ndarray
+    theta:   np.ndarray
+    oi:      np.ndarray
+    volume:  np.ndarray
+
+    # ── construction ────────────────────────────────────────────────────────
+    @classmethod
+    def from_results(cls, results: Iterable[dict]) -> "ChainFrame":
+        rows = [r for r in results if isinstance(r, dict)]
+        n = len(rows)
+        cols = {k: np.full(n, np.nan) for k in
+                ("strike", "bid", "ask", "iv", "delta", "gamma", "vega", "theta", "oi", "volume")}
+        ticker = np.empty(n, dtype=object)
+        expiry = np.zeros(n, dtype=np.int64)
+        is_call = np.zeros(n, dtype=bool)
+
+        for i, opt in enumerate(rows):
+            details = opt.get("details") or {}
+            greeks = opt.get("greeks") or {}
+            quote = opt.get("last_quote") or {}
+            ticker[i] = details.get("ticker", "")
+            expiry[i] = _expiry_code(details.get("expiration_date"))
+            is_call[i] = details.get("contract_type") == "call"
+            cols["strike"][i] = _num(details.get("strike_price"))
+            cols["bid"][i] = _num(quote.get("bid"))
+            cols["ask"][i] = _num(quote.get("ask"))
+            cols["iv"][i] = _num(opt.get("implied_volatility"))
+            cols["delta"][i] = _num(greeks.get("delta"))
+            cols["gamma"][i] = _num(greeks.get("gamma"))
+            cols["vega"][i] = _num(greeks.get("vega"))
+            cols["theta"][i] = _num(greeks.get("theta"))
+            cols["oi"][i] = _num(opt.get("open_interest"))
+            cols["volume"][i] = _num((opt.get("day") or {}).get("volume"))
+
+        return cls(ticker=ticker, expiry=expiry, is_call=is_call, **cols)
+
+    @classmethod
+    def empty(cls) -> "ChainFrame":
+        return cls.from_results([])
+
+    def __len__(self) -> int:
+        return len(self.strike)
+
+    # ── selection ───────────────────────────────────────────────────────────
+    @property
+    def mid(self) -> np.ndarray:
+        return (self.bid + self.ask) / 2
+
+    @property
+    def expiries(self) -> np.ndarray:
+        return np.unique(self.expiry[self.expiry > 0])
+
+    def mask(self, expiry: str | int | None = None, side: str | None = None) -> np.ndarray:
+        m = np.ones(len(self), dtype=bool)
+        if expiry is not None:
+            m &= self.expiry == (_expiry_code(expiry) if isinstance(expiry, str) else int(expiry))
+        if side == "call":
+            m &= self.is_call
+        elif side == "put":
+            m &= ~self.is_call
+        return m
+
+    def index_of(self, ticker: str) -> int | None:
+        if not ticker.startswith("O:"):
+            ticker = f"O:{ticker}"
+        hits = np.nonzero(self.ticker == ticker)[0]
+        return int(hits[0]) if len(hits) else None
+
+    # ── reductions ──────────────────────────────────────────────────────────
+    def gex_by_strike(
+        self,
+        expiry: str | int | None = None,
+        *,
+        contract_size: float = 100,
+        require_delta: bool = True,
+        require_oi: bool = True,
+        integer_strikes: bool = False,
+    ) -> Dict[str, np.ndarray | float]:
+        """
+        Gamma notional (gamma × OI × contract_size) summed per strike.
+        Contracts with missing gamma or OI are skipped, as are zero-OI
+        contracts when *require_oi* and missing deltas when *require_delta*.
+        """
+        m = self.mask(expiry) & np.isfinite(self.gamma) & np.isfinite(self.oi)
+        if require_oi:
+            m &= self.oi != 0
+        if require_delta:
+            m &= np.isfinite(self.delta)
+        notional = self.gamma[m] * self.oi[m] * contract_size
+        strikes = np.trunc(self.strike[m]) if integer_strikes else self.strike[m]
+        calls = self.is_call[m]
+        uniq, gex = group_sum(strikes, notional)
+        return {
+            "strikes": uniq,
+            "gex": gex,
+            "call_gex": float(notional[calls].sum()),
+            "put_gex": float(notional[~calls].sum()),
+        }
+
+    def oi_by_strike(self, expiry: str | int | None = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(strikes, call_oi, put_oi) with missing OI counted as zero."""
+        m = self.mask(expiry) & np.isfinite(self.strike)
+        oi = np.nan_to_num(self.oi[m])
+        calls = self.is_call[m]
+        strikes, call_oi, put_oi = group_sum(self.strike[m], oi * calls, oi * ~calls)
+        return strikes, call_oi, put_oi
+
+    def atm_index(
+        self,
+        expiry: str | int | None = None,
+        *,
+        spot: float | None = None,
+        side: str | None = None,
+    ) -> int | None:
+        """
+        Row of the at-the-money contract: nearest strike to *spot* when given,
+        otherwise |delta| closest to 0.5.
+        """
+        m = self.mask(expiry, side)
+        if spot:
+            dist = np.abs(self.strike - spot)
+        else:
+            dist = np.abs(np.abs(self.delta) - 0.5)
+        dist = np.where(m & np.isfinite(dist), dist, np.inf)
+        if not len(dist) or not np.isfinite(dist.min()):
+            return None
+        return int(np.argmin(dist))
+
+    def skew(self, spot: float | None = None, expiry: str | int | None = None, n: int = 3) -> float | None:
+        """
+        Put/call IV ratio from the *n* nearest out-of-the-money strikes on each
+        side of *spot* (median strike if no spot). None if either side is empty.
+        """
+        if expiry is None and len(self.expiries):
+            expiry = int(self.expiries[0])
+        m = self.mask(expiry) & np.isfinite(self.iv) & (self.iv > 0)
+        if not m.any():
+            return None
+        if not spot:
+            spot = float(np.median(self.strike[m]))
+        call_m = m & self.is_call & (self.strike >= spot)
+        put_m = m & ~self.is_call & (self.strike <= spot)
+        if not call_m.any() or not put_m.any():
+            return None
+        call_iv = self.iv[call_m][np.argsort(self.strike[call_m])[:n]].mean()
+        put_iv = self.iv[put_m][np.argsort(-self.strike[put_m])[:n]].mean()
+        return float(put_iv / call_iv) if call_iv else None
+
+    def iv_at(self, expiry: str | int, strike: float, side: str | None = None) -> float | None:
+        """Mean IV of contracts listed at exactly (*expiry*, *strike*)."""
+        m = self.mask(expiry, side) & (self.strike == strike) & np.isfinite(self.iv)
+        return float(self.iv[m].mean()) if m.any() else None
+
+    def iv_surface(self, expiry: str | int | None = None) -> Dict[str, Dict[float, float]]:
+        """{'YYYY-MM-DD': {strike: iv}} — last listed contract wins per strike."""
+        m = self.mask(expiry) & np.isfinite(self.iv) & (self.iv != 0) & (self.expiry > 0)
+        surface: Dict[str, Dict[float, float]] = {}
+        for exp in np.unique(self.expiry[m]):
+            em = m & (self.expiry == exp)
+            surface[expiry_label(exp)] = dict(zip(self.strike[em].tolist(),
+                                                  np.round(self.iv[em], 4).tolist()))
+        return surface
+
+    def rows(self, idx: Iterable[int]) -> List[dict]:
+        """Flat dicts for a handful of rows (debug / logging)."""
+        fields = ("ticker", "strike", "expiry", "is_call", "bid", "ask", "iv",
+                  "delta", "gamma", "vega", "theta", "oi", "volume")
+        return [{f: getattr(self, f)[i].item() if hasattr(getattr(self, f)[i], "item")
+                 else getattr(self, f)[i] for f in fields} for i in idx]
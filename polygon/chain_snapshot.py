@@ -0,0 +1,253 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: polygon/chain_snapshot.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Shared SPY option-chain snapshot service.
+
+Every chain consumer (skew, OI-by-strike, GEX, IV surface, last price,
+dealer exposure, option metrics) reads the same `/v3/snapshot/options/{sym}`
+payload through this module instead of downloading it on its own.
+
+* One HTTP hit per symbol per `POLYGON_CHAIN_TTL` seconds
+* Single-flight: concurrent threads *and* coroutines share one in-flight fetch
+* Failed fetches serve the last good snapshot and back off briefly
+* Parsed views (by strike / by expiry / by type) and the columnar
+  `ChainFrame` are built once per snapshot
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+
+from core.http_clients import get_client
+from core.logger_setup import get_logger
+from polygon.chain_frame import ChainFrame
+
+load_dotenv()
+logger = get_logger(__name__)
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+POLYGON_API_KEY   = os.getenv("POLYGON_API_KEY", "")
+SNAPSHOT_URL      = "https://api.polygon.io/v3/snapshot/options"
+CHAIN_TTL         = float(os.getenv("POLYGON_CHAIN_TTL", "5"))   # seconds
+FAILURE_BACKOFF   = 2.0                                          # seconds
+FETCH_TIMEOUT     = 10                                           # seconds
+
+# ---------------------------------------------------------------------------
+# Snapshot value object
+# ---------------------------------------------------------------------------
+def _underlying_price(payload: dict, results: List[dict]) -> float:
+    """Best-effort underlying mid/last from either the top level or a contract."""
+    candidates = [payload.get("underlying_asset")]
+    candidates += [r.get("underlying_asset") for r in results[:1] if isinstance(r, dict)]
+    for ua in candidates:
+        if not isinstance(ua, dict):
+            continue
+        mid = ua.get("mid")
+        if not mid and ua.get("ask") and ua.get("bid"):
+            mid = (ua["ask"] + ua["bid"]) / 2
+        price = mid or ua.get("price") or (ua.get("last") or {}).get("price")
+        if price:
+            return round(float(price), 2)
+    return 0.0
+
+
+@dataclass(frozen=True)
+class ChainSnapshot:
+    """Immutable view over one chain download. Views are built lazily, once."""
+    symbol:     str
+    fetched_at: float
+    payload:    Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @cached_property
+    def results(self) -> List[dict]:
+        raw = self.payload.get("results", [])
+        return [r for r in raw if isinstance(r, dict)] if isinstance(raw, list) else []
+
+    @cached_property
+    def underlying_price(self) -> float:
+        return _underlying_price(self.payload, self.results)
+
+    @cached_property
+    def by_type(self) -> Dict[str, List[dict]]:
+        view: Dict[str, List[dict]] = {"call": [], "put": []}
+        for opt in self.results:
+            side = opt.get("details", {}).get("contract_type")
+            if side in view:
+                view[side].append(opt)
+        return view
+
+    @cached_property
+    def by_expiry(self) -> Dict[str, List[dict]]:
+        """Keyed by compact YYYYMMDD expiry."""
+        view: Dict[str, List[dict]] = defaultdict(list)
+        for opt in self.results:
+            exp = opt.get("details", {}).get("expiration_date", "").replace("-", "")
+            view[exp].append(opt)
+        return dict(view)
+
+    @cached_property
+    def by_strike(self) -> Dict[float, Dict[str, List[dict]]]:
+        """strike → {"call": [...], "put": [...]} across all expiries."""
+        view: Dict[float, Dict[str, List[dict]]] = defaultdict(lambda: {"call": [], "put": []})
+        for opt in self.results:
+            details = opt.get("details", {})
+            strike = details.get("strike_price")
+            side = details.get("contract_type")
+            if strike is not None and side in ("call", "put"):
+                view[strike][side].append(opt)
+        return dict(view)
+
+    @cached_property
+    def frame(self) -> ChainFrame:
+        """Struct-of-arrays view for vectorized analytics."""
+        return ChainFrame.from_results(self.results)
+
+    def for_expiry(self, expiry: str) -> List[dict]:
+        """Contracts for *expiry* (accepts YYYYMMDD or YYYY-MM-DD)."""
+        return self.by_expiry.get(expiry.replace("-", ""), [])
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def __bool__(self) -> bool:
+        return bool(self.results)
+
+# ---------------------------------------------------------------------------
+# Single-flight service
+# ---------------------------------------------------------------------------
+class _Flight:
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: ChainSnapshot | None = None
+
+
+class ChainSnapshotService:
+    def __init__(self, ttl: float = CHAIN_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, ChainSnapshot] = {}
+        self._inflight: Dict[str, _Flight] = {}
+        self._failed_at: Dict[str, float] = {}
+        self._stats = {"hits": 0, "fetches": 0, "joins": 0, "errors": 0}
+
+    # ── internals ────────────────────────────────────────────────────────────
+    def _fresh(self, symbol: str, max_age: float) -> ChainSnapshot | None:
+        snap = self._entries.get(symbol)
+        if snap is not None and snap.age < max_age:
+            return snap
+        return None
+
+    def _fetch(self, symbol: str) -> ChainSnapshot | None:
+        url = f"{SNAPSHOT_URL}/{symbol}"
+        t0 = time.time()
+        try:
+            r = get_client(url).get(url, params={"apiKey": POLYGON_API_KEY}, timeout=FETCH_TIMEOUT)
+            r.raise_for_status()
+            payload = r.json()
+            if not isinstance(payload, dict):
+                raise ValueError(f"unexpected payload type {type(payload).__name__}")
+        except Exception as e:
+            logger.error({"event": "chain_snapshot_fail", "symbol": symbol, "err": str(e)})
+            return None
+        logger.debug({"event": "chain_snapshot", "symbol": symbol,
+                      "ms": int((time.time() - t0) * 1000)})
+        return ChainSnapshot(symbol=symbol, fetched_at=time.time(), payload=payload)
+
+    # ── public API ───────────────────────────────────────────────────────────
+    def get(self, symbol: str = "SPY", max_age: float | None = None) -> ChainSnapshot:
+        """Blocking read; joins an in-flight fetch rather than starting another."""
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            snap = self._fresh(symbol, max_age)
+            if snap is not None:
+                self._stats["hits"] += 1
+                return snap
+            stale = self._entries.get(symbol)
+            if stale is not None and time.time() - self._failed_at.get(symbol, 0) < FAILURE_BACKOFF:
+                self._stats["hits"] += 1
+                return stale
+            flight = self._inflight.get(symbol)
+            owner = flight is None
+            if owner:
+                flight = self._inflight[symbol] = _Flight()
+                self._stats["fetches"] += 1
+            else:
+                self._stats["joins"] += 1
+
+        if not owner:
+            flight.done.wait(FETCH_TIMEOUT + 1)
+            return flight.result or self._entries.get(symbol) or ChainSnapshot(symbol, 0.0)
+
+        fetched = self._fetch(symbol)
+        with self._lock:
+            if fetched is not None:
+                self._entries[symbol] = fetched
+                self._failed_at.pop(symbol, None)
+            else:
+                self._failed_at[symbol] = time.time()
+                self._stats["errors"] += 1
+            flight.result = fetched or self._entries.get(symbol)
+            del self._inflight[symbol]
+        flight.done.set()
+        return flight.result or ChainSnapshot(symbol, 0.0)
+
+    async def aget(self, symbol: str = "SPY", max_age: float | None = None) -> ChainSnapshot:
+        """Awaitable read; cache hits never leave the event loop."""
+        max_age = self.ttl if max_age is None else max_age
+        snap = self._fresh(symbol, max_age)
+        if snap is not None:
+            self._stats["hits"] += 1
+            return snap
+        return await asyncio.to_thread(self.get, symbol, max_age)
+
+    def peek(self, symbol: str = "SPY") -> ChainSnapshot | None:
+        """Last snapshot regardless of age, never fetches."""
+        return self._entries.get(symbol)
+
+    def invalidate(self, symbol: str | None = None) -> None:
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(symbol, None)
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+
+_SERVICE = ChainSnapshotService()
+
+
+def get_chain_snapshot(symbol: str = "SPY", max_age: float | None = None) -> ChainSnapshot:
+    return _SERVICE.get(symbol, max_age)
+
+
+async def aget_chain_snapshot(symbol: str = "SPY", max_age: float | None = None) -> ChainSnapshot:
+    return await _SERVICE.aget(symbol, max_age)
+
+
+def get_chain_service() -> ChainSnapshotService:
+    return _SERVICE
+
+
+__all__ = [
+    "ChainSnapshot",
+    "ChainSnapshotService",
+    "get_chain_snapshot",
+    "aget_chain_snapshot",
+    "get_chain_service",
+]
@@ -0,0 +1,305 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: polygon/market_data_hub.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Single in-loop market-data hub.
+
+Owns every Polygon websocket (stocks + options) as tasks on the main asyncio
+loop and publishes immutable, versioned `Quote` / `Trade` snapshots carrying
+both the exchange and the local receive timestamp.
+
+* Publishing swaps one frozen object per symbol – readers on any thread
+  (`asyncio.to_thread` workers included) see a consistent value without
+  locks or thread hops
+* `SPY_LIVE_PRICE` in polygon_websocket / stocks_websocket /
+  async_polygon_websocket are all the same read-only `LivePriceView`
+* Minute / second aggregates are forwarded to `polygon.bar_store`, trades
+  to `analytics.indicator_engine`
+* Each socket is a `WebSocketSupervisor` task (backoff, re-auth,
+  subscription replay, gap stats)
+* Every received frame is handed to `polygon.tick_recorder` (queued, written
+  off the receive path)
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import os
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator
+
+from dotenv import load_dotenv
+
+from core.logger_setup import get_logger
+from polygon.bar_store import get_bar_store
+from analytics.indicator_engine import get_indicator_engine
+from polygon.tick_recorder import record_events
+from polygon.ws_supervisor import WebSocketSupervisor
+
+load_dotenv()
+logger = get_logger(__name__)
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+STOCKS_WS_URL     = "wss://socket.polygon.io/stocks"
+OPTIONS_WS_URL    = "wss://socket.polygon.io/options"
+STOCK_CHANNELS    = os.getenv("POLYGON_STOCK_CHANNELS", "Q.SPY,T.SPY,AM.SPY,A.SPY")
+QUOTE_STALE_AFTER = float(os.getenv("HUB_QUOTE_STALE_AFTER", "5"))   # seconds
+
+_VERSION = itertools.count(1)
+
+# ---------------------------------------------------------------------------
+# Snapshot value objects
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True, slots=True)
+class Quote:
+    symbol:    str
+    bid:       float
+    ask:       float
+    bid_size:  float
+    ask_size:  float
+    exch_ts:   float      # exchange (SIP) time, epoch seconds
+    recv_ts:   float      # local receive time, epoch seconds
+    version:   int
+
+    @property
+    def mid(self) -> float:
+        if self.bid and self.ask:
+            return round((self.bid + self.ask) / 2, 4)
+        return self.bid or self.ask or 0.0
+
+    @property
+    def spread(self) -> float:
+        return self.ask - self.bid if self.bid and self.ask else 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class Trade:
+    symbol:  str
+    price:   float
+    size:    float
+    exch_ts: float
+    recv_ts: float
+    version: int
+
+
+def _exch_seconds(ms) -> float:
+    try:
+        return float(ms) / 1000 if ms else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+# ---------------------------------------------------------------------------
+# Read-only legacy views
+# ---------------------------------------------------------------------------
+class LivePriceView(Mapping):
+    """
+    Dict-like, read-only view of one symbol's latest quote/trade, shaped like
+    the old `SPY_LIVE_PRICE` dicts (price, mid, bid, ask, last_trade,
+    timestamp, exchange_ts, version).
+    """
+
+    def __init__(self, hub: "MarketDataHub", symbol: str):
+        self._hub = hub
+        self._symbol = symbol
+
+    def _fields(self) -> dict:
+        return self._hub.fields(self._symbol)
+
+    def __getitem__(self, key):
+        return self._fields()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields())
+
+    def __len__(self) -> int:
+        return len(self._fields())
+
+    def __repr__(self) -> str:
+        return f"LivePriceView({self._symbol!r}, {self._fields()!r})"
+
+
+class OptionTickView(Mapping):
+    """Read-only `{ "O:…": {"price", "timestamp"} }` over option trades."""
+
+    def __init__(self, hub: "MarketDataHub"):
+        self._hub = hub
+
+    def _ticks(self) -> Dict[str, dict]:
+        return {s: {"price": t.price, "timestamp": t.recv_ts}
+                for s, t in list(self._hub._trades.items()) if s.startswith("O:")}
+
+    def __getitem__(self, key):
+        trade = self._hub._trades.get(key)
+        if trade is None or not key.startswith("O:"):
+            raise KeyError(key)
+        return {"price": trade.price, "timestamp": trade.recv_ts}
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ticks())
+
+    def __len__(self) -> int:
+        return len(self._ticks())
+
+# ---------------------------------------------------------------------------
+# Hub
+# ---------------------------------------------------------------------------
+class MarketDataHub:
+    def __init__(self):
+        self._quotes: Dict[str, Quote] = {}
+        self._trades: Dict[str, Trade] = {}
+        self._feeds: Dict[str, WebSocketSupervisor] = {
+            "stocks":  WebSocketSupervisor("stocks", STOCKS_WS_URL, self.dispatch,
+                                           channels=STOCK_CHANNELS.split(",")),
+            "options": WebSocketSupervisor("options", OPTIONS_WS_URL, self.dispatch),
+        }
+        self._bars = get_bar_store()
+        self._indicators = get_indicator_engine()
+
+    # ── publishing ───────────────────────────────────────────────────────────
+    def publish_quote(self, symbol: str, bid, ask, bid_size=0, ask_size=0,
+                      exch_ts: float = 0.0, recv_ts: float | None = None) -> Quote:
+        q = Quote(symbol, float(bid or 0), float(ask or 0), float(bid_size or 0),
+                  float(ask_size or 0), exch_ts, recv_ts or time.time(), next(_VERSION))
+        self._quotes[symbol] = q
+        return q
+
+    def publish_trade(self, symbol: str, price, size=0,
+                      exch_ts: float = 0.0, recv_ts: float | None = None) -> Trade:
+        t = Trade(symbol, float(price or 0), float(size or 0), exch_ts,
+                  recv_ts or time.time(), next(_VERSION))
+        self._trades[symbol] = t
+        if not symbol.startswith("O:"):
+            self._indicators.on_trade(symbol, t.price)
+        return t
+
+    def dispatch(self, events: Iterable[dict], recv_ts: float | None = None) -> None:
+        """Route one decoded websocket frame (list of events). *recv_ts* is for replay."""
+        recv = recv_ts or time.time()
+        record_events(events, recv)
+        for ev in events:
+            if not isinstance(ev, dict):
+                continue
+            kind, sym = ev.get("ev"), ev.get("sym")
+            if kind == "Q" and sym:
+                self.publish_quote(sym, ev.get("bp"), ev.get("ap"), ev.get("bs"), ev.get("as"),
+                                   _exch_seconds(ev.get("t")), recv)
+            elif kind == "T" and sym and ev.get("p"):
+                self.publish_trade(sym, ev.get("p"), ev.get("s"), _exch_seconds(ev.get("t")), recv)
+            elif kind in ("AM", "A"):
+                self._bars.ingest(ev)
+            elif kind == "status" and ev.get("status") == "auth_failed":
+                logger.error({"event": "ws_auth_failed", "msg": ev.get("message")})
+
+    # ── reads ────────────────────────────────────────────────────────────────
+    def quote(self, symbol: str = "SPY") -> Quote | None:
+        return self._quotes.get(symbol)
+
+    def trade(self, symbol: str = "SPY") -> Trade | None:
+        return self._trades.get(symbol)
+
+    def _fresh_quote(self, symbol: str, now: float | None = None) -> Quote | None:
+        q = self._quotes.get(symbol)
+        if q is None or not q.mid:
+            return None
+        if (now or time.time()) - q.recv_ts > QUOTE_STALE_AFTER:
+            t = self._trades.get(symbol)
+            if t is not None and t.recv_ts > q.recv_ts:
+                return None                 # trades moved on, quote is stale
+        return q
+
+    def price(self, symbol: str = "SPY") -> float:
+        """Quote mid when fresh, else last trade, else 0.0."""
+        q = self._fresh_quote(symbol)
+        if q is not None:
+            return q.mid
+        t = self._trades.get(symbol)
+        return t.price if t is not None else 0.0
+
+    def last_update(self, symbol: str = "SPY") -> float:
+        """Receive time of the newest quote or trade (0.0 if none)."""
+        q, t = self._quotes.get(symbol), self._trades.get(symbol)
+        return max(q.recv_ts if q else 0.0, t.recv_ts if t else 0.0)
+
+    def age(self, symbol: str = "SPY") -> float:
+        last = self.last_update(symbol)
+        return time.time() - last if last else float("inf")
+
+    def fields(self, symbol: str = "SPY") -> dict:
+        """Legacy SPY_LIVE_PRICE-shaped dict built from the current snapshots."""
+        out: dict = {}
+        q, t = self._fresh_quote(symbol), self._trades.get(symbol)
+        if q is not None:
+            out.update(mid=q.mid, bid=q.bid, ask=q.ask)
+        if t is not None:
+            out["last_trade"] = t.price
+        newest = max((s for s in (q, t) if s is not None), key=lambda s: s.version, default=None)
+        if newest is not None:
+            out.update(price=out.get("mid") or out.get("last_trade"),
+                       timestamp=newest.recv_ts, exchange_ts=newest.exch_ts,
+                       version=newest.version)
+        return out
+
+    def live_view(self, symbol: str = "SPY") -> LivePriceView:
+        return LivePriceView(self, symbol)
+
+    def option_ticks(self) -> OptionTickView:
+        return OptionTickView(self)
+
+    def reset(self) -> None:
+        """Drop every published snapshot (replay / tests)."""
+        self._quotes.clear()
+        self._trades.clear()
+
+    # ── websocket lifecycle ──────────────────────────────────────────────────
+    def feed(self, name: str) -> WebSocketSupervisor:
+        return self._feeds[name]
+
+    def start(self) -> None:
+        """Start all feeds on the *running* loop. Idempotent."""
+        for feed in self._feeds.values():
+            feed.start()
+
+    def start_in_thread(self) -> None:
+        """Fallback for scripts without a loop: run the hub on a daemon thread."""
+        async def _main():
+            await asyncio.gather(*(feed.start() for feed in self._feeds.values()))
+        threading.Thread(target=lambda: asyncio.run(_main()), daemon=True, name="market-data-hub").start()
+
+    async def stop(self) -> None:
+        await asyncio.gather(*(feed.stop() for feed in self._feeds.values()))
+
+    async def reconnect(self, feed_name: str = "stocks") -> None:
+        """Drop the socket; the supervisor reconnects and replays its channels."""
+        await self._feeds[feed_name].reconnect()
+
+    def subscribe(self, feed_name: str, channels: Iterable[str]) -> None:
+        """Add channels (thread-safe). Replayed automatically on reconnect."""
+        self._feeds[feed_name].subscribe(channels)
+
+    def unsubscribe(self, feed_name: str, channels: Iterable[str]) -> None:
+        self._feeds[feed_name].unsubscribe(channels)
+
+    def stats(self) -> dict:
+        return {name: feed.stats() for name, feed in self._feeds.items()} | {
+            "quotes": len(self._quotes), "trades": len(self._trades)}
+
+
+_HUB = MarketDataHub()
+
+
+def get_market_data_hub() -> MarketDataHub:
+    return _HUB
+
+
+__all__ = [
+    "Quote",
+    "Trade",
+    "LivePriceView",
+    "MarketDataHub",
+    "get_market_data_hub",
+]
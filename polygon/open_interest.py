@@ -0,0 +1,246 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: polygon/open_interest.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Daily open-interest-by-strike cache.
+
+OCC publishes open interest once per day, so one read of the chain is enough
+for the whole session:
+
+* `load()` runs pre-market. It takes per-strike call / put OI for the
+  nearest `OI_EXPIRIES` expiries from the shared chain snapshot and writes
+  them to `data/open_interest/{symbol}_{YYYY-MM-DD}.json`. A restart later
+  in the day reads that file instead of downloading again.
+* `OpenInterestTable` keeps sorted strike arrays per expiry, plus a total
+  summed across them. Lookups are a binary search, `max_pain()` is a single
+  broadcast, and `for_frame()` aligns OI with a `ChainFrame`'s rows for the
+  GEX / DEX sums.
+* `get()` loads lazily for the current session date, and backs off
+  `RETRY_SECONDS` after a failure. `current()` never does I/O, so it is the
+  read for hot paths.
+"""
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+
+from core.logger_setup import get_logger
+from polygon.bar_store import session_date
+from polygon.chain_frame import ChainFrame, _expiry_code
+from polygon.chain_snapshot import get_chain_snapshot
+
+logger = get_logger(__name__)
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+OI_DIR        = os.getenv("OI_DIR", "data/open_interest")
+OI_EXPIRIES   = int(os.getenv("OI_EXPIRIES", "3"))     # active expiries kept
+RETRY_SECONDS = 60.0
+
+# ---------------------------------------------------------------------------
+# Tables
+# ---------------------------------------------------------------------------
+@dataclass(frozen=True, slots=True)
+class StrikeOI:
+    expiry:  int              # YYYYMMDD, 0 for the all-expiry total
+    strikes: np.ndarray       # sorted
+    call_oi: np.ndarray
+    put_oi:  np.ndarray
+
+    def _index(self, strike: float) -> int | None:
+        i = int(np.searchsorted(self.strikes, strike))
+        return i if i < len(self.strikes) and self.strikes[i] == strike else None
+
+    def at(self, strike: float) -> Tuple[int, int]:
+        """(call_oi, put_oi) listed at *strike*; (0, 0) if unlisted."""
+        i = self._index(strike)
+        return (0, 0) if i is None else (int(self.call_oi[i]), int(self.put_oi[i]))
+
+    def max_pain(self) -> float | None:
+        """Settlement strike that minimises the intrinsic value owed to option holders."""
+        if not len(self.strikes):
+            return None
+        settle = self.strikes[:, None]
+        pain = (np.maximum(settle - self.strikes, 0) @ self.call_oi
+                + np.maximum(self.strikes - settle, 0) @ self.put_oi)
+        return float(self.strikes[int(np.argmin(pain))])
+
+    def as_dict(self) -> dict:
+        return {"strikes": self.strikes.tolist(), "call_oi": self.call_oi.tolist(),
+                "put_oi": self.put_oi.tolist()}
+
+    @classmethod
+    def from_dict(cls, expiry: int, d: dict) -> "StrikeOI":
+        return cls(expiry, *(np.asarray(d[k], dtype=float) for k in ("strikes", "call_oi", "put_oi")))
+
+
+def _total(rows) -> StrikeOI:
+    if not rows:
+        return StrikeOI(0, np.empty(0), np.empty(0), np.empty(0))
+    strikes = np.concatenate([r.strikes for r in rows])
+    uniq, inv = np.unique(strikes, return_inverse=True)
+    call_oi = np.bincount(inv, np.concatenate([r.call_oi for r in rows]), len(uniq))
+    put_oi = np.bincount(inv, np.concatenate([r.put_oi for r in rows]), len(uniq))
+    return StrikeOI(0, uniq, call_oi, put_oi)
+
+
+@dataclass(frozen=True, slots=True)
+class OpenInterestTable:
+    symbol:    str
+    date:      str                    # session date, YYYY-MM-DD
+    loaded_at: float
+    expiries:  Dict[int, StrikeOI]
+    total:     StrikeOI
+
+    @classmethod
+    def build(cls, symbol: str, date: str, rows: Dict[int, StrikeOI],
+              loaded_at: float | None = None) -> "OpenInterestTable":
+        return cls(symbol, date, time.time() if loaded_at is None else loaded_at, rows,
+                   _total(list(rows.values())))
+
+    def get(self, expiry: str | int | None = None) -> StrikeOI | None:
+        """One expiry's table (YYYYMMDD or YYYY-MM-DD); the all-expiry total when None."""
+        if expiry is None:
+            return self.total
+        code = _expiry_code(expiry) if isinstance(expiry, str) else int(expiry)
+        return self.expiries.get(code)
+
+    def at(self, strike: float, expiry: str | int | None = None) -> Tuple[int, int]:
+        rows = self.get(expiry)
+        return rows.at(strike) if rows is not None else (0, 0)
+
+    def max_pain(self, expiry: str | int | None = None) -> float | None:
+        rows = self.get(expiry if expiry is not None else min(self.expiries, default=None))
+        return rows.max_pain() if rows is not None else None
+
+    def for_frame(self, frame: ChainFrame) -> np.ndarray:
+        """OI aligned with *frame*'s rows (by expiry, strike and side); NaN where not cached."""
+        out = np.full(len(frame), np.nan)
+        for code, rows in self.expiries.items():
+            m = np.nonzero(frame.expiry == code)[0]
+            if not len(m) or not len(rows.strikes):
+                continue
+            i = np.minimum(np.searchsorted(rows.strikes, frame.strike[m]), len(rows.strikes) - 1)
+            hit = rows.strikes[i] == frame.strike[m]
+            oi = np.where(frame.is_call[m], rows.call_oi[i], rows.put_oi[i])
+            out[m[hit]] = oi[hit]
+        return out
+
+    def as_dict(self) -> dict:
+        return {"symbol": self.symbol, "date": self.date, "loaded_at": self.loaded_at,
+                "expiries": {str(code): rows.as_dict() for code, rows in self.expiries.items()}}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "OpenInterestTable":
+        rows = {int(code): StrikeOI.from_dict(int(code), r) for code, r in d.get("expiries", {}).items()}
+        return cls.build(d["symbol"], d["date"], rows, d.get("loaded_at"))
+
+
+def table_from_frame(symbol: str, date: str, frame: ChainFrame,
+                     n_expiries: int = OI_EXPIRIES) -> OpenInterestTable:
+    """Per-strike OI for the nearest *n_expiries* expiries on or after *date*."""
+    today = _expiry_code(date)
+    rows = {}
+    for code in [int(c) for c in frame.expiries if c >= today][:n_expiries]:
+        strikes, call_oi, put_oi = frame.oi_by_strike(code)
+        rows[code] = StrikeOI(code, strikes, call_oi, put_oi)
+    return OpenInterestTable.build(symbol, date, rows)
+
+# ---------------------------------------------------------------------------
+# Service
+# ---------------------------------------------------------------------------
+class OpenInterestService:
+    def __init__(self, symbol: str = "SPY", root: str = OI_DIR):
+        self.symbol = symbol
+        self.root = root
+        self._lock = threading.Lock()
+        self._table: OpenInterestTable | None = None
+        self._failed_at = 0.0
+        self._stats = {"loads": 0, "file_hits": 0, "downloads": 0, "errors": 0}
+
+    def _path(self, date: str) -> str:
+        return os.path.join(self.root, f"{self.symbol}_{date}.json")
+
+    def _read(self, date: str) -> OpenInterestTable | None:
+        try:
+            with open(self._path(date)) as f:
+                return OpenInterestTable.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning({"event": "oi_cache_unreadable", "date": date, "err": str(e)})
+            return None
+
+    def _write(self, table: OpenInterestTable) -> None:
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", dir=self.root, delete=False) as tmp:
+                json.dump(table.as_dict(), tmp, separators=(",", ":"))
+            os.replace(tmp.name, self._path(table.date))
+        except OSError as e:
+            logger.warning({"event": "oi_persist_fail", "err": str(e)})
+
+    def load(self, date: str | None = None, force: bool = False) -> OpenInterestTable | None:
+        """Blocking: the dated file if present, otherwise one chain download (persisted)."""
+        date = date or session_date()
+        with self._lock:
+            if not force and self._table is not None and self._table.date == date:
+                return self._table
+            table = None if force else self._read(date)
+            if table is not None:
+                self._stats["file_hits"] += 1
+            else:
+                snapshot = get_chain_snapshot(self.symbol)
+                if not snapshot or not len(snapshot.frame):
+                    self._failed_at = time.time()
+                    self._stats["errors"] += 1
+                    logger.error({"event": "oi_load_fail", "symbol": self.symbol, "date": date})
+                    return self._table
+                table = table_from_frame(self.symbol, date, snapshot.frame)
+                self._stats["downloads"] += 1
+                self._write(table)
+            self._table = table
+            self._stats["loads"] += 1
+            logger.info({"event": "oi_loaded", "symbol": self.symbol, "date": date,
+                         "expiries": sorted(table.expiries), "strikes": len(table.total.strikes)})
+            return table
+
+    def current(self) -> OpenInterestTable | None:
+        """Loaded table for today's session, never does I/O."""
+        table = self._table
+        return table if table is not None and table.date == session_date() else None
+
+    def get(self) -> OpenInterestTable | None:
+        """Today's table, loading it on first use (at most once per `RETRY_SECONDS` after a failure)."""
+        table = self.current()
+        if table is None and time.time() - self._failed_at >= RETRY_SECONDS:
+            table = self.load()
+        return table
+
+    def stats(self) -> dict:
+        table = self._table
+        return {**self._stats, "date": table.date if table else None}
+
+
+_SERVICE = OpenInterestService()
+
+
+def get_open_interest() -> OpenInterestService:
+    return _SERVICE
+
+
+__all__ = [
+    "OpenInterestService",
+    "OpenInterestTable",
+    "StrikeOI",
+    "get_open_interest",
+    "table_from_frame",
+]
@@ -0,0 +1,254 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: polygon/option_subscriptions.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Dynamic 0-DTE option-contract subscriptions on the options websocket.
+
+Keeps live `Q.`/`T.` channels for today's expiry at ATM ± `OPTION_SUB_STRIKES`
+strikes (calls and puts), rolled as the underlying moves. Each roll sends
+only the subscribe/unsubscribe diff through the hub's supervisor.
+
+* Strike ladder comes from the shared chain snapshot (one load per day),
+  falling back to a $1 grid of synthesised OCC tickers
+* Contracts backing open positions can be pinned so they never roll off
+* `book()` / `mark()` read the per-contract NBBO + last trade that the
+  market data hub publishes for every streamed `O:` symbol
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+from core.logger_setup import get_logger
+from polygon.bar_store import session_date
+from polygon.chain_snapshot import aget_chain_snapshot, get_chain_snapshot
+from polygon.market_data_hub import MarketDataHub, get_market_data_hub
+
+logger = get_logger(__name__)
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+WINDOW_STRIKES = int(os.getenv("OPTION_SUB_STRIKES", "5"))      # each side of ATM
+ROLL_INTERVAL  = float(os.getenv("OPTION_SUB_ROLL_SECS", "1"))  # seconds between checks
+MARK_STALE     = float(os.getenv("OPTION_MARK_STALE", "30"))    # seconds
+FALLBACK_STEP  = 1.0                                            # SPY 0DTE strike spacing
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+def occ_symbol(underlying: str, expiry: str, side: str, strike: float) -> str:
+    """('SPY', '20250620', 'C', 545) → 'O:SPY250620C00545000'."""
+    return f"O:{underlying}{expiry[2:]}{side.upper()[0]}{int(round(strike * 1000)):08d}"
+
+
+def normalize_contract(symbol: str) -> str:
+    return symbol if symbol.startswith("O:") else f"O:{symbol}"
+
+
+def today_expiry() -> str:
+    """Today's 0-DTE expiry as YYYYMMDD (US/Eastern)."""
+    return session_date().replace("-", "")
+
+
+def _channels(contracts: Set[str]) -> List[str]:
+    return [f"{ev}.{c}" for c in sorted(contracts) for ev in ("Q", "T")]
+
+
+@dataclass(frozen=True, slots=True)
+class OptionBook:
+    symbol:   str
+    bid:      float
+    ask:      float
+    bid_size: float
+    ask_size: float
+    last:     float
+    last_size: float
+    recv_ts:  float
+    version:  int
+
+    @property
+    def mid(self) -> float:
+        if self.bid and self.ask:
+            return round((self.bid + self.ask) / 2, 4)
+        return 0.0
+
+    @property
+    def spread(self) -> float:
+        return self.ask - self.bid if self.bid and self.ask else 0.0
+
+# ---------------------------------------------------------------------------
+# Manager
+# ---------------------------------------------------------------------------
+class OptionSubscriptionManager:
+    def __init__(self, hub: MarketDataHub | None = None, underlying: str = "SPY",
+                 width: int = WINDOW_STRIKES):
+        self.hub = hub or get_market_data_hub()
+        self.underlying = underlying
+        self.width = width
+        self._expiry = ""
+        self._strikes = np.empty(0)
+        self._tickers: Dict[Tuple[float, str], str] = {}   # (strike, "C"/"P") → O: ticker
+        self._center: float | None = None
+        self._window: Set[str] = set()
+        self._pinned: Set[str] = set()
+        self._task: asyncio.Task | None = None
+        self._stats = {"rolls": 0, "subscribed": 0, "unsubscribed": 0}
+
+    # ── ladder ───────────────────────────────────────────────────────────────
+    def _set_ladder(self, expiry: str, frame) -> None:
+        m = frame.mask(expiry) & np.isfinite(frame.strike)
+        tickers = {(float(k), "C" if c else "P"): str(t)
+                   for k, c, t in zip(frame.strike[m], frame.is_call[m], frame.ticker[m]) if t}
+        self._expiry = expiry
+        self._tickers = tickers
+        self._strikes = np.unique(np.array([k for k, _ in tickers], dtype=float))
+        self._center = None
+        logger.info({"event": "option_ladder_loaded", "expiry": expiry, "strikes": len(self._strikes)})
+
+    async def aload_ladder(self, expiry: str | None = None) -> None:
+        expiry = expiry or today_expiry()
+        snap = await aget_chain_snapshot(self.underlying)
+        self._set_ladder(expiry, snap.frame)
+
+    def load_ladder(self, expiry: str | None = None) -> None:
+        expiry = expiry or today_expiry()
+        self._set_ladder(expiry, get_chain_snapshot(self.underlying).frame)
+
+    def _ticker(self, strike: float, side: str) -> str:
+        return self._tickers.get((strike, side)) or occ_symbol(self.underlying, self._expiry, side, strike)
+
+    def window_for(self, spot: float) -> Tuple[float, Set[str]]:
+        """(center strike, contracts) for ATM ± width around *spot*."""
+        if len(self._strikes):
+            strikes = self._strikes
+        else:
+            base = round(spot / FALLBACK_STEP) * FALLBACK_STEP
+            strikes = base + FALLBACK_STEP * np.arange(-self.width, self.width + 1)
+        i = int(np.argmin(np.abs(strikes - spot)))
+        lo, hi = max(0, i - self.width), min(len(strikes), i + self.width + 1)
+        contracts = {self._ticker(float(k), side) for k in strikes[lo:hi] for side in ("C", "P")}
+        return float(strikes[i]), contracts
+
+    # ── subscriptions ────────────────────────────────────────────────────────
+    def _apply(self, target: Set[str]) -> None:
+        wanted = target | self._pinned
+        current = self._window | self._pinned
+        add, drop = wanted - current, current - wanted
+        if drop:
+            self.hub.unsubscribe("options", _channels(drop))
+        if add:
+            self.hub.subscribe("options", _channels(add))
+        self._window = target
+        self._stats["subscribed"] += len(add)
+        self._stats["unsubscribed"] += len(drop)
+        if add or drop:
+            logger.info({"event": "option_window_roll", "center": self._center,
+                         "added": len(add), "removed": len(drop)})
+
+    def roll(self, spot: float | None = None) -> bool:
+        """Re-centre the window on *spot* (hub price by default). True if it moved."""
+        spot = spot or self.hub.price(self.underlying)
+        if not spot or not self._expiry:
+            return False
+        center, target = self.window_for(spot)
+        if center == self._center:
+            return False
+        self._center = center
+        self._stats["rolls"] += 1
+        self._apply(target)
+        return True
+
+    def pin(self, symbol: str) -> None:
+        """Keep *symbol* subscribed regardless of the ATM window (e.g. open positions)."""
+        sym = normalize_contract(symbol)
+        if sym not in self._pinned:
+            self._pinned.add(sym)
+            if sym not in self._window:
+                self.hub.subscribe("options", _channels({sym}))
+
+    def unpin(self, symbol: str) -> None:
+        sym = normalize_contract(symbol)
+        if sym in self._pinned:
+            self._pinned.discard(sym)
+            if sym not in self._window:
+                self.hub.unsubscribe("options", _channels({sym}))
+
+    def contracts(self) -> Set[str]:
+        return self._window | self._pinned
+
+    # ── book reads ───────────────────────────────────────────────────────────
+    def book(self, symbol: str) -> OptionBook | None:
+        sym = normalize_contract(symbol)
+        q, t = self.hub.quote(sym), self.hub.trade(sym)
+        if q is None and t is None:
+            return None
+        return OptionBook(
+            symbol=sym,
+            bid=q.bid if q else 0.0,
+            ask=q.ask if q else 0.0,
+            bid_size=q.bid_size if q else 0.0,
+            ask_size=q.ask_size if q else 0.0,
+            last=t.price if t else 0.0,
+            last_size=t.size if t else 0.0,
+            recv_ts=max(q.recv_ts if q else 0.0, t.recv_ts if t else 0.0),
+            version=max(q.version if q else 0, t.version if t else 0),
+        )
+
+    def mark(self, symbol: str, max_age: float = MARK_STALE) -> float | None:
+        """Streaming mark: NBBO mid, else last trade; None if nothing fresh."""
+        book = self.book(symbol)
+        if book is None or time.time() - book.recv_ts > max_age:
+            return None
+        return book.mid or book.last or None
+
+    def atm_contract(self, side: str = "C", spot: float | None = None) -> str | None:
+        spot = spot or self.hub.price(self.underlying)
+        if not spot or not self._expiry:
+            return None
+        center, _ = self.window_for(spot)
+        return self._ticker(center, side.upper()[0])
+
+    # ── lifecycle ────────────────────────────────────────────────────────────
+    async def run(self) -> None:
+        while True:
+            try:
+                today = today_expiry()
+                if self._expiry != today:
+                    await self.aload_ladder(today)
+                self.roll()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error({"event": "option_sub_roll_fail", "err": str(e)})
+            await asyncio.sleep(ROLL_INTERVAL)
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run(), name="option-subscriptions")
+        return self._task
+
+    def stats(self) -> dict:
+        return {**self._stats, "expiry": self._expiry, "center": self._center,
+                "window": len(self._window), "pinned": len(self._pinned)}
+
+
+_MANAGER = OptionSubscriptionManager()
+
+
+def get_option_subscriptions() -> OptionSubscriptionManager:
+    return _MANAGER
+
+
+__all__ = [
+    "OptionBook",
+    "OptionSubscriptionManager",
+    "get_option_subscriptions",
+    "normalize_contract",
+    "occ_symbol",
+]
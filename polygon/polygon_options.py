@@ -2,10 +2,12 @@
 # Live SPY option chain fetch + GEX model builder
 
 import os
-import requests
 from dotenv import load_dotenv
 from datetime import datetime
 from polygon.polygon_rest import get_today_expiry
+from polygon.chain_snapshot import get_chain_snapshot
+from polygon.chain_frame import first_sign_flip
+from analytics.bs_pricing import fill_greeks
 from core.logger_setup import logger
 
 load_dotenv()
@@ -17,14 +19,8 @@ def get_option_chain(symbol="SPY", expiry=None):
     if not expiry:
         expiry = get_today_expiry()
 
-    url = f"{BASE_URL}/v3/snapshot/options/{symbol}?apiKey={POLYGON_KEY}"
-
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        chain = data.get("results", [])
-        return [opt for opt in chain if opt.get("details", {}).get("expiration_date", "").replace("-", "") == expiry]
+        return get_chain_snapshot(symbol).for_expiry(expiry)
     except Exception as e:
         logger.error({"event": "polygon_chain_fetch_error", "error": str(e)})
         return []
@@ -49,44 +45,21 @@ def get_option_chain_gex(symbol="SPY", spot=None):
     """
     try:
         expiry = get_today_expiry()
-        chain = get_option_chain(symbol, expiry)
-        if not chain:
+        snapshot = get_chain_snapshot(symbol)
+        frame = fill_greeks(snapshot.frame, spot or snapshot.underlying_price)   # model greeks where Polygon has none
+        if not frame.mask(expiry).any():
             return None
 
-        gex_map = {}
-        call_gex = 0
-        put_gex = 0
-
-        for opt in chain:
-            strike = int(opt.get("details", {}).get("strike_price", 0))
-            delta = opt.get("greeks", {}).get("delta")
-            gamma = opt.get("greeks", {}).get("gamma")
-            oi = opt.get("open_interest", 0)
-            opt_type = opt.get("details", {}).get("contract_type")
-
-            if delta is None or gamma is None or oi == 0:
-                continue
-
-            # Simplified gamma notional
-            notional_gamma = gamma * oi * 100
-
-            gex_map[strike] = gex_map.get(strike, 0) + notional_gamma
-
-            if opt_type == "call":
-                call_gex += notional_gamma
-            else:
-                put_gex += notional_gamma
+        # Simplified gamma notional (gamma × OI × 100) per integer strike
+        gex = frame.gex_by_strike(expiry, integer_strikes=True)
+        strikes, values = gex["strikes"], gex["gex"]
+        gex_map = dict(zip(strikes.astype(int).tolist(), values.tolist()))
 
+        call_gex, put_gex = gex["call_gex"], gex["put_gex"]
         dealer_bias = "short_gamma" if call_gex < 0 and put_gex < 0 else "long_gamma"
 
         # Flip zone = strike where GEX flips sign
-        flip_zone = None
-        sorted_strikes = sorted(gex_map.keys())
-        for i in range(1, len(sorted_strikes)):
-            a, b = sorted_strikes[i - 1], sorted_strikes[i]
-            if gex_map[a] * gex_map[b] < 0:
-                flip_zone = (a + b) / 2
-                break
+        flip_zone = first_sign_flip(strikes, values)
 
         return {
             "gex_map": gex_map,
@@ -10,6 +10,7 @@ that require a paid plan.
 • async_get_option_metrics(symbol)     -> dict   (awaitable)
 • get_dealer_flow_metrics*(symbol)     -> dict   (neutral score placeholder)
 • get_last_price()                     -> float  (SPY mid/last fallback)
+• get_historic_bars(symbol, …)         -> list   (today's minutes from the bar store)
 """
 
 from __future__ import annotations
@@ -17,8 +18,10 @@ from datetime import datetime
 import asyncio
 from typing import Dict
 import os
-import requests
 from dotenv import load_dotenv
+from core.http_clients import get_client
+from polygon.chain_snapshot import get_chain_snapshot
+from polygon.bar_store import get_bar_store, session_date
 from core.live_price_tracker import (
     get_option_metrics      as _metrics_async,
     get_option_metrics_sync as _metrics_sync,
@@ -28,30 +31,35 @@ from core.live_price_tracker import (
 load_dotenv()
 POLYGON_API_KEY = os.getenv("POLYGON_API_KEY")
 
-# Add to polygon_rest.py
 # ---------------------------------------------------------------------------
 # Historical bars fetcher (minute-based for intraday context)
 # ---------------------------------------------------------------------------
-def get_historic_bars(symbol: str = "SPY", multiplier: int = 1, timespan: str = "minute", 
-                      from_date: str = None, to_date: str = None, limit: int = 50) -> list[dict]:
+def get_historic_bars(symbol: str = "SPY", timespan: str = "minute", limit: int = 100,
+                      multiplier: int = 1, from_date: str = None, to_date: str = None) -> list[dict]:
     """
-    Fetches historical bars from Polygon.io REST API.
-    
+    Intraday / historical aggregate bars, oldest first.
+
+    Today's 1-minute bars (no dates, or today's date) come from the in-process
+    bar store and are the *latest* `limit` bars. Anything else – other days,
+    other bar sizes – is fetched from Polygon's REST aggs endpoint.
+
     Parameters:
     - symbol: ticker symbol (e.g., "SPY")
-    - multiplier: size of each bar (1 = 1min, 5 = 5min)
     - timespan: "minute", "hour", "day"
-    - from_date: ISO date (e.g., "2024-06-24") — required
-    - to_date: ISO date (e.g., "2024-06-24") — optional
-    - limit: number of bars to fetch
-    
-    Returns:
-    - List of bar dicts with timestamp, open, high, low, close, volume
+    - limit: number of bars to return
+    - multiplier: size of each bar (1 = 1min, 5 = 5min)
+    - from_date / to_date: ISO dates (e.g., "2024-06-24"); default today
     """
-    try:
-        if not from_date:
-            raise ValueError("from_date is required (e.g., '2024-06-24')")
+    today = session_date()
+    if timespan == "minute" and multiplier == 1 and from_date in (None, today) and to_date in (None, today):
+        try:
+            return get_bar_store().bars(symbol, limit=limit)
+        except Exception as e:
+            print(f"[polygon_rest] get_historic_bars (store) failed → {e}")
+            return []
 
+    try:
+        from_date = from_date or today
         url = f"https://api.polygon.io/v2/aggs/ticker/{symbol}/range/{multiplier}/{timespan}/{from_date}/{to_date or from_date}"
         params = {
             "adjusted": "true",
@@ -59,7 +67,7 @@ def get_historic_bars(symbol: str = "SPY", multiplier: int = 1, timespan: str =
             "limit": limit,
             "apiKey": POLYGON_API_KEY
         }
-        response = requests.get(url, params=params)
+        response = get_client(url).get(url, params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
         return data.get("results", [])
@@ -79,11 +87,7 @@ def get_today_expiry() -> str:
 # ---------------------------------------------------------------------------
 def get_polygon_snapshot_options(symbol: str) -> list:
     try:
-        url = f"https://api.polygon.io/v3/snapshot/options/{symbol}?apiKey={POLYGON_API_KEY}"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("results", [])
+        return get_chain_snapshot(symbol).results
     except Exception as e:
         print(f"[polygon_rest] snapshot fetch error → {e}")
         return []
@@ -93,19 +97,7 @@ def get_polygon_snapshot_options(symbol: str) -> list:
 # ---------------------------------------------------------------------------
 def get_last_price(symbol: str = "SPY") -> float:
     try:
-        url = f"https://api.polygon.io/v3/snapshot/options/{symbol}?apiKey={POLYGON_API_KEY}"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-
-        underlying = data.get("underlying_asset")
-        if isinstance(underlying, dict):
-            mid = underlying.get("mid") or (
-                (underlying.get("ask") + underlying.get("bid")) / 2
-                if underlying.get("ask") and underlying.get("bid") else None
-            )
-            return round(mid, 2) if mid else 0.0
-        return 0.0
+        return get_chain_snapshot(symbol).underlying_price
     except Exception as e:
         print(f"[polygon_rest] get_last_price failed: {e}")
         return 0.0
@@ -127,18 +119,6 @@ async def async_get_option_metrics(symbol: str = "SPY") -> Dict[str, float]:
 def get_dealer_flow_metrics(symbol: str = "SPY") -> Dict[str, float]:
     return {"score": 0.0}
 
-def get_historic_bars(symbol: str = "SPY", timespan="minute", limit=100) -> list:
-    """Pulls historical bars for SPY intraday timeframe."""
-    try:
-        url = f"https://api.polygon.io/v2/aggs/ticker/{symbol}/range/1/{timespan}/today?adjusted=true&sort=asc&limit={limit}&apiKey={POLYGON_API_KEY}"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("results", [])
-    except Exception as e:
-        print(f"[polygon_rest] get_historic_bars error → {e}")
-        return []
-    
 async def async_get_dealer_flow_metrics(symbol: str = "SPY") -> Dict[str, float]:
     return {"score": 0.0}
 
@@ -153,4 +133,5 @@ __all__ = [
     "async_get_dealer_flow_metrics",
     "get_last_price",
     "get_today_expiry",  # ← Add this
+    "get_historic_bars",
 ]
@@ -2,12 +2,15 @@
 # Helper tools for working with Polygon data formats and enabling real-time mesh agent access
 
 import math
-from datetime import datetime, timedelta
-import requests
 import os
 import json
-from collections import defaultdict
 from dotenv import load_dotenv
+from core.http_clients import get_client
+from polygon.chain_snapshot import get_chain_snapshot
+from polygon.bar_store import get_bar_store, session_date
+from polygon.open_interest import get_open_interest
+from analytics.indicator_engine import VOLUME_WINDOW, get_indicator_snapshot
+from analytics.gex_engine import GEX_INTERVAL, SNAPSHOT_PATH, get_gex_engine
 
 load_dotenv()
 POLYGON_KEY = os.getenv("POLYGON_API_KEY")
@@ -31,7 +34,7 @@ def normalize_chain(chain, side="call"):
 def get_realtime_price(symbol="SPY") -> float:
     url = f"{BASE_URL}/v2/last/trade/{symbol}?apiKey={POLYGON_KEY}"
     try:
-        r = requests.get(url)
+        r = get_client(url).get(url)
         r.raise_for_status()
         data = r.json()
         return data.get("last", {}).get("price", 0.0)
@@ -40,15 +43,12 @@ def get_realtime_price(symbol="SPY") -> float:
         return 0.0
 
 # ---------------------------------------------------------------------------
-# Real-time aggregate bars (1-min)
+# Real-time aggregate bars (1-min, served from the in-process bar store)
 # ---------------------------------------------------------------------------
 def get_intraday_bars(symbol="SPY", timespan="minute", limit=5):
-    today = datetime.utcnow().strftime("%Y-%m-%d")
-    url = f"{BASE_URL}/v2/aggs/ticker/{symbol}/range/1/{timespan}/{today}/{today}?apiKey={POLYGON_KEY}&limit={limit}"
+    """First *limit* minute bars of today's session (same as the old REST call)."""
     try:
-        r = requests.get(url)
-        r.raise_for_status()
-        return r.json().get("results", [])
+        return get_bar_store().bars(symbol, limit=limit, first=True)
     except Exception as e:
         print(f"⚠️ get_intraday_bars failed: {e}")
         return []
@@ -58,25 +58,17 @@ def get_intraday_bars(symbol="SPY", timespan="minute", limit=5):
 # ---------------------------------------------------------------------------
 def get_vwap(symbol: str = "SPY") -> float:
     try:
-        today = datetime.utcnow().strftime("%Y-%m-%d")
-        url = f"{BASE_URL}/v2/aggs/ticker/{symbol}/range/1/minute/{today}/{today}?adjusted=true&sort=asc&apiKey={POLYGON_KEY}"
-        r = requests.get(url)
-        r.raise_for_status()
-        candles = r.json().get("results", [])
-        if not candles:
-            return 0.0
-        total_vol = sum(c["v"] for c in candles)
-        if total_vol == 0:
-            return 0.0
-        vwap = sum(c["v"] * (c["h"] + c["l"] + c["c"]) / 3 for c in candles) / total_vol
-        return round(vwap, 2)
+        snap = get_indicator_snapshot(symbol)
+        if snap.warm:
+            return round(snap.vwap, 2)
+        return round(get_bar_store().session_vwap(symbol), 2)
     except Exception:
         return 0.0
     
 def get_vwap_diff(symbol: str = "SPY") -> float:
     try:
         url = f"{BASE_URL}/v2/aggs/ticker/{symbol}/prev?adjusted=true&apiKey={POLYGON_KEY}"
-        r = requests.get(url).json()
+        r = get_client(url).get(url).json()
         close = r["results"][0]["c"]
         vwap = r["results"][0]["vwap"]
         return round((close - vwap) / vwap, 4)
@@ -112,7 +104,7 @@ def get_intraday_returns(symbol="SPY", limit=20) -> dict:
 def get_option_greeks(symbol: str) -> dict:
     url = f"{BASE_URL}/v3/snapshot/options/{symbol}?apiKey={POLYGON_KEY}"
     try:
-        r = requests.get(url)
+        r = get_client(url).get(url)
         r.raise_for_status()
         data = r.json().get("results", [])
         if not data:
@@ -134,7 +126,7 @@ def get_option_greeks(symbol: str) -> dict:
 def get_order_book_depth(symbol="SPY") -> dict:
     url = f"{BASE_URL}/v3/quotes/{symbol}?apiKey={POLYGON_KEY}"
     try:
-        r = requests.get(url)
+        r = get_client(url).get(url)
         r.raise_for_status()
         data = r.json().get("results", [])
         if not data:
@@ -160,16 +152,24 @@ def get_vix_index_price() -> float:
 # Real-time volume for SPY
 # ---------------------------------------------------------------------------
 def get_recent_volume(symbol="SPY", limit=5) -> int:
-    bars = get_intraday_bars(symbol=symbol, limit=limit)
     try:
-        return sum(bar.get("v", 0) for bar in bars)
+        if limit == VOLUME_WINDOW:
+            snap = get_indicator_snapshot(symbol)
+            if snap.warm:
+                return int(snap.rolling_volume)
+        bars = get_bar_store().bars(symbol, limit=limit)
+        return int(sum(bar.get("v", 0) for bar in bars))
     except Exception as e:
         print(f"⚠️ get_recent_volume failed: {e}")
         return 0
 
 def get_gex_score(symbol: str = "SPY") -> float:
+    """Net signed GEX from the in-memory GEX engine; falls back to the last persisted snapshot."""
+    prof = get_gex_engine().current(max_age=GEX_INTERVAL * 4)
+    if prof is not None and prof.symbol == symbol:
+        return prof.net_gex
     try:
-        path = "data/gex_ml_snapshots/latest_gex.json"
+        path = SNAPSHOT_PATH
         with open(path, "r") as f:
             snap = json.load(f)
         return snap.get("gex_score", 0)
@@ -192,19 +192,24 @@ def format_option_symbol(symbol: str, expiry: str, strike: int, call_put: str) -
 def normalize_chain(chain: list, side: str = "call") -> list:
     return [opt for opt in chain if opt.get("details", {}).get("contract_type") == side]
 
-def get_intraday_returns(symbol: str = "SPY") -> float:
-    try:
+_PREV_CLOSE: dict = {}   # (symbol, ET session date) → previous session close
+
+def _prev_close(symbol: str) -> float:
+    key = (symbol, session_date())
+    if key not in _PREV_CLOSE:
         url = f"{BASE_URL}/v2/aggs/ticker/{symbol}/prev?adjusted=true&apiKey={POLYGON_KEY}"
-        r = requests.get(url)
+        r = get_client(url).get(url, timeout=10)
         r.raise_for_status()
         data = r.json().get("results", [])
         if not data:
             return 0.0
-        prev_close = data[0].get("c", 0)
-        curr_url = f"{BASE_URL}/v2/last/trade/{symbol}?apiKey={POLYGON_KEY}"
-        r2 = requests.get(curr_url)
-        r2.raise_for_status()
-        last = r2.json().get("results", {}).get("p", 0)
+        _PREV_CLOSE[key] = data[0].get("c", 0)
+    return _PREV_CLOSE[key]
+
+def get_intraday_returns(symbol: str = "SPY") -> float:
+    try:
+        prev_close = _prev_close(symbol)
+        last = get_bar_store().last_close(symbol)
         if not last or not prev_close:
             return 0.0
         return round((last - prev_close) / prev_close, 4)
@@ -215,49 +220,38 @@ def get_intraday_returns(symbol: str = "SPY") -> float:
 
 def get_skew(symbol: str = "SPY") -> float:
     """
-    Returns skew estimate based on IV between OTM puts and OTM calls.
-    This is a placeholder and should ideally be replaced with real IV surface parsing.
+    Returns skew estimate based on IV between OTM puts and OTM calls
+    (three nearest strikes either side of spot, nearest expiry).
     """
     try:
-        url = f"{BASE_URL}/v3/snapshot/options/{symbol}?apiKey={POLYGON_KEY}"
-        r = requests.get(url)
-        r.raise_for_status()
-        data = r.json().get("results", [])
-        if not data:
+        snapshot = get_chain_snapshot(symbol)
+        if not snapshot:
             return 1.05  # fallback
 
-        calls = [opt for opt in data if opt["details"]["contract_type"] == "call"]
-        puts = [opt for opt in data if opt["details"]["contract_type"] == "put"]
-        atm_call_iv = sum(opt["implied_volatility"] for opt in calls[:3]) / max(len(calls[:3]), 1)
-        atm_put_iv = sum(opt["implied_volatility"] for opt in puts[:3]) / max(len(puts[:3]), 1)
-
-        skew = round(atm_put_iv / atm_call_iv, 4) if atm_call_iv else 1.05
-        return skew
+        skew = snapshot.frame.skew(spot=snapshot.underlying_price, n=3)
+        return round(skew, 4) if skew else 1.05
 
     except Exception:
         return 1.05  # conservative fallback
 
+def _strike_key(strike: float) -> str:
+    return str(int(strike)) if float(strike).is_integer() else str(strike)
+
 def get_open_interest_by_strike(symbol: str = "SPY") -> dict:
     """
-    Build a dictionary of strike → {call_oi, put_oi} from option snapshot.
+    Dictionary of strike → {call_oi, put_oi} summed over the active expiries,
+    from the daily OI cache (no chain download). Prefer
+    `get_open_interest().get().at(strike)` for single lookups.
     """
     try:
-        url = f"{BASE_URL}/v3/snapshot/options/{symbol}?apiKey={POLYGON_KEY}"
-        r = requests.get(url)
-        r.raise_for_status()
-        data = r.json().get("results", [])
-        if not data:
+        table = get_open_interest().get()
+        if table is None or table.symbol != symbol:
             return {}
 
-        oi_map = defaultdict(lambda: {"call_oi": 0, "put_oi": 0})
-        for opt in data:
-            strike = opt["details"].get("strike_price")
-            side = opt["details"].get("contract_type")
-            oi = opt.get("open_interest", 0)
-            if side == "call":
-                oi_map[str(strike)]["call_oi"] += oi
-            elif side == "put":
-                oi_map[str(strike)]["put_oi"] += oi
-        return dict(oi_map)
+        rows = table.total
+        return {
+            _strike_key(k): {"call_oi": int(c), "put_oi": int(p)}
+            for k, c, p in zip(rows.strikes.tolist(), rows.call_oi.tolist(), rows.put_oi.tolist())
+        }
     except Exception:
         return {}
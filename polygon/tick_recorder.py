@@ -0,0 +1,363 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: polygon/tick_recorder.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Binary tick recorder – daily, memory-mapped, append-only segments.
+
+Every stock / option event the market data hub receives (Q, T, A, AM) is
+queued in O(1) on the receive path and encoded by a writer thread into a
+fixed-width 72-byte record:
+
+    kind u8 | flags u8 | sym_id u16 | seq u32 | exch_ns i64 | recv_ns i64 | f[6] f64
+
+    Q  → bid, ask, bid_size, ask_size, bid_exchange, ask_exchange
+    T  → price, size, exchange, 0, 0, 0
+    A/AM → open, high, low, close, volume, vwap      (exch_ns = bar start)
+
+Per session date (ET) in `TICK_DIR`:
+
+    YYYYMMDD.ticks   64-byte header + records (grown in `TICK_CHUNK_MB` chunks)
+    YYYYMMDD.syms    "<id>\\t<symbol>" lines, appended on first sight
+    YYYYMMDD.idx     sparse time index: (recv_ns i64, record_no u64) every
+                     `INDEX_EVERY` records
+
+`TickReader` maps a segment read-only and exposes it as a zero-copy NumPy
+structured array.
+"""
+from __future__ import annotations
+
+import atexit
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List
+
+import numpy as np
+
+from core.logger_setup import get_logger
+from polygon.bar_store import session_date
+
+logger = get_logger(__name__)
+
+# ---------------------------------------------------------------------------
+# Config / format
+# ---------------------------------------------------------------------------
+TICK_DIR       = os.getenv("TICK_DIR", "data/ticks")
+TICK_ENABLED   = os.getenv("TICK_RECORDER_ENABLED", "1") == "1"
+CHUNK_BYTES    = int(float(os.getenv("TICK_CHUNK_MB", "64")) * 1024 * 1024)
+INDEX_EVERY    = 4096                  # records between sparse time-index entries
+HEADER_SYNC_S  = 1.0                   # seconds between header count updates
+
+MAGIC          = b"QTIK"
+FORMAT_VERSION = 1
+HEADER         = struct.Struct("<4sHHqQ8s32x")        # magic, ver, rec size, created_ns, count, date
+RECORD         = struct.Struct("<BBHIqq6d")
+INDEX_ENTRY    = struct.Struct("<qQ")
+assert HEADER.size == 64 and RECORD.size == 72
+
+KIND_QUOTE, KIND_TRADE, KIND_SECOND, KIND_MINUTE = 1, 2, 3, 4
+KINDS = {"Q": KIND_QUOTE, "T": KIND_TRADE, "A": KIND_SECOND, "AM": KIND_MINUTE}
+KIND_NAMES = {v: k for k, v in KINDS.items()}
+
+RECORD_DTYPE = np.dtype([
+    ("kind", "u1"), ("flags", "u1"), ("sym", "<u2"), ("seq", "<u4"),
+    ("exch_ns", "<i8"), ("recv_ns", "<i8"), ("f", "<f8", (6,)),
+])
+assert RECORD_DTYPE.itemsize == RECORD.size
+
+
+def _n(v) -> float:
+    try:
+        return float(v) if v is not None else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _fields(kind: int, ev: dict) -> tuple:
+    if kind == KIND_QUOTE:
+        return (_n(ev.get("bp")), _n(ev.get("ap")), _n(ev.get("bs")), _n(ev.get("as")),
+                _n(ev.get("bx")), _n(ev.get("ax")))
+    if kind == KIND_TRADE:
+        return (_n(ev.get("p")), _n(ev.get("s")), _n(ev.get("x")), 0.0, 0.0, 0.0)
+    return (_n(ev.get("o")), _n(ev.get("h")), _n(ev.get("l")), _n(ev.get("c")),
+            _n(ev.get("v")), _n(ev.get("vw")))
+
+# ---------------------------------------------------------------------------
+# Segment writer
+# ---------------------------------------------------------------------------
+class _Segment:
+    """One day's append-only, memory-mapped record file plus its sidecars."""
+
+    def __init__(self, directory: str, day: str):
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.join(directory, day.replace("-", ""))
+        self.day = day
+        self.path = f"{stem}.ticks"
+        self._fh = open(self.path, "r+b" if os.path.exists(self.path) else "w+b")
+        self._syms_fh = open(f"{stem}.syms", "a+", encoding="utf-8")
+        self._idx_fh = open(f"{stem}.idx", "ab")
+        self.symbols: Dict[str, int] = self._load_symbols()
+
+        size = os.fstat(self._fh.fileno()).st_size
+        if size >= HEADER.size:
+            magic, _ver, rec, created, count, _ = HEADER.unpack(self._fh.read(HEADER.size))
+            if magic != MAGIC or rec != RECORD.size:
+                raise ValueError(f"{self.path}: not a v{FORMAT_VERSION} tick segment")
+            self.count, self.created = count, created
+        else:
+            self.count, self.created = 0, time.time_ns()
+            size = 0
+        self._capacity_bytes = max(size, HEADER.size + CHUNK_BYTES)
+        self._fh.truncate(self._capacity_bytes)
+        self._mm = mmap.mmap(self._fh.fileno(), self._capacity_bytes)
+        self.sync_header()
+
+    def _load_symbols(self) -> Dict[str, int]:
+        self._syms_fh.seek(0)
+        symbols = {}
+        for line in self._syms_fh:
+            sid, _, sym = line.rstrip("\n").partition("\t")
+            if sym:
+                symbols[sym] = int(sid)
+        return symbols
+
+    def sym_id(self, symbol: str) -> int:
+        sid = self.symbols.get(symbol)
+        if sid is None:
+            sid = self.symbols[symbol] = len(self.symbols)
+            self._syms_fh.write(f"{sid}\t{symbol}\n")
+            self._syms_fh.flush()
+        return sid
+
+    def _grow(self) -> None:
+        self._mm.flush()
+        self._mm.close()
+        self._capacity_bytes += CHUNK_BYTES
+        self._fh.truncate(self._capacity_bytes)
+        self._mm = mmap.mmap(self._fh.fileno(), self._capacity_bytes)
+
+    def append(self, kind: int, sym: int, exch_ns: int, recv_ns: int, f: tuple) -> None:
+        offset = HEADER.size + self.count * RECORD.size
+        if offset + RECORD.size > self._capacity_bytes:
+            self._grow()
+        RECORD.pack_into(self._mm, offset, kind, 0, sym, self.count & 0xFFFFFFFF,
+                         exch_ns, recv_ns, *f)
+        if self.count % INDEX_EVERY == 0:
+            self._idx_fh.write(INDEX_ENTRY.pack(recv_ns, self.count))
+        self.count += 1
+
+    def sync_header(self) -> None:
+        HEADER.pack_into(self._mm, 0, MAGIC, FORMAT_VERSION, RECORD.size, self.created,
+                         self.count, self.day.replace("-", "").encode())
+        self._idx_fh.flush()
+
+    def close(self) -> None:
+        self.sync_header()
+        self._mm.flush()
+        self._mm.close()
+        self._fh.truncate(HEADER.size + self.count * RECORD.size)   # drop preallocated tail
+        self._fh.close()
+        self._syms_fh.close()
+        self._idx_fh.close()
+
+
+class TickRecorder:
+    """Queue-fed background writer. `submit()` is the only call on the receive path."""
+
+    def __init__(self, directory: str = TICK_DIR):
+        self.directory = directory
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._segment: _Segment | None = None
+        self._lock = threading.Lock()
+        self._stats = {"events": 0, "written": 0, "skipped": 0, "errors": 0}
+
+    # ── receive path ─────────────────────────────────────────────────────────
+    def submit(self, events: List[dict], recv_ts: float | None = None) -> None:
+        """Enqueue one decoded websocket frame; O(1), never blocks."""
+        if self._thread is None:
+            self.start()
+        self._queue.put((recv_ts or time.time(), events))
+
+    # ── writer thread ────────────────────────────────────────────────────────
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True, name="tick-recorder")
+                self._thread.start()
+
+    def _segment_for(self, day: str) -> _Segment:
+        seg = self._segment
+        if seg is None or seg.day != day:
+            if seg is not None:
+                seg.close()
+            seg = self._segment = _Segment(self.directory, day)
+            logger.info({"event": "tick_segment_open", "path": seg.path, "records": seg.count})
+        return seg
+
+    def _write(self, recv_ts: float, events: Iterable[dict]) -> None:
+        seg = self._segment_for(session_date())
+        recv_ns = int(recv_ts * 1e9)
+        for ev in events:
+            self._stats["events"] += 1
+            kind = KINDS.get(ev.get("ev")) if isinstance(ev, dict) else None
+            sym = ev.get("sym") if kind else None
+            if not sym:
+                self._stats["skipped"] += 1
+                continue
+            ts = ev.get("s") if kind in (KIND_SECOND, KIND_MINUTE) else ev.get("t")
+            exch_ns = int(_n(ts) * 1_000_000)          # Polygon sends epoch ms
+            seg.append(kind, seg.sym_id(sym), exch_ns, recv_ns, _fields(kind, ev))
+            self._stats["written"] += 1
+
+    def _run(self) -> None:
+        last_sync = time.time()
+        while True:
+            try:
+                item = self._queue.get(timeout=HEADER_SYNC_S)
+            except queue.Empty:
+                item = None
+            if item is StopIteration:
+                break
+            try:
+                if item is not None:
+                    self._write(*item)
+                if self._segment is not None and time.time() - last_sync >= HEADER_SYNC_S:
+                    self._segment.sync_header()
+                    last_sync = time.time()
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error({"event": "tick_record_fail", "err": str(e)})
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Drain the queue, finalise the segment and stop the writer."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(StopIteration)
+        thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> dict:
+        return {**self._stats, "queued": self._queue.qsize(),
+                "segment": self._segment.path if self._segment else None}
+
+# ---------------------------------------------------------------------------
+# Reader
+# ---------------------------------------------------------------------------
+class TickReader:
+    """Read-only, zero-copy view of one tick segment."""
+
+    def __init__(self, path: str):
+        stem = path[:-len(".ticks")] if path.endswith(".ticks") else path
+        self.path = f"{stem}.ticks"
+        with open(self.path, "rb") as fh:
+            magic, _ver, rec, self.created_ns, count, day = HEADER.unpack(fh.read(HEADER.size))
+            if magic != MAGIC or rec != RECORD.size:
+                raise ValueError(f"{self.path}: not a v{FORMAT_VERSION} tick segment")
+            self.day = day.decode()
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        # a live segment may be ahead of its last header sync – trust the header
+        self.records = np.frombuffer(self._mm, dtype=RECORD_DTYPE, count=count, offset=HEADER.size)
+        self.symbols: Dict[int, str] = {}
+        if os.path.exists(f"{stem}.syms"):
+            with open(f"{stem}.syms", encoding="utf-8") as fh:
+                for line in fh:
+                    sid, _, sym = line.rstrip("\n").partition("\t")
+                    if sym:
+                        self.symbols[int(sid)] = sym
+        self.index = np.empty((0, 2), dtype=np.int64)
+        if os.path.exists(f"{stem}.idx"):
+            raw = np.fromfile(f"{stem}.idx", dtype=np.int64)
+            self.index = raw[: len(raw) // 2 * 2].reshape(-1, 2)
+
+    @classmethod
+    def for_date(cls, day: str, directory: str = TICK_DIR) -> "TickReader":
+        return cls(os.path.join(directory, day.replace("-", "") + ".ticks"))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def symbol_id(self, symbol: str) -> int | None:
+        return next((i for i, s in self.symbols.items() if s == symbol), None)
+
+    def between(self, start_ns: int | None = None, end_ns: int | None = None) -> np.ndarray:
+        """Records whose receive time is in [start_ns, end_ns), narrowed via the sparse index."""
+        lo, hi = 0, len(self.records)
+        if len(self.index):
+            if start_ns is not None:
+                k = int(np.searchsorted(self.index[:, 0], start_ns, side="right")) - 1
+                lo = int(self.index[k, 1]) if k >= 0 else 0
+            if end_ns is not None:
+                k = int(np.searchsorted(self.index[:, 0], end_ns, side="right"))
+                hi = int(self.index[k, 1]) if k < len(self.index) else hi
+        recs = self.records[lo:hi]
+        m = np.ones(len(recs), dtype=bool)
+        if start_ns is not None:
+            m &= recs["recv_ns"] >= start_ns
+        if end_ns is not None:
+            m &= recs["recv_ns"] < end_ns
+        return recs[m]
+
+    def select(self, symbol: str | None = None, kinds: Iterable[str] | None = None,
+               start_ns: int | None = None, end_ns: int | None = None) -> np.ndarray:
+        recs = self.between(start_ns, end_ns)
+        if symbol is not None:
+            sid = self.symbol_id(symbol)
+            recs = recs[recs["sym"] == sid] if sid is not None else recs[:0]
+        if kinds is not None:
+            recs = recs[np.isin(recs["kind"], [KINDS[k] for k in kinds])]
+        return recs
+
+    def iter_events(self, records: np.ndarray | None = None) -> Iterator[dict]:
+        """Rebuild Polygon-shaped event dicts (plus `_recv` seconds) for replay."""
+        recs = self.records if records is None else records
+        for r in recs:
+            kind, f = int(r["kind"]), r["f"].tolist()
+            ev = {"ev": KIND_NAMES.get(kind), "sym": self.symbols.get(int(r["sym"]), ""),
+                  "_recv": int(r["recv_ns"]) / 1e9}
+            ms = int(r["exch_ns"]) // 1_000_000
+            if kind == KIND_QUOTE:
+                ev.update(bp=f[0], ap=f[1], bs=f[2], **{"as": f[3]}, bx=int(f[4]), ax=int(f[5]), t=ms)
+            elif kind == KIND_TRADE:
+                ev.update(p=f[0], s=f[1], x=int(f[2]), t=ms)
+            else:
+                ev.update(o=f[0], h=f[1], l=f[2], c=f[3], v=f[4], vw=f[5], s=ms,
+                          e=ms + (60_000 if kind == KIND_MINUTE else 1_000))
+            yield ev
+
+    def close(self) -> None:
+        self.records = np.empty(0, dtype=RECORD_DTYPE)
+        try:
+            self._mm.close()
+        except BufferError:
+            pass                            # caller still holds views; unmapped on GC
+
+
+_RECORDER = TickRecorder()
+atexit.register(_RECORDER.close)
+
+
+def get_tick_recorder() -> TickRecorder:
+    return _RECORDER
+
+
+def record_events(events: List[dict], recv_ts: float | None = None) -> None:
+    """Receive-path hook; no-op when TICK_RECORDER_ENABLED=0."""
+    if TICK_ENABLED:
+        _RECORDER.submit(events, recv_ts)
+
+
+__all__ = [
+    "TickRecorder",
+    "TickReader",
+    "RECORD_DTYPE",
+    "get_tick_recorder",
+    "record_events",
+]
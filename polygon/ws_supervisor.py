@@ -0,0 +1,275 @@
+# ─────────────────────────────────────────────────────────────────────────────
+# File: polygon/ws_supervisor.py
+# ─────────────────────────────────────────────────────────────────────────────
+"""
+Supervisor for one long-lived Polygon websocket connection.
+
+* Reconnects forever with full-jitter exponential backoff (reset once a
+  connection has stayed up for `WS_STABLE_AFTER` seconds)
+* Re-authenticates and replays the *current* subscription set on every
+  connect – subscribe/unsubscribe while down simply edits that set
+* Optional idle watchdog forces a reconnect when no frame arrives in time
+* `stats()` exposes connects, reconnects, message counts and gap durations
+  (time from losing the socket to being authenticated again)
+
+One task per connection, no recursion, no extra threads.
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import os
+import random
+import time
+from collections import deque
+from typing import Any, Callable, Iterable, List
+
+import websockets
+from dotenv import load_dotenv
+
+from core.logger_setup import get_logger
+
+load_dotenv()
+logger = get_logger(__name__)
+
+# ---------------------------------------------------------------------------
+# Config
+# ---------------------------------------------------------------------------
+POLYGON_API_KEY = os.getenv("POLYGON_API_KEY", "")
+BACKOFF_BASE    = float(os.getenv("WS_BACKOFF_BASE", "0.5"))    # seconds
+BACKOFF_MAX     = float(os.getenv("WS_BACKOFF_MAX", "30"))      # seconds
+STABLE_AFTER    = float(os.getenv("WS_STABLE_AFTER", "30"))     # seconds up before backoff resets
+AUTH_TIMEOUT    = 10                                            # seconds
+SUBSCRIBE_BATCH = 500                                           # channels per message
+
+MessageHandler = Callable[[List[dict]], Any]      # may return an awaitable
+StatusHandler = Callable[[str, dict], Any]        # ("up" | "down", info)
+
+# ---------------------------------------------------------------------------
+# Supervisor
+# ---------------------------------------------------------------------------
+class WebSocketSupervisor:
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        on_message: MessageHandler,
+        *,
+        channels: Iterable[str] = (),
+        api_key: str | None = None,
+        idle_timeout: float | None = None,
+        on_status: StatusHandler | None = None,
+    ):
+        self.name = name
+        self.url = url
+        self.on_message = on_message
+        self.on_status = on_status
+        self.idle_timeout = idle_timeout
+        self.channels = set(filter(None, channels))
+        self._api_key = api_key if api_key is not None else POLYGON_API_KEY
+        self._ws = None
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stopping = False
+        self._up_since = 0.0
+        self._down_since = time.time()
+        self._last_msg_at = 0.0
+        self._gaps: deque = deque(maxlen=50)
+        self._stats = {"connects": 0, "reconnects": 0, "messages": 0, "errors": 0,
+                       "total_gap": 0.0, "max_gap": 0.0}
+
+    # ── connection ───────────────────────────────────────────────────────────
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None
+
+    @staticmethod
+    def backoff(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX) -> float:
+        """Full-jitter exponential backoff: U(0, min(cap, base·2^attempt))."""
+        return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+    async def _authenticate(self, ws) -> None:
+        await ws.send(json.dumps({"action": "auth", "params": self._api_key}))
+        deadline = time.time() + AUTH_TIMEOUT
+        while time.time() < deadline:
+            raw = await asyncio.wait_for(ws.recv(), timeout=max(0.1, deadline - time.time()))
+            events = json.loads(raw)
+            statuses = {e.get("status") for e in events if isinstance(e, dict)}
+            if "auth_success" in statuses:
+                return
+            if "auth_failed" in statuses or "max_connections" in statuses:
+                raise ConnectionError(f"{self.name}: {statuses}")
+        raise ConnectionError(f"{self.name}: auth timed out")
+
+    async def _send(self, action: str, channels: List[str]) -> None:
+        ws = self._ws
+        if ws is None or not channels:
+            return
+        for i in range(0, len(channels), SUBSCRIBE_BATCH):
+            batch = channels[i:i + SUBSCRIBE_BATCH]
+            await ws.send(json.dumps({"action": action, "params": ",".join(batch)}))
+
+    def _mark_up(self) -> None:
+        now = time.time()
+        gap = now - self._down_since if self._stats["connects"] else 0.0
+        self._up_since = now
+        self._stats["connects"] += 1
+        if gap:
+            self._gaps.append(round(gap, 3))
+            self._stats["total_gap"] += gap
+            self._stats["max_gap"] = max(self._stats["max_gap"], gap)
+        logger.info({"event": "ws_up", "feed": self.name, "gap_s": round(gap, 3),
+                     "channels": len(self.channels)})
+        self._emit("up", {"gap": gap})
+
+    def _mark_down(self, err: str | None) -> float:
+        lasted = time.time() - self._up_since if self._ws is not None else 0.0
+        was_up = self._ws is not None
+        self._ws = None
+        if was_up:
+            self._down_since = time.time()
+            logger.warning({"event": "ws_down", "feed": self.name, "err": err,
+                            "uptime_s": round(lasted, 1)})
+            self._emit("down", {"err": err, "uptime": lasted})
+        return lasted
+
+    def _emit(self, status: str, info: dict) -> None:
+        if self.on_status is None:
+            return
+        try:
+            self.on_status(status, info)
+        except Exception as e:
+            logger.error({"event": "ws_status_hook_fail", "feed": self.name, "err": str(e)})
+
+    async def _recv(self, ws):
+        if self.idle_timeout:
+            try:
+                return await asyncio.wait_for(ws.recv(), timeout=self.idle_timeout)
+            except asyncio.TimeoutError:
+                raise ConnectionError(f"{self.name}: idle for {self.idle_timeout}s")
+        return await ws.recv()
+
+    async def _session(self) -> None:
+        async with websockets.connect(self.url, max_queue=None) as ws:
+            await self._authenticate(ws)
+            self._ws = ws
+            self._mark_up()
+            await self._send("subscribe", sorted(self.channels))
+            while True:
+                raw = await self._recv(ws)
+                self._last_msg_at = time.time()
+                self._stats["messages"] += 1
+                try:
+                    events = json.loads(raw)
+                    result = self.on_message(events if isinstance(events, list) else [events])
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    self._stats["errors"] += 1
+                    logger.error({"event": "ws_handler_fail", "feed": self.name, "err": str(e)})
+
+    async def run(self) -> None:
+        """Supervise the connection until `stop()` is called."""
+        self._loop = asyncio.get_running_loop()
+        attempt = 0
+        while not self._stopping:
+            err = None
+            try:
+                await self._session()
+            except asyncio.CancelledError:
+                self._mark_down("cancelled")
+                raise
+            except Exception as e:
+                err = str(e) or type(e).__name__
+            lasted = self._mark_down(err)
+            if self._stopping:
+                break
+            if lasted >= STABLE_AFTER:
+                attempt = 0
+            delay = self.backoff(attempt)
+            attempt += 1
+            self._stats["reconnects"] += 1
+            logger.info({"event": "ws_backoff", "feed": self.name, "attempt": attempt,
+                         "delay_s": round(delay, 2), "err": err})
+            await asyncio.sleep(delay)
+
+    # ── lifecycle ────────────────────────────────────────────────────────────
+    def start(self) -> asyncio.Task:
+        """Start supervising on the running loop. Idempotent."""
+        self._loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = self._loop.create_task(self.run(), name=f"ws-{self.name}")
+        return self._task
+
+    async def stop(self) -> None:
+        self._stopping = True
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def reconnect(self) -> None:
+        """Close the current socket; `run()` reconnects and replays channels."""
+        ws = self._ws
+        if ws is not None:
+            await ws.close()
+
+    # ── subscriptions ────────────────────────────────────────────────────────
+    def _call_in_loop(self, action: str, channels: List[str]) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed() or self._ws is None:
+            return                          # replayed on next connect
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            loop.create_task(self._safe_send(action, channels))
+        else:
+            asyncio.run_coroutine_threadsafe(self._safe_send(action, channels), loop)
+
+    async def _safe_send(self, action: str, channels: List[str]) -> None:
+        try:
+            await self._send(action, channels)
+        except Exception as e:
+            logger.warning({"event": "ws_send_fail", "feed": self.name, "action": action, "err": str(e)})
+
+    def subscribe(self, channels: Iterable[str]) -> List[str]:
+        """Add channels (thread-safe); returns the ones actually new."""
+        new = sorted({c for c in channels if c} - self.channels)
+        self.channels.update(new)
+        if new:
+            self._call_in_loop("subscribe", new)
+        return new
+
+    def unsubscribe(self, channels: Iterable[str]) -> List[str]:
+        gone = sorted(set(channels) & self.channels)
+        self.channels.difference_update(gone)
+        if gone:
+            self._call_in_loop("unsubscribe", gone)
+        return gone
+
+    def set_channels(self, channels: Iterable[str]) -> None:
+        """Replace the subscription set, sending only the diff."""
+        target = set(filter(None, channels))
+        self.unsubscribe(self.channels - target)
+        self.subscribe(target)
+
+    # ── introspection ────────────────────────────────────────────────────────
+    def stats(self) -> dict:
+        now = time.time()
+        return {
+            "connected": self.connected,
+            "channels": len(self.channels),
+            "uptime_s": round(now - self._up_since, 1) if self.connected else 0.0,
+            "down_s": 0.0 if self.connected else round(now - self._down_since, 1),
+            "last_message_age": round(now - self._last_msg_at, 1) if self._last_msg_at else None,
+            "last_gap": self._gaps[-1] if self._gaps else None,
+            "recent_gaps": list(self._gaps)[-5:],
+            **{k: round(v, 3) if isinstance(v, float) else v for k, v in self._stats.items()},
+        }
+
+
+__all__ = ["WebSocketSupervisor"]
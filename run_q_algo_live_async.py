@@ -15,19 +15,29 @@ from core.runtime_state import update_runtime_state
 from core.capital_manager import (
     fetch_tradier_equity, get_tradier_buying_power,
     get_current_allocation, evaluate_drawdown_throttle,
-    compute_position_size, poll_balance_loop
+    compute_position_size
 )
-from core.position_manager import manage_positions
+from core.account_state import get_account_state
+from core.order_tracker import get_order_tracker
+from core.position_manager import manage_positions_async
 from core.entry_learner import evaluate_entry
 from core.open_trade_tracker import log_open_trade, load_open_trades
-from core.trade_engine import open_position
+from core.trade_engine import aopen_position
 from core.telegram_alerts import send_telegram_alert
+from core.http_clients import warm_connections, awarm_connections, pool_stats
 from core.tradier_execution import get_atm_option_symbol
-from polygon.polygon_websocket import start_polygon_listener, SPY_LIVE_PRICE
-from polygon.stocks_websocket import start_spy_price_listener
+from core.option_symbol_resolver import get_atm_resolver, resolve_atm_symbol
+from core.market_context import MarketContext, abuild_market_context
+from polygon.market_data_hub import get_market_data_hub
+from polygon.option_subscriptions import get_option_subscriptions
+from polygon.bar_store import get_bar_store
 from core.market_hours import is_market_open_now, get_market_status_string, is_0dte_trading_window_now
-from analytics.technical_indicators import get_rsi, is_vwap_reclaim
-from core.mesh_router import summarize_votes
+from core.mesh_router import summarize_votes, BRAIN_FEATURES
+from core.feature_graph import get_features
+from analytics.gex_engine import get_gex_engine
+from analytics.iv_surface import get_iv_surface_engine
+from polygon.open_interest import get_open_interest
+from analytics.state_index import get_state_index
 from mesh.q_think import _log_qthink_summary
 
 logger = get_logger(__name__)
@@ -46,14 +56,18 @@ async def _heartbeat():
         try:
             eq = fetch_tradier_equity()
             bp = get_tradier_buying_power()
-            mid = SPY_LIVE_PRICE.get("mid") or SPY_LIVE_PRICE.get("last_trade")
+            mid = get_market_data_hub().price("SPY") or None
             ts = datetime.utcnow().strftime("%H:%M:%S")
             print(f"🎯 {ts} | eq ${eq:,.0f} bp ${bp:,.0f} mid {mid} | 0-DTE {'OPEN' if is_0dte_trading_window_now() else 'CLOSED'}")
+            logger.debug({"event": "http_pools", "pools": pool_stats(), "account": get_account_state().stats(),
+                          "orders": get_order_tracker().stats(), "gex": get_gex_engine().stats(),
+                          "iv_surface": get_iv_surface_engine().stats(),
+                          "oi": get_open_interest().stats()})
         except Exception as e:
             logger.error({"event": "heartbeat_fail", "err": str(e)})
         await asyncio.sleep(_HEARTBEAT_INTERVAL)
 
-async def _entry_cycle():
+async def _entry_cycle(market: MarketContext):
     print("\n🔍 Evaluating entry signal...")
     if not is_0dte_trading_window_now():
         print("⌛ Market closed or not within 0-DTE window.")
@@ -79,7 +93,7 @@ async def _entry_cycle():
         print("⏳ Skipping entry: open position exists.")
         return
 
-    meta = await evaluate_entry(default_threshold=ENTRY_THRESHOLD, want_meta=True)
+    meta = await evaluate_entry(default_threshold=ENTRY_THRESHOLD, want_meta=True, market=market)
     if not meta.get("passes"):
         print(f"⚪ Entry rejected: score {meta.get('score', 0):.2f}")
         return
@@ -87,8 +101,8 @@ async def _entry_cycle():
     score = meta["score"]
     rationale = meta["rationale"]
     regime = meta.get("regime", "unknown")
-    rsi = get_rsi("SPY")
-    vwap = is_vwap_reclaim("SPY")
+    rsi = market.rsi if market.rsi is not None else 50.0
+    vwap = market.vwap_reclaim
     mesh = meta.get("agent_signals", {})
     mesh_score = summarize_votes(mesh)
     gpt_bias = meta.get("gpt_reasoning", "n/a").lower()
@@ -110,7 +124,9 @@ async def _entry_cycle():
     side = "CALL" if vote_call > vote_put else "PUT"
     option_type = "C" if side == "CALL" else "P"
 
-    opt_symbol = get_atm_option_symbol("SPY", call_put=option_type)
+    opt_symbol = resolve_atm_symbol("SPY", call_put=option_type)
+    if not opt_symbol:                          # ladder not loaded yet – slow REST path
+        opt_symbol = await asyncio.to_thread(get_atm_option_symbol, "SPY", option_type)
     if not opt_symbol:
         print("❌ Failed to resolve ATM option.")
         return
@@ -124,7 +140,7 @@ async def _entry_cycle():
     print(f"📊 {side} {contracts}x SPY | alloc={alloc:.2f} x throttle={throttle:.2f} → {alloc * throttle:.2f}")
 
     try:
-        order = open_position(
+        order = await aopen_position(
             symbol=opt_symbol,
             contracts=contracts,
             option_type=option_type,
@@ -158,27 +174,50 @@ async def main():
     run_preflight_check()
     reconcile_open_trades()
     run_recovery()
-    start_polygon_listener()
-    start_spy_price_listener()
-    asyncio.create_task(poll_balance_loop())
+    hub = get_market_data_hub()
+    hub.start()
+    get_option_subscriptions().start()
+    await asyncio.to_thread(warm_connections)
+    await awarm_connections([os.getenv("TRADIER_API_BASE", "https://sandbox.tradier.com/v1")])
+    await asyncio.to_thread(get_bar_store().seed, "SPY")
+    await asyncio.to_thread(get_open_interest().load)    # day's OI by strike, file-cached
+    await asyncio.to_thread(get_state_index().load)      # q_0dte_brain similarity index
+    resolver = get_atm_resolver()
+    try:
+        await resolver.prepare()                # strike ladder once per expiry, before the open
+    except Exception as e:
+        logger.error({"event": "atm_resolver_prepare_fail", "err": str(e)})
+    resolver.start()
+    get_gex_engine().start()                    # gamma profile from the shared chain snapshot
+    get_iv_surface_engine().start()             # fitted smiles from the same snapshot
+    account = get_account_state()
+    get_order_tracker().attach(account)         # coalesced order polls double as the fill event stream
+    account.start()                             # positions / orders / balances, one coalesced poll
+    await account.wait_for_change(timeout=10)
     asyncio.create_task(_heartbeat())
 
+    warm = True
     while not _shutdown.is_set():
         start = time.time()
         if not is_market_open_now():
             print(f"⌛ {datetime.utcnow().isoformat()} - Market closed. Sleeping 30s...")
+            warm = False
             await asyncio.sleep(30)
             continue
+        if not warm:                            # idle pools have expired overnight
+            await asyncio.to_thread(warm_connections)
+            warm = True
 
         try:
+            market = await abuild_market_context("SPY")     # one snapshot for entry, exit and the mesh
+            await get_features(market).resolve(BRAIN_FEATURES)  # I/O features fetched concurrently, once
             async with asyncio.TaskGroup() as tg:
-                tg.create_task(asyncio.to_thread(manage_positions))
-                tg.create_task(_entry_cycle())
+                tg.create_task(manage_positions_async(market=market))
+                tg.create_task(_entry_cycle(market))
 
-            last_ts = SPY_LIVE_PRICE.get("timestamp") or 0
-            if (time.time() - last_ts) > MAX_WS_IDLE_SECONDS:
-                print("⚠️ WebSocket stale. Restarting listener.")
-                start_polygon_listener()
+            if hub.age("SPY") > MAX_WS_IDLE_SECONDS:
+                print("⚠️ WebSocket stale. Reconnecting stocks feed.")
+                await hub.reconnect("stocks")
 
             print(f"✅ Loop cycle completed in {time.time() - start:.2f}s\n")
         except Exception as exc:
@@ -0,0 +1,25 @@
+# helpers.py
+# Shared test factories for Polygon option-chain snapshot rows
+
+from polygon.chain_snapshot import ChainSnapshot
+
+
+def opt_row(strike, side, *, oi=100, gamma=None, delta=None, iv=None, quote=None, expiry="2025-06-20"):
+    """One `/v3/snapshot/options` result row; greeks / IV / quote only when given."""
+    code = expiry.replace("-", "")[2:]
+    row = {
+        "details": {"ticker": f"O:SPY{code}{side[0].upper()}{int(strike * 1000):08d}",
+                    "strike_price": strike, "contract_type": side, "expiration_date": expiry},
+        "open_interest": oi,
+    }
+    if gamma is not None or delta is not None:
+        row["greeks"] = {"gamma": gamma, "delta": delta}
+    if iv is not None:
+        row["implied_volatility"] = iv
+    if quote is not None:
+        row["last_quote"] = {"bid": quote - 0.01, "ask": quote + 0.01}
+    return row
+
+
+def chain_snapshot(rows, ts=1.0, price=501.0, symbol="SPY"):
+    return ChainSnapshot(symbol, ts, {"results": rows, "underlying_asset": {"price": price}})
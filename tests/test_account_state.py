@@ -0,0 +1,109 @@
+# test_account_state.py
+# Account-state service: coalesced polls, change notifications, forced refresh and partial failures
+
+import asyncio
+import dataclasses
+
+from core.account_state import AccountStateService
+from core.tradier_async import TradierBalances, TradierError, TradierOrder, TradierPosition
+
+
+class _Tradier:
+    def __init__(self):
+        self.calls = 0
+        self.positions_list = []
+        self.fail_orders = False
+
+    async def positions(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return list(self.positions_list)
+
+    async def orders(self):
+        if self.fail_orders:
+            raise TradierError("HTTP 503", 503)
+        return [TradierOrder("1", "open")]
+
+    async def balances(self):
+        return TradierBalances(10_000.0, 4_000.0, 4_000.0, {"total_equity": 10_000, "total_cash": 4_000})
+
+
+def test_coalesced_refresh_and_change_events():
+    tradier = _Tradier()
+    svc = AccountStateService(tradier, interval=60)
+    seen = []
+    svc.subscribe(lambda snap, changes: seen.append(changes))
+
+    async def run():
+        a, b = await asyncio.gather(svc.refresh(), svc.refresh())
+        assert a is b and tradier.calls == 1
+        await svc.refresh()                                   # unchanged → no event, same version
+        tradier.positions_list = [TradierPosition("7", "SPY250620C00545000", 1.0, 110.0, "")]
+        tradier.fail_orders = True
+        return await svc.refresh()
+
+    snap = asyncio.run(run())
+    assert seen == [frozenset({"positions", "orders", "balances"}), frozenset({"positions"})]
+    assert snap.version == 2 and snap.position_count == 1
+    assert snap.working_orders()[0].id == "1"                 # failed endpoint keeps last value
+    assert snap.errors and snap.buying_power == 4_000.0
+    assert svc.current() is snap and svc.current(max_age=-1) is None
+
+
+def test_failed_endpoint_does_not_refresh_snapshot_age():
+    tradier = _Tradier()
+    tradier.fail_orders = True
+    svc = AccountStateService(tradier, interval=60)
+    snap = asyncio.run(svc.refresh())
+    assert snap.fetched_at == 0.0 and svc.current() is None     # orders never fetched
+
+    tradier.fail_orders = False
+    asyncio.run(svc.refresh())
+    svc._snap = dataclasses.replace(svc.snapshot, endpoint_at=(0.0, 0.0, 0.0))
+    tradier.fail_orders = True
+    snap = asyncio.run(svc.refresh())                             # positions/balances fresh, orders stale
+    assert snap.endpoint_at[0] > 0 and snap.endpoint_at[1] == 0.0
+    assert snap.fetched_at == 0.0 and svc.current() is None
+
+
+def test_notify_order_wakes_the_poller():
+    tradier = _Tradier()
+    svc = AccountStateService(tradier, interval=60)
+
+    async def run():
+        task = svc.start()
+        first = await svc.wait_for_change(timeout=1)
+        tradier.positions_list = [TradierPosition("8", "SPY250620P00540000", 2.0, 90.0, "")]
+        svc.notify_order("42")
+        second = await svc.wait_for_change(first.version, timeout=1)
+        task.cancel()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first.position_count == 0 and second.position("O:SPY250620P00540000").quantity == 2.0
+    assert svc.stats()["forced"] == 1
+
+
+def test_capital_manager_serves_last_balances_when_snapshot_is_stale(monkeypatch):
+    import core.capital_manager as cm
+
+    svc = AccountStateService(_Tradier(), interval=60)
+    asyncio.run(svc.refresh())
+    monkeypatch.setattr(cm, "get_account_state", lambda: svc)
+    svc._snap = dataclasses.replace(svc.snapshot, fetched_at=0.0)     # poll backing off after errors
+
+    assert svc.current() is None
+    assert cm.fetch_tradier_equity() == 10_000.0 and cm.get_tradier_buying_power() == 4_000.0
+
+
+def test_open_orders_from_snapshot_keep_tradier_rows(monkeypatch):
+    import core.open_trade_tracker as ott
+
+    row = {"id": 4242, "status": "open", "option_symbol": "SPY250620C00545000", "quantity": 1.0,
+           "create_date": "2025-06-20T14:01:02.000Z"}
+    svc = AccountStateService(_Tradier(), interval=60)
+    asyncio.run(svc.refresh())
+    svc._snap = dataclasses.replace(svc.snapshot, orders=(TradierOrder.from_api(row),))
+    monkeypatch.setattr(ott, "get_account_state", lambda: svc)
+
+    assert ott.fetch_open_tradier_orders() == [row]                 # int id + create_date, like REST
@@ -0,0 +1,55 @@
+# test_archetype_matcher.py
+# Archetype matcher: list-format loading, compiled time blocks / failure conditions, one-pass scoring
+
+from datetime import datetime
+
+import pytz
+
+from core.archetype_matcher import compile_archetypes, load_archetypes, parse_time_block
+
+_ET = pytz.timezone("US/Eastern")
+
+
+def _ts(hour, minute):
+    return _ET.localize(datetime(2025, 6, 20, hour, minute)).timestamp()
+
+
+def _vote(direction, score=0.7):
+    return {"score": score, "direction": direction}
+
+
+def test_time_blocks_parse_to_minutes():
+    assert parse_time_block("12:30–2:30 PM") == (750, 870)
+    assert parse_time_block("10:30–1:00 PM") == (630, 780)
+    assert parse_time_block("9:50–10:15 AM") == (590, 615)
+    assert parse_time_block("whenever") is None
+
+
+def test_repo_archetypes_load_and_compile():
+    archs = load_archetypes()
+    assert {a["name"] for a in archs} >= {"gamma_flip_surge", "trap_zone_reversal"}
+    matcher = compile_archetypes(archs)
+    assert len(matcher) == len(archs) and len(matcher.cond_text) == sum(len(a["failure_conditions"]) for a in archs)
+
+
+def test_scores_coverage_time_and_failures():
+    matcher = compile_archetypes(load_archetypes())
+    votes = {"q_gamma": _vote("call"), "q_precision": _vote("call"), "q_quant": _vote("call", 0.5)}
+    features = {"iv": 0.22, "gex": 4e8, "dex": 1e9, "vix": 17, "volume_ratio": 2.0,
+                "oi_above": 0, "flow_divergence": 0.0}
+
+    best = matcher.match(features, votes, _ts(13, 15))[0]
+    assert best.name == "gamma_flip_surge" and best.matched and best.score == 1.0
+    assert best.direction == "call" and best.boost == 0.12 and best.failures == ()
+
+    late = {m.name: m for m in matcher.match(features, votes, _ts(15, 30))}["gamma_flip_surge"]
+    assert late.score == 0.5 and not late.matched and not late.in_time
+
+    trapped = {m.name: m for m in matcher.match(features, {**votes, "q_trap": _vote("put")}, _ts(13, 15))}
+    assert trapped["gamma_flip_surge"].score == 0.0 and trapped["gamma_flip_surge"].failures == ("Q Trap active",)
+
+    neg = {m.name: m for m in matcher.match({**features, "gex": -1e9, "iv": 0.7}, votes, _ts(13, 15))}
+    assert set(neg["gamma_flip_surge"].failures) == {"IV > 60%", "GEX still negative"}
+
+    gap = {m.name: m for m in matcher.match(features, votes, _ts(11, 0))}["liquidity_gap_thrust"]
+    assert gap.coverage == 1.0 and gap.matched                        # q_precision + q_quant, 10:30–1:00
@@ -0,0 +1,48 @@
+# test_bar_store.py
+# Validates websocket aggregate merging and ring-buffer eviction in the minute-bar store
+
+from polygon.bar_store import MinuteBarStore, session_date
+
+T0 = 1_700_000_040_000  # minute-aligned epoch ms
+
+def _store(capacity=4):
+    store = MinuteBarStore(capacity=capacity)
+    # pretend today's REST seed already happened so reads never hit the network
+    store._seeded["SPY"] = session_date()
+    store._synced_at["SPY"] = float("inf")
+    return store
+
+def _agg(ev, start, o, h, l, c, v, vw):
+    return {"ev": ev, "sym": "SPY", "s": start, "o": o, "h": h, "l": l, "c": c, "v": v, "vw": vw}
+
+def test_second_aggregates_merge_into_minute():
+    store = _store()
+    store.ingest(_agg("A", T0 + 1_000, 500.0, 501.0, 499.5, 500.5, 100, 500.2))
+    store.ingest(_agg("A", T0 + 2_000, 500.5, 502.0, 500.0, 501.5, 300, 501.0))
+    (bar,) = store.bars("SPY")
+    assert bar["t"] == T0
+    assert (bar["o"], bar["h"], bar["l"], bar["c"], bar["v"]) == (500.0, 502.0, 499.5, 501.5, 400)
+    assert round(bar["vw"], 2) == 500.8
+
+    # the closing minute aggregate replaces the partial bar
+    store.ingest(_agg("AM", T0, 500.0, 502.5, 499.0, 502.0, 450, 501.1))
+    assert store.bars("SPY") == [{"t": T0, "o": 500.0, "h": 502.5, "l": 499.0,
+                                  "c": 502.0, "v": 450.0, "vw": 501.1}]
+
+def test_ring_evicts_oldest_and_serves_reads():
+    seen = []
+    store = _store(capacity=3)
+    store.add_listener(lambda sym, bar, final: seen.append((bar["t"], final)))
+    for k in range(5):
+        px = 500.0 + k
+        store.ingest(_agg("AM", T0 + k * 60_000, px, px, px, px, 10, px))
+
+    assert [b["t"] for b in store.bars("SPY")] == [T0 + k * 60_000 for k in (2, 3, 4)]
+    assert store.bars("SPY", 1, first=True)[0]["c"] == 502.0
+    assert store.last_close("SPY") == 504.0
+    assert store.session_vwap("SPY") == 503.0
+    assert len(seen) == 5 and all(final for _, final in seen)
+
+    # a late bar older than anything retained is dropped
+    store.ingest(_agg("AM", T0, 1, 1, 1, 1, 1, 1))
+    assert store.stats()["late_drops"] == 1
@@ -0,0 +1,70 @@
+# test_bs_pricing.py
+# Vectorized Black-Scholes: parity, greeks vs finite differences, IV round trip, 0DTE time, chain fill
+
+import numpy as np
+import pytz
+from datetime import datetime
+
+from analytics.bs_pricing import (MIN_T, ChainPricer, bs_greeks, bs_price, fill_greeks, implied_vol,
+                                  time_to_expiry)
+from polygon.chain_frame import ChainFrame
+
+R, Q = 0.045, 0.013
+
+
+def test_parity_and_greeks_match_finite_differences():
+    S, K, T, vol = 500.0, np.array([480.0, 500.0, 520.0]), 2 / 24 / 365, 0.18
+    call, put = bs_price(S, K, T, vol, True, R, Q), bs_price(S, K, T, vol, False, R, Q)
+    assert np.allclose(call - put, S * np.exp(-Q * T) - K * np.exp(-R * T))
+
+    g = bs_greeks(S, K, T, vol, True, R, Q)
+    h = 0.01
+    up, dn = bs_price(S + h, K, T, vol, True, R, Q), bs_price(S - h, K, T, vol, True, R, Q)
+    assert np.allclose(g["delta"], (up - dn) / (2 * h), atol=1e-4)
+    assert np.allclose(g["gamma"], (up - 2 * call + dn) / h ** 2, rtol=1e-3)
+    dv = bs_price(S, K, T, vol + 1e-4, True, R, Q) - bs_price(S, K, T, vol - 1e-4, True, R, Q)
+    assert np.allclose(g["vega"], dv / 2e-4 / 100, rtol=1e-4)
+
+
+def test_implied_vol_round_trip_and_bounds():
+    S, K = 500.0, np.linspace(470, 530, 121)
+    is_call = np.arange(len(K)) % 2 == 0
+    for hours, vol in ((0.5, 0.12), (4.0, 0.25), (24 * 30, 0.6)):
+        T = hours / 24 / 365
+        iv = implied_vol(bs_price(S, K, T, vol, is_call, R, Q), S, K, T, is_call, R, Q)
+        ok = np.isfinite(iv)
+        assert ok.sum() >= 3 and np.allclose(iv[ok], vol, atol=1e-4)
+    # below intrinsic / above the underlying / no time value → NaN, never a made-up vol
+    bad = implied_vol(np.array([5.0, 600.0, 20.001]), S, np.array([490.0, 500.0, 480.0]), 1 / 365, True, R, Q)
+    assert np.isnan(bad).all()
+
+
+def test_time_to_expiry_is_minute_precise():
+    et = pytz.timezone("US/Eastern")
+    now = et.localize(datetime(2025, 6, 20, 15, 30)).timestamp()
+    assert np.isclose(time_to_expiry(20250620, now)[0] * 365 * 24 * 60, 30)
+    assert time_to_expiry(20250620, now + 3600)[0] == MIN_T
+    assert np.isnan(time_to_expiry(np.array([0]), now)[0])
+
+
+def test_fill_greeks_from_quotes():
+    et = pytz.timezone("US/Eastern")
+    now = et.localize(datetime(2025, 6, 20, 13, 0)).timestamp()
+    T = time_to_expiry(20250620, now)[0]
+    mid = float(bs_price(500.0, 502.0, T, 0.15, True))
+
+    def _row(strike, side, quote, gamma=None):
+        return {"details": {"ticker": f"O:SPY250620{side[0].upper()}{int(strike * 1000):08d}",
+                            "strike_price": strike, "contract_type": side, "expiration_date": "2025-06-20"},
+                "greeks": {"gamma": gamma} if gamma is not None else {},
+                "last_quote": {"bid": quote - 0.01, "ask": quote + 0.01}, "open_interest": 100}
+
+    frame = ChainFrame.from_results([_row(502, "call", mid), _row(505, "call", 0.5, gamma=0.07)])
+    filled = fill_greeks(frame, 500.0, now)
+    assert np.isclose(filled.iv[0], 0.15, atol=2e-3) and filled.gamma[0] > 0
+    assert filled.gamma[1] == 0.07                                     # Polygon's value kept
+
+    pricer = ChainPricer(frame)
+    at_solve = pricer.solve(500.0, now)
+    moved = pricer.at(501.0, now)                                      # per-tick re-price, same IVs
+    assert np.array_equal(moved.iv, at_solve.iv, equal_nan=True) and moved.delta[0] > at_solve.delta[0]
@@ -0,0 +1,39 @@
+# test_chain_frame.py
+# Validates vectorized chain analytics against hand-computed values
+
+from helpers import opt_row
+from polygon.chain_frame import ChainFrame, first_sign_flip
+from analytics.dealer_exposure import calculate_gex, detect_gex_flip
+
+CHAIN = [
+    opt_row(500, "call", gamma=0.02, oi=1000, delta=0.5, iv=0.2),
+    opt_row(500, "put", gamma=-0.03, oi=1000, delta=-0.5, iv=0.2),
+    opt_row(505, "call", gamma=0.01, oi=2000, delta=0.5, iv=0.18),
+    opt_row(495, "put", gamma=0.01, oi=0, delta=-0.3, iv=0.25),
+    opt_row(510, "call", gamma=None, oi=500, delta=0.5, iv=0.2),
+    opt_row(500, "call", gamma=0.05, oi=100, delta=0.5, iv=0.2, expiry="2025-06-23"),
+]
+
+def test_gex_by_strike_filters_and_sums():
+    frame = ChainFrame.from_results(CHAIN)
+    gex = frame.gex_by_strike("20250620")
+    assert gex["strikes"].tolist() == [500.0, 505.0]
+    assert gex["gex"].tolist() == [-1000.0, 2000.0]
+    assert gex["call_gex"] == 4000.0
+    assert gex["put_gex"] == -3000.0
+    assert first_sign_flip(gex["strikes"], gex["gex"]) == 502.5
+
+def test_oi_by_strike_and_atm():
+    frame = ChainFrame.from_results(CHAIN)
+    strikes, call_oi, put_oi = frame.oi_by_strike("2025-06-20")
+    assert strikes.tolist() == [495.0, 500.0, 505.0, 510.0]
+    assert call_oi.tolist() == [0, 1000, 2000, 500]
+    assert put_oi.tolist() == [0, 1000, 0, 0]
+    idx = frame.atm_index("20250620", spot=504, side="call")
+    assert frame.strike[idx] == 505
+    assert frame.index_of("SPY250620C00505000") == idx
+
+def test_dealer_exposure_matches_loop():
+    gex = calculate_gex(CHAIN)
+    assert gex == {495.0: 0.0, 500.0: -0.01 * 1000 + 0.05 * 100, 505.0: 20.0}
+    assert detect_gex_flip(gex) == 505.0
@@ -0,0 +1,73 @@
+# test_chain_snapshot.py
+# Chain snapshot service: single-flight fetches, TTL / max_age, last-good fallback on failure
+
+import asyncio
+import threading
+import time
+
+import polygon.chain_snapshot as cs
+from helpers import opt_row
+from polygon.chain_snapshot import ChainSnapshot, ChainSnapshotService
+
+
+def _service(monkeypatch, ttl=5.0, delay=0.0, fail=None):
+    """Service whose fetch sleeps *delay* and fails while fail["on"] is set."""
+    svc = ChainSnapshotService(ttl=ttl)
+    svc.calls = 0
+
+    def fetch(symbol):
+        svc.calls += 1
+        time.sleep(delay)
+        if fail and fail["on"]:
+            return None
+        return ChainSnapshot(symbol, time.time(), {"results": [opt_row(500, "call")], "n": svc.calls})
+
+    monkeypatch.setattr(svc, "_fetch", fetch)
+    return svc
+
+
+def test_concurrent_threads_and_coroutines_share_one_fetch(monkeypatch):
+    svc = _service(monkeypatch, delay=0.1)
+    got = []
+    threads = [threading.Thread(target=lambda: got.append(svc.get("SPY"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert svc.calls == 1 and len({id(s) for s in got}) == 1
+    assert svc.stats() == {"hits": 0, "fetches": 1, "joins": 7, "errors": 0}
+
+    async def many():
+        return await asyncio.gather(*(svc.aget("QQQ") for _ in range(5)))
+
+    snaps = asyncio.run(many())
+    assert svc.calls == 2 and all(s is snaps[0] for s in snaps) and snaps[0].symbol == "QQQ"
+
+
+def test_ttl_and_max_age(monkeypatch):
+    svc = _service(monkeypatch, ttl=0.2)
+    first = svc.get()
+    assert svc.get() is first and svc.calls == 1                    # within TTL → cache hit
+    assert svc.get(max_age=0) is not first and svc.calls == 2       # caller wants it fresher
+
+    time.sleep(0.25)
+    assert svc.get().payload["n"] == 3                              # TTL elapsed → refetch
+    assert svc.get(max_age=60).payload["n"] == 3
+    assert svc.peek("SPY").payload["n"] == 3 and svc.peek("IWM") is None
+
+
+def test_failed_fetch_serves_last_good_and_backs_off(monkeypatch):
+    fail = {"on": False}
+    svc = _service(monkeypatch, ttl=0.0, fail=fail)
+    good = svc.get()
+    fail["on"] = True
+    assert svc.get() is good and svc.stats()["errors"] == 1
+    assert svc.get() is good and svc.calls == 2                     # inside FAILURE_BACKOFF → no retry
+
+    monkeypatch.setattr(cs, "FAILURE_BACKOFF", 0.0)
+    fail["on"] = False
+    assert svc.get() is not good and svc.calls == 3
+
+    empty = _service(monkeypatch, fail={"on": True})                # never succeeded → empty snapshot
+    snap = empty.get("SPY")
+    assert not snap and snap.results == [] and snap.fetched_at == 0.0
@@ -0,0 +1,82 @@
+# test_feature_graph.py
+# Feature registry: dependency levels, once-per-tick memoization across threads, ttl carry, failure defaults
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.feature_graph import REGISTRY, Feature, FeatureEngine, FeatureRegistry
+from core.market_context import MarketContext
+
+
+def _market(cycle=1, price=545.0, vwap=544.5):
+    return MarketContext(cycle=cycle, ts=time.time(), symbol="SPY", price=price, vwap=vwap)
+
+
+def _registry(calls):
+    reg = FeatureRegistry()
+
+    def slow_leaf(name):
+        def fn(m):
+            calls.append(name)
+            time.sleep(0.1)
+            return m.price
+        return fn
+
+    reg.register(Feature("a", slow_leaf("a"), io=True))
+    reg.register(Feature("b", slow_leaf("b"), io=True))
+    reg.register(Feature("c", slow_leaf("c"), io=True, ttl=60))
+    reg.register(Feature("ab", lambda a, b: calls.append("ab") or a + b, deps=("a", "b")))
+    reg.register(Feature("boom", lambda m: 1 / 0, default=-1.0))
+    return reg
+
+
+def test_levels_and_unknown_dependency():
+    reg = _registry([])
+    assert [sorted(level) for level in reg.levels(["ab", "c"])] == [["a", "b", "c"], ["ab"]]
+    with pytest.raises(ValueError):
+        reg.register(Feature("bad", lambda x: x, deps=("missing",)))
+
+
+def test_each_feature_computed_once_per_tick():
+    calls = []
+    engine = FeatureEngine(_registry(calls))
+    market = _market()
+    graph = engine.for_market(market)
+
+    t0 = time.perf_counter()
+    out = asyncio.run(graph.resolve(["ab", "c"]))
+    assert time.perf_counter() - t0 < 0.25                      # I/O leaves ran concurrently
+    assert out == {"ab": 1090.0, "c": 545.0}
+
+    with ThreadPoolExecutor(8) as pool:                         # mesh agents asking from threads
+        assert set(pool.map(lambda _: graph.get("ab"), range(8))) == {1090.0}
+    assert sorted(calls) == ["a", "ab", "b", "c"]
+    assert engine.for_market(market) is graph and graph.get("boom") == -1.0
+
+    nxt = engine.for_market(_market(cycle=2, price=546.0))      # new tick: recompute, ttl node carried
+    assert nxt is not graph and nxt.get("a") == 546.0 and nxt.get("c") == 545.0
+    assert calls.count("c") == 1 and nxt.stats()["carried"] == 1
+
+
+def test_concurrent_first_requests_share_one_computation():
+    calls = []
+    graph = FeatureEngine(_registry(calls)).for_market(_market())
+    barrier = threading.Barrier(4)
+
+    def ask():
+        barrier.wait()
+        return graph.get("a")
+
+    with ThreadPoolExecutor(4) as pool:
+        assert list(pool.map(lambda _: ask(), range(4))) == [545.0] * 4
+    assert calls == ["a"]
+
+
+def test_builtin_features_share_one_definition():
+    graph = FeatureEngine(REGISTRY).for_market(_market())
+    assert graph.get("vwap_diff") == 0.5 and graph.get("spy_price") == 545.0
+    assert 0 <= graph.get("time_of_day_bin") <= 12
@@ -0,0 +1,45 @@
+# test_gex_engine.py
+# GEX engine: signed per-strike profile, walls and flip zone, incremental updates match a full rebuild
+
+from analytics.gex_engine import GexEngine
+from helpers import chain_snapshot, opt_row
+
+EXPIRY = "20250620"
+
+
+def _opt(strike, side, gamma, oi, expiry="2025-06-20"):
+    return opt_row(strike, side, gamma=gamma, delta=0.5 if side == "call" else -0.5, oi=oi, expiry=expiry)
+
+
+CHAIN = [
+    _opt(495, "put", 0.02, 3000),
+    _opt(500, "put", 0.03, 1000),
+    _opt(500, "call", 0.03, 500),
+    _opt(505, "call", 0.02, 4000),
+    _opt(510, "call", 0.01, 1000),
+    _opt(505, "call", 0.05, 100, expiry="2025-06-23"),       # not 0DTE → ignored
+]
+
+
+def test_profile_walls_and_flip():
+    prof = GexEngine(persist=False).update(chain_snapshot(CHAIN, 1.0), EXPIRY)
+    assert prof.gex_map == {495: -6000.0, 500: -1500.0, 505: 8000.0, 510: 1000.0}
+    assert prof.call_wall == 505.0 and prof.put_wall == 495.0
+    assert prof.flip_zone == 502.5 and prof.net_gex == 1500.0
+    assert prof.dealer_bias == "long_gamma" and prof.contracts == 5 and prof.spot == 501.0
+
+
+def test_incremental_update_matches_rebuild():
+    engine = GexEngine(persist=False)
+    engine.update(chain_snapshot(CHAIN, 1.0), EXPIRY)
+    assert engine.update(chain_snapshot(CHAIN, 1.0), EXPIRY).changed == 5   # same snapshot → no work
+    assert engine.stats()["unchanged"] == 1
+
+    moved = [_opt(495, "put", 0.02, 3000), _opt(500, "put", 0.03, 9000), _opt(500, "call", 0.03, 500),
+             _opt(505, "call", 0.02, 4000), _opt(515, "call", 0.01, 200)]
+    inc = engine.update(chain_snapshot(moved, 2.0), EXPIRY)
+    full = GexEngine(persist=False).update(chain_snapshot(moved, 2.0), EXPIRY)
+    assert inc.changed == 3                                                # 500P changed, 510C gone, 515C new
+    assert inc.gex_map == full.gex_map and inc.net_gex == full.net_gex
+    assert inc.flip_zone == full.flip_zone == 502.5 and inc.put_wall == 500.0
+    assert engine.stats()["rebuilds"] == 1
@@ -0,0 +1,54 @@
+# test_http_clients.py
+# Pooled per-host clients: connection reuse, per-loop async clients and pool stats
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core import http_clients
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"          # keep-alive
+    peers = set()
+
+    def do_HEAD(self, body=b'{"ok": true}'):
+        _Handler.peers.add(self.client_address)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        return body
+
+    def do_GET(self):
+        self.wfile.write(self.do_HEAD())
+
+    def log_message(self, *args):
+        pass
+
+
+def test_connections_are_reused_per_host():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        assert http_clients.get_client(f"{base}/a") is http_clients.get_client(f"{base}/b?x=1")
+        http_clients.warm_connections([base])
+        for i in range(5):
+            assert http_clients.get_client(base).get(f"{base}/q/{i}").json() == {"ok": True}
+        assert len(_Handler.peers) == 1              # one TCP connection for warm-up + 5 calls
+
+        async def _async_calls():
+            cli = http_clients.get_async_client(base)
+            assert http_clients.get_async_client(f"{base}/x") is cli
+            await http_clients.awarm_connections([base])
+            r = await cli.get(f"{base}/async")
+            await http_clients.aclose_all()
+            return r.json()
+        assert asyncio.run(_async_calls()) == {"ok": True}
+
+        stats = http_clients.pool_stats()[base]
+        assert stats["requests"] == 8 and stats["sync"]["open"] == 1
+    finally:
+        server.shutdown()
+        http_clients.close_all()
@@ -0,0 +1,72 @@
+# test_indicator_engine.py
+# Checks incremental RSI / VWAP / returns against straightforward batch formulas
+
+import math
+from analytics.indicator_engine import IndicatorEngine, RSI_PERIOD, _State
+from polygon.bar_store import session_date
+
+T0 = 1_700_000_040_000
+CLOSES = [500, 501, 500.5, 502, 503, 502.5, 501, 500, 501.5, 503, 504, 503.5,
+          505, 504, 503, 504.5, 506, 505.5, 507, 506]
+
+def _bars():
+    out = []
+    for i, c in enumerate(CLOSES):
+        o = CLOSES[i - 1] if i else c
+        out.append({"t": T0 + i * 60_000, "o": o, "h": max(o, c) + 0.25,
+                    "l": min(o, c) - 0.25, "c": c, "v": 1000 + 10 * i})
+    return out
+
+def _engine():
+    engine = IndicatorEngine()
+    engine._states["SPY"] = _State(session_date())
+    return engine
+
+def _wilder_rsi(closes, period):
+    deltas = [b - a for a, b in zip(closes, closes[1:])]
+    gain = sum(max(d, 0) for d in deltas[:period]) / period
+    loss = sum(max(-d, 0) for d in deltas[:period]) / period
+    for d in deltas[period:]:
+        gain = (gain * (period - 1) + max(d, 0)) / period
+        loss = (loss * (period - 1) + max(-d, 0)) / period
+    return 100 - 100 / (1 + gain / loss)
+
+def test_incremental_matches_batch():
+    engine = _engine()
+    bars = _bars()
+    for bar in bars:
+        engine.on_bar("SPY", {**bar, "c": bar["c"] - 1}, False)   # partial first
+        engine.on_bar("SPY", bar, True)
+    snap = engine.snapshot("SPY")
+
+    assert snap.bars == len(bars)
+    assert snap.rsi == round(_wilder_rsi(CLOSES, RSI_PERIOD), 2)
+
+    typical = [(b["h"] + b["l"] + b["c"]) / 3 for b in bars]
+    vols = [b["v"] for b in bars]
+    vwap = sum(p * v for p, v in zip(typical, vols)) / sum(vols)
+    sd = math.sqrt(sum(v * (p - vwap) ** 2 for p, v in zip(typical, vols)) / sum(vols))
+    assert math.isclose(snap.vwap, vwap)
+    assert math.isclose(snap.vwap_sd, sd, rel_tol=1e-6)
+    assert snap.rolling_volume == sum(vols[-5:])
+    assert math.isclose(snap.return_from_open, (506 - 500) / 500 * 100)
+    assert snap.high == 507.25 and snap.high_fade < 0 < snap.low_fade
+
+def test_partial_bar_and_trade_overlay_without_committing():
+    engine = _engine()
+    bars = _bars()
+    for bar in bars[:-1]:
+        engine.on_bar("SPY", bar, True)
+    engine.on_bar("SPY", bars[-1], False)
+    assert engine.snapshot("SPY").bars == len(bars)
+    assert engine._states["SPY"].n == len(bars) - 1
+
+    engine.on_trade("SPY", 510.0)
+    snap = engine.snapshot("SPY")
+    assert snap.last == 510.0 and snap.high == 510.0 and snap.above_vwap
+
+    # a corrected final bar for an already-committed minute replaces it
+    engine.on_bar("SPY", bars[-1], True)
+    engine.on_bar("SPY", {**bars[-1], "c": 499.0, "l": 498.0}, True)
+    assert engine._states["SPY"].n == len(bars)
+    assert engine._states["SPY"].close == 499.0
@@ -0,0 +1,61 @@
+# test_iv_surface.py
+# IV surface: SVI smile recovered from chain IVs, strike/delta lookups, incremental refits, quote-solved gaps
+
+from datetime import datetime
+
+import numpy as np
+import pytz
+
+from analytics.bs_pricing import bs_price, time_to_expiry
+from analytics.iv_surface import IvSurfaceEngine, svi_variance
+from helpers import chain_snapshot, opt_row
+
+SPOT = 500.0
+TRUE = (0.01, 2.0, -0.6, 0.0, 0.01)                     # smirk: puts richer than calls
+NOW = pytz.timezone("US/Eastern").localize(datetime(2025, 6, 20, 11, 0)).timestamp()
+
+
+def _chain(scale=1.0, blank=()):
+    T = float(time_to_expiry(20250620, NOW)[0])
+    fwd = SPOT * np.exp((0.045 - 0.013) * T)
+    rows = []
+    for K in range(480, 521, 2):
+        iv = float(np.sqrt(svi_variance(np.log(K / fwd), TRUE))) * scale
+        side = "put" if K < fwd else "call"
+        if K in blank:                                   # no IV from Polygon: only a quote
+            rows.append(opt_row(K, side, quote=float(bs_price(SPOT, K, T, iv, side == "call"))))
+        else:
+            rows.append(opt_row(K, side, iv=iv))
+    return rows
+
+
+def test_smile_fit_and_lookups():
+    surf = IvSurfaceEngine().update(chain_snapshot(_chain(), 1.0, price=SPOT), now=NOW)
+    smile = surf.smile("2025-06-20")
+    assert smile.params is not None and smile.rmse < 1e-3
+    fwd = smile.forward
+    for K in (483.0, 497.5, 501.0, 519.0):                 # between and on listed strikes
+        want = np.sqrt(svi_variance(np.log(K / fwd), TRUE))
+        assert abs(surf.iv(K) - want) < 2e-3
+    assert surf.skew(10) > 0                               # put wing richer
+    assert surf.iv_at_delta(-0.25) > surf.iv_at_delta(0.5) > surf.iv_at_delta(0.25)
+    strike, _ = smile.iv_at_delta(0.5, SPOT)
+    assert abs(strike - SPOT) < 2
+
+
+def test_incremental_refit_and_quote_solved_points():
+    engine = IvSurfaceEngine()
+    rows = _chain() + [opt_row(505, "call", iv=0.2, expiry="2025-06-23")]   # thin expiry → interpolation
+    first = engine.update(chain_snapshot(rows, 1.0, price=SPOT), now=NOW)
+    assert first.expiries == [20250620, 20250623] and first.smile(20250623).params is None
+    assert engine.update(chain_snapshot(rows, 1.0, price=SPOT), now=NOW) is first   # same snapshot → no work
+
+    moved = _chain(scale=1.1) + [opt_row(505, "call", iv=0.2, expiry="2025-06-23")]
+    second = engine.update(chain_snapshot(moved, 2.0, price=SPOT), now=NOW)
+    assert second.smile(20250623) is first.smile(20250623)           # unchanged expiry reused
+    assert abs(second.iv(500.0) / first.iv(500.0) - 1.1) < 0.01
+    assert engine.stats()["fits"] == 3 and engine.stats()["reused"] == 1
+
+    gaps = IvSurfaceEngine().update(chain_snapshot(_chain(blank=(496, 500, 504)), 3.0, price=SPOT), now=NOW)
+    assert len(gaps.smile().k) == 21                                 # blanks solved from quotes
+    assert abs(gaps.iv(500.0) - first.iv(500.0)) < 2e-3
@@ -0,0 +1,67 @@
+# test_market_context.py
+# Per-cycle MarketContext: one build, read-only fields, handed to every mesh agent as ctx=
+
+import asyncio
+import dataclasses
+
+import pytest
+
+import core.market_context as mc
+from core.mesh_executor import MeshExecutor
+
+
+def _stub_inputs(monkeypatch, calls):
+    def _metrics(symbol):
+        calls.append("option_metrics")
+        return [{"volume": 10}, {"delta": 0.52, "gamma": 0.03, "iv": 0.18, "skew": 0.1, "volume": 900}]
+
+    def _dealer(symbol):
+        calls.append("dealer_flow")
+        return {"score": 0.4}
+
+    def _live(symbol):
+        calls.append("live")
+        return {"price": 545.2, "vwap": 544.9, "rsi": 41.0, "vwap_reclaim": True,
+                "returns": 0.002, "volume": 12_000, "vix": 16.5}
+
+    monkeypatch.setattr(mc, "get_option_metrics", _metrics)
+    monkeypatch.setattr(mc, "get_dealer_flow_metrics", _dealer)
+    monkeypatch.setattr(mc, "_live_fields", _live)
+
+
+def test_build_once_and_read_only(monkeypatch):
+    calls = []
+    _stub_inputs(monkeypatch, calls)
+    ctx = asyncio.run(mc.abuild_market_context("SPY"))
+
+    assert sorted(calls) == ["dealer_flow", "live", "option_metrics"]
+    assert ctx.vwap_diff == 0.3 and ctx.vix == 16.5
+    assert ctx.entry_fields() == {"symbol": "SPY", "price": 545.2, "volume": 900, "iv": 0.18,
+                                  "delta": 0.52, "gamma": 0.03, "skew": 0.1, "dealer_flow": 0.4}
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        ctx.price = 1.0
+    with pytest.raises(TypeError):
+        ctx.dealer_flow["score"] = 9
+
+
+def test_failed_rest_input_degrades_to_empty(monkeypatch):
+    _stub_inputs(monkeypatch, [])
+    monkeypatch.setattr(mc, "get_dealer_flow_metrics", lambda s: 1 / 0)
+    ctx = mc.build_market_context("SPY")
+    assert ctx.entry_fields()["dealer_flow"] == 0 and ctx.option_metrics["delta"] == 0.52
+
+
+def test_executor_hands_the_same_context_to_every_agent():
+    ctx = mc.MarketContext(cycle=1, ts=0.0, symbol="SPY", price=545.0)
+    seen = []
+
+    def agent(ctx=None):
+        seen.append(ctx)
+        return {"agent": "a", "score": 0.5}
+
+    ex = MeshExecutor([("a", agent), ("b", agent)], timeout=1.0)
+    run = asyncio.run(ex.run(ctx=ctx))
+    assert len(run.signals) == 2 and seen == [ctx, ctx] and seen[0] is seen[1]
+    ex.run_sync()
+    assert seen[-1] is None
+    ex.shutdown()
@@ -0,0 +1,89 @@
+# test_market_data_hub.py
+# Market data hub: Q/T/AM/A frame routing, stale-quote rule, read-only legacy price views
+
+import pytest
+
+import polygon.market_data_hub as mdh
+from polygon.market_data_hub import MarketDataHub
+
+
+class _Sink:
+    def __init__(self):
+        self.items = []
+
+    def ingest(self, ev):
+        self.items.append(ev)
+
+    def on_trade(self, symbol, price):
+        self.items.append((symbol, price))
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(mdh, "record_events", lambda events, recv: recorded.append((list(events), recv)))
+    h = MarketDataHub()
+    h._bars, h._indicators = _Sink(), _Sink()
+    h.recorded = recorded
+    return h
+
+
+def test_dispatch_routes_quotes_trades_and_aggregates(hub):
+    frame = [
+        {"ev": "Q", "sym": "SPY", "bp": 500.0, "ap": 500.2, "bs": 3, "as": 4, "t": 1_750_000_000_000},
+        {"ev": "T", "sym": "SPY", "p": 500.1, "s": 100, "t": 1_750_000_000_500},
+        {"ev": "T", "sym": "O:SPY250620C00500000", "p": 1.25, "s": 2},
+        {"ev": "T", "sym": "SPY", "p": 0},                                # no price → ignored
+        {"ev": "AM", "sym": "SPY", "o": 500, "c": 501},
+        {"ev": "A", "sym": "SPY", "o": 501, "c": 501.5},
+        {"ev": "status", "status": "auth_failed", "message": "bad key"},
+        "not-an-event",
+    ]
+    hub.dispatch(frame)
+
+    [(recorded, recv)] = hub.recorded
+    assert recorded == frame
+    q = hub.quote("SPY")
+    assert (q.bid, q.ask, q.bid_size, q.ask_size) == (500.0, 500.2, 3.0, 4.0)
+    assert q.exch_ts == 1_750_000_000.0 and q.recv_ts == recv and q.mid == 500.1
+    t = hub.trade("SPY")
+    assert t.price == 500.1 and t.size == 100.0 and t.version > q.version
+    assert hub.trade("O:SPY250620C00500000").price == 1.25
+    assert [e["ev"] for e in hub._bars.items] == ["AM", "A"]
+    assert hub._indicators.items == [("SPY", 500.1)]                   # option trades skip indicators
+
+
+def test_stale_quote_yields_to_newer_trade(hub, monkeypatch):
+    monkeypatch.setattr(mdh, "QUOTE_STALE_AFTER", 5.0)
+    hub.publish_quote("SPY", 500.0, 500.2, recv_ts=100.0)
+    hub.publish_trade("SPY", 503.0, recv_ts=102.0)
+
+    assert hub._fresh_quote("SPY", now=104.0) is not None              # quote still young
+    assert hub._fresh_quote("SPY", now=110.0) is None                  # old, and trades moved on
+    hub.publish_trade("SPY", 503.0, recv_ts=99.0)
+    assert hub._fresh_quote("SPY", now=110.0) is not None              # old, but no newer trade
+
+    hub.publish_quote("QQQ", 0, 0, recv_ts=100.0)
+    assert hub._fresh_quote("QQQ", now=100.0) is None                  # empty book never counts
+
+
+def test_price_and_legacy_views_are_read_only(hub):
+    view, ticks = hub.live_view("SPY"), hub.option_ticks()
+    assert dict(view) == {} and hub.price("SPY") == 0.0 and len(ticks) == 0
+
+    hub.publish_trade("SPY", 499.9, recv_ts=1.0)
+    assert hub.price("SPY") == 499.9 and view["price"] == 499.9 and "mid" not in view
+    q = hub.publish_quote("SPY", 500.0, 500.2)
+    assert hub.price("SPY") == 500.1
+    assert view["price"] == 500.1 and view["last_trade"] == 499.9 and view["version"] == q.version
+    assert set(view) == {"mid", "bid", "ask", "last_trade", "price", "timestamp", "exchange_ts", "version"}
+
+    hub.publish_trade("O:SPY250620P00495000", 0.8, recv_ts=5.0)
+    assert dict(ticks) == {"O:SPY250620P00495000": {"price": 0.8, "timestamp": 5.0}}
+    with pytest.raises(KeyError):
+        ticks["SPY"]                                                   # stock trades aren't option ticks
+
+    with pytest.raises(TypeError):
+        view["price"] = 1.0
+    with pytest.raises(TypeError):
+        ticks["O:X"] = {}
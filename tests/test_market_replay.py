@@ -0,0 +1,56 @@
+# test_market_replay.py
+# Replay building blocks: frame grouping, simulated clock, ATM resolution and broker fills
+
+import asyncio
+
+import polygon.market_data_hub as hub_mod
+import polygon.tick_recorder as tr
+from analytics.market_replay import MarketReplay, SimClock
+from polygon.tick_recorder import TickReader, TickRecorder
+
+T0 = 1_750_426_200.0   # 2025-06-20 09:30 ET
+CALL = "O:SPY250620C00545000"
+
+
+def _segment(tmp_path, monkeypatch):
+    monkeypatch.setattr(tr, "session_date", lambda: "2025-06-20")
+    rec = TickRecorder(str(tmp_path))
+    rec.submit([{"ev": "Q", "sym": "SPY", "bp": 545.1, "ap": 545.2, "t": 1}], T0)
+    rec.submit([{"ev": "Q", "sym": CALL, "bp": 1.00, "ap": 1.10, "t": 1},
+                {"ev": "Q", "sym": "O:SPY250620C00550000", "bp": 0.2, "ap": 0.25, "t": 1}], T0 + 1)
+    rec.submit([{"ev": "Q", "sym": CALL, "bp": 1.50, "ap": 1.60, "t": 2}], T0 + 5)
+    rec.close()
+    return TickReader.for_date("2025-06-20", str(tmp_path))
+
+
+def test_frames_ladder_and_broker(tmp_path, monkeypatch):
+    monkeypatch.setattr(hub_mod, "record_events", lambda *a, **k: None)
+    replay = MarketReplay(_segment(tmp_path, monkeypatch))
+    replay._prepare()
+    frames = list(replay._frames())
+    assert [(ts - T0, len(evs)) for ts, evs in frames] == [(0, 1), (1, 2), (5, 1)]
+
+    for ts, events in frames[:2]:
+        replay.hub.dispatch(events, recv_ts=ts)
+    assert replay.atm_option_symbol("SPY", "C") == CALL[2:]
+    assert replay.atm_option_symbol("SPY", "P") is None
+
+    broker = replay.broker
+    order = broker.open_position(CALL[2:], contracts=2, option_type="C")
+    assert order["status"] == "ok" and order["fill_price"] == 1.10
+    assert broker.get_positions()["positions"][0]["cost_basis"] == 220.0
+
+    replay.hub.dispatch(frames[2][1], recv_ts=frames[2][0])
+    resp = broker.submit_order(CALL[2:], 2, "sell_to_close")
+    assert broker.get_order_status(resp["order"]["id"])["order"]["status"] == "filled"
+    assert broker.positions == {}
+    assert round(broker.realized, 2) == round(300 - 220 - 0.7 - 0.7, 2)    # commission on both legs
+    replay.hub.reset()
+
+
+def test_sim_clock_pacing():
+    clock = SimClock(100.0, speed=50)
+    asyncio.run(clock.advance_to(101.0))       # ~20ms of wall time at 50×
+    assert clock.time() == 101.0 and clock.now_et().tzinfo is not None
+    asyncio.run(clock.advance_to(90.0))        # never runs backwards
+    assert clock.time() == 101.0
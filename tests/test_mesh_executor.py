@@ -0,0 +1,93 @@
+# test_mesh_executor.py
+# Concurrent mesh agents: deadlines, stale and failing agents, cadence-cached results
+
+import asyncio
+import time
+
+from core.mesh_executor import AgentPolicy, MeshExecutor, load_agent_policies
+
+
+def _agent(name, delay, score=0.6):
+    def fn():
+        time.sleep(delay)
+        return {"agent": name, "score": score, "direction": "call"}
+    return fn
+
+
+def _boom():
+    raise RuntimeError("feed down")
+
+
+def test_agents_run_concurrently_with_deadlines():
+    ex = MeshExecutor([("a", _agent("a", 0.15)), ("b", _agent("b", 0.15)), ("c", _agent("c", 0.15)),
+                       ("slow", _agent("slow", 1.0)), ("err", _boom)],
+                      timeout=0.4, timeouts={"slow": 0.25})
+    try:
+        run = asyncio.run(ex.run())
+        assert run.wall < 0.4                              # ~max(0.15, 0.25), not the 1.45s sum
+        assert [s["agent"] for s in run.signals] == ["a", "b", "c"]
+        assert run.stale == ["slow"]
+        by_agent = {r.agent: r for r in run.results}
+        assert by_agent["err"].status == "error" and "feed down" in by_agent["err"].error
+        assert 0.14 < run.timings["a"] < 0.3 and run.timings["slow"] == 0.25
+
+        again = ex.run_sync()                              # slow agent still running → not resubmitted
+        slow = {r.agent: r for r in again.results}["slow"]
+        assert slow.status == "stale" and slow.error == "in_flight"
+        assert ex.stats()["slow"]["stale"] == 2 and ex.stats()["a"]["ok"] == 2
+    finally:
+        ex.shutdown()
+
+
+def test_cadence_serves_cached_result_and_refreshes_in_background():
+    calls = []
+
+    def slow_agent():
+        calls.append(time.perf_counter())
+        time.sleep(0.2)
+        return {"agent": "slow", "score": 0.7, "n": len(calls)}
+
+    ex = MeshExecutor([("slow", slow_agent), ("fast", _agent("fast", 0.0))], timeout=1.0,
+                      policies={"slow": AgentPolicy(cadence=0.3, max_staleness=5.0)})
+    try:
+        first = ex.run_sync()                              # nothing cached yet → waits
+        assert first.results[0].status == "ok" and len(calls) == 1
+
+        second = ex.run_sync()                             # not due → cached, agent not re-run
+        assert second.cached == ["slow"] and len(calls) == 1 and second.wall < 0.1
+
+        time.sleep(0.35)
+        third = ex.run_sync()                              # due → refresh started, cached value served now
+        assert third.cached == ["slow"] and third.signals[0]["n"] == 1 and third.wall < 0.1
+        time.sleep(0.3)
+        fourth = ex.run_sync()
+        assert len(calls) == 2 and fourth.signals[0]["n"] == 2
+        assert ex.stats()["slow"]["cached"] == 3 and ex.stats()["fast"]["ok"] == 4
+    finally:
+        ex.shutdown()
+
+
+def test_policies_load_from_mesh_config():
+    policies = load_agent_policies("data/mesh_config.json")
+    assert policies["q_block"] == AgentPolicy(300, 900)
+    assert policies["q_trap"] == AgentPolicy()
+    assert load_agent_policies("missing.json") == {}
+
+
+def test_late_agent_result_is_served_on_later_timeouts():
+    ex = MeshExecutor([("rest", _agent("rest", 0.3)), ("fast", _agent("fast", 0.0))], timeout=0.1,
+                      late_max_age=5.0)
+    try:
+        first = ex.run_sync()                              # default policy, nothing cached → stale
+        assert first.stale == ["rest"]
+        time.sleep(0.3)                                    # late result lands in the cache
+
+        second = ex.run_sync()                             # times out again → last result keeps its vote
+        assert second.cached == ["rest"] and {s["agent"] for s in second.signals} == {"rest", "fast"}
+        assert second.wall < 0.2
+
+        ex.late_max_age = 0.0
+        time.sleep(0.3)
+        assert ex.run_sync().stale == ["rest"]            # too old → dropped again
+    finally:
+        ex.shutdown()
@@ -0,0 +1,61 @@
+# test_open_interest.py
+# Daily OI cache: per-expiry strike arrays, lookups, max pain, frame alignment, dated file reuse
+
+import numpy as np
+
+import polygon.open_interest as oi_mod
+from helpers import chain_snapshot, opt_row
+from polygon.open_interest import OpenInterestService, table_from_frame
+
+DATE = "2025-06-20"
+
+
+CHAIN = [
+    opt_row(495, "put", oi=3000), opt_row(495, "call", oi=100),
+    opt_row(500, "put", oi=1000), opt_row(500, "call", oi=2000),
+    opt_row(505, "put", oi=50), opt_row(505, "call", oi=4000),
+    opt_row(500, "call", oi=700, expiry="2025-06-23"),
+    opt_row(500, "call", oi=900, expiry="2025-06-16"),            # expired → not kept
+]
+
+
+def _snap():
+    return chain_snapshot(CHAIN)
+
+
+def test_table_lookups_and_max_pain():
+    table = table_from_frame("SPY", DATE, _snap().frame)
+    assert sorted(table.expiries) == [20250620, 20250623]
+    assert table.at(500, "2025-06-20") == (2000, 1000) and table.at(500) == (2700, 1000)
+    assert table.at(502.5) == (0, 0)
+    # nearest expiry – settle 495: puts owe 5·1000 + 10·50 = 5500; 500: 5·100 + 5·50 = 750; 505: 10·100 + 5·2000
+    assert table.max_pain() == 500.0
+
+    frame = _snap().frame
+    aligned = table.for_frame(frame)
+    assert np.array_equal(aligned[:7], [3000, 100, 1000, 2000, 50, 4000, 700]) and np.isnan(aligned[7])
+
+
+def test_service_persists_and_reuses_dated_file(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(oi_mod, "get_chain_snapshot", lambda *_a: calls.append(1) or _snap())
+    monkeypatch.setattr(oi_mod, "session_date", lambda: DATE)
+
+    first = OpenInterestService(root=str(tmp_path))
+    table = first.get()
+    assert table.at(505) == (4000, 50) and first.get() is table and len(calls) == 1
+    assert (tmp_path / f"SPY_{DATE}.json").exists()
+
+    restarted = OpenInterestService(root=str(tmp_path))              # later the same day
+    again = restarted.get()
+    assert len(calls) == 1 and restarted.stats()["file_hits"] == 1
+    assert again.at(505) == (4000, 50) and again.max_pain() == table.max_pain()
+
+
+def test_failed_load_backs_off(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(oi_mod, "get_chain_snapshot", lambda *_a: calls.append(1) or None)
+    monkeypatch.setattr(oi_mod, "session_date", lambda: DATE)
+    svc = OpenInterestService(root=str(tmp_path))
+    assert svc.get() is None and svc.get() is None
+    assert len(calls) == 1 and svc.stats()["errors"] == 1
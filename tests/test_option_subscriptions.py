@@ -0,0 +1,111 @@
+# test_option_subscriptions.py
+# 0DTE option subscriptions: ATM window at ladder edges, roll diffs, pinned contracts, mark staleness
+
+import time
+from types import SimpleNamespace
+
+from helpers import chain_snapshot, opt_row
+from polygon.option_subscriptions import OptionSubscriptionManager, occ_symbol
+
+EXPIRY = "20250620"
+
+
+class _Hub:
+    def __init__(self):
+        self.sent = []
+        self.quotes, self.trades = {}, {}
+        self.spot = 0.0
+
+    def subscribe(self, feed, channels):
+        self.sent.append(("+", feed, sorted(channels)))
+
+    def unsubscribe(self, feed, channels):
+        self.sent.append(("-", feed, sorted(channels)))
+
+    def price(self, symbol):
+        return self.spot
+
+    def quote(self, symbol):
+        return self.quotes.get(symbol)
+
+    def trade(self, symbol):
+        return self.trades.get(symbol)
+
+
+def _manager(width=2):
+    hub = _Hub()
+    subs = OptionSubscriptionManager(hub, width=width)
+    rows = [opt_row(k, side) for k in range(495, 506) for side in ("call", "put")]
+    subs._set_ladder(EXPIRY, chain_snapshot(rows).frame)
+    return hub, subs
+
+
+def _c(strike, side="C"):
+    return occ_symbol("SPY", EXPIRY, side, strike)
+
+
+def _chans(*contracts):
+    return sorted(f"{ev}.{c}" for c in contracts for ev in ("Q", "T"))
+
+
+def test_window_for_clips_at_ladder_edges():
+    _, subs = _manager()
+    center, contracts = subs.window_for(500.3)
+    assert center == 500.0 and contracts == {_c(k, s) for k in range(498, 503) for s in "CP"}
+
+    low, contracts = subs.window_for(480.0)                 # below the ladder → lowest strikes only
+    assert low == 495.0 and contracts == {_c(k, s) for k in (495, 496, 497) for s in "CP"}
+    high, contracts = subs.window_for(530.0)
+    assert high == 505.0 and contracts == {_c(k, s) for k in (503, 504, 505) for s in "CP"}
+
+    empty = OptionSubscriptionManager(_Hub(), width=1)       # no ladder → synthesised $1 grid
+    empty._expiry = EXPIRY
+    assert empty.window_for(501.4) == (501.0, {_c(k, s) for k in (500, 501, 502) for s in "CP"})
+
+
+def test_roll_sends_only_the_diff():
+    hub, subs = _manager()
+    assert subs.roll(500.0) and hub.sent == [("+", "options", _chans(*subs.contracts()))]
+    assert not subs.roll(500.2)                              # same centre → nothing sent
+    hub.sent.clear()
+
+    assert subs.roll(501.0)
+    assert hub.sent == [("-", "options", _chans(_c(498), _c(498, "P"))),
+                        ("+", "options", _chans(_c(503), _c(503, "P")))]
+    assert subs.stats()["rolls"] == 2 and subs.stats()["unsubscribed"] == 2
+
+
+def test_pinned_contract_survives_rolls_until_unpinned():
+    hub, subs = _manager()
+    subs.roll(500.0)
+    hub.sent.clear()
+
+    subs.pin("SPY250620C00499000")                           # inside the window → already streamed
+    assert hub.sent == [] and _c(499) in subs.contracts()
+    subs.roll(503.0)                                         # 499 leaves the window but stays pinned
+    assert _c(499) in subs.contracts()
+    assert all(_c(499) not in " ".join(chans) for op, _, chans in hub.sent if op == "-")
+
+    hub.sent.clear()
+    subs.unpin(_c(499))                                      # outside the window → dropped now
+    assert hub.sent == [("-", "options", _chans(_c(499)))] and _c(499) not in subs.contracts()
+
+    subs.pin(_c(504))                                        # in the window: unpin keeps it streamed
+    hub.sent.clear()
+    subs.unpin(_c(504))
+    assert hub.sent == [] and _c(504) in subs.contracts()
+
+
+def test_mark_prefers_mid_then_last_and_expires():
+    hub, subs = _manager()
+    now = time.time()
+    sym = _c(500)
+    assert subs.mark(sym) is None
+    hub.trades[sym] = SimpleNamespace(price=1.3, size=2, recv_ts=now, version=1)
+    assert subs.mark("SPY250620C00500000") == 1.3
+    hub.quotes[sym] = SimpleNamespace(bid=1.2, ask=1.3, bid_size=10, ask_size=5, recv_ts=now - 1, version=2)
+    assert subs.mark(sym) == 1.25 and abs(subs.book(sym).spread - 0.1) < 1e-9
+
+    hub.quotes[sym] = SimpleNamespace(bid=1.2, ask=1.3, bid_size=10, ask_size=5, recv_ts=now - 60, version=3)
+    hub.trades[sym] = SimpleNamespace(price=1.3, size=2, recv_ts=now - 45, version=1)
+    assert subs.mark(sym) is None and subs.mark(sym, max_age=50) == 1.25
@@ -0,0 +1,59 @@
+# test_option_symbol_resolver.py
+# Strike-ladder cache (one load per expiry) and pre-resolved ATM symbols
+
+import asyncio
+
+import core.option_symbol_resolver as osr
+from core.option_symbol_resolver import AtmResolver, StrikeLadderCache
+
+
+class _Hub:
+    def __init__(self, spot):
+        self.spot = spot
+
+    def price(self, symbol="SPY"):
+        return self.spot
+
+
+class _Tradier:
+    def __init__(self):
+        self.calls = []
+
+    async def strikes(self, symbol, expiration):
+        self.calls.append(expiration)
+        return [] if expiration == "2025-06-21" else [544.0, 545.0, 546.0, 547.0]
+
+
+def test_ladder_loads_once_and_skips_empty_expiries(monkeypatch):
+    tradier = _Tradier()
+    monkeypatch.setattr(osr, "get_tradier", lambda: tradier)
+
+    async def _no_chain(*_a, **_k):
+        raise RuntimeError("offline")
+    monkeypatch.setattr(osr, "aget_chain_snapshot", _no_chain)
+
+    cache = StrikeLadderCache()
+    resolver = AtmResolver(_Hub(545.4), ladders=cache)
+    ladder = asyncio.run(resolver.prepare("2025-06-21"))       # Saturday → next listed expiry
+    assert ladder.expiry == "2025-06-22" and tradier.calls == ["2025-06-21", "2025-06-22"]
+    assert resolver.resolve("C") == "SPY250622C00545000"
+    assert resolver.resolve("P") == "SPY250622P00545000"
+
+    asyncio.run(resolver.prepare("2025-06-22"))
+    assert tradier.calls == ["2025-06-21", "2025-06-22"]       # cached ladder, no refetch
+    assert cache.stats()["loads"] == 1
+
+
+def test_resolver_recentres_only_outside_band():
+    hub = _Hub(545.4)
+    resolver = AtmResolver(hub, ladders=StrikeLadderCache())
+    resolver.set_ladder(resolver.ladders.put("SPY", "2025-06-20", [547, 545, 546, 544, 545]), "2025-06-20")
+    assert resolver.strike == 545.0 and resolver.stats()["band"] == (544.5, 545.5)
+
+    hub.spot = 545.49
+    assert resolver.refresh() is False
+    hub.spot = 546.6
+    assert resolver.resolve("C") == "SPY250620C00547000" and resolver.stats()["recentres"] == 2
+    hub.spot = 600.0                                           # beyond the ladder → top strike
+    assert resolver.resolve("put") == "SPY250620P00547000"
+    assert AtmResolver(hub, ladders=StrikeLadderCache()).resolve("C") is None
@@ -0,0 +1,86 @@
+# test_order_tracker.py
+# Order-fill state machine: polled fills, event-stream updates, deadlines with cancel
+
+import asyncio
+
+from core.order_tracker import OrderTracker, classify
+from core.tradier_async import TradierOrder
+
+
+class _Broker:
+    """Scripted status sequence per order id; cancel flips the order to canceled."""
+
+    def __init__(self, script, partial=None):
+        self.script = {k: list(v) for k, v in script.items()}
+        self.partial = partial or {}            # order id → contracts filled before the cancel
+        self.cancelled = []
+
+    async def order(self, oid):
+        seq = self.script[oid]
+        status = seq.pop(0) if len(seq) > 1 else seq[0]
+        qty = 2.0 if status == "filled" else self.partial.get(oid, 0.0)
+        return TradierOrder(oid, status, exec_quantity=qty, avg_fill_price=1.25 if qty else 0.0)
+
+    async def cancel_order(self, oid):
+        self.cancelled.append(oid)
+        self.script[oid] = ["canceled"]
+        return TradierOrder(oid, "ok")
+
+
+def test_classify_statuses():
+    assert classify("ok") == "pending" and classify("partially_filled") == "partially_filled"
+    assert classify("canceled") == "cancelled" and classify("FILLED") == "filled"
+    assert classify("weird") is None
+
+
+def test_fill_after_pending_is_awaited_not_failed():
+    broker = _Broker({"1": ["pending", "open", "partially_filled", "filled"]})
+    tracker = OrderTracker(broker)
+
+    async def run():
+        return await tracker.submit_and_wait(TradierOrder("1", "ok", quantity=2.0), timeout=2)
+
+    tracked = asyncio.run(run())
+    assert tracked.filled and tracked.filled_qty == 2.0 and tracked.avg_fill_price == 1.25
+    assert [s for _, s in tracked.history] == ["pending", "open", "partially_filled", "filled"]
+    assert tracked.time_to_fill > 0 and tracker.stats()["ttf_p50"] is not None
+
+
+def test_event_stream_update_and_deadline_cancel():
+    broker = _Broker({"2": ["open"], "3": ["open"]})
+    tracker = OrderTracker(broker)
+
+    async def run():
+        tracker.track(TradierOrder("2", "ok"), poll=False)
+        waiter = asyncio.create_task(tracker.wait("2", timeout=1))
+        await asyncio.sleep(0)
+        tracker.on_update(TradierOrder("2", "filled", exec_quantity=1.0, avg_fill_price=0.9))
+        streamed = await waiter
+        timed_out = await tracker.submit_and_wait(TradierOrder("3", "ok"), timeout=0.2,
+                                                  cancel_on_timeout=True)
+        await asyncio.sleep(0.05)
+        return streamed, timed_out
+
+    streamed, timed_out = asyncio.run(run())
+    assert streamed.filled and streamed.avg_fill_price == 0.9
+    assert broker.cancelled == ["3"] and not timed_out.filled
+    assert tracker.stats()["timeouts"] == 1
+
+
+def test_cancel_on_timeout_rereads_partial_fill():
+    broker = _Broker({"5": ["open"]}, partial={"5": 1.0})
+    tracker = OrderTracker(broker)
+
+    async def run():
+        tracker.track(TradierOrder("5", "ok", quantity=3.0), poll=False)
+        return await tracker.wait("5", timeout=0.1, cancel_on_timeout=True)
+
+    tracked = asyncio.run(run())
+    assert broker.cancelled == ["5"] and tracked.state == "cancelled"
+    assert tracked.filled_qty == 1.0 and tracked.avg_fill_price == 1.25
+
+
+def test_skipped_orders_resolve_immediately():
+    tracked = asyncio.run(OrderTracker(_Broker({})).submit_and_wait(
+        TradierOrder("", "skipped", reason="test_mode")))
+    assert tracked.state == "skipped" and tracked.done
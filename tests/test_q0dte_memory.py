@@ -0,0 +1,53 @@
+# test_q0dte_memory.py
+# Append-only memory: reverse tail reads, in-memory ring, incremental pattern counters across restarts
+
+import json
+
+from core.utils.jsonl_tail import tail_jsonl
+from mesh.q_0dte_memory import MemoryStore
+
+
+def test_tail_reads_across_blocks_and_skips_torn_lines(tmp_path):
+    path = tmp_path / "log.jsonl"
+    with open(path, "w") as f:
+        for i in range(200):
+            f.write(json.dumps({"i": i, "pad": "x" * (i % 7)}) + "\n")
+        f.write('{"i": 200, "pa')                                   # torn write
+    got = tail_jsonl(str(path), 5, chunk_size=64)
+    assert [r["i"] for r in got] == [195, 196, 197, 198, 199]
+    assert [r["i"] for r in tail_jsonl(str(path), 2, predicate=lambda r: r["i"] % 50 == 0)] == [100, 150]
+    assert tail_jsonl(str(tmp_path / "missing.jsonl"), 5) == []
+
+
+def _store(tmp_path, ring=10):
+    return MemoryStore(str(tmp_path / "mem.jsonl"), str(tmp_path / "summary.json"), ring_size=ring)
+
+
+def test_ring_and_counters_survive_restart(tmp_path):
+    store = _store(tmp_path)
+    for i in range(30):
+        store.append({"pattern_tag": "gamma_fade" if i % 3 else "vwap_reclaim", "n": i,
+                      **({"result": "win"} if i % 5 == 0 else {})})
+    assert [s["n"] for s in store.recent(3)] == [27, 28, 29]
+    assert len(store.recent(50)) == 30                              # past the ring → tail read
+    first = store.summary()
+    assert first["vwap_reclaim"] == {"count": 10, "wins": 2, "losses": 0, "others": 8}
+    assert first["gamma_fade"]["count"] == 20
+
+    store.flush()
+    with open(tmp_path / "mem.jsonl", "a") as f:                    # appended by another writer
+        f.write(json.dumps({"pattern_tag": "compression_chop", "result": "loss"}) + "\n")
+
+    restarted = _store(tmp_path)
+    assert restarted.summary() == {**first, "compression_chop": {"count": 1, "wins": 0, "losses": 1, "others": 0}}
+    assert restarted.recent(2)[-1]["pattern_tag"] == "compression_chop"
+
+
+def test_counters_rebuilt_when_log_rotated(tmp_path):
+    store = _store(tmp_path)
+    for _ in range(5):
+        store.append({"pattern_tag": "gamma_fade"})
+    store.flush()
+    with open(tmp_path / "mem.jsonl", "w") as f:                    # rotated: shorter than checkpoint
+        f.write(json.dumps({"pattern_tag": "vwap_reclaim"}) + "\n")
+    assert _store(tmp_path).summary() == {"vwap_reclaim": {"count": 1, "wins": 0, "losses": 0, "others": 1}}
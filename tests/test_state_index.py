@@ -0,0 +1,69 @@
+# test_state_index.py
+# State similarity index: normalised k-NN over memory snapshots, incremental appends, checkpoint + log catch-up
+
+import time
+
+import numpy as np
+
+from analytics.state_index import StateIndex, state_row
+from mesh.q_0dte_memory import MemoryStore
+
+
+def _state(rng, regime):
+    base = {"fade": (-0.3, -9e8, 1.15), "reclaim": (0.3, 2e8, 1.02)}[regime]
+    return {"vwap_diff": base[0] + rng.normal(0, 0.05), "gex": base[1] + rng.normal(0, 5e7),
+            "skew": base[2] + rng.normal(0, 0.01), "return": rng.normal(0, 0.002),
+            "vix": 18 + rng.normal(0, 1), "time_of_day_bin": int(rng.integers(0, 13))}
+
+
+def _setup(tmp_path):
+    store = MemoryStore(str(tmp_path / "mem.jsonl"), str(tmp_path / "summary.json"))
+    index = StateIndex(str(tmp_path / "mem.jsonl"), str(tmp_path / "index.npz"))
+    store.subscribe(index.on_append)
+    return store, index
+
+
+def test_neighbours_follow_normalised_regime(tmp_path):
+    rng = np.random.default_rng(7)
+    store, index = _setup(tmp_path)
+    for i in range(400):
+        regime = "fade" if i % 2 else "reclaim"
+        store.append({"timestamp": "2025-06-20T15:00:00", "pattern_tag": regime,
+                      "state_vector": _state(rng, regime), "result": "win" if regime == "fade" else "loss"})
+    index.load()                                                     # nothing indexed yet → parses the log
+    assert len(index) == 400 and index.stats()["indexed"] == 400
+
+    q = _state(rng, "fade")
+    hits = index.query(q, k=15)
+    assert hits.dominant_tag == "fade" and hits.win_rate == 1.0
+    assert [n.distance for n in hits.neighbors] == sorted(n.distance for n in hits.neighbors)
+
+    for _ in range(300):                                             # live appends: tail, then a rebuild
+        store.append({"pattern_tag": "reclaim", "state_vector": _state(rng, "reclaim")})
+    index.flush()                                                    # rebuild runs off the append path
+    assert len(index) == 700 and index.stats()["rebuilds"] == 2
+    assert 700 - index.stats()["indexed"] < 256
+
+    t0 = time.perf_counter()
+    for _ in range(200):
+        index.query(q, k=20)
+    assert (time.perf_counter() - t0) / 200 < 1e-3
+
+
+def test_restart_loads_checkpoint_and_parses_only_new_lines(tmp_path):
+    rng = np.random.default_rng(1)
+    store, index = _setup(tmp_path)
+    index.load()
+    for _ in range(300):
+        store.append({"pattern_tag": "fade", "state_vector": _state(rng, "fade")})
+    index.flush()                                                    # checkpoint written by the rebuild thread
+    store.append({"pattern_tag": "reclaim", "state_vector": {"vwap_diff": 0.3}})   # after the checkpoint
+
+    restarted = StateIndex(str(tmp_path / "mem.jsonl"), str(tmp_path / "index.npz")).load()
+    assert len(restarted) == 301 and restarted.stats()["rebuilds"] == 1
+    assert np.array_equal(restarted._X[:300], index._X[:300])
+
+
+def test_state_row_time_bin_and_aliases():
+    row = state_row({"vwap_diff": 0.1, "intraday_return": 0.004}, ts="2025-06-20T14:05:00")  # 10:05 ET
+    assert row[0] == 0.1 and row[3] == 0.004 and np.isnan(row[1]) and row[5] == 1.0
@@ -0,0 +1,44 @@
+# test_tick_recorder.py
+# Binary tick segments: write through the recorder thread, read back via TickReader
+
+import polygon.tick_recorder as tr
+from polygon.tick_recorder import TickReader, TickRecorder
+
+
+def test_round_trip_and_reopen(tmp_path, monkeypatch):
+    monkeypatch.setattr(tr, "session_date", lambda: "2025-06-20")
+    monkeypatch.setattr(tr, "CHUNK_BYTES", 4096)          # force several grows
+
+    rec = TickRecorder(str(tmp_path))
+    frames = []
+    for i in range(200):
+        frames.append([
+            {"ev": "Q", "sym": "SPY", "bp": 545.0 + i, "ap": 545.02 + i, "bs": 3, "as": 4, "t": 1_000 + i},
+            {"ev": "T", "sym": "O:SPY250620C00545000", "p": 1.25, "s": 10, "x": 4, "t": 2_000 + i},
+            {"ev": "status", "status": "connected"},
+        ])
+    for i, frame in enumerate(frames):
+        rec.submit(frame, recv_ts=1_700_000_000 + i)
+    rec.close()
+    assert rec.stats()["written"] == 400 and rec.stats()["skipped"] == 200
+
+    reader = TickReader.for_date("2025-06-20", str(tmp_path))
+    assert len(reader) == 400
+    spy = reader.select("SPY", kinds=["Q"])
+    assert len(spy) == 200 and spy["f"][5, 0] == 550.0
+    window = reader.between(int((1_700_000_000 + 50) * 1e9), int((1_700_000_000 + 60) * 1e9))
+    assert len(window) == 20
+
+    ev = next(reader.iter_events(reader.select("O:SPY250620C00545000")))
+    assert ev == {"ev": "T", "sym": "O:SPY250620C00545000", "_recv": 1_700_000_000.0,
+                  "p": 1.25, "s": 10.0, "x": 4, "t": 2_000}
+    reader.close()
+
+    # appending to an existing segment keeps symbol ids and record count
+    rec = TickRecorder(str(tmp_path))
+    rec.submit([{"ev": "AM", "sym": "SPY", "o": 1, "h": 2, "l": 0.5, "c": 1.5, "v": 100, "vw": 1.2, "s": 60_000}])
+    rec.close()
+    reader = TickReader.for_date("2025-06-20", str(tmp_path))
+    assert len(reader) == 401 and reader.symbols == {0: "SPY", 1: "O:SPY250620C00545000"}
+    assert reader.records[-1]["sym"] == 0 and reader.records[-1]["f"][4] == 100
+    reader.close()
@@ -0,0 +1,74 @@
+# test_tradier_async.py
+# Async Tradier client: payload normalisation, typed parsing, order payloads and errors
+
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+import core.tradier_async as ta
+from core.tradier_async import TradierAsync, TradierError, _as_list, _scalars, underlying_of
+
+
+def _client(monkeypatch, handler):
+    transport = httpx.MockTransport(handler)
+    monkeypatch.setattr(ta, "get_async_client", lambda url: httpx.AsyncClient(transport=transport))
+    return TradierAsync("https://api.test/v1", "ACC1")
+
+
+def test_normalisation_helpers():
+    assert _as_list("null", "position") == [] and _as_list({"positions": "null"}, "positions") == []
+    assert _as_list({"order": {"id": 1}}, "order") == [{"id": 1}]
+    assert _as_list({"order": [{"id": 1}, "junk"]}, "order") == [{"id": 1}]
+    assert _scalars({"date": "2025-06-20"}, "date") == ["2025-06-20"]
+    assert _scalars({"strike": [1.0, 2.0]}, "strike") == [1.0, 2.0] and _scalars(None, "x") == []
+    assert underlying_of("O:SPY250620C00545000") == "SPY"
+
+
+def test_positions_orders_and_errors(monkeypatch):
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        path = request.url.path
+        if path.endswith("/positions"):
+            body = {"positions": {"position": {"id": 7, "symbol": "SPY250620C00545000",
+                                               "quantity": 2.0, "cost_basis": 220.0}}}
+        elif request.method == "POST":
+            body = {"order": {"id": 99, "status": "ok"}}
+        elif path.endswith("/orders/99"):
+            body = {"order": {"id": 99, "status": "filled", "avg_fill_price": "1.1"}}
+        else:
+            return httpx.Response(400, json={"errors": {"error": "bad symbol"}})
+        return httpx.Response(200, json=body)
+
+    async def run():
+        tradier = _client(monkeypatch, handler)
+        positions = await tradier.positions()
+        order = await tradier.place_option_order("O:SPY250620C00545000", 2, "buy_to_open",
+                                                 order_type="limit", price=1.05)
+        status = await tradier.order("99")
+        with pytest.raises(TradierError) as err:
+            await tradier.quote("XXX")
+        return positions, order, status, err.value
+
+    positions, order, status, err = asyncio.run(run())
+    assert positions[0].as_dict()["cost_basis"] == 220.0 and positions[0].quantity == 2.0
+    assert order.id == "99" and order.accepted and not order.filled
+    assert status.filled and status.avg_fill_price == 1.1
+    assert err.status == 400 and err.body == {"errors": {"error": "bad symbol"}}
+
+    form = parse_qs(seen[1].content.decode())
+    assert seen[1].url.path == "/v1/accounts/ACC1/orders"
+    assert form["symbol"] == ["SPY"] and form["option_symbol"] == ["SPY250620C00545000"]
+    assert form["type"] == ["limit"] and form["price"] == ["1.05"] and "tag" not in form
+
+
+def test_test_mode_skips_submission(monkeypatch):
+    monkeypatch.setenv("ALLOW_ORDER_SUBMISSION", "0")
+    tradier = _client(monkeypatch, lambda r: pytest.fail("order must not be sent"))
+    order = asyncio.run(tradier.place_option_order("SPY250620P00540000", 1, "sell_to_close"))
+    assert order.status == "skipped" and not order.accepted
+    assert json.loads(json.dumps(order.as_dict()))["reason"] == "test_mode"
@@ -0,0 +1,101 @@
+# test_ws_supervisor.py
+# Offline checks for websocket backoff bounds, subscription bookkeeping and reconnect replay
+
+import asyncio
+import json
+
+import polygon.ws_supervisor as ws_supervisor
+from polygon.ws_supervisor import WebSocketSupervisor
+
+def test_backoff_is_jittered_and_capped():
+    for attempt in range(12):
+        ceiling = min(30.0, 0.5 * 2 ** attempt)
+        delays = [WebSocketSupervisor.backoff(attempt, 0.5, 30.0) for _ in range(50)]
+        assert all(0 <= d <= ceiling for d in delays)
+    assert len({round(d, 6) for d in delays}) > 1
+
+def test_channels_diff_and_replay_set_while_disconnected():
+    sup = WebSocketSupervisor("test", "ws://unused", lambda events: None, channels=["T.SPY"])
+    assert sup.subscribe(["T.SPY", "Q.SPY"]) == ["Q.SPY"]
+    assert sup.unsubscribe(["T.SPY", "AM.SPY"]) == ["T.SPY"]
+    sup.set_channels(["Q.SPY", "A.SPY"])
+    assert sup.channels == {"Q.SPY", "A.SPY"}
+    stats = sup.stats()
+    assert stats["connected"] is False and stats["channels"] == 2 and stats["reconnects"] == 0
+
+
+class _FakeSocket:
+    """One fake connection: auth succeeds, then frames come from `inbox` until a DROP."""
+    DROP = object()
+
+    def __init__(self):
+        self.sent = []
+        self.inbox = asyncio.Queue()
+        self.authed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def send(self, raw):
+        self.sent.append(json.loads(raw))
+
+    async def recv(self):
+        if not self.authed:
+            self.authed = True
+            return json.dumps([{"ev": "status", "status": "auth_success"}])
+        item = await self.inbox.get()
+        if item is self.DROP:
+            raise ConnectionError("connection closed")
+        return json.dumps(item)
+
+    async def close(self):
+        await self.inbox.put(self.DROP)
+
+
+def test_dropped_connection_reauths_and_replays_channels(monkeypatch):
+    sockets, received = [], []
+
+    def connect(url, **_kw):
+        sockets.append(_FakeSocket())
+        return sockets[-1]
+
+    monkeypatch.setattr(ws_supervisor.websockets, "connect", connect)
+    monkeypatch.setattr(WebSocketSupervisor, "backoff", staticmethod(lambda attempt: 0.05))
+    sup = WebSocketSupervisor("test", "ws://fake", received.extend, channels=["T.SPY", "Q.SPY"],
+                              api_key="KEY")
+
+    async def until(cond):
+        for _ in range(200):
+            if cond():
+                return
+            await asyncio.sleep(0.005)
+        raise AssertionError("timed out")
+
+    async def run():
+        sup.start()
+        await until(lambda: sup.connected)
+        await sockets[0].inbox.put([{"ev": "T", "sym": "SPY", "p": 500.0}])
+        await until(lambda: received)
+
+        await sockets[0].inbox.put(_FakeSocket.DROP)                    # socket dies
+        await until(lambda: sup.stats()["reconnects"] == 1)            # backing off, socket gone
+        assert not sup.connected
+        sup.subscribe(["AM.SPY"])                                       # edited while down
+        sup.unsubscribe(["T.SPY"])
+        await until(lambda: len(sockets) == 2 and sup.connected)
+        await asyncio.sleep(0.01)
+        await sup.stop()
+
+    asyncio.run(run())
+    first, second = sockets
+    assert first.sent == [{"action": "auth", "params": "KEY"},
+                          {"action": "subscribe", "params": "Q.SPY,T.SPY"}]
+    assert second.sent == [{"action": "auth", "params": "KEY"},
+                           {"action": "subscribe", "params": "AM.SPY,Q.SPY"}]
+    assert received == [{"ev": "T", "sym": "SPY", "p": 500.0}]
+    stats = sup.stats()
+    assert stats["connects"] == 2 and stats["reconnects"] == 1 and stats["messages"] == 1
+    assert stats["last_gap"] is not None